@@ -0,0 +1,195 @@
+"""
+基准测试入口
+
+    python -m benchmarks run [--scale small|medium|large] [--repeat 3] [--filter lrc] [--output 结果.json]
+    python -m benchmarks compare 旧结果.json 新结果.json [--threshold 0.1]
+    python -m benchmarks list
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from benchmarks.cases import CASES, SCALES  # noqa: E402
+
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+
+
+def git_revision():
+    """返回 (提交哈希, 工作区是否有未提交修改)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BASE_DIR,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit or None, dirty
+    except OSError:
+        return None, False
+
+
+def silence_loguru():
+    """tool021 逐个区域打印日志，基准测试时丢弃输出（仍保留格式化开销）"""
+    try:
+        from loguru import logger
+    except ImportError:
+        return
+    logger.remove()
+    logger.add(io.StringIO(), level="DEBUG")
+
+
+def run_case(func, workspace, scale, repeat):
+    """生成数据并重复计时，返回结果字典"""
+    result = {"times": [], "items": None, "bytes": None, "error": None}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            case = func(workspace, scale)
+            result["items"] = case.get("items")
+            result["bytes"] = case.get("bytes")
+            for _ in range(repeat):
+                if case.get("reset"):
+                    case["reset"]()
+                start = time.perf_counter()
+                case["run"]()
+                result["times"].append(time.perf_counter() - start)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    best = min(result["times"])
+    result["min"] = best
+    result["median"] = statistics.median(result["times"])
+    if result["items"]:
+        result["items_per_s"] = result["items"] / best if best else None
+    if result["bytes"]:
+        result["mb_per_s"] = result["bytes"] / best / 1024 / 1024 if best else None
+    return result
+
+
+def run_benchmarks(scale_name="small", repeat=3, pattern=None, output=None, keep=None):
+    scale = SCALES[scale_name]
+    names = [name for name in CASES if not pattern or pattern in name]
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scale": scale_name,
+        "repeat": repeat,
+        "results": {},
+    }
+
+    silence_loguru()
+    workspace = keep or tempfile.mkdtemp(prefix="scripttools-bench-")
+    os.makedirs(workspace, exist_ok=True)
+    cwd = os.getcwd()
+    # 工具默认写入 ./cache，切换到工作目录避免污染项目
+    os.chdir(workspace)
+    try:
+        for name in names:
+            print(f"{name} ...", end=" ", flush=True)
+            result = run_case(CASES[name], workspace, scale, repeat)
+            report["results"][name] = result
+            if result["error"]:
+                print(f"跳过 ({result['error']})")
+            else:
+                print(f"{result['min'] * 1000:.1f} ms")
+    finally:
+        os.chdir(cwd)
+        if not keep:
+            import shutil
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{commit or 'unknown'}{'-dirty' if dirty else ''}-{scale_name}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f"\n结果已保存: {output}")
+    return report
+
+
+def compare_results(old_path, new_path, threshold=0.1):
+    """
+    比较两次结果的最短耗时
+
+    Returns:
+        变慢超过阈值的用例数
+    """
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    if old.get("scale") != new.get("scale"):
+        print(f"警告: 数据规模不同 ({old.get('scale')} vs {new.get('scale')})")
+    print(f"{old.get('commit')} -> {new.get('commit')}\n")
+    print(f"{'用例':<36}{'旧(ms)':>12}{'新(ms)':>12}{'变化':>10}")
+
+    regressions = 0
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        before = old["results"].get(name, {}).get("min")
+        after = new["results"].get(name, {}).get("min")
+        if before is None or after is None:
+            print(f"{name:<36}{'-' if before is None else f'{before * 1000:.1f}':>12}"
+                  f"{'-' if after is None else f'{after * 1000:.1f}':>12}{'':>10}")
+            continue
+        change = (after - before) / before if before else 0.0
+        mark = ""
+        if change > threshold:
+            mark = "  变慢"
+            regressions += 1
+        elif change < -threshold:
+            mark = "  变快"
+        print(f"{name:<36}{before * 1000:>12.1f}{after * 1000:>12.1f}{change:>+10.1%}{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="ScriptTools 基准测试")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser("run", help="运行基准测试")
+    run_parser.add_argument("--scale", choices=list(SCALES), default="small", help="数据规模")
+    run_parser.add_argument("--repeat", type=int, default=3, help="每个用例的计时次数")
+    run_parser.add_argument("--filter", dest="pattern", help="只运行名称包含该字符串的用例")
+    run_parser.add_argument("--output", "-o", help="结果JSON路径（默认 benchmarks/results/<提交>-<规模>.json）")
+    run_parser.add_argument("--keep", help="在该目录生成并保留测试数据")
+
+    compare_parser = subparsers.add_parser("compare", help="比较两次结果")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="判定变快/变慢的相对变化")
+
+    subparsers.add_parser("list", help="列出全部用例")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run_benchmarks(args.scale, args.repeat, args.pattern, args.output, args.keep)
+        return 0
+    if args.command == "compare":
+        return 1 if compare_results(args.old, args.new, args.threshold) else 0
+    if args.command == "list":
+        for name in CASES:
+            print(name)
+        return 0
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+基准测试用例
+
+每个用例是 bench_xxx(workspace, scale) 函数，生成数据后返回：
+    {"run": 被计时的函数, "reset": 每次计时前调用的函数（可选，不计时），
+     "items": 处理的条目数, "bytes": 处理的字节数}
+"""
+import json
+import os
+import shutil
+
+from benchmarks import fixtures
+
+# 各规模的数据量
+SCALES = {
+    "small": {"lines": 10_000, "regions": 200, "page": 1024, "files": 2_000, "audio_files": 20, "skeletons": 100,
+              "bundles": 50, "image": 256, "screen": (1280, 720)},
+    "medium": {"lines": 100_000, "regions": 500, "page": 2048, "files": 20_000, "audio_files": 100, "skeletons": 500,
+               "bundles": 200, "image": 512, "screen": (1920, 1080)},
+    "large": {"lines": 1_000_000, "regions": 1000, "page": 2048, "files": 100_000, "audio_files": 400, "skeletons": 2000,
+              "bundles": 1000, "image": 1024, "screen": (1920, 1080)},
+}
+
+# tool008 的 lrc_to_srt 对行数是平方复杂度，限制行数避免大规模时跑不完
+QUADRATIC_LINE_LIMIT = 20_000
+
+
+def _size(*paths):
+    return sum(os.path.getsize(path) for path in paths)
+
+
+def bench_tool007_lrc_to_srt(workspace, scale):
+    from tool007.main import lrc_to_srt
+    lrc_path = fixtures.make_lrc(os.path.join(workspace, "tool007.lrc"), scale["lines"])
+    with open(lrc_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return {"run": lambda: lrc_to_srt(content, lrc_path), "items": scale["lines"], "bytes": _size(lrc_path)}
+
+
+def bench_tool008_lrc_to_srt(workspace, scale):
+    from tool008.main import lrc_to_srt
+    lines = min(scale["lines"], QUADRATIC_LINE_LIMIT)
+    lrc_path = fixtures.make_lrc(os.path.join(workspace, "tool008.lrc"), lines)
+    srt_path = os.path.join(workspace, "tool008.srt")
+    return {"run": lambda: lrc_to_srt(lrc_path, srt_path), "items": lines, "bytes": _size(lrc_path)}
+
+
+def bench_tool011_srt_to_lrc(workspace, scale):
+    from tool011.main import SRTtoLRCConverter
+    srt_path = fixtures.make_srt(os.path.join(workspace, "tool011.srt"), scale["lines"])
+    lrc_path = os.path.join(workspace, "tool011.lrc")
+    converter = SRTtoLRCConverter()
+    return {"run": lambda: converter.convert(srt_path, lrc_path), "items": scale["lines"], "bytes": _size(srt_path)}
+
+
+def bench_tool012_merge_lrc_files(workspace, scale):
+    from tool012.main import merge_lrc_files
+    jp_path = fixtures.make_lrc(os.path.join(workspace, "tool012_jp.lrc"), scale["lines"])
+    cn_path = fixtures.make_lrc(os.path.join(workspace, "tool012_cn.lrc"), scale["lines"], seed=7, offset_ms=200)
+    out_path = os.path.join(workspace, "tool012_out.lrc")
+    return {"run": lambda: merge_lrc_files(jp_path, cn_path, out_path),
+            "items": scale["lines"] * 2, "bytes": _size(jp_path, cn_path)}
+
+
+def bench_tool021_split_atlas(workspace, scale):
+    from tool021.atlas_unpack3 import split_atlas
+    atlas_dir = os.path.join(workspace, "tool021")
+    atlas_path = fixtures.make_atlas(atlas_dir, "spine", scale["regions"], page_size=scale["page"], pages=2)
+    output_path = os.path.join(atlas_dir, "images")
+    return {
+        "run": lambda: split_atlas("spine", output_path=output_path, atlas_path=atlas_path),
+        "reset": lambda: shutil.rmtree(output_path, ignore_errors=True),
+        "items": scale["regions"],
+        "bytes": _size(*[os.path.join(atlas_dir, name) for name in os.listdir(atlas_dir)]),
+    }
+
+
+def bench_tool021_premultiply_alpha(workspace, scale):
+    from tool021.atlas_unpack3 import premultiply_alpha
+    source = fixtures.make_image((scale["image"], scale["image"]))
+    state = {}
+    return {
+        "run": lambda: premultiply_alpha(state["image"]),
+        "reset": lambda: state.update(image=source.copy()),
+        "items": scale["image"] ** 2,
+        "bytes": scale["image"] ** 2 * 4,
+    }
+
+
+def bench_tool024_compare_images(workspace, scale):
+    from tool024.region_change import compare_images
+    first = fixtures.make_image(scale["screen"], mode="RGB")
+    second = fixtures.make_image(scale["screen"], seed=fixtures.SEED + 1, mode="RGB")
+    pixels = scale["screen"][0] * scale["screen"][1]
+    return {"run": lambda: compare_images(first, second), "items": pixels, "bytes": pixels * 3 * 2}
+
+
+def bench_tool002_create_m3u_from_list(workspace, scale):
+    from tool002.main import create_m3u_from_list
+    library = os.path.join(workspace, "tool002_library")
+    paths = fixtures.make_empty_library(library, scale["files"])
+    fixtures.age_tree(library)
+    names = [os.path.splitext(os.path.basename(path))[0] for path in paths[::3]] + ["missing_song"] * 10
+    output = os.path.join(workspace, "tool002.m3u")
+    return {"run": lambda: create_m3u_from_list(names, library, output), "items": scale["files"], "bytes": 0}
+
+
+def bench_fs_index_cold(workspace, scale):
+    from common.fs_index import FileIndex
+    library = os.path.join(workspace, "fs_index_library")
+    fixtures.make_empty_library(library, scale["files"])
+    fixtures.age_tree(library)
+    db_path = os.path.join(workspace, "fs_index_cold.sqlite")
+
+    def reset():
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    return {"run": lambda: FileIndex(db_path).files(library, {".flac"}), "reset": reset,
+            "items": scale["files"], "bytes": 0}
+
+
+def bench_fs_index_warm(workspace, scale):
+    from common.fs_index import FileIndex
+    library = os.path.join(workspace, "fs_index_library")
+    if not os.path.isdir(library):
+        fixtures.make_empty_library(library, scale["files"])
+        fixtures.age_tree(library)
+    index = FileIndex(os.path.join(workspace, "fs_index_warm.sqlite"))
+    index.refresh(library)
+    return {"run": lambda: index.files(library, {".flac"}), "items": scale["files"], "bytes": 0}
+
+
+def _bench_bundle_decode(workspace, scale, game):
+    from tool016.main import _decode_directory
+    root = os.path.join(workspace, "tool016")
+    game_dir = os.path.join(root, game)
+
+    def reset():
+        shutil.rmtree(root, ignore_errors=True)
+        fixtures.make_bundles(root, scale["bundles"])
+
+    reset()
+    return {"run": lambda: _decode_directory(game_dir, game), "reset": reset,
+            "items": scale["bundles"], "bytes": _size(*[os.path.join(game_dir, f) for f in os.listdir(game_dir)])}
+
+
+def bench_tool016_soul_tide_decode(workspace, scale):
+    return _bench_bundle_decode(workspace, scale, "soul_tide")
+
+
+def bench_tool016_skzy_decode(workspace, scale):
+    return _bench_bundle_decode(workspace, scale, "skzy")
+
+
+def bench_tool016_hxls_decode(workspace, scale):
+    return _bench_bundle_decode(workspace, scale, "hxls")
+
+
+def bench_tool015_skel_to_json(workspace, scale):
+    from tool015.main import skel_to_json
+    root = os.path.join(workspace, "skel")
+    paths = fixtures.make_skels(root, scale["skeletons"])
+    return {"run": lambda: [skel_to_json(path) for path in paths], "items": len(paths), "bytes": _size(*paths)}
+
+
+def _spine_jsons(workspace, scale):
+    root = os.path.join(workspace, "spine_json")
+    if not os.path.isdir(root):
+        fixtures.make_spine_jsons(root, scale["skeletons"])
+    return sorted(os.path.join(root, name) for name in os.listdir(root))
+
+
+def bench_tool017_patch_unchanged(workspace, scale):
+    """重复运行：值都已相同，只读文件开头判断"""
+    from tool017.main import patch_json_tree
+    paths = _spine_jsons(workspace, scale)
+    return {"run": lambda: patch_json_tree(paths), "items": len(paths), "bytes": _size(*paths)}
+
+
+def bench_tool017_load_dump(workspace, scale):
+    """对照：原来的做法，每个文件完整解析后重新写出"""
+    paths = _spine_jsons(workspace, scale)
+
+    def run():
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data["skeleton"]["images"] = 'images'
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+
+    return {"run": run, "items": len(paths), "bytes": _size(*paths)}
+
+
+def _audio_library(workspace, scale):
+    library = os.path.join(workspace, "audio_library")
+    if not os.path.isdir(library):
+        fixtures.make_audio_library(library, scale["audio_files"])
+    return library, sorted(os.path.join(library, name) for name in os.listdir(library))
+
+
+def bench_tool003_duration_report(workspace, scale):
+    from tool003.main import write_duration_report
+    library, paths = _audio_library(workspace, scale)
+    output = os.path.join(workspace, "tool003.txt")
+    return {"run": lambda: write_duration_report(library, output), "items": len(paths), "bytes": _size(*paths)}
+
+
+# 带内嵌封面的音频库中每个封面的大小
+COVER_SIZE = 512 * 1024
+
+
+def _cover_library(workspace, scale):
+    library = os.path.join(workspace, "cover_library")
+    if not os.path.isdir(library):
+        fixtures.make_audio_library(library, scale["audio_files"], extensions=(".flac", ".mp3", ".wav"),
+                                    picture_size=COVER_SIZE)
+    return library, sorted(os.path.join(library, name) for name in os.listdir(library))
+
+
+def bench_duration_header_probe(workspace, scale):
+    """只读文件头获取时长（tool003 使用的路径）"""
+    from common.duration_probe import read_durations
+    library, paths = _cover_library(workspace, scale)
+    return {"run": lambda: read_durations(paths), "items": len(paths), "bytes": _size(*paths)}
+
+
+def bench_duration_mutagen(workspace, scale):
+    """对照：构造完整的mutagen对象获取时长（会解析内嵌封面）"""
+    from mutagen import File
+    library, paths = _cover_library(workspace, scale)
+    return {"run": lambda: [File(path).info.length for path in paths], "items": len(paths), "bytes": _size(*paths)}
+
+
+def bench_tool026_extract_lyrics(workspace, scale):
+    """整个音频库提取歌词（重复运行：歌词文件已存在且内容相同）"""
+    from common.lyrics import extract_lyrics_tree
+    # 单独的音频库：写出的LRC不影响其他用例
+    library = os.path.join(workspace, "lyrics_library")
+    if not os.path.isdir(library):
+        fixtures.make_audio_library(library, scale["audio_files"], extensions=(".flac", ".mp3", ".wav"))
+    paths = sorted(os.path.join(library, name) for name in os.listdir(library) if not name.endswith(".lrc"))
+    return {"run": lambda: extract_lyrics_tree([library]), "items": len(paths), "bytes": _size(*paths)}
+
+
+def bench_audio_meta_cold(workspace, scale):
+    from common.audio_meta import AudioMetaCache
+    library, paths = _audio_library(workspace, scale)
+    db_path = os.path.join(workspace, "audio_meta_cold.sqlite")
+
+    def reset():
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    return {"run": lambda: AudioMetaCache(db_path).get_many(paths), "reset": reset,
+            "items": len(paths), "bytes": _size(*paths)}
+
+
+def bench_audio_meta_warm(workspace, scale):
+    from common.audio_meta import AudioMetaCache
+    library, paths = _audio_library(workspace, scale)
+    cache = AudioMetaCache(os.path.join(workspace, "audio_meta_warm.sqlite"))
+    cache.get_many(paths)
+    return {"run": lambda: cache.get_many(paths), "items": len(paths), "bytes": 0}
+
+
+def bench_uexp_fixture_scan(workspace, scale):
+    """.uexp 转换依赖 umodel，这里只测量在资源目录中查找 .uexp 的开销"""
+    from common.batch import iter_input_files
+    root = os.path.join(workspace, "uexp")
+    fixtures.make_uexp(root, scale["bundles"])
+    return {"run": lambda: list(iter_input_files([root], {'.uexp'})), "items": scale["bundles"], "bytes": 0}
+
+
+# 用例名 -> 函数（按名称排序输出）
+CASES = {
+    name[len("bench_"):]: func
+    for name, func in sorted(globals().items())
+    if name.startswith("bench_") and callable(func)
+}
@@ -0,0 +1,873 @@
+"""
+基准测试用的合成数据
+
+所有数据由固定种子生成，同一规模下每次生成的内容完全相同，不需要网络或ffmpeg。
+FLAC使用VERBATIM子帧（不压缩）直接写出，结构合法，mutagen等库可以正常读取。
+"""
+import array
+import json
+import math
+import os
+import random
+import struct
+import sys
+import time
+import wave
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# 固定随机种子
+SEED = 20240601
+
+# FLAC每帧的采样数
+FLAC_BLOCK_SIZE = 4096
+
+LYRIC_WORDS = ["星", "夜", "风", "雨", "光", "海", "梦", "歌", "花", "雪", "君", "心", "空", "月", "路", "声"]
+
+
+# ---------------------------------------------------------------------------
+# 音频
+# ---------------------------------------------------------------------------
+
+def generate_samples(seconds, sample_rate=44100, channels=2, kind="sine", frequency=440.0, seed=SEED):
+    """生成16位交错PCM采样（array('h')）"""
+    total = int(seconds * sample_rate)
+    samples = array.array('h', bytes(total * channels * 2))
+    if kind == "sine":
+        step = 2 * math.pi * frequency / sample_rate
+        for i in range(total):
+            value = int(12000 * math.sin(step * i))
+            for c in range(channels):
+                samples[i * channels + c] = value
+    else:
+        rng = random.Random(seed)
+        for i in range(total * channels):
+            samples[i] = rng.randint(-12000, 12000)
+    return samples
+
+
+def write_wav(path, samples, sample_rate=44100, channels=2):
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+    return path
+
+
+def _crc8(data):
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+_CRC16_TABLE = []
+for _i in range(256):
+    _crc = _i << 8
+    for _ in range(8):
+        _crc = ((_crc << 1) ^ 0x8005) & 0xFFFF if _crc & 0x8000 else (_crc << 1) & 0xFFFF
+    _CRC16_TABLE.append(_crc)
+
+
+def _crc16(data):
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC16_TABLE[(crc >> 8) ^ byte]
+    return crc
+
+
+def _utf8_number(value):
+    """FLAC帧号使用的类UTF-8编码"""
+    if value < 0x80:
+        return bytes([value])
+    length = 2
+    while value >= 1 << (5 * length + 1):
+        length += 1
+    out = []
+    for _ in range(length - 1):
+        out.append(0x80 | (value & 0x3F))
+        value >>= 6
+    out.append(((0xFF00 >> length) & 0xFF) | value)
+    return bytes(reversed(out))
+
+
+def _metadata_block(block_type, payload, last):
+    return bytes([(0x80 if last else 0) | block_type]) + len(payload).to_bytes(3, 'big') + payload
+
+
+def _cover_bytes(size, seed=SEED):
+    """模拟内嵌封面的随机字节（只用于占据元数据空间，不是有效图片）"""
+    return random.Random(seed).randbytes(size)
+
+
+def write_flac(path, samples, sample_rate=44100, channels=2, tags=None, picture_size=0):
+    """
+    写出16位FLAC文件（VERBATIM子帧）
+
+    Args:
+        samples: 交错PCM采样 array('h')
+        tags: Vorbis注释字典，如 {"TITLE": ..., "LYRICS": ...}
+        picture_size: 大于0时写入该大小的PICTURE块（模拟内嵌封面）
+    """
+    total = len(samples) // channels
+
+    # STREAMINFO
+    info = struct.pack('>HH', FLAC_BLOCK_SIZE, FLAC_BLOCK_SIZE) + bytes(6)
+    packed = (sample_rate << 44) | ((channels - 1) << 41) | (15 << 36) | total
+    info += packed.to_bytes(8, 'big') + bytes(16)
+    blocks = [(0, info)]
+
+    if tags:
+        vendor = b"ScriptTools benchmarks"
+        comment = struct.pack('<I', len(vendor)) + vendor + struct.pack('<I', len(tags))
+        for key, value in tags.items():
+            entry = f"{key}={value}".encode('utf-8')
+            comment += struct.pack('<I', len(entry)) + entry
+        blocks.append((4, comment))
+
+    if picture_size:
+        mime = b"image/jpeg"
+        picture = struct.pack('>II', 3, len(mime)) + mime + struct.pack('>IIIIII', 0, 600, 600, 24, 0, picture_size)
+        blocks.append((6, picture + _cover_bytes(picture_size)))
+
+    with open(path, 'wb') as f:
+        f.write(b'fLaC')
+        for index, (block_type, payload) in enumerate(blocks):
+            f.write(_metadata_block(block_type, payload, index == len(blocks) - 1))
+
+        # 按声道拆分（大端）
+        channel_data = []
+        for c in range(channels):
+            channel = array.array('h', samples[c::channels])
+            if sys.byteorder == 'little':
+                channel.byteswap()
+            channel_data.append(channel)
+
+        for frame_number, start in enumerate(range(0, total, FLAC_BLOCK_SIZE)):
+            block = min(FLAC_BLOCK_SIZE, total - start)
+            if block == FLAC_BLOCK_SIZE:
+                header = bytes([0xFF, 0xF8, 0xC0, ((channels - 1) << 4) | 0x08])
+                tail = b''
+            else:
+                # 最后一帧：16位块大小写在帧号之后
+                header = bytes([0xFF, 0xF8, 0x70, ((channels - 1) << 4) | 0x08])
+                tail = struct.pack('>H', block - 1)
+            header += _utf8_number(frame_number) + tail
+            frame = header + bytes([_crc8(header)])
+            for channel in channel_data:
+                # 子帧头 0b0_000001_0：VERBATIM，无wasted bits
+                frame += b'\x02' + channel[start:start + block].tobytes()
+            f.write(frame + struct.pack('>H', _crc16(frame)))
+    return path
+
+
+# MPEG1 Layer III 的码率索引（kbps -> 索引）
+MP3_BITRATE_INDEX = {32: 1, 40: 2, 48: 3, 56: 4, 64: 5, 80: 6, 96: 7, 112: 8, 128: 9,
+                     160: 10, 192: 11, 224: 12, 256: 13, 320: 14}
+
+
+def _id3v2_apic(picture_size):
+    """只含一个APIC帧的ID3v2.3标签"""
+    data = b"\x00image/jpeg\x00\x03\x00" + _cover_bytes(picture_size)
+    frame = b"APIC" + struct.pack('>I', len(data)) + b"\x00\x00" + data
+    size = len(frame)
+    synchsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b"ID3\x03\x00\x00" + synchsafe + frame
+
+
+def write_mp3(path, seconds, bitrate=128, xing=False, picture_size=0):
+    """
+    写出静音的MPEG1 Layer III文件（44.1kHz立体声，帧内容全为0，不需要编码器）
+
+    Args:
+        xing: 第一帧写入Xing头（记录总帧数，按VBR文件处理）
+        picture_size: 大于0时写入带APIC帧的ID3v2标签（模拟内嵌封面）
+    """
+    frames = max(1, round(seconds * 44100 / 1152))
+    header = bytes([0xFF, 0xFB, MP3_BITRATE_INDEX[bitrate] << 4, 0x00])
+    frame_length = 144 * bitrate * 1000 // 44100
+    silent = header + bytes(frame_length - 4)
+    with open(path, 'wb') as f:
+        if picture_size:
+            f.write(_id3v2_apic(picture_size))
+        if xing:
+            # Xing头在帧头和32字节边信息之后：标志（只有帧数）+ 帧数
+            first = header + bytes(32) + b"Xing" + struct.pack('>II', 1, frames)
+            f.write(first + bytes(frame_length - len(first)))
+        f.write(silent * frames)
+    return path
+
+
+def make_audio_library(directory, count, seconds=1.0, extensions=(".flac", ".wav"), tags=True, picture_size=0):
+    """
+    生成音频库：交替写出正弦/噪声的FLAC与WAV（可选MP3）
+
+    Args:
+        picture_size: 大于0时FLAC/MP3带该大小的内嵌封面
+
+    Returns:
+        文件路径列表
+    """
+    os.makedirs(directory, exist_ok=True)
+    sine = generate_samples(seconds, kind="sine")
+    noise = generate_samples(seconds, kind="noise")
+    paths = []
+    for i in range(count):
+        ext = extensions[i % len(extensions)]
+        samples = sine if i % 2 == 0 else noise
+        path = os.path.join(directory, f"track_{i:05d}{ext}")
+        if ext == ".flac":
+            file_tags = {
+                "TITLE": f"Track {i}", "ARTIST": f"Artist {i % 17}", "ALBUM": f"Album {i // 100}",
+                "LYRICS": make_lrc_text(8, seed=i),
+            } if tags else None
+            write_flac(path, samples, tags=file_tags, picture_size=picture_size)
+        elif ext == ".mp3":
+            write_mp3(path, seconds, xing=i % 2 == 1, picture_size=picture_size)
+        else:
+            write_wav(path, samples)
+        paths.append(path)
+    return paths
+
+
+def make_empty_library(directory, count, extensions=(".flac", ".mp3", ".wav")):
+    """生成只有文件名的音频库（用于只关心目录扫描的工具）"""
+    paths = []
+    for i in range(count):
+        subdir = os.path.join(directory, f"artist{i % 50:02d}", f"album{i % 7}")
+        os.makedirs(subdir, exist_ok=True)
+        path = os.path.join(subdir, f"song_{i:06d}{extensions[i % len(extensions)]}")
+        open(path, 'wb').close()
+        paths.append(path)
+    return paths
+
+
+def age_tree(root, seconds=3600):
+    """把目录树中所有目录的修改时间调早，模拟长期未变化的库（否则刚生成的目录总会被索引重扫）"""
+    past = time.time() - seconds
+    for directory, _, _ in os.walk(root):
+        os.utime(directory, (past, past))
+
+
+# ---------------------------------------------------------------------------
+# 歌词/字幕
+# ---------------------------------------------------------------------------
+
+def _lyric_text(rng):
+    return "".join(rng.choice(LYRIC_WORDS) for _ in range(rng.randint(4, 12)))
+
+
+def make_lrc_text(lines, seed=SEED, step_ms=1500, offset_ms=0):
+    rng = random.Random(seed)
+    out = []
+    for i in range(lines):
+        ms = offset_ms + i * step_ms
+        out.append(f"[{ms // 60000:02d}:{ms // 1000 % 60:02d}.{ms // 10 % 100:02d}]{_lyric_text(rng)}")
+    return "\n".join(out) + "\n"
+
+
+def make_lrc(path, lines, seed=SEED, offset_ms=0):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(make_lrc_text(lines, seed, offset_ms=offset_ms))
+    return path
+
+
+def make_srt(path, blocks, seed=SEED):
+    rng = random.Random(seed)
+
+    def fmt(ms):
+        return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(blocks):
+            start = i * 1500
+            f.write(f"{i + 1}\n{fmt(start)} --> {fmt(start + 1400)}\n<i>{_lyric_text(rng)}</i>\n\n")
+    return path
+
+
+# ---------------------------------------------------------------------------
+# 图片/图集
+# ---------------------------------------------------------------------------
+
+def make_image(size, seed=SEED, mode="RGBA"):
+    """生成确定性的噪声图片"""
+    if not PIL_AVAILABLE:
+        raise RuntimeError("需要安装 Pillow")
+    width, height = size
+    rng = random.Random(seed)
+    channels = len(mode)
+    return Image.frombytes(mode, size, rng.randbytes(width * height * channels))
+
+
+def make_atlas(directory, name, regions, page_size=1024, pages=1, seed=SEED):
+    """
+    生成Spine(libGDX)格式的 .atlas 和对应的PNG图页
+
+    每页按网格排列区域，部分区域标记为旋转90度。
+
+    Returns:
+        .atlas 路径
+    """
+    os.makedirs(directory, exist_ok=True)
+    per_page = math.ceil(regions / pages)
+    grid = math.ceil(math.sqrt(per_page))
+    cell = page_size // grid
+    lines = []
+    index = 0
+    for page in range(pages):
+        png_name = f"{name}{'' if page == 0 else page + 1}.png"
+        make_image((page_size, page_size), seed=seed + page).save(os.path.join(directory, png_name))
+        lines += ["", png_name, f"size: {page_size},{page_size}", "format: RGBA8888",
+                  "filter: Linear,Linear", "repeat: none"]
+        for slot in range(min(per_page, regions - index)):
+            x, y = slot % grid * cell, slot // grid * cell
+            rotate = index % 5 == 0
+            w, h = cell - 2, cell // 2
+            lines += [
+                f"region_{index:05d}",
+                f"  rotate: {'true' if rotate else 'false'}",
+                f"  xy: {x}, {y}",
+                f"  size: {w}, {h}",
+                f"  orig: {w}, {h}",
+                "  offset: 0, 0",
+                "  index: -1",
+            ]
+            index += 1
+    atlas_path = os.path.join(directory, name + ".atlas")
+    with open(atlas_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    return atlas_path
+
+
+# ---------------------------------------------------------------------------
+# 游戏资源包
+# ---------------------------------------------------------------------------
+
+def _unityfs_payload(rng, size):
+    return b"UnityFS\x00" + struct.pack('>I', 6) + b"5.x.x\x00" + rng.randbytes(size)
+
+
+def make_bundles(directory, count, size=65536, seed=SEED):
+    """
+    生成伪造的加密资源包：
+    灵魂潮汐 .ab（iqigam前缀）、深空之眼 .ys 与环行旅舍 .ab（UnityFS前的混淆字节）
+
+    Returns:
+        {"soul_tide": 目录, "skzy": 目录, "hxls": 目录}
+    """
+    rng = random.Random(seed)
+    dirs = {}
+    for game, (ext, prefix) in {
+        "soul_tide": (".ab", lambda: b"iqigam"),
+        "skzy": (".ys", lambda: rng.randbytes(rng.randint(1, 40))),
+        "hxls": (".ab", lambda: rng.randbytes(rng.randint(1, 40))),
+    }.items():
+        game_dir = os.path.join(directory, game)
+        os.makedirs(game_dir, exist_ok=True)
+        for i in range(count):
+            with open(os.path.join(game_dir, f"bundle_{i:05d}{ext}"), 'wb') as f:
+                f.write(prefix() + _unityfs_payload(rng, size))
+        dirs[game] = game_dir
+    return dirs
+
+
+def make_uexp(directory, count, size=262144, seed=SEED):
+    """生成伪造的 .uasset/.uexp 文件对（只有文件头魔数，内容为随机字节）"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        base = os.path.join(directory, f"T_Texture_{i:05d}")
+        with open(base + ".uasset", 'wb') as f:
+            f.write(b"\xc1\x83\x2a\x9e" + rng.randbytes(1024))
+        with open(base + ".uexp", 'wb') as f:
+            f.write(rng.randbytes(size) + b"\xc1\x83\x2a\x9e")
+        paths.append(base + ".uexp")
+    return paths
+
+
+# ---------------------------------------------------------------------------
+# Spine骨架
+# ---------------------------------------------------------------------------
+
+SPINE_VERSION = "3.8.99"
+
+
+class _SkelWriter:
+    """按Spine 3.8二进制格式写出（与JSON导出结构对应的字典 -> .skel）"""
+
+    ATTACHMENT_TYPES = ("region", "boundingbox", "mesh", "linkedmesh", "path", "point", "clipping")
+
+    def __init__(self):
+        self.out = bytearray()
+        self.strings = []
+        self.string_index = {}
+
+    def varint(self, value, optimize_positive=True):
+        if not optimize_positive:
+            value = (value << 1) ^ (value >> 31)
+        value &= 0xFFFFFFFF
+        while value > 0x7F:
+            self.out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        self.out.append(value)
+
+    def int32(self, value):
+        self.out += struct.pack('>i', value)
+
+    def byte(self, value):
+        self.out += struct.pack('>b', value)
+
+    def boolean(self, value):
+        self.out.append(1 if value else 0)
+
+    def floats(self, *values):
+        self.out += struct.pack(f'>{len(values)}f', *values)
+
+    def string(self, value):
+        if value is None:
+            self.varint(0)
+            return
+        data = value.encode('utf-8')
+        self.varint(len(data) + 1)
+        self.out += data
+
+    def ref(self, value):
+        if value is None:
+            self.varint(0)
+            return
+        if value not in self.string_index:
+            self.strings.append(value)
+            self.string_index[value] = len(self.strings)
+        self.varint(self.string_index[value])
+
+    def color(self, value):
+        self.int32(struct.unpack('>i', bytes.fromhex(value))[0])
+
+    def shorts(self, values):
+        self.varint(len(values))
+        self.out += struct.pack(f'>{len(values)}H', *values)
+
+    def vertices(self, vertices, vertex_count):
+        weighted = len(vertices) != vertex_count * 2
+        self.boolean(weighted)
+        if not weighted:
+            self.floats(*vertices)
+            return
+        i = 0
+        for _ in range(vertex_count):
+            bone_count = vertices[i]
+            self.varint(bone_count)
+            i += 1
+            for _ in range(bone_count):
+                self.varint(vertices[i])
+                self.floats(*vertices[i + 1:i + 4])
+                i += 4
+
+
+def _index(items):
+    return {item["name"]: i for i, item in enumerate(items)}
+
+
+def encode_skel(skeleton):
+    """把Spine JSON结构的字典编码为3.8二进制骨架（字符串表在最后统一写到前面）"""
+    body = _SkelWriter()
+    w = body
+    bones, slots = _index(skeleton["bones"]), _index(skeleton["slots"])
+    iks, transforms, paths = (_index(skeleton.get(key, [])) for key in ("ik", "transform", "path"))
+    events = list(skeleton.get("events", {}))
+    header = skeleton["skeleton"]
+    nonessential = "fps" in header
+
+    for i, bone in enumerate(skeleton["bones"]):
+        w.string(bone["name"])
+        if i:
+            w.varint(bones[bone["parent"]])
+        w.floats(bone.get("rotation", 0), bone.get("x", 0), bone.get("y", 0), bone.get("scaleX", 1),
+                 bone.get("scaleY", 1), bone.get("shearX", 0), bone.get("shearY", 0), bone.get("length", 0))
+        w.varint(("normal", "onlyTranslation", "noRotationOrReflection", "noScale",
+                  "noScaleOrReflection").index(bone.get("transform", "normal")))
+        w.boolean(bone.get("skin", False))
+        if nonessential:
+            w.color(bone.get("color", "9b9b9bff"))
+    bone_section = bytes(w.out)
+
+    w.out = bytearray()
+    w.varint(len(skeleton["slots"]))
+    for slot in skeleton["slots"]:
+        w.string(slot["name"])
+        w.varint(bones[slot["bone"]])
+        w.color(slot.get("color", "ffffffff"))
+        w.int32(int(slot["dark"], 16) if "dark" in slot else -1)
+        w.ref(slot.get("attachment"))
+        w.varint(("normal", "additive", "multiply", "screen").index(slot.get("blend", "normal")))
+
+    def constraint_head(data):
+        w.string(data["name"])
+        w.varint(data.get("order", 0))
+        w.boolean(data.get("skin", False))
+        w.varint(len(data["bones"]))
+        for name in data["bones"]:
+            w.varint(bones[name])
+
+    w.varint(len(iks))
+    for ik in skeleton.get("ik", []):
+        constraint_head(ik)
+        w.varint(bones[ik["target"]])
+        w.floats(ik.get("mix", 1), ik.get("softness", 0))
+        w.byte(1 if ik.get("bendPositive", True) else -1)
+        w.boolean(ik.get("compress", False))
+        w.boolean(ik.get("stretch", False))
+        w.boolean(ik.get("uniform", False))
+    w.varint(len(transforms))
+    for data in skeleton.get("transform", []):
+        constraint_head(data)
+        w.varint(bones[data["target"]])
+        w.boolean(data.get("local", False))
+        w.boolean(data.get("relative", False))
+        w.floats(*(data.get(key, default) for key, default in (
+            ("rotation", 0), ("x", 0), ("y", 0), ("scaleX", 0), ("scaleY", 0), ("shearY", 0),
+            ("rotateMix", 1), ("translateMix", 1), ("scaleMix", 1), ("shearMix", 1))))
+    w.varint(len(paths))
+    for data in skeleton.get("path", []):
+        constraint_head(data)
+        w.varint(slots[data["target"]])
+        w.varint(("fixed", "percent").index(data.get("positionMode", "percent")))
+        w.varint(("length", "fixed", "percent").index(data.get("spacingMode", "length")))
+        w.varint(("tangent", "chain", "chainScale").index(data.get("rotateMode", "tangent")))
+        w.floats(data.get("rotation", 0), data.get("position", 0), data.get("spacing", 0),
+                 data.get("rotateMix", 1), data.get("translateMix", 1))
+
+    def skin_attachments(skin):
+        attachments = skin.get("attachments", {})
+        w.varint(len(attachments))
+        for slot_name, entries in attachments.items():
+            w.varint(slots[slot_name])
+            w.varint(len(entries))
+            for key, att in entries.items():
+                w.ref(key)
+                w.ref(att.get("name"))
+                kind = att.get("type", "region")
+                w.byte(_SkelWriter.ATTACHMENT_TYPES.index(kind))
+                if kind == "region":
+                    w.ref(att.get("path"))
+                    w.floats(att.get("rotation", 0), att.get("x", 0), att.get("y", 0), att.get("scaleX", 1),
+                             att.get("scaleY", 1), att["width"], att["height"])
+                    w.color(att.get("color", "ffffffff"))
+                elif kind in ("boundingbox", "path", "clipping"):
+                    if kind == "path":
+                        w.boolean(att.get("closed", False))
+                        w.boolean(att.get("constantSpeed", True))
+                    if kind == "clipping":
+                        w.varint(slots[att["end"]])
+                    w.varint(att["vertexCount"])
+                    w.vertices(att["vertices"], att["vertexCount"])
+                    if kind == "path":
+                        w.floats(*att["lengths"])
+                    if nonessential:
+                        w.color(att["color"])
+                elif kind == "mesh":
+                    w.ref(att.get("path"))
+                    w.color(att.get("color", "ffffffff"))
+                    vertex_count = len(att["uvs"]) // 2
+                    w.varint(vertex_count)
+                    w.floats(*att["uvs"])
+                    w.shorts(att["triangles"])
+                    w.vertices(att["vertices"], vertex_count)
+                    w.varint(att["hull"])
+                    if nonessential:
+                        w.shorts(att["edges"])
+                        w.floats(att["width"], att["height"])
+                elif kind == "linkedmesh":
+                    w.ref(att.get("path"))
+                    w.color(att.get("color", "ffffffff"))
+                    w.ref(att.get("skin"))
+                    w.ref(att["parent"])
+                    w.boolean(att.get("deform", True))
+                    if nonessential:
+                        w.floats(att["width"], att["height"])
+                else:
+                    w.floats(att.get("rotation", 0), att.get("x", 0), att.get("y", 0))
+                    if nonessential:
+                        w.color(att["color"])
+
+    skins = skeleton.get("skins", [])
+    skin_names = [skin["name"] for skin in skins]
+    others = [skin for skin in skins if skin["name"] != "default"]
+    default = [skin for skin in skins if skin["name"] == "default"]
+    if default:
+        skin_attachments(default[0])
+    else:
+        w.varint(0)
+    w.varint(len(others))
+    for skin in others:
+        w.ref(skin["name"])
+        for key, index in (("bones", bones), ("ik", iks), ("transform", transforms), ("path", paths)):
+            names = skin.get(key, [])
+            w.varint(len(names))
+            for name in names:
+                w.varint(index[name])
+        skin_attachments(skin)
+
+    w.varint(len(events))
+    for name, event in skeleton.get("events", {}).items():
+        w.ref(name)
+        w.varint(event.get("int", 0), False)
+        w.floats(event.get("float", 0))
+        w.string(event.get("string"))
+        w.string(event.get("audio"))
+        if "audio" in event:
+            w.floats(event["volume"], event["balance"])
+
+    def frames(items, write_values, curve=True):
+        w.varint(len(items))
+        for i, frame in enumerate(items):
+            w.floats(frame.get("time", 0))
+            write_values(frame)
+            if curve and i < len(items) - 1:
+                if frame.get("curve") == "stepped":
+                    w.byte(1)
+                elif "curve" in frame:
+                    w.byte(2)
+                    w.floats(frame["curve"], frame.get("c2", 0), frame.get("c3", 1), frame.get("c4", 1))
+                else:
+                    w.byte(0)
+
+    animations = skeleton.get("animations", {})
+    w.varint(len(animations))
+    for name, animation in animations.items():
+        w.string(name)
+        w.varint(len(animation.get("slots", {})))
+        for slot_name, timelines in animation.get("slots", {}).items():
+            w.varint(slots[slot_name])
+            w.varint(len(timelines))
+            for kind, items in timelines.items():
+                w.byte(("attachment", "color", "twoColor").index(kind))
+                if kind == "attachment":
+                    frames(items, lambda f: w.ref(f.get("name")), False)
+                elif kind == "color":
+                    frames(items, lambda f: w.color(f["color"]))
+                else:
+                    frames(items, lambda f: (w.color(f["light"]), w.int32(int(f["dark"], 16))))
+        w.varint(len(animation.get("bones", {})))
+        for bone_name, timelines in animation.get("bones", {}).items():
+            w.varint(bones[bone_name])
+            w.varint(len(timelines))
+            for kind, items in timelines.items():
+                w.byte(("rotate", "translate", "scale", "shear").index(kind))
+                if kind == "rotate":
+                    frames(items, lambda f: w.floats(f.get("angle", 0)))
+                else:
+                    default = 1 if kind == "scale" else 0
+                    frames(items, lambda f: w.floats(f.get("x", default), f.get("y", default)))
+        w.varint(len(animation.get("ik", {})))
+        for ik_name, items in animation.get("ik", {}).items():
+            w.varint(iks[ik_name])
+            frames(items, lambda f: (w.floats(f.get("mix", 1), f.get("softness", 0)),
+                                     w.byte(1 if f.get("bendPositive", True) else -1),
+                                     w.boolean(f.get("compress", False)), w.boolean(f.get("stretch", False))))
+        w.varint(len(animation.get("transform", {})))
+        for transform_name, items in animation.get("transform", {}).items():
+            w.varint(transforms[transform_name])
+            frames(items, lambda f: w.floats(f.get("rotateMix", 1), f.get("translateMix", 1),
+                                             f.get("scaleMix", 1), f.get("shearMix", 1)))
+        w.varint(len(animation.get("path", {})))
+        for path_name, timelines in animation.get("path", {}).items():
+            w.varint(paths[path_name])
+            w.varint(len(timelines))
+            for kind, items in timelines.items():
+                w.byte(("position", "spacing", "mix").index(kind))
+                if kind == "mix":
+                    frames(items, lambda f: w.floats(f.get("rotateMix", 1), f.get("translateMix", 1)))
+                else:
+                    frames(items, lambda f, key=kind: w.floats(f.get(key, 0)))
+        w.varint(len(animation.get("deform", {})))
+        for skin_name, skin_slots in animation.get("deform", {}).items():
+            w.varint(skin_names.index(skin_name))
+            w.varint(len(skin_slots))
+            for slot_name, entries in skin_slots.items():
+                w.varint(slots[slot_name])
+                w.varint(len(entries))
+                for attachment_name, items in entries.items():
+                    w.ref(attachment_name)
+
+                    def deform(frame):
+                        values = frame.get("vertices", [])
+                        w.varint(len(values))
+                        if values:
+                            w.varint(frame.get("offset", 0))
+                            w.floats(*values)
+                    frames(items, deform)
+        draw_order = animation.get("drawOrder", [])
+        w.varint(len(draw_order))
+        for frame in draw_order:
+            w.floats(frame.get("time", 0))
+            offsets = frame.get("offsets", [])
+            w.varint(len(offsets))
+            for offset in offsets:
+                w.varint(slots[offset["slot"]])
+                w.varint(offset["offset"])
+        timeline = animation.get("events", [])
+        w.varint(len(timeline))
+        for frame in timeline:
+            data = skeleton["events"][frame["name"]]
+            w.floats(frame.get("time", 0))
+            w.varint(events.index(frame["name"]))
+            w.varint(frame.get("int", data.get("int", 0)), False)
+            w.floats(frame.get("float", data.get("float", 0)))
+            w.boolean("string" in frame)
+            if "string" in frame:
+                w.string(frame["string"])
+            if "audio" in data:
+                w.floats(frame.get("volume", 1), frame.get("balance", 0))
+    rest = bytes(w.out)
+
+    # 头部和字符串表（字符串引用在写正文时收集）
+    head = _SkelWriter()
+    head.string(header.get("hash", ""))
+    head.string(header["spine"])
+    head.floats(header.get("x", 0), header.get("y", 0), header.get("width", 0), header.get("height", 0))
+    head.boolean(nonessential)
+    if nonessential:
+        head.floats(header["fps"])
+        head.string(header.get("images"))
+        head.string(header.get("audio"))
+    head.varint(len(w.strings))
+    for value in w.strings:
+        head.string(value)
+    head.varint(len(skeleton["bones"]))
+    return bytes(head.out) + bone_section + rest
+
+
+def make_skeleton_json(seed=SEED, bones=40, meshes=6, animations=4, frames=12):
+    """生成一个Spine 3.8 JSON结构的骨架（包含各类附件、约束和时间线）"""
+    rng = random.Random(seed)
+
+    def value(scale=100.0):
+        # 与导出的数据一样为 float32 精度
+        return struct.unpack('>f', struct.pack('>f', round(rng.uniform(-scale, scale), 2)))[0]
+
+    bone_list = [{"name": "root"}]
+    for i in range(1, bones):
+        bone_list.append({"name": f"bone{i}", "parent": bone_list[rng.randrange(i)]["name"],
+                          "length": abs(value()), "rotation": value(180), "x": value(), "y": value()})
+    slot_list = [{"name": f"slot{i}", "bone": bone_list[rng.randrange(bones)]["name"], "attachment": f"image{i}"}
+                 for i in range(meshes + 4)]
+    slot_list[1]["blend"] = "additive"
+    slot_list[2]["dark"] = "102030"
+
+    attachments = {}
+    for i, slot in enumerate(slot_list[:meshes]):
+        count = 8
+        uvs = [round(rng.random(), 3) for _ in range(count * 2)]
+        if i % 2:
+            vertices = []
+            for _ in range(count):
+                vertices += [2, rng.randrange(bones), value(), value(), 0.5, rng.randrange(bones), value(), value(), 0.5]
+        else:
+            vertices = [value() for _ in range(count * 2)]
+        attachments[slot["name"]] = {slot["attachment"]: {
+            "type": "mesh", "uvs": [struct.unpack('>f', struct.pack('>f', v))[0] for v in uvs],
+            "triangles": [rng.randrange(count) for _ in range(18)], "vertices": vertices, "hull": count,
+            "edges": [0, 2, 2, 4], "width": 128, "height": 96}}
+    attachments[slot_list[meshes]["name"]] = {slot_list[meshes]["attachment"]: {"width": 64, "height": 32, "x": 1.5}}
+    attachments[slot_list[meshes + 1]["name"]] = {"box": {"type": "boundingbox", "vertexCount": 3,
+                                                          "vertices": [0, 0, 10, 0, 5, 8], "color": "60f000ff"}}
+    attachments[slot_list[meshes + 2]["name"]] = {"curve": {
+        "type": "path", "constantSpeed": False, "vertexCount": 6, "vertices": [value() for _ in range(12)],
+        "lengths": [10, 20], "color": "ff7f00ff"}}
+    attachments[slot_list[meshes + 3]["name"]] = {
+        "tip": {"type": "point", "x": 3, "y": 4, "rotation": 45, "color": "f1f100ff"},
+        "clip": {"type": "clipping", "end": slot_list[0]["name"], "vertexCount": 3,
+                 "vertices": [0, 0, 1, 0, 0, 1], "color": "ce3a3aff"}}
+
+    skeleton = {
+        "skeleton": {"hash": f"fixture{seed}", "spine": SPINE_VERSION, "x": -100, "y": -20, "width": 200,
+                     "height": 300, "fps": 30, "images": "./images/"},
+        "bones": bone_list,
+        "slots": slot_list,
+        "ik": [{"name": "ik1", "bones": ["bone1", "bone2"], "target": "bone3", "bendPositive": False}],
+        "transform": [{"name": "tc1", "order": 1, "bones": ["bone4"], "target": "bone5", "rotateMix": 0.5}],
+        "path": [{"name": "pc1", "order": 2, "bones": ["bone6"], "target": slot_list[meshes + 2]["name"],
+                  "rotateMode": "chain", "spacing": 5}],
+        "skins": [
+            {"name": "default", "attachments": attachments},
+            {"name": "alt", "bones": ["bone7"], "ik": ["ik1"], "attachments": {slot_list[0]["name"]: {
+                slot_list[0]["attachment"]: {"type": "linkedmesh", "path": "alt_image", "parent": slot_list[0]["attachment"],
+                                             "skin": "default", "deform": False, "width": 128, "height": 96}}}},
+        ],
+        "events": {"hit": {"int": -3, "string": "ouch"}, "step": {"audio": "step.ogg", "volume": 0.5, "balance": 0}},
+        "animations": {},
+    }
+
+    for a in range(animations):
+        times = [round(i / 30, 4) for i in range(frames)]
+        times = [struct.unpack('>f', struct.pack('>f', t))[0] for t in times]
+
+        def curve(frame, i):
+            # 最后一帧没有曲线
+            if i == frames - 1:
+                return frame
+            if i % 3 == 1:
+                frame["curve"] = "stepped"
+            elif i % 3 == 2:
+                frame.update({"curve": 0.25, "c2": 0, "c3": 0.75, "c4": 1})
+            return frame
+
+        bone_timelines = {}
+        for bone in bone_list[1:bones // 2]:
+            bone_timelines[bone["name"]] = {
+                "rotate": [curve({"time": t, "angle": value(180)}, i) for i, t in enumerate(times)],
+                "translate": [curve({"time": t, "x": value(), "y": value()}, i) for i, t in enumerate(times)],
+            }
+        animation = {
+            "slots": {slot_list[0]["name"]: {"attachment": [{"time": 0, "name": None}, {"time": times[-1], "name": "image0"}],
+                                             "color": [{"time": 0, "color": "ff0000ff", "curve": "stepped"},
+                                                       {"time": times[-1], "color": "00ff00ff"}]},
+                      slot_list[2]["name"]: {"twoColor": [{"time": 0, "light": "ffffffff", "dark": "000000"}]}},
+            "bones": bone_timelines,
+            "ik": {"ik1": [{"time": 0, "mix": 0.5, "softness": 2, "bendPositive": False, "compress": False, "stretch": True}]},
+            "transform": {"tc1": [{"time": 0, "rotateMix": 1, "translateMix": 0.5, "scaleMix": 0, "shearMix": 0}]},
+            "path": {"pc1": {"position": [{"time": 0, "position": 0.25}], "mix": [{"time": 0, "rotateMix": 1, "translateMix": 0}]}},
+            "deform": {"default": {slot_list[0]["name"]: {slot_list[0]["attachment"]: [
+                {"time": 0, "curve": "stepped"},
+                {"time": times[-1], "offset": 2, "vertices": [value() for _ in range(6)]}]}}},
+            "drawOrder": [{"time": 0, "offsets": [{"slot": slot_list[3]["name"], "offset": -2}]}, {"time": times[-1]}],
+            "events": [{"time": 0, "name": "hit", "int": -3, "float": 0}, {"time": times[-1], "name": "step", "int": 0,
+                                                                        "float": 1.5, "string": "left", "volume": 0.5, "balance": 0}],
+        }
+        skeleton["animations"][f"anim{a}"] = animation
+    return skeleton
+
+
+def make_skels(directory, count, seed=SEED, **options):
+    """生成 count 个 .skel 文件"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"skeleton_{i:05d}.skel")
+        with open(path, 'wb') as f:
+            f.write(encode_skel(make_skeleton_json(seed + i, **options)))
+        paths.append(path)
+    return paths
+
+
+def make_spine_jsons(directory, count, seed=SEED, images="images", **options):
+    """生成 count 个Spine骨架JSON（skeleton.images 为 images）"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        skeleton = make_skeleton_json(seed + i, **options)
+        skeleton["skeleton"]["images"] = images
+        path = os.path.join(directory, f"skeleton_{i:05d}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(skeleton, f)
+        paths.append(path)
+    return paths
@@ -0,0 +1,349 @@
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from common.lyrics import lyrics_from_tags
+
+try:
+    from mutagen import File
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
+# 默认缓存数据库位置（与各工具的 ./cache 目录一致）
+DEFAULT_DB_PATH = "./cache/audio_meta.sqlite"
+
+# 需要解析的文件数达到该值时改用进程池（mutagen解析主要是纯Python计算）
+PROCESS_POOL_THRESHOLD = 256
+
+# 每次查询/写入数据库的路径数
+BATCH_SIZE = 500
+
+# 缓存内容的版本：判断规则变化（如 has_lyrics 改为与歌词提取一致）时加一，旧记录全部重新解析
+CACHE_VERSION = 1
+
+FIELDS = ("duration", "title", "artist", "album", "sample_rate", "codec", "has_lyrics", "error")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    duration REAL,
+    title TEXT,
+    artist TEXT,
+    album TEXT,
+    sample_rate INTEGER,
+    codec TEXT,
+    has_lyrics INTEGER,
+    error TEXT,
+    updated REAL
+);
+CREATE TABLE IF NOT EXISTS durations (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    duration REAL,
+    error TEXT,
+    updated REAL
+);
+CREATE TABLE IF NOT EXISTS lyrics (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    has_lyrics INTEGER NOT NULL,
+    updated REAL
+);
+"""
+
+# 各标签格式中标题/艺术家/专辑/歌词对应的键
+# 是否含内嵌歌词由 common.lyrics.lyrics_from_tags 判断（与歌词提取使用同一规则）
+VORBIS_KEYS = {"title": ["title"], "artist": ["artist"], "album": ["album"]}
+ID3_KEYS = {"title": ["TIT2"], "artist": ["TPE1"], "album": ["TALB"]}
+MP4_KEYS = {"title": ["\xa9nam"], "artist": ["\xa9ART"], "album": ["\xa9alb"]}
+
+
+def _tag_keys(tags):
+    """根据标签类型选择键表"""
+    name = type(tags).__name__
+    if "ID3" in name:
+        return ID3_KEYS
+    if "MP4" in name:
+        return MP4_KEYS
+    return VORBIS_KEYS
+
+
+def _first_text(tags, keys):
+    """返回第一个存在的标签的文本，ID3按帧名前缀匹配（如 USLT::eng）"""
+    for key in keys:
+        values = None
+        if key in tags:
+            values = tags[key]
+        elif key.isupper():
+            for tag_key in tags.keys():
+                if tag_key.startswith(key):
+                    values = tags[tag_key]
+                    break
+        if values is None:
+            continue
+        values = getattr(values, "text", values)
+        if isinstance(values, (list, tuple)):
+            values = values[0] if values else ""
+        if isinstance(values, bytes):
+            values = values.decode("utf-8", errors="ignore")
+        return str(values)
+    return None
+
+
+def read_audio_metadata(file_path):
+    """
+    用mutagen读取一个音频文件的元数据（不经过缓存）
+
+    Returns:
+        字典，键为 FIELDS；读取失败时 error 为错误信息，其余字段为None
+    """
+    result = dict.fromkeys(FIELDS)
+    if not MUTAGEN_AVAILABLE:
+        result["error"] = "mutagen库未安装"
+        return result
+    try:
+        audio = File(file_path)
+        if audio is None:
+            result["error"] = "无法识别的音频格式"
+            return result
+        info = audio.info
+        result["duration"] = getattr(info, "length", None)
+        result["sample_rate"] = getattr(info, "sample_rate", None)
+        result["codec"] = type(audio).__name__.lower()
+
+        tags = audio.tags
+        if tags is not None:
+            keys = _tag_keys(tags)
+            result["title"] = _first_text(tags, keys["title"])
+            result["artist"] = _first_text(tags, keys["artist"])
+            result["album"] = _first_text(tags, keys["album"])
+            result["has_lyrics"] = bool(lyrics_from_tags(tags))
+        else:
+            result["has_lyrics"] = False
+    except Exception as e:
+        result = dict.fromkeys(FIELDS)
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _read_with_stat(item):
+    """在读取池中执行：item 为 (路径, 大小, 修改时间ns)"""
+    path, size, mtime_ns = item
+    return path, size, mtime_ns, read_audio_metadata(path)
+
+
+class AudioMetaCache:
+    """
+    基于SQLite的音频元数据缓存
+
+    以 路径+大小+修改时间 为键保存时长、标题、艺术家、专辑、采样率、编码和是否含内嵌歌词。
+    未变化的文件直接从数据库读取；新增或修改过的文件由读取池并行解析后写回。
+    无法解析的文件也会记录错误信息，文件不变时不再重复尝试。
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            if conn.execute("PRAGMA user_version").fetchone()[0] < CACHE_VERSION:
+                conn.execute("DELETE FROM tracks")
+                conn.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, file_path):
+        """返回单个文件的元数据字典，文件不存在时返回None"""
+        return self.get_many([file_path]).get(os.path.abspath(file_path))
+
+    def get_many(self, paths, max_workers=None, on_progress=None):
+        """
+        批量获取元数据
+
+        Args:
+            paths: 文件路径列表
+            max_workers: 读取池大小，默认CPU核心数
+            on_progress: 解析进度回调 on_progress(已解析数, 需解析总数)
+
+        Returns:
+            {绝对路径: 元数据字典}，不存在的文件不在结果中
+        """
+        stats = _stat_all(paths)
+        results = {}
+        with self._connect() as conn:
+            for row in _select_current(conn, "tracks", FIELDS, stats):
+                results[row[0]] = self._row_to_dict(row[1:])
+
+        missing = [(path, size, mtime_ns) for path, (size, mtime_ns) in stats.items() if path not in results]
+        if missing:
+            results.update(self._read_missing(missing, max_workers, on_progress))
+        return results
+
+    def get_durations(self, paths, max_workers=None, on_progress=None):
+        """
+        批量获取时长（秒），未变化的文件直接从数据库读取
+
+        缓存中没有的文件只读文件头获取时长（common.duration_probe，不构造完整的mutagen对象），
+        结果记录在 durations 表中；已有完整元数据的文件直接使用其中的时长。
+
+        Args:
+            on_progress: 读取进度回调 on_progress(已读取数, 需读取总数)
+
+        Returns:
+            {绝对路径: (时长或None, 错误信息或None)}，不存在的文件为 (None, "文件不存在")
+        """
+        from common.duration_probe import read_durations
+
+        stats = _stat_all(paths)
+        results = {os.path.abspath(path): (None, "文件不存在") for path in paths}
+        cached = set()
+        with self._connect() as conn:
+            for path, duration, error in _select_current(conn, "durations", ("duration", "error"), stats):
+                results[path] = (duration, error)
+                cached.add(path)
+            for path, duration in _select_current(conn, "tracks", ("duration",), stats):
+                if duration is not None and path not in cached:
+                    results[path] = (duration, None)
+                    cached.add(path)
+
+        missing = [path for path in stats if path not in cached]
+        if missing:
+            probed = read_durations(missing, max_workers, on_progress)
+            now = time.time()
+            with self._connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO durations VALUES (?, ?, ?, ?, ?, ?)",
+                                 [(path, *stats[path], *probed[path], now) for path in missing])
+            results.update(probed)
+        return results
+
+    def get_lyrics_flags(self, paths):
+        """
+        只查询数据库，返回已知的是否含内嵌歌词（不解析任何文件）
+
+        先看歌词提取记录的 lyrics 表，其次是完整元数据中的 has_lyrics。
+
+        Returns:
+            {绝对路径: (大小, 修改时间ns, 是否含歌词或None)}，不存在的文件不在结果中，None 表示没有记录
+        """
+        stats = _stat_all(paths)
+        flags = {path: None for path in stats}
+        with self._connect() as conn:
+            for path, has_lyrics in _select_current(conn, "lyrics", ("has_lyrics",), stats):
+                flags[path] = bool(has_lyrics)
+            for path, has_lyrics in _select_current(conn, "tracks", ("has_lyrics",), stats):
+                if flags[path] is None and has_lyrics is not None:
+                    flags[path] = bool(has_lyrics)
+        return {path: (*stats[path], flag) for path, flag in flags.items()}
+
+    def record_lyrics_flags(self, rows):
+        """记录歌词提取得到的是否含内嵌歌词，rows 为 [(绝对路径, 大小, 修改时间ns, 是否含歌词)]"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO lyrics VALUES (?, ?, ?, ?, ?)",
+                             [(path, size, mtime_ns, int(has_lyrics), now)
+                              for path, size, mtime_ns, has_lyrics in rows])
+
+    @staticmethod
+    def _row_to_dict(values):
+        meta = dict(zip(FIELDS, values))
+        if meta["has_lyrics"] is not None:
+            meta["has_lyrics"] = bool(meta["has_lyrics"])
+        return meta
+
+    def _read_missing(self, missing, max_workers, on_progress):
+        """并行解析缓存中没有或已变化的文件，分批写回数据库"""
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(missing)))
+        use_processes = workers > 1 and len(missing) >= PROCESS_POOL_THRESHOLD
+        pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        chunksize = max(1, min(64, len(missing) // (workers * 4))) if use_processes else 1
+
+        results = {}
+        pending = []
+        done = 0
+        with pool_class(max_workers=workers) as executor, self._connect() as conn:
+            for path, size, mtime_ns, meta in executor.map(_read_with_stat, missing, chunksize=chunksize):
+                results[path] = meta
+                pending.append((path, size, mtime_ns, *(meta[field] for field in FIELDS), time.time()))
+                done += 1
+                if len(pending) >= BATCH_SIZE:
+                    self._store(conn, pending)
+                    pending = []
+                if on_progress:
+                    on_progress(done, len(missing))
+            if pending:
+                self._store(conn, pending)
+        return results
+
+    @staticmethod
+    def _store(conn, rows):
+        conn.executemany(f"INSERT OR REPLACE INTO tracks VALUES ({','.join('?' * (len(FIELDS) + 4))})", rows)
+        conn.commit()
+
+    def forget(self, paths):
+        """删除文件的缓存记录（如原地修改了标签但修改时间未变）"""
+        with self._connect() as conn:
+            keys = [(os.path.abspath(path),) for path in paths]
+            conn.executemany("DELETE FROM tracks WHERE path = ?", keys)
+            conn.executemany("DELETE FROM lyrics WHERE path = ?", keys)
+
+
+def _stat_all(paths):
+    """{绝对路径: (大小, 修改时间ns)}，不存在的文件不在结果中"""
+    stats = {}
+    for path in paths:
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stats[path] = (st.st_size, st.st_mtime_ns)
+    return stats
+
+
+def _select_current(conn, table, columns, stats):
+    """分批查询记录，只返回大小和修改时间都未变化的 (路径, *columns)"""
+    all_paths = list(stats)
+    for start in range(0, len(all_paths), BATCH_SIZE):
+        chunk = all_paths[start:start + BATCH_SIZE]
+        rows = conn.execute(
+            f"SELECT path, size, mtime_ns, {', '.join(columns)} FROM {table} "
+            f"WHERE path IN ({','.join('?' * len(chunk))})", chunk)
+        for row in rows:
+            if stats[row[0]] == (row[1], row[2]):
+                yield (row[0],) + tuple(row[3:])
+
+
+_default_cache = None
+
+
+def get_cache():
+    """返回使用默认数据库的共享缓存"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = AudioMetaCache()
+    return _default_cache
+
+
+def get_metadata(file_path):
+    """使用默认缓存获取单个文件的元数据"""
+    return get_cache().get(file_path)
+
+
+def get_metadata_many(paths, max_workers=None, on_progress=None):
+    """使用默认缓存批量获取元数据"""
+    return get_cache().get_many(paths, max_workers, on_progress)
+
+
+def get_durations_many(paths, max_workers=None, on_progress=None):
+    """使用默认缓存批量获取时长"""
+    return get_cache().get_durations(paths, max_workers, on_progress)
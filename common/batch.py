@@ -0,0 +1,520 @@
+import json
+import os
+
+from common import trace
+from common.fs_index import list_files
+from common.manifest import Manifest
+from common.ffmpeg_pool import FFmpegPool
+from common.scheduler import JobScheduler
+
+
+def parse_params(param_list):
+    """将 KEY=VALUE 形式的参数列表解析为字典"""
+    params = {}
+    for item in param_list or []:
+        if '=' not in item:
+            raise ValueError(f"参数格式错误（应为 KEY=VALUE）: {item}")
+        key, value = item.split('=', 1)
+        params[key.strip()] = value.strip()
+    return params
+
+
+def is_true(value):
+    """解析布尔型参数"""
+    return str(value).lower() in ('1', 'true', 'yes', 'y', 'on')
+
+
+def iter_input_files(inputs, extensions=None):
+    """
+    展开输入路径：文件直接返回，目录递归查找指定后缀的文件
+
+    Args:
+        inputs: 文件或目录路径列表
+        extensions: 小写后缀集合（如 {'.flac'}），None表示不过滤
+    """
+    for item in inputs:
+        if os.path.isfile(item):
+            yield item
+        elif os.path.isdir(item):
+            yield from list_files(item, extensions)
+        else:
+            raise FileNotFoundError(f"输入路径不存在: {item}")
+
+
+def make_tracker(tool, params, tool_params=None):
+    """
+    创建清单跟踪函数，用于跳过输入未变化的任务
+
+    通用参数：-p force=1 重新处理全部输入；-p hash=blake2|xxhash 修改时间变化时比较内容哈希
+
+    Returns:
+        track(任务名, 函数, 参数元组, 输入, 输出) -> 任务元组；输入未变化时函数为None
+    """
+    manifest = Manifest(tool, tool_params, hash_name=params.get('hash'))
+    force = is_true(params.get('force', '0'))
+
+    def track(name, func, args, inputs, outputs=()):
+        if not force and manifest.is_current(inputs, outputs):
+            return (name, None, ())
+        return (name, _tracked_job, (manifest, inputs, outputs, func) + tuple(args))
+
+    return track
+
+
+def _tracked_job(manifest, inputs, outputs, func, *args, **kwargs):
+    """执行任务，成功后把输入指纹记录到清单"""
+    result = func(*args, **kwargs)
+    manifest.record(inputs, outputs)
+    return result
+
+
+def read_lines(file_path):
+    """读取文本文件中的非空行"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+# ---------------------------------------------------------------------------
+# 任务函数：在工作线程/进程中调用各工具的核心函数，失败时抛出异常
+# ---------------------------------------------------------------------------
+
+def _m3u_job(list_file, library, output_path, audio_library=None, fuzzy_threshold=None, extended=False):
+    from tool002.main import create_m3u_from_list
+    result, success, output_path = create_m3u_from_list(read_lines(list_file), library, output_path,
+                                                        audio_library, fuzzy_threshold, extended)
+    if not success:
+        raise RuntimeError(result)
+    return output_path
+
+
+def _duration_job(folder_path, output_file, recursive=False, extensions=('.flac',)):
+    from tool003.main import write_duration_report
+    return write_duration_report(folder_path, output_file, recursive, extensions)
+
+
+def _separate_job(source_folder, target_folder, matcher, conflict="overwrite", dry_run=False):
+    from tool004.main import separate_files_by_ids
+    separate_files_by_ids(source_folder, target_folder, None, matcher=matcher, conflict=conflict, dry_run=dry_run)
+
+
+def _spine_job(json_path, out_path, command, template_path):
+    from tool005.main import export_spine_json
+    return export_spine_json(json_path, out_path, command, template_path)
+
+
+def _opencc_job(file_path, conversion_type, create_backup):
+    from tool010.main import convert_text_file
+    convert_text_file(file_path, conversion_type, create_backup)
+
+
+def _loudnorm_job(input_path, output_path, loudnorm, **ffmpeg):
+    from tool013.main import normalize_audio
+    success, error = normalize_audio(input_path, output_path, loudnorm, **ffmpeg)
+    if not success:
+        raise RuntimeError(error)
+    return output_path
+
+
+def _video_job(audio_path, pic_path, output_path, **ffmpeg):
+    from tool014.main import make_video
+    if not make_video(audio_path, pic_path, output_path, **ffmpeg):
+        raise RuntimeError("ffmpeg执行失败")
+    return output_path
+
+
+def _skel_job(skel_path, json_path):
+    from tool015.main import skel_to_json
+    return skel_to_json(skel_path, json_path)
+
+
+def _json_patch_job(file_path, compiled, dry_run=False):
+    from tool017.json_patch import OUTCOME_LABELS, patch_file
+    outcome, detail = patch_file(file_path, compiled, dry_run)
+    return OUTCOME_LABELS[outcome] + (f" {detail}" if detail else "")
+
+
+def _bundle_job(file_path, game):
+    from tool016.main import DECODERS
+    return DECODERS[game][1](file_path)
+
+
+def _uexp_job(game_content, file, umodel_path):
+    from tool018.main import export_uexp_texture
+    export_uexp_texture(game_content, file, umodel_path)
+
+
+def _concat_job(input_files, output_file, **ffmpeg):
+    from tool019.main import concat_audio_files_filter
+    success, message = concat_audio_files_filter(input_files, output_file, **ffmpeg)
+    if not success:
+        raise RuntimeError(message)
+    return output_file
+
+
+def _atlas_job(atlas_path, output_path):
+    from tool021.atlas_unpack3 import split_atlas
+    unit_name = os.path.splitext(os.path.basename(atlas_path))[0]
+    split_atlas(unit_name, output_path=output_path, atlas_path=atlas_path)
+    return output_path
+
+
+def _lyrics_job(file_path, suffix='.lrc', stat=None):
+    from common.audio_meta import get_cache
+    from common.lyrics import NO_LYRICS, OUTCOME_LABELS, extract_lyrics_file
+    outcome, lyrics_path = extract_lyrics_file(file_path, suffix=suffix)
+    if stat is not None:
+        # 记录是否含歌词（stat 为规划时的 大小, 修改时间ns），下次运行不再解析没有歌词的文件
+        get_cache().record_lyrics_flags([(os.path.abspath(file_path), *stat, outcome != NO_LYRICS)])
+    return OUTCOME_LABELS[outcome] + (f" {lyrics_path}" if lyrics_path else "")
+
+
+def _table_job(paths, excel_path):
+    from tool027.main import collect_table_rows, write_table
+    data = collect_table_rows(paths)
+    write_table(data, excel_path)
+    return excel_path
+
+
+def _apply_job(excel_path):
+    from tool027.main import apply_table
+    success_count, error_count = apply_table(excel_path)
+    if error_count:
+        raise RuntimeError(f"成功 {success_count} 行，失败 {error_count} 行")
+    return success_count
+
+
+def _wem_job(file_path, output_dir, output_format, keep_original, **ffmpeg):
+    from tool028.main import convert_wem
+    if not convert_wem(file_path, output_dir, output_format, keep_original, **ffmpeg):
+        raise RuntimeError("转换失败")
+    return output_dir
+
+
+# ---------------------------------------------------------------------------
+# 各工具的任务规划：根据输入/输出/参数生成任务列表
+# 返回 [(任务名, 函数, 参数元组), ...]
+# ---------------------------------------------------------------------------
+
+AUDIO_EXTENSIONS = {'.mp3', '.flac', '.wav', '.m4a', '.aac', '.ogg', '.opus'}
+
+
+def plan_tool002(inputs, output, params):
+    library = params.get('library')
+    if not library:
+        raise ValueError("需要指定音频库目录: -p library=目录")
+    output_dir = output or "./cache"
+    os.makedirs(output_dir, exist_ok=True)
+    list_paths = [path for path in iter_input_files(inputs, {'.txt'})
+                  if not path.lower().endswith('_missing.txt')]
+    # 所有播放列表共用一次扫描得到的音频库索引（任务在线程中执行）
+    from tool002.main import AudioLibrary
+    audio_library = AudioLibrary(library) if list_paths and os.path.isdir(library) else None
+    fuzzy_threshold = float(params['fuzzy']) if params.get('fuzzy') else None
+    extended = is_true(params.get('extended', '0'))
+    return [
+        (list_file, _m3u_job,
+         (list_file, library, os.path.join(output_dir, os.path.splitext(os.path.basename(list_file))[0] + ".m3u"),
+          audio_library, fuzzy_threshold, extended))
+        for list_file in list_paths
+    ]
+
+
+def plan_tool003(inputs, output, params):
+    from tool003.main import DURATION_EXTENSIONS, REPORT_FORMATS
+    output_dir = output or "."
+    os.makedirs(output_dir, exist_ok=True)
+    ext = "." + params.get('format', 'txt').lstrip('.').lower()
+    if ext not in REPORT_FORMATS:
+        raise ValueError(f"不支持的报告格式: {ext}（可选: {', '.join(REPORT_FORMATS)}）")
+    # 与界面一致：默认递归统计全部支持的格式，-p recursive=0 只统计顶层
+    recursive = is_true(params.get('recursive', '1'))
+    extensions = tuple(sorted(DURATION_EXTENSIONS))
+    jobs = []
+    for folder in inputs:
+        name = os.path.basename(os.path.normpath(folder)) or "music_duration"
+        jobs.append((folder, _duration_job, (folder, os.path.join(output_dir, name + ext), recursive, extensions)))
+    return jobs
+
+
+def plan_tool004(inputs, output, params):
+    from common.file_mover import CONFLICT_POLICIES
+    from tool004.id_matcher import IDMatcher, load_ids
+    if not output:
+        raise ValueError("需要指定目标文件夹: --output")
+    ids = params.get('ids')
+    if not ids:
+        raise ValueError("需要指定ID列表: -p ids=文件 或 -p ids=1,2,3")
+    id_list = load_ids(ids, params.get('column')) if os.path.isfile(ids) else [i.strip() for i in ids.split(',') if i.strip()]
+    if not id_list:
+        raise ValueError("ID列表为空")
+    # 所有文件夹共用一个匹配器
+    matcher = IDMatcher(id_list, is_true(params.get('whole', '0')))
+    conflict = params.get('conflict', 'overwrite')
+    if conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"未知的冲突策略: {conflict}（可选: {', '.join(CONFLICT_POLICIES)}）")
+    dry_run = is_true(params.get('dry_run', '0'))
+    return [(folder, _separate_job, (folder, output, matcher, conflict, dry_run)) for folder in inputs]
+
+
+def plan_tool005(inputs, output, params):
+    from tool005.main import DEFAULT_TEMPLATE, find_skeleton_jsons, load_config, spine_command
+    config = load_config()
+    command = spine_command(params.get('spine'), config)
+    template_path = os.path.abspath(params.get('template') or config.get("export_template") or DEFAULT_TEMPLATE)
+    if not os.path.isfile(template_path):
+        raise FileNotFoundError(f"导出设置模板不存在: {template_path}")
+    if output:
+        os.makedirs(output, exist_ok=True)
+    return [(path, _spine_job, (path, output, command, template_path)) for path in find_skeleton_jsons(inputs)]
+
+
+def plan_tool010(inputs, output, params):
+    conversion_type = params.get('mode', 's2t')
+    create_backup = is_true(params.get('backup', '1'))
+    extensions = {'.' + ext.strip('.').lower() for ext in params.get('ext', 'txt').split(',')}
+    track = make_tracker("tool010", params, {"mode": conversion_type})
+    return [
+        track(file_path, _opencc_job, (file_path, conversion_type, create_backup), file_path)
+        for file_path in iter_input_files(inputs, extensions)
+    ]
+
+
+def plan_tool013(inputs, output, params):
+    loudnorm = params.get('lufs', '-16')
+    in_place = is_true(params.get('in_place', '0'))
+    if not output and not in_place:
+        raise ValueError("需要指定输出目录 --output，或使用 -p in_place=1 覆盖原文件")
+    if output:
+        os.makedirs(output, exist_ok=True)
+    track = make_tracker("tool013", params, {"lufs": loudnorm})
+    jobs = []
+    for file_path in iter_input_files(inputs, AUDIO_EXTENSIONS):
+        output_path = file_path if in_place else os.path.join(output, os.path.basename(file_path))
+        jobs.append(track(file_path, _loudnorm_job, (file_path, output_path, loudnorm), file_path, [output_path]))
+    return jobs
+
+
+def plan_tool014(inputs, output, params):
+    pic_path = params.get('image')
+    if not pic_path or not output:
+        raise ValueError("需要指定图片 -p image=图片 和输出目录 --output")
+    os.makedirs(output, exist_ok=True)
+    jobs = []
+    for file_path in iter_input_files(inputs, {'.mp3', '.flac', '.wav'}):
+        out = os.path.join(output, os.path.splitext(os.path.basename(file_path).lower())[0] + ".mp4")
+        jobs.append((file_path, _video_job, (file_path, pic_path, out)))
+    return jobs
+
+
+def plan_tool015(inputs, output, params):
+    from tool015.main import skel_json_path
+    if output:
+        os.makedirs(output, exist_ok=True)
+    track = make_tracker("tool015", params)
+    jobs = []
+    for skel_path in iter_input_files(inputs, {'.skel'}):
+        json_path = skel_json_path(skel_path)
+        if output:
+            json_path = os.path.join(output, os.path.basename(json_path))
+        jobs.append(track(skel_path, _skel_job, (skel_path, json_path), skel_path, [json_path]))
+    return jobs
+
+
+def plan_tool016(inputs, output, params):
+    from tool016.main import DECODERS
+    game = params.get('game', 'hxls')
+    if game not in DECODERS:
+        raise ValueError(f"未知的游戏: {game}（可选: {', '.join(DECODERS)}）")
+    suffix = DECODERS[game][0]
+    return [(file_path, _bundle_job, (file_path, game)) for file_path in iter_input_files(inputs, {suffix})]
+
+
+def plan_tool017(inputs, output, params):
+    from tool017.json_patch import compile_edits, load_edits
+    from tool017.main import DEFAULT_EDITS
+    if params.get('edits'):
+        edits = load_edits(params['edits'])
+    elif params.get('pointer'):
+        value = params.get('value', '')
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+        edits = {params['pointer']: value}
+    else:
+        edits = DEFAULT_EDITS
+    compiled = compile_edits(edits)
+    dry_run = is_true(params.get('dry_run', '0'))
+    files = list(iter_input_files(inputs, {'.json'}))
+    if dry_run:
+        return [(file_path, _json_patch_job, (file_path, compiled, True)) for file_path in files]
+    # 修改后记录的是新文件的指纹：再次运行时未变化的文件只比较大小和修改时间
+    track = make_tracker("tool017", params, {"edits": edits})
+    return [track(file_path, _json_patch_job, (file_path, compiled), file_path) for file_path in files]
+
+
+def plan_tool018(inputs, output, params):
+    from tool018.main import UMODEL_PATH
+    umodel_path = params.get('umodel', UMODEL_PATH)
+    return [
+        (file_path, _uexp_job, (os.path.dirname(file_path), os.path.basename(file_path), umodel_path))
+        for file_path in iter_input_files(inputs, {'.uexp'})
+    ]
+
+
+def plan_tool019(inputs, output, params):
+    list_files = [item for item in inputs if item.lower().endswith('.txt')]
+    if list_files:
+        # 每个列表文件拼接为一个输出文件
+        output_dir = output or "."
+        os.makedirs(output_dir, exist_ok=True)
+        ext = '.' + params.get('format', 'flac').strip('.')
+        return [
+            (list_file, _concat_job,
+             (read_lines(list_file), os.path.join(output_dir, os.path.splitext(os.path.basename(list_file))[0] + ext)))
+            for list_file in list_files
+        ]
+    if not output:
+        raise ValueError("需要指定输出文件: --output")
+    return [(output, _concat_job, (list(inputs), output))]
+
+
+def plan_tool021(inputs, output, params):
+    from tool021.atlas_unpack3 import atlas_pages
+    track = make_tracker("tool021", params)
+    jobs = []
+    for atlas_path in iter_input_files(inputs, {'.atlas'}):
+        output_path = output or os.path.join(os.path.dirname(atlas_path), 'images')
+        jobs.append(track(atlas_path, _atlas_job, (atlas_path, output_path),
+                          [atlas_path] + atlas_pages(atlas_path), [output_path]))
+    return jobs
+
+
+def plan_tool026(inputs, output, params):
+    from common.lyrics import LYRICS_EXTENSIONS, find_lyrics_candidates
+    suffix = '.' + params.get('ext', 'lrc').strip('.')
+    # 缓存中已知没有内嵌歌词的文件不生成任务
+    _, candidates, flags = find_lyrics_candidates(list(iter_input_files(inputs, LYRICS_EXTENSIONS)))
+    jobs = []
+    for file_path in candidates:
+        stat = flags.get(os.path.abspath(file_path))
+        jobs.append((file_path, _lyrics_job, (file_path, suffix, stat[:2] if stat else None)))
+    return jobs
+
+
+def plan_tool027(inputs, output, params):
+    action = params.get('action', 'table')
+    if action == 'table':
+        excel_path = output or "./cache/temp.xlsx"
+        os.makedirs(os.path.dirname(os.path.abspath(excel_path)), exist_ok=True)
+        return [(excel_path, _table_job, (list(inputs), excel_path))]
+    if action == 'apply':
+        return [(excel_path, _apply_job, (excel_path,)) for excel_path in inputs]
+    raise ValueError(f"未知的操作: {action}（可选: table, apply）")
+
+
+def plan_tool028(inputs, output, params):
+    output_format = params.get('format', 'FLAC').upper()
+    keep_original = is_true(params.get('keep', '1'))
+    from tool028.main import wem_output_path
+    if output:
+        os.makedirs(output, exist_ok=True)
+    track = make_tracker("tool028", params, {"format": output_format})
+    jobs = []
+    for file_path in iter_input_files(inputs, {'.wem'}):
+        output_dir = output or os.path.dirname(file_path)
+        jobs.append(track(file_path, _wem_job, (file_path, output_dir, output_format, keep_original),
+                          file_path, [wem_output_path(file_path, output_dir, output_format)]))
+    return jobs
+
+
+# 多线程编码的ffmpeg任务每个进程使用的线程数（其余ffmpeg任务为1）
+FFMPEG_THREADS = {
+    "tool014": 4,
+}
+
+# 成功时在进度行中显示任务结果（简短的处理说明）的工具
+SHOW_RESULT = {"tool017", "tool026"}
+
+# 工具名 -> (任务规划函数, 执行方式 threads|processes|ffmpeg, 说明)
+BATCH_TOOLS = {
+    "tool002": (plan_tool002, "threads", "按名称列表(.txt)生成M3U，-p library=音频库目录 [-p fuzzy=0.85] [-p extended=1]"),
+    "tool003": (plan_tool003, "threads", "统计文件夹（含子文件夹）中FLAC/MP3/M4A/OGG/OPUS/WAV的时长，每个输入文件夹输出一个报告 [-p recursive=0 只统计顶层] [-p format=txt|tsv|csv|json]"),
+    "tool004": (plan_tool004, "threads", "按数字ID分离文件，-p ids=ID文件(.txt/.csv/.json)或逗号列表 [-p whole=1] [-p column=列名] [-p conflict=skip|overwrite|rename] [-p dry_run=1]"),
+    "tool005": (plan_tool005, "threads", "Spine JSON导入并渲染导出，每个任务独立的临时项目 [-p spine=Spine路径] [-p template=导出设置]"),
+    "tool010": (plan_tool010, "processes", "繁简转换（原地），-p mode=s2t -p backup=1 -p ext=txt [-p force=1]"),
+    "tool013": (plan_tool013, "ffmpeg", "音量标准化，-p lufs=-16 [-p in_place=1] [-p force=1]"),
+    "tool014": (plan_tool014, "ffmpeg", "音频+单张图片制作视频，-p image=图片"),
+    "tool015": (plan_tool015, "processes", "Spine 3.8 .skel 转 JSON（直接解析，不需要Spine），默认输出到同目录 [-p force=1]"),
+    "tool016": (plan_tool016, "threads", "包体解密（原地），-p game=soul_tide|skzy|hxls"),
+    "tool017": (plan_tool017, "threads", "按JSON Pointer修改JSON（只替换目标值，相同则不写入），默认 /skeleton/images=images [-p pointer=/a/b -p value=JSON] [-p edits=修改列表.json] [-p dry_run=1]"),
+    "tool018": (plan_tool018, "threads", "UE贴图导出为PNG，-p umodel=umodel路径"),
+    "tool019": (plan_tool019, "ffmpeg", "拼接音频：输入音频列表或多个列表文件(.txt)"),
+    "tool021": (plan_tool021, "processes", "按.atlas拆分图集，默认输出到同目录images [-p force=1]"),
+    "tool026": (plan_tool026, "processes", "提取内嵌歌词为同名LRC（MP3/FLAC/M4A/OPUS/OGG/WAV，只写入有歌词且内容变化的文件）[-p ext=lrc|txt]"),
+    "tool027": (plan_tool027, "threads", "生成文件管理表格或应用表格，-p action=table|apply"),
+    "tool028": (plan_tool028, "ffmpeg", "WEM转FLAC/WAV，-p format=FLAC|WAV -p keep=1 [-p force=1]"),
+}
+
+
+def run_batch(tool, inputs, output=None, jobs=None, params=None):
+    """
+    无界面批量运行工具
+
+    Returns:
+        进程退出码（全部成功为0）
+    """
+    if tool not in BATCH_TOOLS:
+        print(f"未知的工具: {tool}")
+        print("可用工具: " + ", ".join(BATCH_TOOLS))
+        return 2
+
+    plan, executor, _ = BATCH_TOOLS[tool]
+    try:
+        planned = plan(inputs, output, params or {})
+    except (ValueError, FileNotFoundError) as e:
+        print(f"错误: {e}")
+        return 2
+
+    if not planned:
+        print("没有找到需要处理的输入文件")
+        return 0
+
+    # 函数为None的任务输入未变化，直接跳过
+    skipped = sum(1 for _, func, _ in planned if func is None)
+    planned = [job for job in planned if job[1] is not None]
+    if skipped:
+        print(f"{tool}: 跳过 {skipped} 个未变化的输入（-p force=1 重新处理）")
+    if not planned:
+        return 0
+
+    if executor == "ffmpeg":
+        # ffmpeg任务：并行数与每个ffmpeg的线程数按核心数分配，Ctrl+C 会终止子进程
+        scheduler = FFmpegPool(max_workers=jobs, threads_per_job=FFMPEG_THREADS.get(tool))
+    else:
+        scheduler = JobScheduler(max_workers=jobs, use_processes=executor == "processes")
+    for name, func, args in planned:
+        scheduler.submit(name, func, *args)
+
+    print(f"{tool}: 共 {len(planned)} 个任务，并行数 {min(scheduler.max_workers, len(planned))}")
+
+    def on_done(job, finished, total):
+        if job.ok:
+            result = f" {job.result}" if tool in SHOW_RESULT and job.result else ""
+            print(f"[{finished}/{total}] ✓ {job.name} ({job.elapsed:.2f}s){result}")
+        else:
+            print(f"[{finished}/{total}] ✗ {job.name} - {job.error}")
+
+    # 线程/ffmpeg任务中的span记录到本次运行；进程池中的任务不统计
+    with trace.run(tool):
+        trace.count("跳过未变化", skipped)
+        results = scheduler.run(on_done)
+    failed = [job for job in results if not job.ok]
+    print(f"\n完成: 成功 {len(results) - len(failed)}/{len(results)}")
+    return 1 if failed else 0
+
+
+def print_batch_tools():
+    """打印支持无界面运行的工具"""
+    for name, (_, _, description) in BATCH_TOOLS.items():
+        print(f"  {name}  {description}")
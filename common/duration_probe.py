@@ -0,0 +1,307 @@
+"""
+只读文件头的音频时长探测
+
+mutagen 构造完整的文件对象时会解析全部元数据块（包括很大的内嵌封面），
+而时长只需要文件头中的少量字节：
+    FLAC  STREAMINFO 块中的采样率和总采样数
+    MP3   第一帧的 Xing/Info/VBRI 头（VBR）或帧头码率（CBR）
+    MP4   moov/mvhd 中的时间刻度和时长（跳过 mdat 不读取）
+    WAV   fmt 块的字节率和 data 块的大小
+其他格式或文件头不完整、无法确定时长时回退到 mutagen。
+"""
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from mutagen import File
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
+# 查找MP3第一帧时最多读取的字节数
+MP3_SYNC_SEARCH = 64 * 1024
+
+# MPEG 版本位 -> 版本（1 / 2 / 2.5）
+MPEG_VERSIONS = {0b11: 1, 0b10: 2, 0b00: 2.5}
+
+# (MPEG1?, 层) -> 码率表（kbps，下标为码率索引）
+MP3_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+
+
+def _skip_id3v2(f):
+    """跳过文件开头的ID3v2标签，返回音频数据的起始位置"""
+    header = f.read(10)
+    if len(header) == 10 and header[:3] == b'ID3':
+        size = 0
+        for byte in header[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        start = 10 + size + (10 if header[5] & 0x10 else 0)
+    else:
+        start = 0
+    f.seek(start)
+    return start
+
+
+def _flac_duration(f, file_size):
+    _skip_id3v2(f)
+    if f.read(4) != b'fLaC':
+        return None
+    block = f.read(38)
+    # 第一个元数据块必须是 STREAMINFO（类型0，34字节）
+    if len(block) < 38 or block[0] & 0x7F != 0:
+        return None
+    packed = int.from_bytes(block[14:22], 'big')
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / sample_rate
+
+
+def _wav_duration(f, file_size):
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        return None
+    byte_rate = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, size = chunk[:4], struct.unpack('<I', chunk[4:])[0]
+        if chunk_id == b'fmt ':
+            fmt = f.read(size)
+            if len(fmt) < 12:
+                return None
+            byte_rate = struct.unpack('<I', fmt[8:12])[0]
+            if size & 1:
+                f.seek(1, os.SEEK_CUR)
+        elif chunk_id == b'data':
+            if not byte_rate:
+                return None
+            # 流式写出的文件 data 大小可能为0或0xFFFFFFFF，截断的文件以实际大小为准
+            remaining = file_size - f.tell()
+            data_size = remaining if size in (0, 0xFFFFFFFF) else min(size, remaining)
+            return data_size / byte_rate
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def _mp4_boxes(f, start, end):
+    """依次返回 [start, end) 范围内的 (类型, 内容起始, 盒子结束)"""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack('>I4s', header)
+        header_size = 8
+        if size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                return
+            size = struct.unpack('>Q', large)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size:
+            return
+        yield kind, pos + header_size, pos + size
+        pos += size
+
+
+def _mp4_duration(f, file_size):
+    for index, (kind, start, end) in enumerate(_mp4_boxes(f, 0, file_size)):
+        if index == 0 and kind != b'ftyp':
+            return None
+        if kind != b'moov':
+            continue
+        for child, child_start, _ in _mp4_boxes(f, start, end):
+            if child != b'mvhd':
+                continue
+            f.seek(child_start)
+            data = f.read(32)
+            if len(data) < 20:
+                return None
+            if data[0] == 1:
+                if len(data) < 32:
+                    return None
+                timescale, duration = struct.unpack('>IQ', data[20:32])
+                unknown = 0xFFFFFFFFFFFFFFFF
+            else:
+                timescale, duration = struct.unpack('>II', data[12:20])
+                unknown = 0xFFFFFFFF
+            if not timescale or not duration or duration == unknown:
+                return None
+            return duration / timescale
+        return None
+    return None
+
+
+def _parse_mp3_header(data, offset):
+    """
+    解析MPEG音频帧头
+
+    Returns:
+        (版本, 层, 码率kbps, 采样率, 帧长度, 每帧采样数, 声道模式)，不是有效帧头时为None
+    """
+    if offset + 4 > len(data):
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or b1 & 0xE0 != 0xE0:
+        return None
+    version = MPEG_VERSIONS.get((b1 >> 3) & 0x03)
+    layer = 4 - ((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    # 不支持自由码率（索引0）
+    if version is None or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    bitrate = MP3_BITRATES[(version == 1, layer)][bitrate_index]
+    sample_rate = MP3_SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    if layer == 1:
+        samples = 384
+        frame_length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    else:
+        samples = 1152 if layer == 2 or version == 1 else 576
+        frame_length = samples // 8 * bitrate * 1000 // sample_rate + padding
+    return version, layer, bitrate, sample_rate, frame_length, samples, b3 >> 6
+
+
+def _mp3_duration(f, file_size):
+    audio_start = _skip_id3v2(f)
+    data = f.read(MP3_SYNC_SEARCH)
+
+    # 查找第一帧：帧头有效且下一帧的位置也是有效帧头，避免把数据中的 0xFF 误认为同步字
+    offset = data.find(b'\xff')
+    header = None
+    while offset != -1:
+        header = _parse_mp3_header(data, offset)
+        if header is not None:
+            following = offset + header[4]
+            if following + 4 > len(data) or _parse_mp3_header(data, following) is not None:
+                break
+        header = None
+        offset = data.find(b'\xff', offset + 1)
+    if header is None:
+        return None
+    version, layer, bitrate, sample_rate, frame_length, samples, channel_mode = header
+
+    # VBR：Xing/Info 头在边信息之后，VBRI 头固定在帧头后32字节
+    if layer == 3:
+        mono = channel_mode == 3
+        if version == 1:
+            side_info = 17 if mono else 32
+        else:
+            side_info = 9 if mono else 17
+        xing = offset + 4 + side_info
+        if data[xing:xing + 4] in (b'Xing', b'Info') and len(data) >= xing + 12:
+            flags = struct.unpack('>I', data[xing + 4:xing + 8])[0]
+            if flags & 0x01:
+                frames = struct.unpack('>I', data[xing + 8:xing + 12])[0]
+                return frames * samples / sample_rate if frames else None
+        vbri = offset + 4 + 32
+        if data[vbri:vbri + 4] == b'VBRI' and len(data) >= vbri + 18:
+            frames = struct.unpack('>I', data[vbri + 14:vbri + 18])[0]
+            return frames * samples / sample_rate if frames else None
+
+    # CBR：按音频数据大小和码率估算（去掉末尾的ID3v1标签）
+    audio_end = file_size
+    if file_size >= 128:
+        f.seek(file_size - 128)
+        if f.read(3) == b'TAG':
+            audio_end -= 128
+    audio_bytes = audio_end - (audio_start + offset)
+    if audio_bytes <= 0:
+        return None
+    return audio_bytes * 8 / (bitrate * 1000)
+
+
+# 后缀 -> 文件头解析函数
+HEADER_PARSERS = {
+    '.flac': _flac_duration,
+    '.mp3': _mp3_duration,
+    '.m4a': _mp4_duration,
+    '.mp4': _mp4_duration,
+    '.aac': _mp4_duration,
+    '.wav': _wav_duration,
+}
+
+
+def read_header_duration(file_path):
+    """
+    只读文件头获取时长（秒）
+
+    Returns:
+        时长，格式不支持或无法从文件头确定时为None
+
+    Raises:
+        OSError: 文件无法打开
+    """
+    parser = HEADER_PARSERS.get(os.path.splitext(file_path)[1].lower())
+    if parser is None:
+        return None
+    with open(file_path, 'rb') as f:
+        try:
+            return parser(f, os.fstat(f.fileno()).st_size)
+        except (struct.error, ValueError, IndexError):
+            return None
+
+
+def read_duration(file_path):
+    """
+    获取时长（秒）：先读文件头，无法确定时用mutagen
+
+    Raises:
+        读取失败时抛出异常
+    """
+    duration = read_header_duration(file_path)
+    if duration is not None:
+        return duration
+    if not MUTAGEN_AVAILABLE:
+        raise RuntimeError("mutagen库未安装，无法读取该格式的时长")
+    audio = File(file_path)
+    if audio is None:
+        raise ValueError("无法识别的音频格式")
+    return audio.info.length
+
+
+def _read_one(file_path):
+    try:
+        return file_path, read_duration(file_path), None
+    except Exception as e:
+        return file_path, None, f"{type(e).__name__}: {e}"
+
+
+def read_durations(file_paths, max_workers=None, on_progress=None):
+    """
+    并行读取多个文件的时长（只读文件头，以I/O为主，使用线程池）
+
+    Args:
+        on_progress: 进度回调 on_progress(已读取数, 总数)
+
+    Returns:
+        {绝对路径: (时长或None, 错误信息或None)}
+    """
+    paths = [os.path.abspath(path) for path in file_paths]
+    results = {}
+    if not paths:
+        return results
+    workers = max(1, min(max_workers or min(32, (os.cpu_count() or 1) * 4), len(paths)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for done, (path, duration, error) in enumerate(executor.map(_read_one, paths), 1):
+            results[path] = (duration, error)
+            if on_progress:
+                on_progress(done, len(paths))
+    return results
@@ -0,0 +1,193 @@
+import collections
+import contextvars
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from common.scheduler import Job
+
+# 保留的 stderr 行数（用于报错信息）
+STDERR_TAIL_LINES = 20
+
+
+class FFmpegCancelled(Exception):
+    """任务被取消，子进程已被终止"""
+
+
+def plan_workers(max_workers=None, threads_per_job=None, cores=None):
+    """
+    根据CPU核心数确定并行的ffmpeg数量与每个ffmpeg的线程数
+
+    音频滤镜/编码基本是单线程的，默认每个任务1个线程、并行数等于核心数；
+    视频编码等多线程任务指定 threads_per_job，并行数相应减少。
+
+    Returns:
+        (并行数, 每个任务的线程数)
+    """
+    cores = cores or os.cpu_count() or 1
+    if max_workers:
+        return max_workers, threads_per_job or max(1, cores // max_workers)
+    threads = threads_per_job or 1
+    return max(1, cores // threads), threads
+
+
+def probe_duration(file_path, ffprobe="ffprobe"):
+    """用ffprobe读取媒体时长（秒），失败时返回None"""
+    try:
+        result = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", file_path],
+            capture_output=True, text=True, timeout=30
+        )
+        return float(result.stdout.strip())
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+
+def _is_ffmpeg(cmd):
+    return os.path.splitext(os.path.basename(cmd[0]))[0].lower() == "ffmpeg"
+
+
+def run_ffmpeg(cmd, duration=None, on_progress=None, cancel_event=None, timeout=None, stdin=None):
+    """
+    运行一个ffmpeg（或vgmstream等其他外部程序）命令
+
+    ffmpeg命令会自动加上 -progress pipe:1，解析已处理的时长；
+    cancel_event 被设置或超时时立即终止子进程。
+
+    Args:
+        cmd: 完整命令列表
+        duration: 输入时长（秒），用于计算进度比例
+        on_progress: 进度回调 on_progress(已处理秒数, 比例或None)
+        cancel_event: threading.Event，设置后终止子进程
+        timeout: 超时秒数
+        stdin: 子进程的标准输入（如上游解码器的stdout管道，配合 -i pipe:0），默认不读取
+
+    Returns:
+        (返回码, stderr末尾若干行)
+
+    Raises:
+        FFmpegCancelled: 被取消
+        subprocess.TimeoutExpired: 超时
+    """
+    cmd = [str(arg) for arg in cmd]
+    if _is_ffmpeg(cmd):
+        cmd = [cmd[0], "-hide_banner", "-nostdin", "-nostats", "-progress", "pipe:1"] + cmd[1:]
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               stdin=stdin if stdin is not None else subprocess.DEVNULL,
+                               text=True, encoding='utf-8', errors='replace')
+    stderr_tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+    state = {"killed_by": None}
+
+    def drain_stderr():
+        for line in process.stderr:
+            stderr_tail.append(line.rstrip())
+
+    def watch():
+        # 取消或超时时终止子进程，读取stdout的主循环随之结束
+        deadline = time.monotonic() + timeout if timeout else None
+        while process.poll() is None:
+            if cancel_event is not None and cancel_event.is_set():
+                state["killed_by"] = "cancel"
+            elif deadline is not None and time.monotonic() > deadline:
+                state["killed_by"] = "timeout"
+            if state["killed_by"]:
+                process.kill()
+                return
+            time.sleep(0.1)
+
+    stderr_thread = threading.Thread(target=drain_stderr, daemon=True)
+    watch_thread = threading.Thread(target=watch, daemon=True)
+    stderr_thread.start()
+    watch_thread.start()
+
+    for line in process.stdout:
+        key, _, value = line.strip().partition("=")
+        # out_time_ms 实际单位也是微秒，两者取其一即可
+        if key == "out_time_us" and on_progress and value.isdigit():
+            seconds = int(value) / 1_000_000
+            fraction = min(seconds / duration, 1.0) if duration else None
+            on_progress(seconds, fraction)
+
+    process.wait()
+    stderr_thread.join()
+    watch_thread.join()
+
+    if state["killed_by"] == "cancel":
+        raise FFmpegCancelled(f"已取消: {os.path.basename(cmd[0])}")
+    if state["killed_by"] == "timeout":
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return process.returncode, "\n".join(stderr_tail)
+
+
+class FFmpegPool:
+    """
+    有上限的并行ffmpeg执行器
+
+    任务函数以关键字参数接收 threads / cancel_event / on_progress，并在内部调用 run_ffmpeg，
+    因此任务可以在ffmpeg前后做重命名、清理临时文件等工作。
+    """
+
+    def __init__(self, max_workers=None, threads_per_job=None):
+        self.max_workers, self.threads_per_job = plan_workers(max_workers, threads_per_job)
+        self.cancel_event = threading.Event()
+        self.jobs = []
+
+    def submit(self, name, func, *args, **kwargs):
+        """添加任务，返回Job对象"""
+        job = Job(name, func, *args, **kwargs)
+        self.jobs.append(job)
+        return job
+
+    def cancel(self):
+        """取消全部任务：未开始的不再执行，正在运行的ffmpeg被终止"""
+        self.cancel_event.set()
+
+    def _run_job(self, job, on_progress):
+        if self.cancel_event.is_set():
+            raise FFmpegCancelled(f"已取消: {job.name}")
+        progress = (lambda seconds, fraction: on_progress(job, seconds, fraction)) if on_progress else None
+        start = time.perf_counter()
+        result = job.func(*job.args, threads=self.threads_per_job, cancel_event=self.cancel_event,
+                          on_progress=progress, **job.kwargs)
+        return result, time.perf_counter() - start
+
+    def run(self, on_done=None, on_progress=None):
+        """
+        并行执行全部任务（阻塞直到结束或取消）
+
+        Args:
+            on_done: 每个任务结束时的回调 on_done(job, finished_count, total_count)
+            on_progress: 任务进度回调 on_progress(job, 已处理秒数, 比例或None)
+
+        Returns:
+            任务列表（按提交顺序），job.elapsed 为每个任务的墙钟耗时
+        """
+        if not self.jobs:
+            return []
+
+        total = len(self.jobs)
+        finished = 0
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, total)) as executor:
+            # 每个任务复制提交时的上下文，任务中的span记录到当前的 trace.run
+            futures = {executor.submit(contextvars.copy_context().run, self._run_job, job, on_progress): job
+                       for job in self.jobs}
+            try:
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        job.result, job.elapsed = future.result()
+                        job.ok = True
+                    except Exception as e:
+                        job.ok = False
+                        job.error = f"{type(e).__name__}: {e}"
+                    finished += 1
+                    if on_done:
+                        on_done(job, finished, total)
+            except KeyboardInterrupt:
+                self.cancel()
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+        return self.jobs
@@ -0,0 +1,249 @@
+"""
+批量移动文件：先规划后执行
+
+规划阶段一次性确定每个文件的目标路径和冲突处理方式（整批使用同一策略，不逐个询问），
+并判断源和目标是否在同一文件系统：
+    同一文件系统   os.rename，只改目录项，几乎不耗时
+    跨设备         复制到临时文件（大缓冲区）后改名，再删除源文件；由有限的复制线程并行执行
+规划结果可以先预览（dry run），确认后再执行。
+"""
+import errno
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 冲突策略：目标已存在时 跳过 / 覆盖 / 自动改名（name (1).ext）
+CONFLICT_POLICIES = ("skip", "overwrite", "rename")
+
+CONFLICT_LABELS = {"skip": "跳过", "overwrite": "覆盖", "rename": "自动改名"}
+
+# 跨设备复制的缓冲区大小
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+# 跨设备复制的默认并行数（受磁盘而不是CPU限制，过多反而增加寻道）
+COPY_WORKERS = 4
+
+# 复制过程中的临时文件后缀
+PART_SUFFIX = ".part"
+
+
+class MovePlan:
+    """
+    移动计划
+
+    Attributes:
+        moves: [{'src', 'dst', 'size', 'same_device', 'overwrite'}, ...]
+        skipped: [(源路径, 目标路径, 原因), ...]
+        errors: [(源路径, 错误信息), ...]
+    """
+
+    def __init__(self, conflict):
+        self.conflict = conflict
+        self.moves = []
+        self.skipped = []
+        self.errors = []
+
+    @property
+    def total_bytes(self):
+        return sum(move['size'] for move in self.moves)
+
+    @property
+    def copy_moves(self):
+        return [move for move in self.moves if not move['same_device']]
+
+    def summary(self):
+        """计划概要（一行）"""
+        copies = self.copy_moves
+        copy_size = sum(move['size'] for move in copies) / (1024 * 1024)
+        return (f"移动 {len(self.moves)} 个文件（同盘改名 {len(self.moves) - len(copies)}，"
+                f"跨盘复制 {len(copies)}，{copy_size:.1f} MB），跳过 {len(self.skipped)}，"
+                f"错误 {len(self.errors)}，冲突策略: {CONFLICT_LABELS[self.conflict]}")
+
+    def describe(self):
+        """逐条列出计划（预览用）"""
+        lines = [self.summary()]
+        for move in self.moves:
+            action = "改名" if move['same_device'] else "复制"
+            if move['overwrite']:
+                action += "（覆盖）"
+            lines.append(f"{action}: {move['src']} -> {move['dst']}")
+        lines.extend(f"跳过: {src} -> {dst}（{reason}）" for src, dst, reason in self.skipped)
+        lines.extend(f"错误: {src} - {error}" for src, error in self.errors)
+        return lines
+
+
+def _device(path):
+    """路径所在设备；路径不存在时取最近的已存在的上级目录"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return os.stat(path).st_dev
+
+
+def _unique_path(dst, taken):
+    """为冲突的目标生成 name (n).ext 形式的新路径"""
+    stem, ext = os.path.splitext(dst)
+    n = 1
+    while True:
+        candidate = f"{stem} ({n}){ext}"
+        if not os.path.exists(candidate) and os.path.normcase(candidate) not in taken:
+            return candidate
+        n += 1
+
+
+def plan_moves(pairs, conflict="skip"):
+    """
+    规划批量移动
+
+    Args:
+        pairs: [(源文件, 目标文件), ...]
+        conflict: 目标已存在（或与计划中的其他文件重名）时的策略，见 CONFLICT_POLICIES
+
+    Returns:
+        MovePlan
+    """
+    if conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"未知的冲突策略: {conflict}（可选: {', '.join(CONFLICT_POLICIES)}）")
+    plan = MovePlan(conflict)
+    taken = set()
+    devices = {}
+    for src, dst in pairs:
+        src, dst = os.path.abspath(src), os.path.abspath(dst)
+        try:
+            src_stat = os.stat(src)
+        except OSError as e:
+            plan.errors.append((src, f"无法读取源文件: {e.strerror or e}"))
+            continue
+        if os.path.normcase(src) == os.path.normcase(dst):
+            plan.skipped.append((src, dst, "源和目标相同"))
+            continue
+
+        key = os.path.normcase(dst)
+        overwrite = False
+        if key in taken or os.path.exists(dst):
+            if conflict == "skip" or (conflict == "overwrite" and key in taken):
+                plan.skipped.append((src, dst, "目标已存在" if key not in taken else "与其他文件的目标重名"))
+                continue
+            if conflict == "overwrite":
+                if os.path.isdir(dst):
+                    plan.errors.append((src, f"目标是文件夹: {dst}"))
+                    continue
+                overwrite = True
+            else:
+                dst = _unique_path(dst, taken)
+                key = os.path.normcase(dst)
+        taken.add(key)
+
+        # 同一目标目录只判断一次所在设备
+        dst_dir = os.path.dirname(dst)
+        if dst_dir not in devices:
+            devices[dst_dir] = _device(dst_dir)
+        plan.moves.append({'src': src, 'dst': dst, 'size': src_stat.st_size,
+                           'same_device': src_stat.st_dev == devices[dst_dir], 'overwrite': overwrite})
+    return plan
+
+
+def copy_then_remove(src, dst, overwrite=False):
+    """跨设备移动：大缓冲区复制到临时文件，完成后改名为目标并删除源文件"""
+    part = dst + PART_SUFFIX
+    try:
+        with open(src, 'rb') as fsrc, open(part, 'wb') as fdst:
+            shutil.copyfileobj(fsrc, fdst, COPY_BUFFER_SIZE)
+        shutil.copystat(src, part)
+        if not overwrite and os.path.exists(dst):
+            raise FileExistsError(errno.EEXIST, "目标已存在", dst)
+        os.replace(part, dst)
+    except BaseException:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+    os.remove(src)
+
+
+def _rename(src, dst, overwrite):
+    if overwrite:
+        os.replace(src, dst)
+    elif os.path.exists(dst):
+        raise FileExistsError(errno.EEXIST, "目标已存在", dst)
+    else:
+        os.rename(src, dst)
+
+
+def execute_moves(plan, max_workers=COPY_WORKERS, on_progress=None, cancel_event=None):
+    """
+    执行移动计划
+
+    同一文件系统的移动先在当前线程中依次改名，跨设备的移动再交给复制线程池；
+    改名时发现其实跨设备（EXDEV）的文件也改为复制。
+
+    Args:
+        max_workers: 复制线程数
+        on_progress: 回调 on_progress(已完成文件数, 总文件数, 已完成字节数, 总字节数)，在当前线程中调用
+        cancel_event: threading.Event，设置后不再开始新的移动
+
+    Returns:
+        {'moved': [(源, 目标), ...], 'failed': [(源, 目标, 错误信息), ...], 'cancelled': 未执行数}
+    """
+    result = {'moved': [], 'failed': [], 'cancelled': 0}
+    total_files, total_bytes = len(plan.moves), plan.total_bytes
+    done_files = done_bytes = 0
+
+    def finish(move, error=None):
+        nonlocal done_files, done_bytes
+        if error is None:
+            result['moved'].append((move['src'], move['dst']))
+        else:
+            result['failed'].append((move['src'], move['dst'], error))
+        done_files += 1
+        done_bytes += move['size']
+        if on_progress:
+            on_progress(done_files, total_files, done_bytes, total_bytes)
+
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    created = set()
+    copies = []
+    for move in plan.moves:
+        if cancelled():
+            result['cancelled'] += 1
+            continue
+        try:
+            dst_dir = os.path.dirname(move['dst'])
+            if dst_dir not in created:
+                os.makedirs(dst_dir, exist_ok=True)
+                created.add(dst_dir)
+            if not move['same_device']:
+                copies.append(move)
+                continue
+            _rename(move['src'], move['dst'], move['overwrite'])
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                copies.append(move)
+                continue
+            finish(move, f"{type(e).__name__}: {e}")
+            continue
+        finish(move)
+
+    if copies:
+        def copy(move):
+            if cancelled():
+                return False
+            copy_then_remove(move['src'], move['dst'], move['overwrite'])
+            return True
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(copies)))) as executor:
+            futures = {executor.submit(copy, move): move for move in copies}
+            for future in as_completed(futures):
+                move = futures[future]
+                try:
+                    if future.result():
+                        finish(move)
+                    else:
+                        result['cancelled'] += 1
+                except Exception as e:
+                    finish(move, f"{type(e).__name__}: {e}")
+    return result
@@ -0,0 +1,190 @@
+import os
+import sqlite3
+import time
+
+# 默认索引数据库位置（与各工具的 ./cache 目录一致）
+DEFAULT_DB_PATH = "./cache/fs_index.sqlite"
+
+# 目录修改时间距扫描时刻小于该值时不视为“已稳定”，下次刷新仍会重扫
+# （FAT/exFAT等文件系统的时间精度只有2秒，同一时间窗内的新改动可能不改变mtime）
+RACY_WINDOW_NS = 2_000_000_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    inode INTEGER
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+CREATE INDEX IF NOT EXISTS files_ext_dir ON files(ext, dir);
+"""
+
+
+def _subtree_bounds(root):
+    """返回 root 子孙路径的字符串区间 [low, high)，用于范围查询"""
+    prefix = root if root.endswith(os.sep) else root + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+class FileIndex:
+    """
+    基于SQLite的持久化增量文件索引
+
+    记录每个文件的路径、大小、修改时间和inode，以及每个目录的修改时间。
+    刷新时只重新列出修改时间发生变化的目录，未变化的目录只需一次stat，
+    因此在大型音乐库或外接/网络磁盘上重复扫描的代价与变动量成正比。
+
+    注意：只修改文件内容不会改变所在目录的修改时间，这类变化需要 refresh(root, full=True)。
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # 每次调用独立连接，便于在多个线程中使用
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def refresh(self, root, full=False):
+        """
+        增量刷新 root 目录树
+
+        Args:
+            root: 根目录
+            full: 为True时忽略目录修改时间，重新stat所有文件
+
+        Returns:
+            重新扫描的目录数
+        """
+        root = os.path.abspath(root)
+        rescanned = 0
+        with self._connect() as conn:
+            stack = [root]
+            while stack:
+                directory = stack.pop()
+                try:
+                    dir_stat = os.stat(directory)
+                except OSError:
+                    self._forget_tree(conn, directory)
+                    continue
+
+                row = conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (directory,)).fetchone()
+                if not full and row is not None and row[0] == dir_stat.st_mtime_ns:
+                    # 目录未变化：沿用记录的子目录，继续向下检查
+                    stack.extend(path for (path,) in conn.execute(
+                        "SELECT path FROM dirs WHERE parent = ?", (directory,)))
+                    continue
+
+                subdirs = self._rescan_directory(conn, directory, dir_stat)
+                stack.extend(subdirs)
+                rescanned += 1
+        return rescanned
+
+    def _rescan_directory(self, conn, directory, dir_stat):
+        """重新列出单个目录，更新其中的文件记录，返回子目录列表"""
+        subdirs = []
+        rows = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file():
+                            st = entry.stat()
+                            rows.append((
+                                entry.path, directory, entry.name,
+                                os.path.splitext(entry.name)[1].lower(),
+                                st.st_size, st.st_mtime_ns, st.st_ino
+                            ))
+                    except OSError:
+                        continue
+        except OSError:
+            # 无权限等情况：视为空目录
+            pass
+
+        conn.execute("DELETE FROM files WHERE dir = ?", (directory,))
+        conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+        # 清理已消失的子目录
+        known = {path for (path,) in conn.execute("SELECT path FROM dirs WHERE parent = ?", (directory,))}
+        for gone in known - set(subdirs):
+            self._forget_tree(conn, gone)
+
+        # 刚修改过的目录不记录mtime，保证下次刷新仍会重扫
+        mtime_ns = dir_stat.st_mtime_ns
+        if time.time_ns() - mtime_ns < RACY_WINDOW_NS:
+            mtime_ns = None
+        parent = os.path.dirname(directory)
+        conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)",
+                     (directory, parent if parent != directory else None, mtime_ns))
+        return subdirs
+
+    def _forget_tree(self, conn, directory):
+        """删除目录及其所有子孙的记录"""
+        low, high = _subtree_bounds(directory)
+        conn.execute("DELETE FROM files WHERE dir = ? OR (dir >= ? AND dir < ?)", (directory, low, high))
+        conn.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (directory, low, high))
+
+    def entries(self, root, extensions=None, refresh=True):
+        """
+        查询 root 目录树下的文件
+
+        Args:
+            root: 根目录
+            extensions: 后缀集合（如 {'.flac', '.mp3'}，不区分大小写），None表示全部文件
+            refresh: 查询前是否先增量刷新
+
+        Returns:
+            [(路径, 大小, 修改时间ns), ...]，按路径排序
+        """
+        root = os.path.abspath(root)
+        if refresh:
+            self.refresh(root)
+
+        low, high = _subtree_bounds(root)
+        sql = "SELECT path, size, mtime_ns FROM files WHERE (dir = ? OR (dir >= ? AND dir < ?))"
+        params = [root, low, high]
+        if extensions is not None:
+            extensions = sorted({ext.lower() for ext in extensions})
+            sql += f" AND ext IN ({', '.join('?' * len(extensions))})"
+            params.extend(extensions)
+        sql += " ORDER BY path"
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def files(self, root, extensions=None, refresh=True):
+        """查询 root 目录树下指定后缀的文件路径列表"""
+        return [path for path, _, _ in self.entries(root, extensions, refresh)]
+
+
+_default_index = None
+
+
+def get_index():
+    """获取默认的共享索引"""
+    global _default_index
+    if _default_index is None:
+        _default_index = FileIndex()
+    return _default_index
+
+
+def list_files(root, extensions=None):
+    """使用共享索引列出 root 下指定后缀的文件（先增量刷新）"""
+    return get_index().files(root, extensions)
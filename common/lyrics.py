@@ -0,0 +1,251 @@
+"""
+内嵌歌词提取（tool006、tool026、流水线的 lyrics 阶段共用）
+
+支持 MP3（ID3 USLT / TXXX:LYRICS）、FLAC/OPUS/OGG（Vorbis注释 LYRICS / UNSYNCEDLYRICS）、
+M4A（©lyr）、WAV（ID3块）。只在文件确实含有歌词、且与磁盘上已有的同名文件内容不同时写入，
+没有歌词的文件不生成任何文件，重复运行时不会改动已有结果。
+"""
+import os
+
+from common.fs_index import list_files
+from common.scheduler import JobScheduler
+
+try:
+    from mutagen import File
+    from mutagen.flac import FLAC
+    from mutagen.id3 import ID3, ID3NoHeaderError
+    from mutagen.mp4 import MP4
+    from mutagen.oggopus import OggOpus
+    from mutagen.wave import WAVE
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
+try:
+    import chardet
+    CHARDET_AVAILABLE = True
+except ImportError:
+    CHARDET_AVAILABLE = False
+
+# 支持提取歌词的音频后缀
+LYRICS_EXTENSIONS = {'.mp3', '.flac', '.m4a', '.opus', '.ogg', '.wav'}
+
+# 需要解析的文件数达到该值时改用进程池（mutagen解析主要是纯Python计算）
+PROCESS_POOL_THRESHOLD = 256
+
+# Vorbis注释 / ID3 TXXX 中的歌词字段（小写比较）
+LYRICS_KEYS = ("lyrics", "unsyncedlyrics")
+
+# 每个文件的处理结果
+WRITTEN = "written"
+UNCHANGED = "unchanged"
+NO_LYRICS = "no_lyrics"
+OUTCOME_LABELS = {
+    WRITTEN: "已写入",
+    UNCHANGED: "内容相同，未写入",
+    NO_LYRICS: "没有内嵌歌词",
+}
+
+
+def _text(value):
+    """标签值转为文本：列表取全部非空项按行合并，bytes 检测编码后解码"""
+    value = getattr(value, "text", value)
+    if isinstance(value, (list, tuple)):
+        return "\n".join(part for part in (_text(item) for item in value) if part)
+    if isinstance(value, bytes):
+        encoding = (chardet.detect(value).get('encoding') if CHARDET_AVAILABLE else None) or 'utf-8'
+        return value.decode(encoding, errors='ignore')
+    return str(value) if value is not None else ""
+
+
+def _load_tags(file_path):
+    """按后缀只读取标签（不解析音频流），没有标签时返回None"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.mp3':
+        try:
+            return ID3(file_path)
+        except ID3NoHeaderError:
+            return None
+    if ext == '.flac':
+        return FLAC(file_path).tags
+    if ext == '.m4a':
+        return MP4(file_path).tags
+    if ext == '.opus':
+        return OggOpus(file_path).tags
+    if ext == '.wav':
+        return WAVE(file_path).tags
+    # .ogg 可能是Vorbis、Opus或FLAC，由mutagen判断
+    audio = File(file_path)
+    return audio.tags if audio is not None else None
+
+
+def _lyrics_fields(tags):
+    """(歌词文本, 标题/艺术家/专辑对应的键)，没有歌词时文本为空字符串"""
+    if hasattr(tags, "getall"):
+        # ID3（MP3、WAV）：任意语言中第一个非空的USLT，其次是 TXXX:LYRICS（描述不区分大小写）
+        lyrics = next((text for text in map(_text, tags.getall("USLT")) if text.strip()), "")
+        if not lyrics:
+            lyrics = next((text for text in (_text(frame) for frame in tags.getall("TXXX")
+                                             if frame.desc.lower() in LYRICS_KEYS) if text.strip()), "")
+        return lyrics, {"title": "TIT2", "artist": "TPE1", "album": "TALB"}
+    if "MP4" in type(tags).__name__:
+        return _text(tags.get("\xa9lyr")), {"title": "\xa9nam", "artist": "\xa9ART", "album": "\xa9alb"}
+    lyrics = next((text for text in (_text(tags[key]) for key in LYRICS_KEYS if key in tags) if text.strip()), "")
+    return lyrics, {"title": "title", "artist": "artist", "album": "album"}
+
+
+def lyrics_from_tags(tags):
+    """
+    mutagen标签中的内嵌歌词文本，没有时返回空字符串
+
+    read_lyrics 和元数据缓存的 has_lyrics 都用它判断，两者结果一致。
+    """
+    if tags is None:
+        return ""
+    lyrics = _lyrics_fields(tags)[0]
+    return lyrics if lyrics.strip() else ""
+
+
+def read_lyrics(file_path):
+    """
+    读取内嵌歌词及标题/艺术家/专辑
+
+    Returns:
+        {"lyrics", "title", "artist", "album"}（缺少的字段为空字符串）；没有歌词时返回None
+
+    Raises:
+        RuntimeError: mutagen未安装
+        其他异常: 文件无法解析
+    """
+    if not MUTAGEN_AVAILABLE:
+        raise RuntimeError("mutagen库未安装")
+    tags = _load_tags(file_path)
+    if not lyrics_from_tags(tags):
+        return None
+    lyrics, fields = _lyrics_fields(tags)
+    result = {"lyrics": lyrics}
+    for field, key in fields.items():
+        result[field] = _text(tags[key]) if key in tags else ""
+    return result
+
+
+def sidecar_path(audio_path, suffix='.lrc'):
+    """歌词文件路径：同目录同名"""
+    return os.path.splitext(audio_path)[0] + suffix
+
+
+def lyrics_document(audio_path, info, suffix='.lrc'):
+    """
+    歌词文件内容（换行统一为 \\n）
+
+    LRC 且歌词没有时间标签时，开头加上已知的标题/艺术家/专辑标签；.txt 只写歌词本身。
+    """
+    lines = info["lyrics"].splitlines()
+    if suffix.lower() == '.lrc' and not any(line.strip().startswith('[') for line in lines):
+        header = [f"[ti:{info.get('title') or os.path.splitext(os.path.basename(audio_path))[0]}]"]
+        header += [f"[{tag}:{info[field]}]" for tag, field in (("ar", "artist"), ("al", "album")) if info.get(field)]
+        lines = header + [""] + lines
+    return "\n".join(lines) + "\n"
+
+
+def write_if_changed(file_path, content):
+    """
+    内容与已有文件不同时写入（先写临时文件再替换）
+
+    Returns:
+        是否写入
+    """
+    # 按文本方式比较和写入，换行符使用系统默认（与以前的 tool026 生成的文件一致）
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    part = file_path + ".part"
+    try:
+        with open(part, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(part, file_path)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+    return True
+
+
+def extract_lyrics_file(audio_path, output_path=None, suffix='.lrc'):
+    """
+    提取单个文件的内嵌歌词
+
+    Args:
+        output_path: 歌词文件路径，默认为音频同目录同名（后缀为 suffix）
+
+    Returns:
+        (结果, 歌词文件路径)：结果为 WRITTEN / UNCHANGED / NO_LYRICS，没有歌词时路径为None
+    """
+    info = read_lyrics(audio_path)
+    if info is None:
+        return NO_LYRICS, None
+    output_path = output_path or sidecar_path(audio_path, suffix)
+    written = write_if_changed(output_path, lyrics_document(audio_path, info, os.path.splitext(output_path)[1]))
+    return (WRITTEN if written else UNCHANGED), output_path
+
+
+def find_lyrics_candidates(inputs):
+    """
+    展开输入（目录递归），排除缓存中已知没有内嵌歌词的文件
+
+    只查询元数据缓存（路径+大小+修改时间未变的记录），不解析文件：缓存中没有记录的文件
+    直接交给提取，提取结果由 record_extract_outcomes 写回，下次运行时没有歌词的文件只需一次批量查询。
+
+    Returns:
+        (全部音频文件列表, 可能含有歌词的文件列表, {绝对路径: (大小, 修改时间ns, 是否含歌词或None)})
+    """
+    from common.audio_meta import get_cache
+
+    file_paths = []
+    for item in inputs:
+        if os.path.isfile(item):
+            file_paths.append(item)
+        else:
+            file_paths.extend(list_files(item, LYRICS_EXTENSIONS))
+    flags = get_cache().get_lyrics_flags(file_paths)
+    candidates = [path for path in file_paths
+                  if flags.get(os.path.abspath(path), (None, None, None))[2] is not False]
+    return file_paths, candidates, flags
+
+
+def record_extract_outcomes(jobs, flags):
+    """把提取结果（是否含歌词）记录到元数据缓存，flags 为 find_lyrics_candidates 返回的文件状态"""
+    from common.audio_meta import get_cache
+
+    rows = []
+    for job in jobs:
+        path = os.path.abspath(job.name)
+        if job.ok and path in flags:
+            size, mtime_ns, _ = flags[path]
+            rows.append((path, size, mtime_ns, job.result[0] != NO_LYRICS))
+    if rows:
+        get_cache().record_lyrics_flags(rows)
+
+
+def extract_lyrics_tree(inputs, suffix='.lrc', max_workers=None, on_done=None):
+    """
+    并行提取目录（递归）或文件中的内嵌歌词到同名歌词文件
+
+    Args:
+        inputs: 目录或音频文件列表
+        suffix: 歌词文件后缀（.lrc 或 .txt）
+        on_done: 每个文件结束时的回调 on_done(job, finished_count, total_count)，
+                 job.result 为 (结果, 歌词文件路径)
+
+    Returns:
+        (音频文件总数, 任务列表)
+    """
+    file_paths, candidates, flags = find_lyrics_candidates(inputs)
+    scheduler = JobScheduler(max_workers=max_workers, use_processes=len(candidates) >= PROCESS_POOL_THRESHOLD)
+    for path in candidates:
+        scheduler.submit(path, extract_lyrics_file, path, None, suffix)
+    jobs = scheduler.run(on_done)
+    record_extract_outcomes(jobs, flags)
+    return len(file_paths), jobs
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# 默认清单数据库位置（与各工具的 ./cache 目录一致）
+DEFAULT_DB_PATH = "./cache/manifest.sqlite"
+
+# 计算内容哈希时的读取块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    tool TEXT NOT NULL,
+    input TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    params TEXT NOT NULL,
+    outputs TEXT NOT NULL,
+    updated REAL,
+    PRIMARY KEY (tool, input)
+);
+"""
+
+
+def file_digest(file_path, hash_name="blake2"):
+    """
+    计算文件内容哈希
+
+    Args:
+        hash_name: "xxhash"（未安装时退回blake2）或 "blake2"
+
+    Returns:
+        "算法名:十六进制摘要"
+    """
+    if hash_name == "xxhash" and XXHASH_AVAILABLE:
+        name, hasher = "xxh3_128", xxhash.xxh3_128()
+    else:
+        name, hasher = "blake2b", hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return f"{name}:{hasher.hexdigest()}"
+
+
+def _as_list(paths):
+    if isinstance(paths, (str, os.PathLike)):
+        return [os.path.abspath(paths)]
+    return [os.path.abspath(path) for path in paths]
+
+
+class Manifest:
+    """
+    记录每个输入的指纹与处理参数，重复运行时跳过未变化的输入
+
+    指纹默认只比较大小和修改时间；指定 hash_name 时，大小相同但修改时间变化的
+    文件会再比较内容哈希（例如文件被复制或重新解包但内容未变）。
+    对象只保存基本属性，可以传给进程池中的任务。
+    """
+
+    def __init__(self, tool, params=None, db_path=DEFAULT_DB_PATH, hash_name=None):
+        """
+        Args:
+            tool: 工具名，不同工具的记录互不影响
+            params: 影响输出结果的参数（如目标LUFS、输出格式），变化后全部重新处理
+            db_path: 清单数据库路径
+            hash_name: None / "blake2" / "xxhash"
+        """
+        self.tool = tool
+        self.params = json.dumps(params or {}, sort_keys=True, ensure_ascii=False)
+        self.db_path = db_path
+        self.hash_name = hash_name
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def fingerprint(self, inputs):
+        """计算输入文件的指纹列表 [[路径, 大小, 修改时间ns, 摘要或None], ...]"""
+        result = []
+        for path in _as_list(inputs):
+            st = os.stat(path)
+            digest = file_digest(path, self.hash_name) if self.hash_name else None
+            result.append([path, st.st_size, st.st_mtime_ns, digest])
+        return result
+
+    def is_current(self, inputs, outputs=()):
+        """
+        判断输入是否已按相同参数处理过且输出仍然存在
+
+        Args:
+            inputs: 输入路径或路径列表（第一个作为记录的键，如.atlas及其图片）
+            outputs: 需要存在的输出路径列表
+        """
+        inputs = _as_list(inputs)
+        with self._connect() as conn:
+            row = conn.execute("SELECT fingerprint, params, outputs FROM entries WHERE tool = ? AND input = ?",
+                               (self.tool, inputs[0])).fetchone()
+        if row is None or row[1] != self.params:
+            return False
+        if not all(os.path.exists(path) for path in json.loads(row[2])):
+            return False
+        if not all(os.path.exists(path) for path in _as_list(outputs)):
+            return False
+
+        stored = json.loads(row[0])
+        if [item[0] for item in stored] != inputs:
+            return False
+
+        changed = False
+        for path, size, mtime_ns, digest in stored:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False
+            if st.st_size != size:
+                return False
+            if st.st_mtime_ns == mtime_ns:
+                continue
+            # 修改时间变化：有内容哈希时再比较内容
+            if not digest or not self.hash_name or file_digest(path, self.hash_name) != digest:
+                return False
+            changed = True
+
+        if changed:
+            # 内容未变，更新记录中的修改时间，下次走快速路径
+            self.record(inputs, json.loads(row[2]))
+        return True
+
+    def record(self, inputs, outputs=()):
+        """
+        处理成功后记录输入指纹
+
+        在处理完成后计算指纹，因此原地处理（输出覆盖输入）的文件记录的是处理后的状态。
+        """
+        inputs = _as_list(inputs)
+        if not all(os.path.exists(path) for path in inputs):
+            # 输入已被删除（如转换后不保留原文件），无需记录
+            return
+        fingerprint = json.dumps(self.fingerprint(inputs), ensure_ascii=False)
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                         (self.tool, inputs[0], fingerprint, self.params,
+                          json.dumps(_as_list(outputs), ensure_ascii=False), time.time()))
+
+    def forget(self, inputs):
+        """删除输入的记录，下次运行时重新处理"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE tool = ? AND input = ?", (self.tool, _as_list(inputs)[0]))
@@ -0,0 +1,237 @@
+"""
+流式处理管线：把多个工具的处理步骤串成一条命令链，不写中间文件
+
+    python main.py pipeline wem,loudnorm,flac,m3u -i WEM目录 -o 输出目录 -p lufs=-16
+    python main.py pipeline loudnorm,flac,lyrics -i 音频目录 -o 输出目录
+
+每个输入文件只启动一条 解码器 | ffmpeg 进程链：vgmstream 把PCM写到管道，
+ffmpeg 从管道读取、执行滤镜并直接编码为最终格式（tool028 的临时WAV、tool013 的
+中间FLAC都不再落盘）。各文件之间由 FFmpegPool 并行执行，只写出最终产物。
+"""
+import os
+import subprocess
+import tempfile
+
+from common import trace
+from common.ffmpeg_pool import FFmpegPool, run_ffmpeg
+
+# 阶段名 -> (类型, 说明)
+STAGES = {
+    "wem": ("source", "用vgmstream解码WEM，PCM经管道送给ffmpeg（tool028）"),
+    "loudnorm": ("filter", "loudnorm音量标准化，-p lufs=-16（tool013）"),
+    "flac": ("encode", "编码为FLAC"),
+    "wav": ("encode", "编码为WAV"),
+    "lyrics": ("sidecar", "把源文件的内嵌歌词保存为输出文件旁的LRC，不能与wem同用（common.lyrics）"),
+    "m3u": ("collect", "全部输出写入一个M3U播放列表，-p playlist=名称（tool002）"),
+}
+
+# 各类型阶段在链中的先后顺序
+KIND_ORDER = ["source", "filter", "encode", "sidecar", "collect"]
+
+# 编码阶段 -> (输出后缀, ffmpeg编码参数)
+ENCODERS = {
+    "flac": (".flac", ["-c:a", "flac"]),
+    "wav": (".wav", ["-c:a", "pcm_s16le"]),
+}
+
+# 没有解码阶段时，ffmpeg直接读取的音频后缀
+AUDIO_EXTENSIONS = {'.mp3', '.flac', '.wav', '.m4a', '.aac', '.ogg', '.opus'}
+
+# 解码器退出等待时间（秒）
+DECODER_WAIT = 10
+
+
+def parse_chain(chain):
+    """
+    解析阶段链，如 "wem,loudnorm,flac,m3u" 或 "loudnorm>flac>lyrics"
+
+    Returns:
+        阶段名列表
+
+    Raises:
+        ValueError: 未知阶段、顺序错误、编码阶段不是恰好一个，或 lyrics 与 wem 同用
+    """
+    names = [name.strip().lower() for name in chain.replace(">", ",").split(",") if name.strip()]
+    for name in names:
+        if name not in STAGES:
+            raise ValueError(f"未知的阶段: {name}（可选: {', '.join(STAGES)}）")
+    if len(set(names)) != len(names):
+        raise ValueError(f"阶段重复: {chain}")
+    kinds = [KIND_ORDER.index(STAGES[name][0]) for name in names]
+    if kinds != sorted(kinds):
+        raise ValueError(f"阶段顺序应为 解码 → 滤镜 → 编码 → 附属文件 → 汇总: {chain}")
+    if sum(1 for name in names if STAGES[name][0] == "encode") != 1:
+        raise ValueError(f"需要恰好一个编码阶段（{', '.join(ENCODERS)}）: {chain}")
+    if "lyrics" in names and "wem" in names:
+        raise ValueError(f"WEM文件没有内嵌歌词，lyrics 阶段不能与 wem 同用: {chain}")
+    return names
+
+
+class Pipeline:
+    """一条声明式的处理链及其执行"""
+
+    def __init__(self, chain, params=None):
+        """
+        Args:
+            chain: 阶段链字符串或阶段名列表
+            params: lufs / playlist / vgmstream（vgmstream-cli路径）/ ffmpeg（ffmpeg路径）
+        """
+        self.stages = parse_chain(chain if isinstance(chain, str) else ",".join(chain))
+        self.params = params or {}
+        self.source = next((name for name in self.stages if STAGES[name][0] == "source"), None)
+        self.encoder = next(name for name in self.stages if STAGES[name][0] == "encode")
+        self.ffmpeg = self.params.get('ffmpeg', 'ffmpeg')
+        if self.source == "wem":
+            from tool028.main import vgm_path
+            self.vgmstream = self.params.get('vgmstream', vgm_path)
+
+    @property
+    def input_extensions(self):
+        return {'.wem'} if self.source == "wem" else AUDIO_EXTENSIONS
+
+    def output_path(self, input_path, output_dir):
+        base = os.path.splitext(os.path.basename(input_path))[0]
+        return os.path.join(output_dir, base + ENCODERS[self.encoder][0])
+
+    def filters(self):
+        """ffmpeg音频滤镜列表"""
+        result = []
+        if "loudnorm" in self.stages:
+            result.append(f"loudnorm=i={self.params.get('lufs', '-16')}")
+        return result
+
+    def build_commands(self, input_path, output_path, threads=1):
+        """
+        Returns:
+            (解码器命令或None, ffmpeg命令)；有解码器时ffmpeg从标准输入读取
+        """
+        decoder = None
+        source = input_path
+        if self.source == "wem":
+            decoder = [self.vgmstream, "-p", input_path]
+            source = "pipe:0"
+        cmd = [self.ffmpeg, "-i", source, "-threads", str(threads)]
+        filters = self.filters()
+        if filters:
+            cmd += ["-af", ",".join(filters)]
+        cmd += ENCODERS[self.encoder][1] + ["-y", output_path]
+        return decoder, cmd
+
+    def process_file(self, input_path, output_path, threads=1, cancel_event=None, on_progress=None):
+        """
+        处理单个文件：解码 | 滤镜+编码 一次完成，再生成附属文件
+
+        输出先写到同目录的 .part 文件，成功后替换为最终文件。
+
+        Returns:
+            输出路径
+
+        Raises:
+            RuntimeError: 解码或编码失败
+        """
+        name, ext = os.path.splitext(output_path)
+        temp_path = f"{name}.part{ext}"
+        decoder_cmd, cmd = self.build_commands(input_path, temp_path, threads)
+
+        with trace.span("file", input_path):
+            try:
+                with trace.span("stream", input_path) as s:
+                    _run_chain(decoder_cmd, cmd, on_progress, cancel_event)
+                    s.bytes_read = trace.file_size(input_path)
+                    s.bytes_written = trace.file_size(temp_path)
+                os.replace(temp_path, output_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+            if "lyrics" in self.stages:
+                with trace.span("lyrics", input_path):
+                    _write_lyrics_sidecar(input_path, output_path)
+        return output_path
+
+    def run(self, inputs, output_dir, jobs=None, log=print):
+        """
+        并行处理全部输入文件，最后执行汇总阶段
+
+        Returns:
+            任务列表（按输入顺序）
+        """
+        from common.batch import iter_input_files
+
+        os.makedirs(output_dir, exist_ok=True)
+        pool = FFmpegPool(max_workers=jobs)
+        for input_path in iter_input_files(inputs, self.input_extensions):
+            pool.submit(input_path, self.process_file, input_path, self.output_path(input_path, output_dir))
+        if not pool.jobs:
+            log("没有找到需要处理的输入文件")
+            return []
+
+        log(f"管线 {' → '.join(self.stages)}: 共 {len(pool.jobs)} 个文件，"
+            f"并行数 {min(pool.max_workers, len(pool.jobs))}")
+
+        def on_done(job, finished, total):
+            if job.ok:
+                log(f"[{finished}/{total}] ✓ {job.name} ({job.elapsed:.2f}s)")
+            else:
+                log(f"[{finished}/{total}] ✗ {job.name} - {job.error}")
+
+        with trace.run("pipeline", log=log):
+            results = pool.run(on_done)
+
+        if "m3u" in self.stages:
+            playlist = os.path.join(output_dir, self.params.get('playlist', 'playlist') + ".m3u")
+            outputs = [job.result for job in results if job.ok]
+            with open(playlist, 'w', encoding='utf-8') as f:
+                f.write("#EXTM3U\n")
+                for path in outputs:
+                    f.write(os.path.abspath(path) + "\n")
+            log(f"播放列表: {playlist}（{len(outputs)} 首）")
+        return results
+
+
+def _run_chain(decoder_cmd, cmd, on_progress=None, cancel_event=None):
+    """
+    运行 解码器 | ffmpeg，任一进程失败时抛出 RuntimeError
+
+    ffmpeg被取消或退出后关闭管道，解码器随之因写入失败而退出。
+    """
+    if decoder_cmd is None:
+        returncode, stderr = run_ffmpeg(cmd, on_progress=on_progress, cancel_event=cancel_event)
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg失败: {stderr[-200:]}")
+        return
+
+    with tempfile.TemporaryFile() as decoder_err:
+        decoder = subprocess.Popen([str(arg) for arg in decoder_cmd], stdout=subprocess.PIPE,
+                                   stderr=decoder_err, stdin=subprocess.DEVNULL)
+        try:
+            returncode, stderr = run_ffmpeg(cmd, on_progress=on_progress, cancel_event=cancel_event,
+                                            stdin=decoder.stdout)
+        finally:
+            decoder.stdout.close()
+            try:
+                decoder.wait(timeout=DECODER_WAIT)
+            except subprocess.TimeoutExpired:
+                decoder.kill()
+                decoder.wait()
+        errors = []
+        if decoder.returncode != 0:
+            decoder_err.seek(0)
+            message = decoder_err.read().decode('utf-8', errors='replace').strip()
+            errors.append(f"解码失败: {message[-200:]}")
+        if returncode != 0:
+            errors.append(f"ffmpeg失败: {stderr[-200:]}")
+        if errors:
+            raise RuntimeError("; ".join(errors))
+
+
+def _write_lyrics_sidecar(input_path, output_path):
+    """源文件含内嵌歌词时，在输出文件旁写入同名LRC"""
+    from common.lyrics import extract_lyrics_file, sidecar_path
+    extract_lyrics_file(input_path, sidecar_path(output_path))
+
+
+def print_stages():
+    """打印可用的阶段"""
+    for name, (kind, description) in STAGES.items():
+        print(f"  {name:<10}{kind:<9}{description}")
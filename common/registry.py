@@ -0,0 +1,147 @@
+import ast
+import importlib
+import os
+import re
+import subprocess
+import sys
+
+# 项目根目录（各 toolNNN 包所在目录）
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 工具包目录名
+TOOL_DIR_PATTERN = re.compile(r'^tool\d+$')
+
+# 工具包 __init__.py 中可声明的元数据常量
+METADATA_FIELDS = {
+    "NAME": "name",
+    "DESCRIPTION": "description",
+    "MODULE": "module",
+    "GUI": "gui",
+    "LAUNCHER": "launcher",
+}
+
+
+def read_tool_metadata(init_path):
+    """
+    只解析 __init__.py 中的常量赋值读取元数据，不执行任何工具代码
+
+    Returns:
+        元数据字典，缺少的字段为 None
+    """
+    with open(init_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=init_path)
+
+    metadata = {field: None for field in METADATA_FIELDS.values()}
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+        target = node.targets[0]
+        if isinstance(target, ast.Name) and target.id in METADATA_FIELDS:
+            try:
+                metadata[METADATA_FIELDS[target.id]] = ast.literal_eval(node.value)
+            except ValueError:
+                continue
+    return metadata
+
+
+def discover_tools(base_dir=BASE_DIR):
+    """
+    扫描项目目录下的 toolNNN 包，按目录名排序返回工具列表
+
+    Returns:
+        [{"key", "name", "description", "module", "gui", "launcher", "path"}, ...]
+    """
+    tools = []
+    with os.scandir(base_dir) as entries:
+        for entry in entries:
+            if not entry.is_dir() or not TOOL_DIR_PATTERN.match(entry.name):
+                continue
+            init_path = os.path.join(entry.path, "__init__.py")
+            if not os.path.isfile(init_path):
+                continue
+            tool = read_tool_metadata(init_path)
+            tool["key"] = entry.name
+            tool["name"] = tool["name"] or entry.name
+            tool["description"] = tool["description"] or ""
+            tool["launcher"] = bool(tool["launcher"])
+            tool["module"] = tool["module"] or f"{entry.name}.main"
+            # 工具脚本路径（独立进程启动前检查是否存在）
+            tool["path"] = os.path.join(base_dir, *tool["module"].split(".")) + ".py"
+            tools.append(tool)
+    tools.sort(key=lambda t: t["key"])
+    return tools
+
+
+def load_tool(tool):
+    """导入工具模块，返回GUI类（没有GUI时返回模块本身）"""
+    module = importlib.import_module(tool["module"])
+    if tool.get("gui"):
+        return getattr(module, tool["gui"])
+    return module
+
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 输出
+
+    Returns:
+        [(模块名, 自身耗时us, 累计耗时us), ...]
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            # 表头行
+            continue
+        rows.append((parts[2].strip(), self_us, cumulative_us))
+    return rows
+
+
+def profile_tool_import(tool, python=sys.executable, top=5):
+    """
+    在新解释器中以 -X importtime 导入工具模块，统计导入耗时
+
+    Returns:
+        {"key", "module", "total_ms", "top": [(模块名, 自身耗时ms), ...], "error"}
+    """
+    result = {"key": tool["key"], "module": tool["module"], "total_ms": None, "top": [], "error": None}
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {tool['module']}"],
+        cwd=BASE_DIR, capture_output=True, text=True, encoding='utf-8', errors='replace'
+    )
+    rows = parse_importtime(proc.stderr)
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        result["error"] = errors[-1] if errors else "导入失败"
+    for name, self_us, cumulative_us in rows:
+        if name.strip() == tool["module"]:
+            result["total_ms"] = cumulative_us / 1000
+    heaviest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    result["top"] = [(name.strip(), self_us / 1000) for name, self_us, _ in heaviest]
+    return result
+
+
+def print_tool_list(tools):
+    """打印工具列表"""
+    for tool in tools:
+        mark = "*" if tool["launcher"] else " "
+        print(f"{mark} {tool['key']}  {tool['name']}  - {tool['description']}")
+
+
+def print_import_profile(tools, top=5):
+    """逐个工具打印导入耗时明细"""
+    for tool in tools:
+        result = profile_tool_import(tool, top=top)
+        total = f"{result['total_ms']:.1f} ms" if result["total_ms"] is not None else "-"
+        print(f"{tool['key']}  {tool['module']}  {total}")
+        if result["error"]:
+            print(f"    导入失败: {result['error']}")
+        for name, self_ms in result["top"]:
+            print(f"    {self_ms:8.1f} ms  {name}")
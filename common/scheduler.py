@@ -0,0 +1,96 @@
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+
+def _timed_call(func, args, kwargs):
+    """在工作线程/进程中执行任务并计时"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+class Job:
+    """一个批处理任务及其执行结果"""
+
+    def __init__(self, name, func, *args, **kwargs):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+        # 执行结果
+        self.ok = None
+        self.result = None
+        self.error = None
+        self.elapsed = 0.0
+
+
+class JobScheduler:
+    """
+    所有批处理工具共用的任务调度器
+
+    ffmpeg等外部进程、磁盘IO为主的任务使用线程池；
+    纯Python计算为主的任务（图集拆分、繁简转换等）使用进程池，此时任务函数和参数必须可pickle。
+    """
+
+    def __init__(self, max_workers=None, use_processes=False):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.jobs = []
+
+    def submit(self, name, func, *args, **kwargs):
+        """添加任务，返回Job对象"""
+        job = Job(name, func, *args, **kwargs)
+        self.jobs.append(job)
+        return job
+
+    def run(self, on_done=None):
+        """
+        并行执行全部任务
+
+        Args:
+            on_done: 每个任务结束时的回调 on_done(job, finished_count, total_count)
+
+        Returns:
+            任务列表（按提交顺序）
+        """
+        if not self.jobs:
+            return []
+
+        pool_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        workers = min(self.max_workers, len(self.jobs))
+        total = len(self.jobs)
+        finished = 0
+
+        executor = pool_class(max_workers=workers)
+        try:
+            if self.use_processes:
+                futures = {
+                    executor.submit(_timed_call, job.func, job.args, job.kwargs): job
+                    for job in self.jobs
+                }
+            else:
+                # 线程中的任务使用提交时的上下文（如当前的 trace.run）
+                futures = {
+                    executor.submit(contextvars.copy_context().run, _timed_call, job.func, job.args, job.kwargs): job
+                    for job in self.jobs
+                }
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    job.result, job.elapsed = future.result()
+                    job.ok = True
+                except Exception as e:
+                    job.ok = False
+                    job.error = f"{type(e).__name__}: {e}"
+                finished += 1
+                if on_done:
+                    on_done(job, finished, total)
+        except KeyboardInterrupt:
+            # 中断时取消尚未开始的任务
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown(wait=True)
+        return self.jobs
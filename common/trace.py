@@ -0,0 +1,243 @@
+"""
+运行过程的计时与吞吐统计
+
+    with trace.run("tool027", log=self.log):
+        for path in files:
+            with trace.span("file", path):
+                with trace.span("ffmpeg", path) as s:
+                    ...
+                    s.bytes_read = trace.file_size(path)
+
+每个span写一行JSONL（默认 ./cache/trace/<工具>-<时间>.jsonl），运行结束时输出
+文件数/秒、MB/秒和各阶段耗时汇总。没有活动的 run 时 span 不做任何记录。
+读写字节数按全部span累加，只在实际读写文件的最内层span上填写，避免重复统计。
+
+环境变量：
+    SCRIPTTOOLS_TRACE=0            不写JSONL（仍输出汇总）
+    SCRIPTTOOLS_TRACE=路径.jsonl   写到指定文件
+    SCRIPTTOOLS_PROFILE=cprofile,tracemalloc
+                                   同时保存cProfile结果(.prof)与内存分配统计(.mem.txt)；
+                                   cProfile只统计调用 run 的线程
+"""
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+TRACE_ENV = "SCRIPTTOOLS_TRACE"
+PROFILE_ENV = "SCRIPTTOOLS_PROFILE"
+DEFAULT_TRACE_DIR = "./cache/trace"
+
+# 表示“整个文件”的阶段名，用于统计文件数
+FILE_STAGE = "file"
+
+# 当前的运行：每个线程（及 asyncio 任务）各自独立，同一进程中同时运行的多个工具互不影响。
+# JobScheduler / FFmpegPool 的线程池任务在提交时复制上下文，任务中的span记录到提交者的运行
+_active = contextvars.ContextVar("trace_active", default=None)
+
+
+class Span:
+    """一次计时，可在 with 块内补充字节数和其他字段"""
+
+    def __init__(self, stage, file=None, **fields):
+        self.stage = stage
+        self.file = file
+        self.fields = fields
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.ok = True
+        self.start = 0.0
+        self.elapsed = 0.0
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+
+class Tracer:
+    """一次运行的span记录、计数器与汇总"""
+
+    def __init__(self, tool, path=None, log=print):
+        self.tool = tool
+        self.log = log
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.files = 0
+        self.failed = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+        setting = os.environ.get(TRACE_ENV, "1")
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        if path is None and setting not in ("0", ""):
+            path = setting if setting.endswith(".jsonl") else os.path.join(DEFAULT_TRACE_DIR, f"{tool}-{stamp}.jsonl")
+        self.path = path
+        self._file = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = open(path, 'a', encoding='utf-8')
+
+        profile = {item.strip() for item in os.environ.get(PROFILE_ENV, "").lower().split(",") if item.strip()}
+        self._profile_base = os.path.splitext(path)[0] if path else os.path.join(DEFAULT_TRACE_DIR, f"{tool}-{stamp}")
+        self._profiler = None
+        self._tracemalloc = None
+        if "cprofile" in profile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        if "tracemalloc" in profile:
+            import tracemalloc
+            self._tracemalloc = tracemalloc
+            tracemalloc.start(10)
+
+    def _write(self, record):
+        if self._file is not None:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def record(self, span):
+        with self.lock:
+            total = self.stages.setdefault(span.stage, [0, 0.0])
+            total[0] += 1
+            total[1] += span.elapsed
+            if span.stage == FILE_STAGE:
+                self.files += 1
+                self.failed += 0 if span.ok else 1
+            self.bytes_read += span.bytes_read
+            self.bytes_written += span.bytes_written
+            self._write({
+                "tool": self.tool,
+                "stage": span.stage,
+                "file": span.file,
+                "t": round(span.start - self.started, 6),
+                "ms": round(span.elapsed * 1000, 3),
+                "bytes_read": span.bytes_read,
+                "bytes_written": span.bytes_written,
+                "ok": span.ok,
+                "thread": threading.current_thread().name,
+                **span.fields,
+            })
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        mb = 1024 * 1024
+        return {
+            "tool": self.tool,
+            "elapsed_s": round(elapsed, 3),
+            "files": self.files,
+            "failed": self.failed,
+            "files_per_s": round(self.files / elapsed, 2) if elapsed else None,
+            "mb_read_per_s": round(self.bytes_read / mb / elapsed, 2) if elapsed else None,
+            "mb_written_per_s": round(self.bytes_written / mb / elapsed, 2) if elapsed else None,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "stages": {stage: {"count": count, "total_s": round(total, 3), "mean_ms": round(total / count * 1000, 2)}
+                       for stage, (count, total) in sorted(self.stages.items(), key=lambda item: -item[1][1])},
+            "counters": dict(self.counters),
+        }
+
+    def close(self):
+        """停止采样，写出汇总并打印到日志"""
+        summary = self.summary()
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self._profile_base + ".prof")
+            summary["profile"] = self._profile_base + ".prof"
+        if self._tracemalloc is not None:
+            snapshot = self._tracemalloc.take_snapshot()
+            current, peak = self._tracemalloc.get_traced_memory()
+            self._tracemalloc.stop()
+            mem_path = self._profile_base + ".mem.txt"
+            os.makedirs(os.path.dirname(os.path.abspath(mem_path)), exist_ok=True)
+            with open(mem_path, 'w', encoding='utf-8') as f:
+                f.write(f"peak: {peak / 1024 / 1024:.1f} MB, current: {current / 1024 / 1024:.1f} MB\n\n")
+                for stat in snapshot.statistics("lineno")[:30]:
+                    f.write(f"{stat}\n")
+            summary["peak_memory_mb"] = round(peak / 1024 / 1024, 1)
+            summary["memory_report"] = mem_path
+
+        with self.lock:
+            self._write({"summary": summary})
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+        if not self.stages:
+            # 工具没有记录任何span（如在子进程中执行），不输出空汇总
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+            return summary
+
+        self.log(format_summary(summary))
+        if self.path:
+            self.log(f"计时记录: {self.path}")
+        return summary
+
+
+def format_summary(summary):
+    """把汇总格式化为几行日志文本"""
+    lines = [
+        f"[{summary['tool']}] {summary['files']} 个文件（失败 {summary['failed']}），耗时 {summary['elapsed_s']:.2f}s，"
+        f"{summary['files_per_s'] or 0:.1f} 文件/s，读 {summary['mb_read_per_s'] or 0:.2f} MB/s，"
+        f"写 {summary['mb_written_per_s'] or 0:.2f} MB/s"
+    ]
+    for stage, stats in summary["stages"].items():
+        lines.append(f"  {stage:<12} {stats['count']:>6} 次  共 {stats['total_s']:.2f}s  平均 {stats['mean_ms']:.1f} ms")
+    for name, value in summary["counters"].items():
+        lines.append(f"  {name}: {value}")
+    return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def run(tool, log=print, path=None):
+    """一次批处理运行：期间的 span 都记录到该运行中，结束时输出汇总"""
+    tracer = Tracer(tool, path, log)
+    token = _active.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _active.reset(token)
+        tracer.close()
+
+
+@contextlib.contextmanager
+def span(stage, file=None, **fields):
+    """
+    计时一个阶段；块内抛出异常时记录为失败并继续抛出（也可以设置 span.ok = False）
+
+    阶段名为 "file" 的span代表处理一个完整文件，用于统计文件数。
+    """
+    tracer = _active.get()
+    current = Span(stage, file, **fields)
+    current.start = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        current.ok = False
+        raise
+    finally:
+        current.elapsed = time.perf_counter() - current.start
+        if tracer is not None:
+            tracer.record(current)
+
+
+def count(name, value=1):
+    """累加当前运行的计数器（值为0时忽略）"""
+    tracer = _active.get()
+    if tracer is not None and value:
+        tracer.count(name, value)
+
+
+def file_size(path):
+    """文件大小，文件不存在时为0（用于填写 bytes_read / bytes_written）"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
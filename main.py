@@ -1,93 +1,30 @@
-# # 文件批量重名脚本（通用）
-# import tool001.main
-#
-# # 批量选取音乐文件 -> m3u
-# import tool002.main
-#
-# # 统计音乐文件时长
-# import tool003.main
-#
-# # 依靠文件名批量选取并移动文件
-# import tool004.main
-#
-# # 使用spine将json文件转化为spine文件
-# import tool005.main
-#
-# # 提取音乐文件内嵌的歌词
-# import tool006.main
-#
-# # lrc转srt文件，并对复数相同时间戳进行拆分到多个srt文件
-# import tool007.main
-#
-# # lrc转srt文件
-# import tool008.main
-#
-# # LRC文件拆分为多段
-# import tool009.main
-#
-# # 繁简转化
-# import tool010.main
-#
-# # srt文件转化为lrc文件
-# import tool011.main
-#
-# # 多段LRC文件合一
-# import tool012.main
-#
-# # 批量音量标准化
-# import tool013.main
-#
-# # 使用音乐文件和单张图片，批量制作视频
-# import tool014.main
-#
-# # 将目录中skel文件转化为json
-# import tool015.main
-#
-# # 灵魂潮汐, 深空之眼, 环行旅舍 包体解密
-# import tool016.main
-#
-# # json文件修改图集识别位置
-# import tool017.main
-#
-# # UE批量图片解包
-# import tool018.main
-#
-# # 拼接多个音频片段
-# import tool019.main
-#
-# # UE解包拆分为.atlas与.json文件
-# import tool020.main
-#
-# # atlas图理文件对png文件解包
-# import tool021.main
-#
-# # 去除重名mp3
-# import tool022.main
-#
-# # 移动文件到自身文件名的文件夹内
-# import tool023.main
-#
-# # Astrofox
-# import tool024.main
-#
-# # AE批量渲染前置批量图片裁剪
-# import tool025.main
-#
-# # 音频文件歌词提取工具
-# import tool026.main
-#
-# # 文件批量改名移动复制，修改音乐文件元数据信息（EXCEL）
-# import tool027.main
-#
-# # WEM音频文件音乐文件转格式
-# import tool028.main
-
 import tkinter as tk
 from tkinter import ttk, messagebox
 import subprocess
+import argparse
+import importlib
+import threading
+import time
+import json
+import sys
 import os
 from pathlib import Path
 
+from common.registry import BASE_DIR, discover_tools, load_tool
+
+# 进程内启动时预先导入的重型依赖（未安装的会被跳过）
+WARM_MODULES = [
+    "numpy",
+    "pandas",
+    "PIL.Image",
+    "mutagen",
+    "mutagen.flac",
+    "mutagen.mp3",
+    "mutagen.id3",
+    "chardet",
+    "opencc",
+]
+
 
 class ToolLauncherGUI:
     def __init__(self, root):
@@ -109,59 +46,31 @@ class ToolLauncherGUI:
             text="工具列表",
             font=("Microsoft YaHei", 18, "bold")
         )
-        title_label.pack(pady=(0, 20))
+        title_label.pack(pady=(0, 10))
+
+        # 启动方式：进程内打开（预热后毫秒级）或独立进程
+        self.in_process_var = tk.BooleanVar(value=True)
+        mode_check = ttk.Checkbutton(
+            self.main_frame,
+            text="在启动器进程内打开工具（预加载常用依赖，秒开）",
+            variable=self.in_process_var
+        )
+        mode_check.pack(anchor=tk.W, pady=(0, 10))
 
         # 创建工具列表容器（使用Frame + Canvas实现可滚动列表）
         self.create_scrollable_frame()
 
-        # 工具配置列表 - 这里是可拓展的部分
-        self.tools = [
-            {
-                "name": "M3U播放列表生成器",
-                "description": "用于生成M3U格式的播放列表文件，支持自定义文件名列表和输出路径设置",
-                "path": "./tool002/main.py"
-            },
-            {
-                "name": "音频时长统计工具",
-                "description": "统计音乐文件时长",
-                "path": "./tool003/main.py"
-            },
-            {
-                "name": "繁简字转换工具",
-                "description": "批量转换文本文件中的繁简字，支持多种转换模式",
-                "path": "./tool010/main.py"
-            },
-            {
-                "name": "音频音量标准化工具",
-                "description": "将音频文件音量标准化到指定LUFS值，支持多种音频格式",
-                "path": "./tool013/main.py"
-            },
-            {
-                "name": "音频片段拼接工具",
-                "description": "拼接多个音频片段文件为一个音频文件",
-                "path": "./tool019/main.py"
-            },
-            {
-                "name": "音频文件歌词提取工具",
-                "description": "分离音频文件歌词文本到同目录文件名的lrc文件中",
-                "path": "./tool026/main.py"
-            },
-            {
-                "name": "文件管理工具",
-                "description": "管理文件和文件夹，可生成包含文件信息的Excel表格，支持音频文件元数据提取",
-                "path": "./tool027/main.py"
-            },
-            {
-                "name": "WEM音频文件转换器",
-                "description": "将WEM格式音频文件转换为FLAC或WAV格式",
-                "path": "./tool028/main.py"
-            }
-            # 后续添加新工具只需在这里增加字典条目
-        ]
+        # 工具列表：从各 toolNNN/__init__.py 的元数据中发现（不导入工具模块）
+        # 新工具只需在包的 __init__.py 中声明 NAME/DESCRIPTION/MODULE/GUI 并设置 LAUNCHER = True
+        self.tools = [tool for tool in discover_tools() if tool["launcher"]]
 
         # 加载工具列表
         self.load_tools()
 
+        # 后台预热：窗口显示后再提前导入重型依赖和工具模块，不拖慢启动
+        self.warm_thread = None
+        self.root.after_idle(self.start_warm_up)
+
     def setup_styles(self):
         """设置界面样式"""
         style = ttk.Style()
@@ -265,7 +174,7 @@ class ToolLauncherGUI:
                 row_frame,
                 text="打开",
                 style="Tool.TButton",
-                command=lambda path=tool["path"]: self.launch_tool(path)
+                command=lambda t=tool: self.launch_tool(t)
             )
             open_btn.pack(side=tk.RIGHT, padx=(10, 0), anchor=tk.CENTER)
 
@@ -274,27 +183,216 @@ class ToolLauncherGUI:
                 separator = ttk.Separator(self.tools_frame, orient="horizontal")
                 separator.pack(fill=tk.X, pady=(0, 15))
 
-    def launch_tool(self, tool_path):
-        """启动指定路径的工具"""
+    def start_warm_up(self):
+        """在后台线程中预先导入重型依赖与工具模块"""
+        modules = WARM_MODULES + [tool["module"] for tool in self.tools if tool.get("module")]
+
+        def warm():
+            for name in modules:
+                try:
+                    importlib.import_module(name)
+                except Exception:
+                    # 依赖缺失或工具导入失败时，留到真正启动时再报错
+                    continue
+
+        self.warm_thread = threading.Thread(target=warm, daemon=True)
+        self.warm_thread.start()
+
+    def launch_tool(self, tool):
+        """启动指定的工具"""
+        if self.in_process_var.get() and tool.get("module") and tool.get("gui"):
+            self.open_in_process(tool)
+        else:
+            self.spawn_tool(tool)
+
+    def open_in_process(self, tool):
+        """在当前进程中以Toplevel窗口打开工具"""
+        window = None
+        try:
+            gui_class = load_tool(tool)
+            window = tk.Toplevel(self.root)
+            # 保持对工具实例的引用，避免被回收
+            window.app = gui_class(window)
+            window.focus_set()
+        except Exception as e:
+            if window is not None:
+                window.destroy()
+            messagebox.showerror("启动失败", f"无法启动工具：\n{tool['name']}\n{str(e)}")
+
+    def spawn_tool(self, tool):
+        """以独立进程启动工具（python -m 包名.模块，工作目录为项目根目录，工具可以导入 common）"""
         try:
             # 检查文件是否存在
-            if not Path(tool_path).exists():
-                messagebox.showerror("错误", f"工具文件不存在：\n{tool_path}")
+            if not Path(tool["path"]).exists():
+                messagebox.showerror("错误", f"工具文件不存在：\n{tool['path']}")
                 return
 
-            # 启动工具（使用subprocess打开新进程）
-            if os.name == 'nt':  # Windows系统
-                subprocess.Popen(['python', tool_path], shell=True)
-            else:  # 类Unix系统
-                subprocess.Popen(['python3', tool_path])
+            # 启动工具（使用当前解释器打开新进程）
+            subprocess.Popen([sys.executable, "-m", tool["module"]], cwd=BASE_DIR)
 
-            messagebox.showinfo("提示", f"正在启动工具...\n{tool_path}")
+            messagebox.showinfo("提示", f"正在启动工具...\n{tool['name']}")
 
         except Exception as e:
             messagebox.showerror("启动失败", f"无法启动工具：\n{str(e)}")
 
 
-if __name__ == "__main__":
+# 冷启动测量：在新解释器中导入工具并显示窗口，输出从进程创建到窗口就绪的秒数
+_COLD_START_SNIPPET = """
+import sys, time, importlib, tkinter as tk
+t0 = float(sys.argv[1])
+module = importlib.import_module(sys.argv[2])
+root = tk.Tk()
+app = getattr(module, sys.argv[3])(root)
+root.update()
+print(time.time() - t0)
+root.destroy()
+"""
+
+
+def benchmark_startup(tools):
+    """
+    测量每个工具的启动耗时（冷启动：独立进程；热启动：预热后的进程内Toplevel）
+
+    Returns:
+        每个工具的测量结果列表，单位毫秒
+    """
+    results = []
+    for tool in tools:
+        row = {"name": tool["name"], "module": tool["module"], "cold_ms": None, "warm_ms": None, "error": None}
+        try:
+            proc = subprocess.run(
+                [sys.executable, "-c", _COLD_START_SNIPPET, repr(time.time()), tool["module"], tool["gui"]],
+                capture_output=True, text=True, timeout=120
+            )
+            if proc.returncode == 0:
+                row["cold_ms"] = float(proc.stdout.strip().splitlines()[-1]) * 1000
+            else:
+                row["error"] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "启动失败"
+        except Exception as e:
+            row["error"] = str(e)
+        results.append(row)
+
+    # 热启动：与启动器相同，先导入依赖与模块，再计时创建窗口
+    root = tk.Tk()
+    root.withdraw()
+    for name in WARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            continue
+    for tool, row in zip(tools, results):
+        try:
+            gui_class = load_tool(tool)
+            start = time.perf_counter()
+            window = tk.Toplevel(root)
+            window.app = gui_class(window)
+            window.update()
+            row["warm_ms"] = (time.perf_counter() - start) * 1000
+            window.destroy()
+        except Exception as e:
+            row["error"] = row["error"] or str(e)
+    root.destroy()
+    return results
+
+
+def print_startup_report(results):
+    """打印启动耗时对比表"""
+    print(f"{'工具':<24}{'冷启动(ms)':>12}{'热启动(ms)':>12}")
+    for row in results:
+        cold = f"{row['cold_ms']:.0f}" if row["cold_ms"] is not None else "-"
+        warm = f"{row['warm_ms']:.1f}" if row["warm_ms"] is not None else "-"
+        line = f"{row['module']:<24}{cold:>12}{warm:>12}"
+        if row["error"]:
+            line += f"  ({row['error']})"
+        print(line)
+
+def build_parser():
+    """命令行参数：无参数时启动图形界面"""
+    parser = argparse.ArgumentParser(description="脚本工具集")
+    parser.add_argument("--bench-startup", action="store_true", help="测量各工具冷/热启动耗时")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser("run", help="无界面批量运行工具")
+    run_parser.add_argument("tool", help="工具名，如 tool013")
+    run_parser.add_argument("--input", "-i", nargs="+", required=True, help="输入文件或目录")
+    run_parser.add_argument("--output", "-o", help="输出文件或目录")
+    run_parser.add_argument("--jobs", "-j", type=int, default=None, help="并行任务数（默认CPU核数）")
+    run_parser.add_argument("--param", "-p", action="append", default=[], metavar="KEY=VALUE",
+                            help="工具参数，可重复")
+
+    pipeline_parser = subparsers.add_parser("pipeline", help="流式处理管线（不写中间文件）")
+    pipeline_parser.add_argument("chain", nargs="?", help="阶段链，如 wem,loudnorm,flac,m3u 或 loudnorm,flac,lyrics")
+    pipeline_parser.add_argument("--input", "-i", nargs="+", help="输入文件或目录")
+    pipeline_parser.add_argument("--output", "-o", help="输出目录")
+    pipeline_parser.add_argument("--jobs", "-j", type=int, default=None, help="并行文件数（默认CPU核数）")
+    pipeline_parser.add_argument("--param", "-p", action="append", default=[], metavar="KEY=VALUE",
+                                 help="阶段参数，可重复")
+    pipeline_parser.add_argument("--stages", action="store_true", help="列出可用的阶段")
+
+    subparsers.add_parser("list", help="列出支持无界面运行的工具")
+
+    tools_parser = subparsers.add_parser("tools", help="列出所有工具（*为启动器中显示的工具）")
+    tools_parser.add_argument("--importtime", action="store_true", help="逐个工具统计导入耗时")
+    tools_parser.add_argument("--top", type=int, default=5, help="每个工具显示最耗时的模块数")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "run":
+        from common.batch import run_batch, parse_params
+        try:
+            params = parse_params(args.param)
+        except ValueError as e:
+            print(f"错误: {e}")
+            return 2
+        return run_batch(args.tool, args.input, args.output, args.jobs, params)
+
+    if args.command == "pipeline":
+        from common.batch import parse_params
+        from common.pipeline import Pipeline, print_stages
+        if args.stages or not args.chain:
+            print_stages()
+            return 0
+        if not args.input or not args.output:
+            print("错误: 需要指定 --input 和 --output")
+            return 2
+        try:
+            pipeline = Pipeline(args.chain, parse_params(args.param))
+            results = pipeline.run(args.input, args.output, args.jobs)
+        except (ValueError, FileNotFoundError) as e:
+            print(f"错误: {e}")
+            return 2
+        return 1 if any(not job.ok for job in results) else 0
+
+    if args.command == "list":
+        from common.batch import print_batch_tools
+        print_batch_tools()
+        return 0
+
+    if args.command == "tools":
+        from common.registry import print_tool_list, print_import_profile
+        tools = discover_tools()
+        if args.importtime:
+            print_import_profile(tools, top=args.top)
+        else:
+            print_tool_list(tools)
+        return 0
+
     root = tk.Tk()
-    app = ToolLauncherGUI(root)
-    root.mainloop()
\ No newline at end of file
+    if args.bench_startup:
+        root.destroy()
+        report = benchmark_startup([tool for tool in discover_tools() if tool["launcher"]])
+        print_startup_report(report)
+        os.makedirs("./cache", exist_ok=True)
+        with open("./cache/startup_bench.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+    else:
+        app = ToolLauncherGUI(root)
+        root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
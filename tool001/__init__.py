@@ -0,0 +1,5 @@
+NAME = "文件批量重命名工具"
+DESCRIPTION = "按规则列表批量重命名目录中的文件（通用）"
+MODULE = "tool001.main"
+GUI = "FileRenamerGUI"
+LAUNCHER = False
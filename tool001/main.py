@@ -1,9 +1,326 @@
 import os
+import contextlib
+import itertools
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import font as tkfont
 import shutil
+import threading
+from datetime import datetime
 from pathlib import Path
 
+# 加载规则文件时输入框中显示的行数
+RULE_FILE_PREVIEW_LINES = 200
+
+# 完整结果报告目录（与各工具的 ./cache 目录一致）
+REPORT_DIR = "./cache/rename_reports"
+
+INPUT_LABEL = "输入重命名规则 (格式: 原文件名\\t新文件名)"
+
+
+def get_actual_new_filename(old_filename, new_filename, ignore_extension):
+    """
+    根据选项获取实际的新文件名
+
+    Args:
+        old_filename: 原文件名（带后缀）
+        new_filename: 新文件名（可能不带后缀）
+        ignore_extension: 是否忽略后缀
+
+    Returns:
+        实际的新文件名
+    """
+    if not ignore_extension:
+        return new_filename
+
+    # 获取原文件的后缀
+    old_name, old_ext = os.path.splitext(old_filename)
+
+    # 获取新文件的后缀
+    new_name, new_ext = os.path.splitext(new_filename)
+
+    # 如果新文件名没有指定后缀，则沿用原文件后缀
+    if not new_ext:
+        return new_filename + old_ext
+    else:
+        return new_filename
+
+
+class DirectoryIndex:
+    """
+    目录内容的一次性索引：文件名 -> 实际文件名，主名(无后缀) -> [文件名...]
+
+    整个重命名过程只列出一次目录，每条规则的查找为O(1)。
+    键经过 os.path.normcase，在Windows上与文件系统一样不区分大小写。
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.names = {}
+        self.stems = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                self._add(entry.name, entry.is_file())
+
+    def _add(self, name, is_file=True):
+        self.names[os.path.normcase(name)] = name
+        if is_file:
+            stem = os.path.normcase(os.path.splitext(name)[0])
+            self.stems.setdefault(stem, []).append(name)
+
+    def find(self, filename, ignore_extension):
+        """
+        查找文件：先精确匹配文件名，忽略后缀时再按主名匹配
+
+        Returns:
+            (完整路径或None, 主名相同的全部文件名)；多个文件主名相同时不返回路径
+        """
+        actual = self.names.get(os.path.normcase(filename))
+        if actual is not None:
+            return os.path.join(self.directory, actual), [actual]
+        if ignore_extension:
+            target_name, _ = os.path.splitext(filename)
+            candidates = self.stems.get(os.path.normcase(target_name), [])
+            if len(candidates) == 1:
+                return os.path.join(self.directory, candidates[0]), candidates
+            return None, list(candidates)
+        return None, []
+
+
+def rename_by_rules(directory, rules, ignore_extension):
+    """
+    按规则列表重命名目录中的文件
+
+    全部规则先规划再执行（见 rename_plan）：交换、轮换和链式改名都可以一次完成，
+    任何一步失败时已完成的改名全部回滚。
+
+    Returns:
+        统计字典：total_rules / files_not_found / rename_skipped / rename_errors / rename_success /
+        journal（日志路径）/ cycles（用临时名打断的环数）
+    """
+    from tool001.rename_plan import plan_renames
+
+    return execute_rename_plan(plan_renames(directory, rules, ignore_extension), len(rules))
+
+
+def rename_by_patterns(directory, rules, ignore_extension, recursive=False, rule_errors=(), on_progress=None):
+    """
+    按正则/模板规则重命名目录（树）中的文件（见 pattern_rename）
+
+    Args:
+        rules: compile_rules 得到的 PatternRule 列表
+        rule_errors: compile_rules 返回的错误规则，计入统计
+        on_progress: 规划进度回调 on_progress(已处理目录数, 已匹配文件数)
+
+    Returns:
+        与 rename_by_rules 相同的统计字典
+    """
+    from tool001.pattern_rename import plan_tree
+
+    plan = plan_tree(directory, rules, ignore_extension, recursive, on_progress=on_progress)
+    plan.rename_errors[:0] = [{'rule': rule, 'error': rule['error']} for rule in rule_errors]
+    return execute_rename_plan(plan, len(rules) + len(rule_errors))
+
+
+def execute_rename_plan(plan, total_rules):
+    """执行规划好的重命名，返回统计字典"""
+    from tool001.rename_plan import execute_plan, RenameAborted
+
+    stats = {
+        'total_rules': total_rules,
+        'files_not_found': plan.files_not_found,
+        'rename_skipped': plan.rename_skipped,
+        'rename_errors': plan.rename_errors,
+        'rename_success': [],
+        'journal': None,
+        'cycles': plan.cycles
+    }
+
+    try:
+        stats['journal'] = execute_plan(plan)
+    except RenameAborted as e:
+        for move in plan.moves:
+            for rule in move['rules']:
+                stats['rename_errors'].append({'rule': rule, 'error': f"重命名失败，已全部回滚: {e}"})
+        return stats
+
+    for move in plan.moves:
+        stats['rename_success'].extend(move['rules'])
+    stats['rename_success'].sort(key=lambda rule: rule['line_num'])
+    return stats
+
+
+def iter_rename_rules(lines):
+    """
+    逐行解析重命名规则（原文件名<TAB>新文件名）
+
+    Args:
+        lines: 可迭代的行，可以直接传入打开的规则文件，不需要整个读入内存
+
+    Yields:
+        规则字典：line_num / old_name / new_name / original_line，格式错误的行为 line_num / error / original_line
+    """
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):  # 跳过空行和注释
+            continue
+
+        if '\t' in line:
+            old_name, new_name = line.split('\t', 1)  # 只分割第一个制表符
+            yield {
+                'line_num': line_num,
+                'old_name': old_name.strip(),
+                'new_name': new_name.strip(),
+                'original_line': line
+            }
+        else:
+            yield {
+                'line_num': line_num,
+                'error': f"格式错误: 未找到制表符分隔符",
+                'original_line': line
+            }
+
+
+def _rule_label(rule):
+    return f"{rule['old_name']} -> " if 'old_name' in rule else ""
+
+
+def format_results(stats, ignore_extension):
+    """把统计字典整理为结果文本的各行"""
+    lines = ["=" * 50, "执行结果统计:", ""]
+
+    # 未找到的文件
+    if stats['files_not_found']:
+        lines.append(f"【未找到的文件】({len(stats['files_not_found'])}个):")
+        lines += [f"  第{rule['line_num']}行: {rule['old_name']}" for rule in stats['files_not_found']]
+        lines.append("")
+
+    # 跳过的文件
+    if stats['rename_skipped']:
+        lines.append(f"【跳过的文件】({len(stats['rename_skipped'])}个):")
+        for rule in stats['rename_skipped']:
+            if 'actual_old_name' in rule:
+                lines.append(f"  第{rule['line_num']}行: 新旧文件名相同 ({rule['actual_old_name']})")
+            else:
+                lines.append(f"  第{rule['line_num']}行: 新旧文件名相同")
+        lines.append("")
+
+    # 重命名错误
+    if stats['rename_errors']:
+        lines.append(f"【重命名错误】({len(stats['rename_errors'])}个):")
+        for error_info in stats['rename_errors']:
+            rule = error_info['rule']
+            lines.append(f"  第{rule['line_num']}行: {_rule_label(rule)}{error_info['error']}")
+        lines.append("")
+
+    # 成功的重命名
+    if stats['rename_success']:
+        lines.append(f"【成功重命名】({len(stats['rename_success'])}个):")
+        for rule in stats['rename_success']:
+            old_display = rule.get('actual_old_name', rule['old_name'])
+            new_display = rule.get('actual_new_name', rule['new_name'])
+            lines.append(f"  第{rule['line_num']}行: {old_display} -> {new_display}")
+        lines.append("")
+
+    # 统计摘要
+    lines += [
+        "【统计摘要】:",
+        f"  总规则数: {stats['total_rules']}",
+        f"  成功重命名: {len(stats['rename_success'])}",
+        f"  未找到文件: {len(stats['files_not_found'])}",
+        f"  跳过重命名: {len(stats['rename_skipped'])}",
+        f"  重命名错误: {len(stats['rename_errors'])}",
+        f"  忽略后缀模式: {'是' if ignore_extension else '否'}",
+    ]
+    if stats.get('cycles'):
+        lines.append(f"  交换/轮换: {stats['cycles']} 组")
+    if stats.get('journal'):
+        lines.append(f"  重命名日志: {stats['journal']}")
+    return lines
+
+
+def write_report(lines, report_dir=REPORT_DIR):
+    """把完整结果写入报告文件，返回报告路径"""
+    os.makedirs(report_dir, exist_ok=True)
+    report_path = os.path.join(report_dir, f"rename-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.txt")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line + "\n")
+    return report_path
+
+
+class ResultView(ttk.Frame):
+    """
+    只渲染可见行的结果列表
+
+    全部行保存在列表中，文本框里只放当前可见的一屏；滚动条和滚轮改变起始行后重新渲染，
+    十万行结果的显示与滚动和几十行一样快。
+    """
+
+    def __init__(self, master, height=15, **kwargs):
+        super().__init__(master, **kwargs)
+        self.lines = []
+        self.top = 0
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.text = tk.Text(self, width=80, height=height, wrap=tk.NONE, state=tk.DISABLED)
+        self.text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        xscrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        xscrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.text.config(xscrollcommand=xscrollbar.set)
+
+        self.text.bind("<Configure>", lambda event: self.render())
+        self.text.bind("<MouseWheel>", lambda event: self.scroll_by(-event.delta // 120 * 3))
+        self.text.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        self.text.bind("<Button-5>", lambda event: self.scroll_by(3))
+
+    def visible_rows(self):
+        line_height = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+        return max(1, self.text.winfo_height() // max(1, line_height))
+
+    def set_lines(self, lines):
+        self.lines = list(lines)
+        self.top = 0
+        self.render()
+
+    def clear(self):
+        self.set_lines([])
+
+    def scroll_to(self, top):
+        self.top = max(0, min(top, len(self.lines) - self.visible_rows()))
+        self.render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.top + rows)
+        return "break"
+
+    def scroll_to_end(self):
+        self.scroll_to(len(self.lines))
+
+    def on_scroll(self, action, value, unit=None):
+        """滚动条回调：moveto 比例 / scroll n units|pages"""
+        if action == "moveto":
+            self.scroll_to(int(float(value) * len(self.lines)))
+        elif unit == "pages":
+            self.scroll_by(int(value) * self.visible_rows())
+        else:
+            self.scroll_by(int(value))
+
+    def render(self):
+        rows = self.visible_rows()
+        self.text.config(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        self.text.insert(1.0, "\n".join(self.lines[self.top:self.top + rows]))
+        self.text.config(state=tk.DISABLED)
+        total = len(self.lines)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
 
 class FileRenamerGUI:
     def __init__(self, root):
@@ -63,7 +380,21 @@ class FileRenamerGUI:
             text="忽略文件后缀（如果新文件名没有后缀，则沿用原文件后缀）",
             variable=self.ignore_extension_var
         )
-        self.ignore_ext_check.grid(row=0, column=0, sticky=tk.W)
+        self.ignore_ext_check.grid(row=0, column=0, columnspan=3, sticky=tk.W)
+
+        self.mode_var = tk.StringVar(value="literal")
+        ttk.Radiobutton(options_frame, text="逐条对应（原文件名\\t新文件名）", variable=self.mode_var,
+                        value="literal").grid(row=1, column=0, sticky=tk.W, padx=(0, 10))
+        ttk.Radiobutton(options_frame, text="正则/模板（正则\\t模板）",
+                        variable=self.mode_var, value="pattern").grid(row=1, column=1, sticky=tk.W, padx=(0, 10))
+
+        self.recursive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="包含子目录（正则/模板模式）",
+                        variable=self.recursive_var).grid(row=1, column=2, sticky=tk.W)
+
+        # 后台预览：每次预览递增编号，过期的结果直接丢弃
+        self.preview_generation = 0
+        self.preview_cancel = None
 
         # 重命名规则输入部分
         rule_frame = ttk.LabelFrame(main_frame, text="重命名规则", padding="10")
@@ -73,11 +404,17 @@ class FileRenamerGUI:
         main_frame.rowconfigure(3, weight=1)
 
         # 输入文本框
-        input_label = ttk.Label(rule_frame, text="输入重命名规则 (格式: 原文件名\\t新文件名)")
+        self.rule_file = None
+        self.input_label_var = tk.StringVar(value=INPUT_LABEL)
+        input_label = ttk.Label(rule_frame, textvariable=self.input_label_var)
         input_label.grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
 
+        self.manual_btn = ttk.Button(rule_frame, text="改为手动输入", command=self.use_manual_input)
+        self.manual_btn.grid(row=0, column=1, sticky=tk.E, pady=(0, 5))
+        self.manual_btn.grid_remove()
+
         self.input_text = scrolledtext.ScrolledText(rule_frame, width=80, height=10)
-        self.input_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        self.input_text.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
 
         # 示例文本
         example_text = """示例格式:
@@ -105,6 +442,12 @@ old_name.mp3\tnew_name.mp3
         self.load_file_btn = ttk.Button(btn_frame, text="从文件加载规则", command=self.load_from_file)
         self.load_file_btn.grid(row=0, column=2, padx=(0, 10))
 
+        self.undo_btn = ttk.Button(btn_frame, text="撤销上次重命名", command=self.undo_last_renaming)
+        self.undo_btn.grid(row=0, column=3, padx=(0, 10))
+
+        self.preview_btn = ttk.Button(btn_frame, text="预览", command=self.preview_renaming)
+        self.preview_btn.grid(row=0, column=4, padx=(0, 10))
+
         # 结果显示部分
         result_frame = ttk.LabelFrame(main_frame, text="执行结果", padding="10")
         result_frame.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
@@ -112,8 +455,8 @@ old_name.mp3\tnew_name.mp3
         result_frame.rowconfigure(0, weight=1)
         main_frame.rowconfigure(5, weight=1)
 
-        self.result_text = scrolledtext.ScrolledText(result_frame, width=80, height=15, state=tk.DISABLED)
-        self.result_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.result_view = ResultView(result_frame, height=15)
+        self.result_view.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
         # 状态栏
         self.status_var = tk.StringVar(value="就绪")
@@ -127,89 +470,65 @@ old_name.mp3\tnew_name.mp3
             self.dir_var.set(directory)
 
     def load_from_file(self):
-        """从文件加载重命名规则"""
+        """
+        从文件加载重命名规则
+
+        规则文件不再整个读入输入框：执行和预览时直接从磁盘逐行读取，
+        输入框只显示开头若干行供确认。
+        """
         file_path = filedialog.askopenfilename(
             title="选择重命名规则文件",
             filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
         )
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                self.input_text.delete(1.0, tk.END)
-                self.input_text.insert(1.0, content)
-                self.status_var.set(f"已从文件加载规则: {file_path}")
+                with open(file_path, 'r', encoding='utf-8-sig') as f:
+                    head = list(itertools.islice(f, RULE_FILE_PREVIEW_LINES))
             except Exception as e:
                 messagebox.showerror("错误", f"读取文件失败: {str(e)}")
+                return
+            self.rule_file = file_path
+            self.input_text.config(state=tk.NORMAL)
+            self.input_text.delete(1.0, tk.END)
+            self.input_text.insert(1.0, "".join(head))
+            self.input_text.config(state=tk.DISABLED)
+            size = os.path.getsize(file_path)
+            self.input_label_var.set(f"规则文件: {file_path}（{size / 1024:.0f} KB，仅显示前 {len(head)} 行，"
+                                     f"执行时从文件读取）")
+            self.manual_btn.grid()
+            self.status_var.set(f"已从文件加载规则: {file_path}")
+
+    def use_manual_input(self):
+        """取消规则文件，改为在输入框中输入规则"""
+        self.rule_file = None
+        self.input_text.config(state=tk.NORMAL)
+        self.input_text.delete(1.0, tk.END)
+        self.input_label_var.set(INPUT_LABEL)
+        self.manual_btn.grid_remove()
+
+    def open_rule_lines(self):
+        """
+        打开规则来源：已加载规则文件时逐行读取文件，否则为输入框的文本
+
+        Returns:
+            可迭代的行（文件对象需要关闭，使用 with 语句）
+        """
+        if self.rule_file:
+            return open(self.rule_file, 'r', encoding='utf-8-sig')
+        return contextlib.nullcontext(self.input_text.get(1.0, tk.END).strip().split('\n'))
 
     def clear_results(self):
         """清空结果显示"""
-        self.result_text.config(state=tk.NORMAL)
-        self.result_text.delete(1.0, tk.END)
-        self.result_text.config(state=tk.DISABLED)
+        self.result_view.clear()
         self.status_var.set("已清空结果")
 
     def parse_rename_rules(self, text_content):
         """解析重命名规则文本"""
-        rules = []
-        lines = text_content.strip().split('\n')
-
-        for line_num, line in enumerate(lines, 1):
-            line = line.strip()
-            if not line or line.startswith('#'):  # 跳过空行和注释
-                continue
-
-            if '\t' in line:
-                parts = line.split('\t', 1)  # 只分割第一个制表符
-                if len(parts) == 2:
-                    old_name, new_name = parts
-                    rules.append({
-                        'line_num': line_num,
-                        'old_name': old_name.strip(),
-                        'new_name': new_name.strip(),
-                        'original_line': line
-                    })
-                else:
-                    rules.append({
-                        'line_num': line_num,
-                        'error': f"格式错误: 应包含一个制表符分隔符",
-                        'original_line': line
-                    })
-            else:
-                rules.append({
-                    'line_num': line_num,
-                    'error': f"格式错误: 未找到制表符分隔符",
-                    'original_line': line
-                })
-
-        return rules
+        return list(iter_rename_rules(text_content.strip().split('\n')))
 
     def get_actual_new_filename(self, old_filename, new_filename, ignore_extension):
-        """
-        根据选项获取实际的新文件名
-
-        Args:
-            old_filename: 原文件名（带后缀）
-            new_filename: 新文件名（可能不带后缀）
-            ignore_extension: 是否忽略后缀
-
-        Returns:
-            实际的新文件名
-        """
-        if not ignore_extension:
-            return new_filename
-
-        # 获取原文件的后缀
-        old_name, old_ext = os.path.splitext(old_filename)
-
-        # 获取新文件的后缀
-        new_name, new_ext = os.path.splitext(new_filename)
-
-        # 如果新文件名没有指定后缀，则沿用原文件后缀
-        if not new_ext:
-            return new_filename + old_ext
-        else:
-            return new_filename
+        """根据选项获取实际的新文件名"""
+        return get_actual_new_filename(old_filename, new_filename, ignore_extension)
 
     def find_file_in_directory(self, directory, filename):
         """
@@ -220,208 +539,228 @@ old_name.mp3\tnew_name.mp3
             filename: 要查找的文件名
 
         Returns:
-            找到的文件完整路径，如果没找到返回None
+            找到的文件完整路径，如果没找到（或多个文件主名相同）返回None
         """
-        # 首先尝试精确匹配
-        exact_path = os.path.join(directory, filename)
-        if os.path.exists(exact_path):
-            return exact_path
+        return DirectoryIndex(directory).find(filename, self.ignore_extension_var.get())[0]
 
-        # 如果启用了忽略后缀选项，尝试模糊匹配
-        if self.ignore_extension_var.get():
-            target_name, _ = os.path.splitext(filename)
+    def check_inputs(self):
+        """检查目录和规则输入，返回目录（无效时提示并返回None）"""
+        directory = self.dir_var.get().strip()
+        if not directory:
+            messagebox.showerror("错误", "请选择目标目录")
+            return None
 
-            for file in os.listdir(directory):
-                file_path = os.path.join(directory, file)
-                if os.path.isfile(file_path):
-                    file_name, file_ext = os.path.splitext(file)
-                    if file_name == target_name:
-                        return file_path
+        if not os.path.exists(directory):
+            messagebox.showerror("错误", "选择的目录不存在")
+            return None
 
-        return None
+        if not self.rule_file and not self.input_text.get(1.0, tk.END).strip():
+            messagebox.showerror("错误", "请输入重命名规则")
+            return None
+        return directory
 
     def execute_renaming(self):
         """执行重命名操作"""
-        # 获取输入
-        directory = self.dir_var.get().strip()
-        text_content = self.input_text.get(1.0, tk.END).strip()
-        ignore_extension = self.ignore_extension_var.get()
-
-        # 验证输入
-        if not directory:
-            messagebox.showerror("错误", "请选择目标目录")
+        directory = self.check_inputs()
+        if directory is None:
             return
 
-        if not os.path.exists(directory):
-            messagebox.showerror("错误", "选择的目录不存在")
+        # 上次在该目录的重命名被中断：先继续或回滚
+        if not self.handle_incomplete_journals(directory):
             return
 
-        if not text_content:
-            messagebox.showerror("错误", "请输入重命名规则")
+        self.perform_renaming(directory, self.ignore_extension_var.get(),
+                              self.mode_var.get() == "pattern", self.recursive_var.get())
+
+    def handle_incomplete_journals(self, directory):
+        """
+        处理该目录中断的重命名：是=继续执行，否=回滚，取消=不执行本次重命名
+
+        Returns:
+            是否可以继续本次重命名
+        """
+        from tool001.rename_plan import incomplete_journals, resume, rollback, RenameAborted
+
+        for journal_path in incomplete_journals(directory):
+            answer = messagebox.askyesnocancel(
+                "发现未完成的重命名",
+                f"该目录上次的重命名被中断:\n{journal_path}\n\n是: 继续完成\n否: 回滚到重命名前\n取消: 暂不处理")
+            if answer is None:
+                return False
+            try:
+                if answer:
+                    count = resume(journal_path)
+                    self.status_var.set(f"已继续完成上次的重命名（{count} 步）")
+                else:
+                    count = rollback(journal_path)
+                    self.status_var.set(f"已回滚上次的重命名（{count} 步）")
+            except (OSError, RenameAborted) as e:
+                messagebox.showerror("错误", f"处理未完成的重命名失败: {e}")
+                return False
+        return True
+
+    def undo_last_renaming(self):
+        """撤销该目录最近一次成功的重命名"""
+        from tool001.rename_plan import last_committed_journal, rollback
+
+        directory = self.dir_var.get().strip()
+        if not directory or not os.path.isdir(directory):
+            messagebox.showerror("错误", "请选择目标目录")
+            return
+        if not self.handle_incomplete_journals(directory):
+            return
+        journal_path = last_committed_journal(directory)
+        if journal_path is None:
+            messagebox.showinfo("提示", "该目录没有可撤销的重命名记录")
             return
+        if not messagebox.askyesno("确认", f"撤销以下记录中的重命名？\n{journal_path}"):
+            return
+        try:
+            count = rollback(journal_path)
+        except OSError as e:
+            messagebox.showerror("错误", f"撤销失败: {e}")
+            return
+        self.status_var.set(f"已撤销 {count} 步重命名")
+
+    def set_running(self, running):
+        """执行期间禁用会修改文件的按钮"""
+        state = tk.DISABLED if running else tk.NORMAL
+        for button in (self.execute_btn, self.undo_btn, self.preview_btn, self.load_file_btn):
+            button.config(state=state)
+
+    def perform_renaming(self, directory, ignore_extension, pattern_mode=False, recursive=False):
+        """在后台线程中解析规则并执行重命名，界面线程只负责显示"""
+        header = [
+            f"开始执行{'正则/模板' if pattern_mode else ''}重命名操作...",
+            f"目标目录: {directory}{'（含子目录）' if pattern_mode and recursive else ''}",
+            f"规则来源: {self.rule_file or '输入框'}",
+            f"忽略文件后缀: {'是' if ignore_extension else '否'}",
+            "=" * 50,
+        ]
+        self.result_view.set_lines(header)
+        self.set_running(True)
+        self.status_var.set("正在重命名...")
+        source = self.open_rule_lines()
+
+        def on_progress(directories, matched):
+            self.root.after(0, self.status_var.set, f"正在规划: 已扫描 {directories} 个目录，匹配 {matched} 个文件")
+
+        def worker():
+            stats, error = None, None
+            try:
+                with source as lines:
+                    if pattern_mode:
+                        from tool001.pattern_rename import compile_rules
+                        rules, rule_errors = compile_rules(lines)
+                        if rules:
+                            stats = rename_by_patterns(directory, rules, ignore_extension, recursive,
+                                                       rule_errors, on_progress)
+                    else:
+                        rules = list(iter_rename_rules(lines))
+                        if rules:
+                            stats = rename_by_rules(directory, rules, ignore_extension)
+            except Exception as e:
+                error = e
+            self.root.after(0, self.finish_renaming, header, stats, ignore_extension, error)
+
+        threading.Thread(target=worker, daemon=True).start()
 
-        # 解析规则
-        rules = self.parse_rename_rules(text_content)
-        if not rules:
+    def finish_renaming(self, header, stats, ignore_extension, error):
+        """后台重命名结束（在界面线程中调用）"""
+        self.set_running(False)
+        if error is not None:
+            self.status_var.set(f"重命名失败: {error}")
+            messagebox.showerror("错误", f"重命名失败: {error}")
+            return
+        if stats is None:
+            self.status_var.set("未找到有效的重命名规则")
             messagebox.showwarning("警告", "未找到有效的重命名规则")
             return
+        self.display_results(stats, ignore_extension, header)
 
-        # 执行重命名
-        self.perform_renaming(directory, rules, ignore_extension)
-
-    def perform_renaming(self, directory, rules, ignore_extension):
-        """执行实际的重命名操作"""
-        # 初始化统计
-        stats = {
-            'total_rules': len(rules),
-            'files_not_found': [],
-            'rename_skipped': [],
-            'rename_errors': [],
-            'rename_success': []
-        }
-
-        # 清空结果文本框
-        self.result_text.config(state=tk.NORMAL)
-        self.result_text.delete(1.0, tk.END)
-
-        # 显示开始信息
-        self.result_text.insert(tk.END, f"开始执行重命名操作...\n")
-        self.result_text.insert(tk.END, f"目标目录: {directory}\n")
-        self.result_text.insert(tk.END, f"重命名规则数量: {stats['total_rules']}\n")
-        self.result_text.insert(tk.END, f"忽略文件后缀: {'是' if ignore_extension else '否'}\n")
-        self.result_text.insert(tk.END, "=" * 50 + "\n\n")
-        self.root.update()
-
-        # 遍历规则并执行重命名
-        for rule in rules:
-            if 'error' in rule:
-                # 规则格式错误
-                stats['rename_errors'].append({
-                    'rule': rule,
-                    'error': rule['error']
-                })
-                continue
-
-            old_name = rule['old_name']
-            new_name = rule['new_name']
-
-            # 查找文件（支持忽略后缀的查找）
-            old_path = self.find_file_in_directory(directory, old_name)
-
-            if not old_path:
-                # 文件不存在
-                stats['files_not_found'].append(rule)
-                continue
-
-            # 获取实际的文件名（用于显示）
-            actual_old_name = os.path.basename(old_path)
-
-            # 获取实际的新文件名（处理后缀）
-            actual_new_name = self.get_actual_new_filename(actual_old_name, new_name, ignore_extension)
-            new_path = os.path.join(directory, actual_new_name)
-
-            # 检查是否在同一目录下
-            old_dir = os.path.dirname(old_path)
-            if old_dir != directory:
-                stats['rename_errors'].append({
-                    'rule': rule,
-                    'error': f"文件不在指定目录中: {old_path}"
-                })
-                continue
-
-            if old_path == new_path:
-                # 新旧文件名相同，跳过
-                stats['rename_skipped'].append(rule)
-                continue
-
-            # 执行重命名
-            try:
-                # 检查目标文件是否已存在
-                if os.path.exists(new_path):
-                    stats['rename_errors'].append({
-                        'rule': rule,
-                        'error': f"目标文件已存在: {actual_new_name}"
-                    })
-                    continue
-
-                # 执行重命名
-                os.rename(old_path, new_path)
-
-                # 更新规则信息以显示实际的文件名
-                rule['actual_old_name'] = actual_old_name
-                rule['actual_new_name'] = actual_new_name
-                stats['rename_success'].append(rule)
+    def preview_renaming(self):
+        """在后台线程中规划重命名并显示预览（不修改任何文件）"""
+        directory = self.check_inputs()
+        if directory is None:
+            return
 
+        ignore_extension = self.ignore_extension_var.get()
+        pattern_mode = self.mode_var.get() == "pattern"
+        recursive = self.recursive_var.get()
+        source = self.open_rule_lines()
+
+        # 取消上一次尚未完成的预览
+        if self.preview_cancel is not None:
+            self.preview_cancel.set()
+        self.preview_generation += 1
+        generation = self.preview_generation
+        cancel_event = self.preview_cancel = threading.Event()
+
+        def on_progress(directories, matched):
+            self.root.after(0, self.status_var.set, f"正在预览: 已扫描 {directories} 个目录，匹配 {matched} 个文件")
+
+        def worker():
+            rule_errors = []
+            try:
+                with source as lines:
+                    if pattern_mode:
+                        from tool001.pattern_rename import compile_rules, plan_tree
+                        rules, rule_errors = compile_rules(lines)
+                        plan = plan_tree(directory, rules, ignore_extension, recursive, cancel_event, on_progress)
+                    else:
+                        from tool001.rename_plan import plan_renames
+                        plan = plan_renames(directory, list(iter_rename_rules(lines)), ignore_extension)
+                error = None
             except Exception as e:
-                stats['rename_errors'].append({
-                    'rule': rule,
-                    'error': f"重命名失败: {str(e)}"
-                })
-
-        # 显示结果
-        self.display_results(stats, ignore_extension)
-
-    def display_results(self, stats, ignore_extension):
-        """显示执行结果"""
-        self.result_text.insert(tk.END, "\n" + "=" * 50 + "\n")
-        self.result_text.insert(tk.END, "执行结果统计:\n\n")
-
-        # 显示未找到的文件
-        if stats['files_not_found']:
-            self.result_text.insert(tk.END, f"【未找到的文件】({len(stats['files_not_found'])}个):\n")
-            for rule in stats['files_not_found']:
-                self.result_text.insert(tk.END, f"  第{rule['line_num']}行: {rule['old_name']}\n")
-            self.result_text.insert(tk.END, "\n")
-
-        # 显示跳过的文件
-        if stats['rename_skipped']:
-            self.result_text.insert(tk.END, f"【跳过的文件】({len(stats['rename_skipped'])}个):\n")
-            for rule in stats['rename_skipped']:
-                if 'actual_old_name' in rule:
-                    self.result_text.insert(tk.END,
-                                            f"  第{rule['line_num']}行: 新旧文件名相同 ({rule['actual_old_name']})\n")
-                else:
-                    self.result_text.insert(tk.END, f"  第{rule['line_num']}行: 新旧文件名相同\n")
-            self.result_text.insert(tk.END, "\n")
-
-        # 显示重命名错误
-        if stats['rename_errors']:
-            self.result_text.insert(tk.END, f"【重命名错误】({len(stats['rename_errors'])}个):\n")
-            for error_info in stats['rename_errors']:
-                rule = error_info['rule']
-                error_msg = error_info['error']
-                if 'old_name' in rule:
-                    self.result_text.insert(tk.END, f"  第{rule['line_num']}行: {rule['old_name']} -> {error_msg}\n")
-                else:
-                    self.result_text.insert(tk.END, f"  第{rule['line_num']}行: {error_msg}\n")
-            self.result_text.insert(tk.END, "\n")
-
-        # 显示成功的重命名
-        if stats['rename_success']:
-            self.result_text.insert(tk.END, f"【成功重命名】({len(stats['rename_success'])}个):\n")
-            for rule in stats['rename_success']:
-                old_display = rule.get('actual_old_name', rule['old_name'])
-                new_display = rule.get('actual_new_name', rule['new_name'])
-                self.result_text.insert(tk.END, f"  第{rule['line_num']}行: {old_display} -> {new_display}\n")
-            self.result_text.insert(tk.END, "\n")
-
-        # 显示统计摘要
-        self.result_text.insert(tk.END, "【统计摘要】:\n")
-        self.result_text.insert(tk.END, f"  总规则数: {stats['total_rules']}\n")
-        self.result_text.insert(tk.END, f"  成功重命名: {len(stats['rename_success'])}\n")
-        self.result_text.insert(tk.END, f"  未找到文件: {len(stats['files_not_found'])}\n")
-        self.result_text.insert(tk.END, f"  跳过重命名: {len(stats['rename_skipped'])}\n")
-        self.result_text.insert(tk.END, f"  重命名错误: {len(stats['rename_errors'])}\n")
-        self.result_text.insert(tk.END, f"  忽略后缀模式: {'是' if ignore_extension else '否'}\n")
+                plan, error = None, e
+            self.root.after(0, self.show_preview, generation, plan, rule_errors, error)
+
+        self.status_var.set("正在预览...")
+        threading.Thread(target=worker, daemon=True).start()
+
+    def show_preview(self, generation, plan, rule_errors, error):
+        """显示预览结果（在界面线程中调用）"""
+        if generation != self.preview_generation or (plan is None and error is None):
+            return
+        self.preview_cancel = None
+        if error is not None:
+            self.status_var.set(f"预览失败: {error}")
+            return
+
+        errors = [{'rule': rule, 'error': rule['error']} for rule in rule_errors] + plan.rename_errors
+        lines = [f"预览（尚未修改任何文件）: {len(plan.moves)} 个文件将被重命名"]
+        if plan.cycles:
+            lines.append(f"其中交换/轮换 {plan.cycles} 组")
+        lines += ["=" * 50, ""]
+        lines += [f"  {move['old_name']} -> {move['new_name']}" for move in plan.moves]
+        if errors:
+            lines += ["", f"【无法重命名】({len(errors)}个):"]
+            lines += [f"  第{e['rule']['line_num']}行: {_rule_label(e['rule'])}{e['error']}" for e in errors]
+        if plan.files_not_found:
+            lines += ["", f"【未找到的文件】({len(plan.files_not_found)}个):"]
+            lines += [f"  第{rule['line_num']}行: {rule['old_name']}" for rule in plan.files_not_found]
+        self.result_view.set_lines(lines)
+        self.status_var.set(f"预览完成: {len(plan.moves)} 个文件将被重命名，{len(errors)} 个错误")
+
+    def display_results(self, stats, ignore_extension, header=()):
+        """显示执行结果：结果列表只渲染可见行，完整结果同时写入报告文件"""
+        lines = format_results(stats, ignore_extension)
+        try:
+            report_path = write_report(list(header) + lines)
+            lines.append(f"  完整报告: {report_path}")
+        except OSError as e:
+            report_path = None
+            lines.append(f"  写入报告失败: {e}")
+        self.result_view.set_lines(list(header) + [""] + lines)
+        # 直接显示统计摘要，向上滚动查看明细
+        self.result_view.scroll_to_end()
 
         # 更新状态栏
         success_count = len(stats['rename_success'])
         total_count = stats['total_rules']
         self.status_var.set(
-            f"完成: 成功 {success_count}/{total_count} (忽略后缀: {'是' if ignore_extension else '否'})")
-
-        # 锁定结果文本框
-        self.result_text.config(state=tk.DISABLED)
+            f"完成: 成功 {success_count}/{total_count} (忽略后缀: {'是' if ignore_extension else '否'})"
+            + (f"，报告: {report_path}" if report_path else ""))
 
 
 def main():
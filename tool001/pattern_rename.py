@@ -0,0 +1,204 @@
+"""
+正则/模板重命名：规则只编译一次，对整个目录树逐目录匹配，生成一份整体改名计划
+
+规则每行一条：正则<TAB>模板。正则需匹配完整文件名，第一条匹配的规则生效；
+模板用 {字段} 引用：
+    {0} {1} ... / {组名}   正则的整体匹配、编号分组和命名分组
+    {name} {stem} {ext}    原文件名、主名、后缀（含点）
+    {dir}                  所在目录名
+    {n}                    文件在所在目录的匹配文件中的序号（按文件名排序，从1开始，可写 {n:03d}）
+    {title} {artist} {album} {codec} {sample_rate} {duration}
+                           音频元数据（经 common.audio_meta 缓存读取，只在模板用到时读取）
+例如：
+    (?i)(\\d+)_(.*)\\.wem    {2}_{1:0>4}.wem
+    .*\\.flac               {artist} - {title}
+
+各目录的改名由 rename_plan 规划（交换、轮换同样适用）后合并，
+整棵树的步骤写入同一个日志，可以整体撤销。
+"""
+import os
+import re
+import string
+
+from tool001.rename_plan import RenamePlan, plan_renames
+
+# 模板可用的文件字段
+FILE_FIELDS = {"name", "stem", "ext", "dir", "n"}
+
+# 模板可用的元数据字段
+META_FIELDS = {"title", "artist", "album", "codec", "sample_rate", "duration"}
+
+# 元数据中不能出现在文件名里的字符
+INVALID_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+class PatternRule:
+    """编译后的一条正则/模板规则"""
+
+    def __init__(self, line_num, pattern, template, original_line=""):
+        self.line_num = line_num
+        self.pattern = pattern
+        self.template = template
+        self.original_line = original_line
+        self.regex = re.compile(pattern)
+
+        fields = set()
+        for _, field, _, _ in string.Formatter().parse(template):
+            if field is None:
+                continue
+            if not field:
+                raise ValueError("模板中的 {} 需要写明字段名或分组编号")
+            fields.add(re.split(r"[.\[]", field, maxsplit=1)[0])
+        groups = set(self.regex.groupindex) | {str(i) for i in range(self.regex.groups + 1)}
+        unknown = fields - groups - FILE_FIELDS - META_FIELDS
+        if unknown:
+            raise ValueError(f"未知的模板字段: {', '.join(sorted(unknown))}")
+        self.meta_fields = fields & META_FIELDS
+
+    def render(self, match, name, directory, n, meta=None):
+        """
+        生成新文件名
+
+        Raises:
+            ValueError: 模板需要的元数据缺失
+        """
+        values = {"name": name, "stem": os.path.splitext(name)[0], "ext": os.path.splitext(name)[1],
+                  "dir": os.path.basename(os.path.abspath(directory)), "n": n}
+        for field in self.meta_fields:
+            value = (meta or {}).get(field)
+            if value is None or value == "":
+                raise ValueError(f"缺少元数据: {field}")
+            values[field] = INVALID_CHARS.sub("_", value).strip() if isinstance(value, str) else value
+        values.update({key: value or "" for key, value in match.groupdict().items()})
+        groups = [match.group(0)] + [group or "" for group in match.groups()]
+        return self.template.format(*groups, **values).strip()
+
+
+def compile_rules(lines):
+    """
+    编译规则行
+
+    Args:
+        lines: 规则文本的各行（可以是文件对象）
+
+    Returns:
+        (PatternRule列表, 错误规则列表)；错误规则与 parse_rename_rules 的格式相同
+    """
+    rules, errors = [], []
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        pattern, sep, template = line.partition('\t')
+        if not sep or not pattern.strip() or not template.strip():
+            errors.append({'line_num': line_num, 'error': "格式错误: 应为 正则<TAB>模板", 'original_line': line})
+            continue
+        try:
+            rules.append(PatternRule(line_num, pattern.strip(), template.strip(), line))
+        except (re.error, ValueError) as e:
+            errors.append({'line_num': line_num, 'error': f"规则无效: {e}", 'original_line': line})
+    return rules, errors
+
+
+def iter_directories(root, recursive=True):
+    """依次返回 (目录, 排序后的文件名列表)"""
+    for directory, dirs, files in os.walk(root):
+        dirs.sort()
+        yield directory, sorted(files)
+        if not recursive:
+            break
+
+
+def _match_directory(directory, names, rules, ignore_extension):
+    """
+    对一个目录中的文件应用规则
+
+    Returns:
+        (字面规则列表, 错误规则列表)；字面规则可直接交给 plan_renames
+    """
+    from common.audio_meta import get_metadata_many
+
+    matched = []
+    for name in names:
+        for rule in rules:
+            match = rule.regex.fullmatch(name)
+            if match:
+                matched.append((name, rule, match))
+                break
+
+    # 只读取模板用到元数据的文件，整个目录一次批量读取
+    need_meta = [os.path.join(directory, name) for name, rule, _ in matched if rule.meta_fields]
+    metadata = get_metadata_many(need_meta) if need_meta else {}
+
+    literal, errors = [], []
+    for n, (name, rule, match) in enumerate(matched, 1):
+        entry = {'line_num': rule.line_num, 'old_name': name, 'original_line': rule.original_line}
+        try:
+            meta = metadata.get(os.path.abspath(os.path.join(directory, name)))
+            new_name = rule.render(match, name, directory, n, meta)
+        except (ValueError, IndexError, KeyError) as e:
+            entry['error'] = f"{name}: {e}"
+            errors.append(entry)
+            continue
+        # 忽略后缀时，结果不以原后缀结尾就补上（标题中可能含有点号，不按“有无后缀”判断）
+        ext = os.path.splitext(name)[1]
+        if ignore_extension and ext and not new_name.lower().endswith(ext.lower()):
+            new_name += ext
+        entry['new_name'] = new_name
+        literal.append(entry)
+    return literal, errors
+
+
+def _relative(prefix, name):
+    return os.path.join(prefix, name) if prefix else name
+
+
+def plan_tree(root, rules, ignore_extension, recursive=True, cancel_event=None, on_progress=None):
+    """
+    规划整棵目录树的正则/模板重命名
+
+    Args:
+        root: 根目录
+        rules: compile_rules 得到的 PatternRule 列表
+        ignore_extension: 模板结果不以原后缀结尾时补上原后缀
+        recursive: 是否包含子目录
+        cancel_event: threading.Event，设置后停止规划并返回None
+        on_progress: 回调 on_progress(已处理目录数, 已匹配文件数)
+
+    Returns:
+        RenamePlan（步骤中的文件名为相对 root 的路径），被取消时为None
+    """
+    plan = RenamePlan(root)
+    directories = matched = 0
+    for directory, names in iter_directories(root, recursive):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        literal, errors = _match_directory(directory, names, rules, ignore_extension)
+        prefix = os.path.relpath(directory, root)
+        prefix = "" if prefix == os.curdir else prefix
+        for entry in errors:
+            entry['old_name'] = _relative(prefix, entry['old_name'])
+            plan.rename_errors.append({'rule': entry, 'error': entry['error']})
+
+        if literal:
+            sub_plan = plan_renames(directory, literal, False)
+            for rule in literal:
+                rule['old_name'] = _relative(prefix, rule['old_name'])
+                for key in ('actual_old_name', 'actual_new_name'):
+                    if key in rule:
+                        rule[key] = _relative(prefix, rule[key])
+            for move in sub_plan.moves:
+                move['old_name'] = _relative(prefix, move['old_name'])
+                move['new_name'] = _relative(prefix, move['new_name'])
+                plan.moves.append(move)
+            plan.steps.extend((_relative(prefix, src), _relative(prefix, dst)) for src, dst in sub_plan.steps)
+            plan.files_not_found.extend(sub_plan.files_not_found)
+            plan.rename_skipped.extend(sub_plan.rename_skipped)
+            plan.rename_errors.extend(sub_plan.rename_errors)
+            plan.cycles += sub_plan.cycles
+            matched += len(literal)
+
+        directories += 1
+        if on_progress:
+            on_progress(directories, matched)
+    return plan
@@ -0,0 +1,373 @@
+"""
+两阶段重命名：先规划全部重命名，再按依赖顺序执行
+
+规则按“同时生效”理解：a→b、b→a 为交换，a→b、b→c、c→a 为轮换。
+目标名被另一个待改名的文件占用时，先执行占用者；形成环时先把环中一个文件
+改为临时名（第一阶段），其余按顺序执行后再把临时文件改为目标名（第二阶段）。
+
+每一步写入追加式日志（./cache/rename_journal/*.jsonl），中途中断后可以继续或回滚。
+步骤严格按顺序执行，日志中最后一条完成记录之后的步骤再按磁盘状态确认。
+"""
+import json
+import os
+import uuid
+from datetime import datetime
+
+# 日志目录（与各工具的 ./cache 目录一致）
+JOURNAL_DIR = "./cache/rename_journal"
+
+# 每执行多少步强制写盘一次日志
+JOURNAL_SYNC_INTERVAL = 200
+
+
+class RenameAborted(Exception):
+    """执行中出错，已完成的步骤已回滚"""
+
+
+class RenamePlan:
+    """规划结果：可执行的改名（moves）、执行步骤（steps）与不执行的规则统计"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        # [{'rules': [规则...], 'old_name': 原文件名, 'new_name': 目标文件名}, ...]
+        self.moves = []
+        # [(源文件名, 目标文件名), ...]，包含临时名
+        self.steps = []
+        self.files_not_found = []
+        self.rename_skipped = []
+        self.rename_errors = []
+        self.cycles = 0
+
+
+def _error(plan, rule, message):
+    plan.rename_errors.append({'rule': rule, 'error': message})
+
+
+def plan_renames(directory, rules, ignore_extension):
+    """
+    规划重命名
+
+    Args:
+        directory: 目录（规则中的文件都在该目录下）
+        rules: parse_rename_rules 的结果
+        ignore_extension: 按主名匹配源文件，新文件名没有后缀时沿用原后缀
+
+    Returns:
+        RenamePlan
+    """
+    from tool001.main import DirectoryIndex, get_actual_new_filename
+
+    plan = RenamePlan(directory)
+    index = DirectoryIndex(directory)
+    sources = {}   # normcase(原文件名) -> move
+    targets = {}   # normcase(目标文件名) -> move
+
+    for rule in rules:
+        if 'error' in rule:
+            _error(plan, rule, rule['error'])
+            continue
+
+        new_name = rule['new_name']
+        if not new_name or os.path.basename(new_name) != new_name or new_name in (".", ".."):
+            _error(plan, rule, f"新文件名无效: {new_name}")
+            continue
+
+        old_path, candidates = index.find(rule['old_name'], ignore_extension)
+        move = None
+        if old_path is None:
+            # 引用前面规则的新文件名时合并为一次改名（a→b、b→c 即 a→c）
+            move = targets.get(os.path.normcase(rule['old_name']))
+            if move is None and ignore_extension:
+                stem = os.path.normcase(os.path.splitext(rule['old_name'])[0])
+                matches = [m for key, m in targets.items() if os.path.splitext(key)[0] == stem]
+                move = matches[0] if len(matches) == 1 else None
+            if move is None:
+                if len(candidates) > 1:
+                    _error(plan, rule, f"多个文件主名相同: {', '.join(sorted(candidates))}")
+                else:
+                    plan.files_not_found.append(rule)
+                continue
+            old_name = move['new_name']
+        else:
+            old_name = os.path.basename(old_path)
+            if os.path.normcase(old_name) in sources:
+                first = sources[os.path.normcase(old_name)]['rules'][0]
+                _error(plan, rule, f"文件已由第{first['line_num']}行重命名: {old_name}")
+                continue
+
+        actual_new_name = get_actual_new_filename(old_name, new_name, ignore_extension)
+        rule['actual_old_name'] = move['old_name'] if move else old_name
+        rule['actual_new_name'] = actual_new_name
+
+        key = os.path.normcase(actual_new_name)
+        other = targets.get(key)
+        if other is not None and other is not move:
+            _error(plan, rule, f"目标文件名与第{other['rules'][0]['line_num']}行重复: {actual_new_name}")
+            continue
+
+        if move is not None:
+            # 合并到前面的改名
+            del targets[os.path.normcase(move['new_name'])]
+            move['new_name'] = actual_new_name
+            move['rules'].append(rule)
+        else:
+            if actual_new_name == old_name:
+                plan.rename_skipped.append(rule)
+                continue
+            move = {'rules': [rule], 'old_name': old_name, 'new_name': actual_new_name}
+            sources[os.path.normcase(old_name)] = move
+            plan.moves.append(move)
+        targets[key] = move
+
+    # 合并后回到原名的改名无需执行
+    for move in list(plan.moves):
+        if move['old_name'] == move['new_name']:
+            plan.moves.remove(move)
+            del sources[os.path.normcase(move['old_name'])]
+            plan.rename_skipped.extend(move['rules'])
+
+    # 目标已存在且不会被腾出时无法执行；去掉一个改名后它的原名不再腾出，需要重复检查
+    changed = True
+    while changed:
+        changed = False
+        for move in list(plan.moves):
+            target_key = os.path.normcase(move['new_name'])
+            if target_key in index.names and target_key not in sources:
+                for rule in move['rules']:
+                    _error(plan, rule, f"目标文件已存在: {move['new_name']}")
+                plan.moves.remove(move)
+                del sources[os.path.normcase(move['old_name'])]
+                changed = True
+
+    plan.steps, plan.cycles = _order_steps(plan.moves, sources)
+    return plan
+
+
+def _order_steps(moves, sources):
+    """
+    按依赖排序：目标名被另一个源文件占用时，占用者先改名；环用临时名打断
+
+    每个目标最多被一个源文件占用、每个源文件最多占用一个目标，
+    因此依赖关系只会是若干条链和环。
+
+    Returns:
+        (步骤列表, 环的数量)
+    """
+    # blocker[i]: 占用 move i 目标名的 move（大小写不同的同一文件不算占用）
+    position = {id(move): i for i, move in enumerate(moves)}
+    blocker = {}
+    blocks = {}
+    for i, move in enumerate(moves):
+        occupant = sources.get(os.path.normcase(move['new_name']))
+        if occupant is not None and occupant is not move:
+            j = position[id(occupant)]
+            blocker[i] = j
+            blocks[j] = i
+
+    steps = []
+    done = set()
+
+    def run_chain(i):
+        # 执行 i，然后依次执行因此腾出目标名的改名
+        while i is not None and i not in done:
+            steps.append((moves[i]['old_name'], moves[i]['new_name']))
+            done.add(i)
+            i = blocks.get(i)
+
+    for i in range(len(moves)):
+        if i not in blocker:
+            run_chain(i)
+
+    # 剩下的都在环中
+    cycles = 0
+    run_id = uuid.uuid4().hex[:8]
+    for i in range(len(moves)):
+        if i in done:
+            continue
+        cycles += 1
+        temp_name = f"~rename-{run_id}-{i}.tmp"
+        steps.append((moves[i]['old_name'], temp_name))
+        done.add(i)
+        # 腾出 i 的原名后，环中其余改名依次执行，最后把临时文件改为 i 的目标名
+        j = blocks.get(i)
+        while j is not None and j != i:
+            steps.append((moves[j]['old_name'], moves[j]['new_name']))
+            done.add(j)
+            j = blocks.get(j)
+        steps.append((temp_name, moves[i]['new_name']))
+    return steps, cycles
+
+
+def step_done(directory, src, dst):
+    """按磁盘状态判断一步是否已完成"""
+    src_path = os.path.join(directory, src)
+    dst_path = os.path.join(directory, dst)
+    if os.path.normcase(src) == os.path.normcase(dst):
+        # 只改大小写：以目录中的实际名称判断（步骤中的文件名可以是相对路径）
+        return os.path.basename(dst) in os.listdir(os.path.dirname(dst_path))
+    return os.path.lexists(dst_path) and not os.path.lexists(src_path)
+
+
+class Journal:
+    """追加式重命名日志"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._pending = 0
+
+    @classmethod
+    def create(cls, directory, steps, journal_dir=JOURNAL_DIR):
+        os.makedirs(journal_dir, exist_ok=True)
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{uuid.uuid4().hex[:6]}.jsonl"
+        journal = cls(os.path.join(journal_dir, name))
+        journal.append({"op": "plan", "directory": os.path.abspath(directory), "steps": steps}, sync=True)
+        return journal
+
+    def append(self, record, sync=False):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._pending += 1
+        if sync or self._pending >= JOURNAL_SYNC_INTERVAL:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def read(self):
+        """Returns: (目录, 步骤列表, 已完成的步骤数, 最后的状态 plan|done|undo|commit|rollback)"""
+        directory, steps, completed, state = None, [], 0, None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 中断时最后一行可能不完整
+                    continue
+                if record["op"] == "plan":
+                    directory, steps = record["directory"], [tuple(step) for step in record["steps"]]
+                elif record["op"] == "done":
+                    completed = max(completed, record["step"] + 1)
+                state = record["op"]
+        return directory, steps, completed, state
+
+    def completed_steps(self):
+        """
+        已完成的步骤数：以日志记录为准，之后的步骤（写日志前中断）按磁盘状态确认
+
+        Returns:
+            (目录, 步骤列表, 已完成的步骤数)
+        """
+        directory, steps, completed, _ = self.read()
+        while completed < len(steps) and step_done(directory, *steps[completed]):
+            completed += 1
+        return directory, steps, completed
+
+
+def _run_steps(directory, steps, journal, start=0):
+    """从 start 开始执行步骤；失败时回滚本次已完成的步骤并抛出 RenameAborted"""
+    for k in range(start, len(steps)):
+        src, dst = steps[k]
+        try:
+            if os.path.normcase(src) != os.path.normcase(dst) and os.path.lexists(os.path.join(directory, dst)):
+                raise FileExistsError(f"目标文件已存在: {dst}")
+            os.rename(os.path.join(directory, src), os.path.join(directory, dst))
+        except OSError as e:
+            _undo_steps(directory, steps[:k], journal)
+            raise RenameAborted(f"{src} -> {dst}: {e}") from e
+        journal.append({"op": "done", "step": k})
+
+
+def _undo_steps(directory, steps, journal):
+    """倒序撤销已完成的步骤（撤销到第k步时，其后的步骤都已撤销，磁盘状态即第k步完成后的状态）"""
+    for k in range(len(steps) - 1, -1, -1):
+        src, dst = steps[k]
+        if step_done(directory, src, dst):
+            os.rename(os.path.join(directory, dst), os.path.join(directory, src))
+            journal.append({"op": "undo", "step": k})
+    journal.append({"op": "rollback"}, sync=True)
+    journal.close()
+
+
+def execute_plan(plan, journal_dir=JOURNAL_DIR):
+    """
+    执行规划好的重命名
+
+    Returns:
+        日志路径（没有需要执行的步骤时为None）
+
+    Raises:
+        RenameAborted: 某一步失败，已全部回滚
+    """
+    if not plan.steps:
+        return None
+    journal = Journal.create(plan.directory, plan.steps, journal_dir)
+    _run_steps(plan.directory, plan.steps, journal)
+    journal.append({"op": "commit"}, sync=True)
+    journal.close()
+    return journal.path
+
+
+def incomplete_journals(directory=None, journal_dir=JOURNAL_DIR):
+    """返回未完成（既未提交也未回滚）的日志路径，可按目录过滤"""
+    if not os.path.isdir(journal_dir):
+        return []
+    result = []
+    for name in sorted(os.listdir(journal_dir)):
+        if not name.endswith(".jsonl"):
+            continue
+        path = os.path.join(journal_dir, name)
+        journal_directory, _, _, state = Journal(path).read()
+        if state in ("commit", "rollback"):
+            continue
+        if directory is None or os.path.normcase(journal_directory) == os.path.normcase(os.path.abspath(directory)):
+            result.append(path)
+    return result
+
+
+def last_committed_journal(directory, journal_dir=JOURNAL_DIR):
+    """返回该目录最近一次成功执行的日志路径"""
+    if not os.path.isdir(journal_dir):
+        return None
+    for name in sorted(os.listdir(journal_dir), reverse=True):
+        if not name.endswith(".jsonl"):
+            continue
+        path = os.path.join(journal_dir, name)
+        journal_directory, _, _, state = Journal(path).read()
+        if state == "commit" and os.path.normcase(journal_directory) == os.path.normcase(os.path.abspath(directory)):
+            return path
+    return None
+
+
+def resume(journal_path):
+    """
+    继续执行中断的重命名
+
+    Returns:
+        本次执行的步骤数
+    """
+    journal = Journal(journal_path)
+    directory, steps, start = journal.completed_steps()
+    _run_steps(directory, steps, journal, start)
+    journal.append({"op": "commit"}, sync=True)
+    journal.close()
+    return len(steps) - start
+
+
+def rollback(journal_path):
+    """
+    撤销日志中已完成的步骤（可用于中断的重命名，也可撤销已提交的重命名）
+
+    Returns:
+        撤销的步骤数
+    """
+    journal = Journal(journal_path)
+    directory, steps, completed = journal.completed_steps()
+    _undo_steps(directory, steps[:completed], journal)
+    return completed
@@ -0,0 +1,5 @@
+NAME = "M3U播放列表生成器"
+DESCRIPTION = "用于生成M3U格式的播放列表文件，支持自定义文件名列表和输出路径设置"
+MODULE = "tool002.main"
+GUI = "M3UGeneratorGUI"
+LAUNCHER = True
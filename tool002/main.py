@@ -7,8 +7,157 @@ import threading
 import subprocess
 import platform
 
+from common.audio_meta import get_metadata_many
+from common.fs_index import list_files
+from tool002.name_index import NameIndex
 
-def create_m3u_from_list(file_names_list, directory_path, output_m3u_path=None):
+
+# 支持的音频文件扩展名
+AUDIO_EXTENSIONS = {'.mp3', '.flac', '.wav', '.m4a', '.aac', '.ogg', '.wma'}
+
+# 启用模糊匹配时，最佳候选的相似度不低于该值才自动采用
+FUZZY_ACCEPT_SCORE = 0.85
+
+
+class AudioLibrary:
+    """
+    音频库索引：文件名（不带后缀）-> 完整路径
+
+    文件列表来自持久化的增量索引（common.fs_index），构建一次后可用于生成任意多个播放列表。
+    精确匹配不到时按规范化名称匹配，仍找不到时可给出模糊候选（见 name_index）。
+    """
+
+    def __init__(self, directory_path):
+        self.directory = directory_path
+        self.files = {}
+        # 遍历目录及其子目录
+        for file_path in list_files(directory_path, AUDIO_EXTENSIONS):
+            name = os.path.splitext(os.path.basename(file_path))[0]
+            # 如果同一个文件名有多个版本，保留第一个找到的
+            if name not in self.files:
+                self.files[name] = file_path
+        self.index = NameIndex(self.files)
+
+    def __len__(self):
+        return len(self.files)
+
+    def find(self, file_name):
+        """返回文件名对应的路径（先精确、后规范化匹配），未找到时返回None"""
+        return self.index.lookup(file_name)[1]
+
+    def match(self, file_name):
+        """Returns: (匹配到的文件名, 路径)，未找到时为 (None, None)"""
+        return self.index.lookup(file_name)
+
+    def suggest(self, file_name):
+        """Returns: 模糊候选 [(文件名, 路径, 相似度), ...]"""
+        return self.index.suggest(file_name)
+
+
+def format_extinf(file_path, meta):
+    """
+    生成扩展M3U的 #EXTINF 行：#EXTINF:秒数,艺术家 - 标题
+
+    时长未知时为 -1；没有标题标签时用文件名（不带后缀）。
+    """
+    meta = meta or {}
+    duration = meta.get("duration")
+    seconds = int(round(duration)) if duration else -1
+    title = meta.get("title") or os.path.splitext(os.path.basename(file_path))[0]
+    artist = meta.get("artist")
+    display = f"{artist} - {title}" if artist else title
+    # 标签中的换行会破坏m3u的行结构
+    display = " ".join(display.split())
+    return f"#EXTINF:{seconds},{display}\n"
+
+
+def _format_suggestions(suggestions):
+    return "，".join(f"{name} ({score:.2f})" for name, _, score in suggestions)
+
+
+def write_m3u(file_names_list, library, output_m3u_path, fuzzy_threshold=None, extended=False):
+    """
+    按名称列表在音频库中查找文件并写入m3u
+
+    未找到的名称写入 *_missing.txt（每行一个，可直接作为名称列表），
+    候选及相似度写入 *_missing_suggestions.tsv。
+
+    Args:
+        fuzzy_threshold: 模糊匹配的最佳候选相似度不低于该值时自动采用，None表示不采用
+        extended: 为每个条目写入 #EXTINF（时长和标签由 common.audio_meta 并行读取并缓存）
+
+    Returns:
+        (日志行列表, 找到的数量, 未找到的 [(名称, 候选列表), ...])
+
+    Raises:
+        OSError: 写入m3u文件失败
+    """
+    result_log = []
+    missing_files = []
+
+    found_paths = []
+
+    for file_name in file_names_list:
+        # 去除空白字符
+        file_name = file_name.strip()
+        if not file_name:
+            continue
+
+        matched, file_path = library.match(file_name)
+        if file_path is not None:
+            found_paths.append(file_path)
+            if matched == file_name:
+                result_log.append(f"✓ 找到: {file_name}")
+            else:
+                result_log.append(f"✓ 找到: {file_name} -> {matched}")
+            continue
+
+        suggestions = library.suggest(file_name)
+        if fuzzy_threshold is not None and suggestions and suggestions[0][2] >= fuzzy_threshold:
+            name, file_path, score = suggestions[0]
+            found_paths.append(file_path)
+            result_log.append(f"≈ 模糊匹配: {file_name} -> {name} ({score:.2f})")
+        else:
+            missing_files.append((file_name, suggestions))
+            if suggestions:
+                result_log.append(f"✗ 未找到: {file_name}（候选: {_format_suggestions(suggestions)}）")
+            else:
+                result_log.append(f"✗ 未找到: {file_name}")
+
+    # 生成m3u文件内容
+    m3u_content = ["#EXTM3U\n"]  # m3u文件头
+    if extended:
+        # 全部条目一次批量读取：缓存中未变化的文件不再解析，其余由读取池并行解析
+        metadata = get_metadata_many(found_paths)
+        for file_path in found_paths:
+            m3u_content.append(format_extinf(file_path, metadata.get(os.path.abspath(file_path))))
+            m3u_content.append(file_path + "\n")
+    else:
+        m3u_content.extend(file_path + "\n" for file_path in found_paths)
+
+    # 写入m3u文件
+    with open(output_m3u_path, 'w', encoding='utf-8') as f:
+        f.writelines(m3u_content)
+
+    # 将未找到的文件列表和候选保存到另外的文件
+    if missing_files:
+        base = os.path.splitext(output_m3u_path)[0]
+        try:
+            with open(base + "_missing.txt", 'w', encoding='utf-8') as f:
+                for missing_file, _ in missing_files:
+                    f.write(missing_file + "\n")
+            with open(base + "_missing_suggestions.tsv", 'w', encoding='utf-8') as f:
+                f.write("名称\t候选\t相似度\t路径\n")
+                for missing_file, suggestions in missing_files:
+                    for name, file_path, score in suggestions or [("", "", "")]:
+                        f.write(f"{missing_file}\t{name}\t{score}\t{file_path}\n")
+        except Exception as e:
+            result_log.append(f"保存未找到文件列表时出错: {e}")
+    return result_log, len(found_paths), missing_files
+
+
+def create_m3u_from_list(file_names_list, directory_path, output_m3u_path=None, library=None,
+                         fuzzy_threshold=None, extended=False):
     """
     根据文件名列表生成m3u播放列表
 
@@ -16,16 +165,22 @@ def create_m3u_from_list(file_names_list, directory_path, output_m3u_path=None):
         file_names_list: 文件名列表
         directory_path: 要搜索的目录路径
         output_m3u_path: 输出的m3u文件路径（可选）
+        library: 已构建的 AudioLibrary（可选，批量生成时共用）
+        fuzzy_threshold: 模糊匹配自动采用的最低相似度（可选，见 write_m3u）
+        extended: 是否生成带 #EXTINF 的扩展M3U
+
+    Returns:
+        (日志文本, 是否成功, 输出路径)
     """
 
     if not directory_path:
-        return "错误：请指定音频目录", False
+        return "错误：请指定音频目录", False, None
 
     if not os.path.exists(directory_path):
-        return f"错误：目录 '{directory_path}' 不存在", False
+        return f"错误：目录 '{directory_path}' 不存在", False, None
 
     if not file_names_list:
-        return "错误：文件名列表为空", False
+        return "错误：文件名列表为空", False, None
 
     # 如果没有指定输出文件，创建cache文件夹并使用当前时间命名
     if output_m3u_path is None:
@@ -35,72 +190,94 @@ def create_m3u_from_list(file_names_list, directory_path, output_m3u_path=None):
         timestamp = datetime.now().strftime("%y-%m-%d %H-%M-%S")
         output_m3u_path = os.path.join(cache_dir, f"{timestamp}.m3u")
 
-    # 支持的音频文件扩展名
-    audio_extensions = {'.mp3', '.flac', '.wav', '.m4a', '.aac', '.ogg', '.wma'}
-
     result_log = []
     result_log.append(f"输入了 {len(file_names_list)} 个文件名\n")
 
     # 构建目录中所有音频文件的映射（文件名不带后缀 -> 完整路径）
-    audio_files_map = {}
-    missing_files = []
-
-    # 遍历目录及其子目录
-    for root, dirs, files in os.walk(directory_path):
-        for file in files:
-            name, ext = os.path.splitext(file)
-            if ext.lower() in audio_extensions:
-                # 如果同一个文件名有多个版本，保留第一个找到的
-                if name not in audio_files_map:
-                    audio_files_map[name] = os.path.join(root, file)
+    if library is None:
+        library = AudioLibrary(directory_path)
+    result_log.append(f"在目录中找到 {len(library)} 个音频文件\n")
 
-    result_log.append(f"在目录中找到 {len(audio_files_map)} 个音频文件\n")
-
-    # 生成m3u文件内容
-    m3u_content = ["#EXTM3U\n"]  # m3u文件头
-    found_count = 0
-
-    for file_name in file_names_list:
-        # 去除空白字符
-        file_name = file_name.strip()
-        if not file_name:
-            continue
-
-        if file_name in audio_files_map:
-            file_path = audio_files_map[file_name]
-            m3u_content.append(file_path + "\n")
-            found_count += 1
-            result_log.append(f"✓ 找到: {file_name}")
-        else:
-            missing_files.append(file_name)
-            result_log.append(f"✗ 未找到: {file_name}")
-
-    # 写入m3u文件
     try:
-        with open(output_m3u_path, 'w', encoding='utf-8') as f:
-            f.writelines(m3u_content)
-        result_log.append(f"\n成功生成m3u文件: {output_m3u_path}")
-        result_log.append(f"找到文件: {found_count}/{len(file_names_list)}")
+        lines, found_count, missing_files = write_m3u(file_names_list, library, output_m3u_path, fuzzy_threshold,
+                                                      extended)
     except Exception as e:
-        return f"写入m3u文件时出错: {e}", False
+        return f"写入m3u文件时出错: {e}", False, None
+    result_log.extend(lines)
+    result_log.append(f"\n成功生成m3u文件: {output_m3u_path}")
+    result_log.append(f"找到文件: {found_count}/{len(file_names_list)}")
 
     # 输出未找到的文件
     if missing_files:
         result_log.append(f"\n未找到的文件 ({len(missing_files)} 个):")
-        for missing_file in missing_files:
-            result_log.append(f"  - {missing_file}")
+        for missing_file, suggestions in missing_files:
+            if suggestions:
+                result_log.append(f"  - {missing_file}  候选: {_format_suggestions(suggestions)}")
+            else:
+                result_log.append(f"  - {missing_file}")
+        result_log.append(f"未找到的文件列表已保存到: {os.path.splitext(output_m3u_path)[0]}_missing.txt")
+        result_log.append(f"候选及相似度已保存到: {os.path.splitext(output_m3u_path)[0]}_missing_suggestions.tsv")
+
+    return "\n".join(result_log), True, output_m3u_path
+
+
+def read_name_list(list_path):
+    """读取名称列表文件中的非空行"""
+    with open(list_path, 'r', encoding='utf-8-sig') as f:
+        return [line.strip() for line in f if line.strip()]
+
 
-        # 可选：将未找到的文件列表保存到另一个txt文件
-        missing_file_path = os.path.splitext(output_m3u_path)[0] + "_missing.txt"
+def create_m3u_batch(list_dir, directory_path, output_dir=None, fuzzy_threshold=None, extended=False):
+    """
+    批量生成播放列表：文件夹中的每个名称列表(.txt)生成一个同名m3u
+
+    音频库只扫描一次，所有播放列表共用同一个索引。
+
+    Args:
+        list_dir: 名称列表所在文件夹
+        directory_path: 音频目录
+        output_dir: 输出文件夹（可选，默认 ./cache/时间戳/）
+        fuzzy_threshold: 模糊匹配自动采用的最低相似度（可选，见 write_m3u）
+        extended: 是否生成带 #EXTINF 的扩展M3U
+
+    Returns:
+        (日志文本, 是否成功, 输出文件夹)
+    """
+    if not directory_path or not os.path.isdir(directory_path):
+        return f"错误：目录 '{directory_path}' 不存在", False, None
+    if not list_dir or not os.path.isdir(list_dir):
+        return f"错误：列表文件夹 '{list_dir}' 不存在", False, None
+
+    list_paths = sorted(
+        os.path.join(list_dir, name) for name in os.listdir(list_dir)
+        if name.lower().endswith('.txt') and not name.lower().endswith('_missing.txt')
+    )
+    if not list_paths:
+        return "错误：列表文件夹中没有 .txt 名称列表", False, None
+
+    if output_dir is None:
+        output_dir = os.path.join("./cache", datetime.now().strftime("%y-%m-%d %H-%M-%S"))
+    os.makedirs(output_dir, exist_ok=True)
+
+    library = AudioLibrary(directory_path)
+    result_log = [f"在目录中找到 {len(library)} 个音频文件", f"共 {len(list_paths)} 个名称列表\n"]
+    failed = 0
+    for list_path in list_paths:
+        name = os.path.splitext(os.path.basename(list_path))[0]
+        output_m3u_path = os.path.join(output_dir, name + ".m3u")
         try:
-            with open(missing_file_path, 'w', encoding='utf-8') as f:
-                for missing_file in missing_files:
-                    f.write(missing_file + "\n")
-            result_log.append(f"未找到的文件列表已保存到: {missing_file_path}")
+            names = read_name_list(list_path)
+            _, found_count, missing_files = write_m3u(names, library, output_m3u_path, fuzzy_threshold, extended)
         except Exception as e:
-            result_log.append(f"保存未找到文件列表时出错: {e}")
+            failed += 1
+            result_log.append(f"✗ {name}: {e}")
+            continue
+        mark = "✓" if not missing_files else "△"
+        result_log.append(f"{mark} {name}: 找到 {found_count}/{len(names)}"
+                          + (f"，未找到 {len(missing_files)} 个" if missing_files else ""))
 
-    return "\n".join(result_log), True, output_m3u_path
+    result_log.append(f"\n播放列表已保存到: {output_dir}")
+    return "\n".join(result_log), failed < len(list_paths), output_dir
 
 
 def open_file_in_explorer(file_path):
@@ -279,6 +456,43 @@ class M3UGeneratorGUI:
         )
         dir_button.pack(side=tk.RIGHT)
 
+        # 批量模式：名称列表文件夹
+        list_dir_frame = tk.Frame(main_frame, bg=self.frame_bg)
+        list_dir_frame.pack(fill=tk.X, padx=20, pady=(0, 10))
+
+        list_dir_label = tk.Label(
+            list_dir_frame,
+            text="列表文件夹(批量):",
+            font=("Microsoft YaHei", 11),
+            bg=self.frame_bg,
+            width=15,
+            anchor="w"
+        )
+        list_dir_label.pack(side=tk.LEFT)
+
+        self.list_dir_entry = tk.Entry(
+            list_dir_frame,
+            font=("Microsoft YaHei", 10),
+            bd=2,
+            relief=tk.GROOVE,
+            width=50
+        )
+        self.list_dir_entry.pack(side=tk.LEFT, padx=(0, 10), fill=tk.X, expand=True)
+
+        list_dir_button = tk.Button(
+            list_dir_frame,
+            text="浏览",
+            font=("Microsoft YaHei", 10),
+            bg=self.button_color,
+            fg="white",
+            activebackground=self.button_hover,
+            activeforeground="white",
+            relief=tk.FLAT,
+            cursor="hand2",
+            command=self.browse_list_directory
+        )
+        list_dir_button.pack(side=tk.RIGHT)
+
         # 输出文件选项
         output_frame = tk.Frame(main_frame, bg=self.frame_bg)
         output_frame.pack(fill=tk.X, padx=20, pady=10)
@@ -342,6 +556,38 @@ class M3UGeneratorGUI:
         )
         self.output_button.pack(side=tk.RIGHT)
 
+        # 匹配选项
+        match_frame = tk.Frame(main_frame, bg=self.frame_bg)
+        match_frame.pack(fill=tk.X, padx=20, pady=(0, 10))
+
+        match_label = tk.Label(
+            match_frame,
+            text="匹配选项:",
+            font=("Microsoft YaHei", 11),
+            bg=self.frame_bg,
+            width=15,
+            anchor="w"
+        )
+        match_label.pack(side=tk.LEFT)
+
+        self.fuzzy_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            match_frame,
+            text=f"模糊匹配（最佳候选相似度≥{FUZZY_ACCEPT_SCORE}时自动采用，其余候选写入报告）",
+            variable=self.fuzzy_var,
+            font=("Microsoft YaHei", 10),
+            bg=self.frame_bg
+        ).pack(side=tk.LEFT)
+
+        self.extended_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            match_frame,
+            text="扩展M3U（#EXTINF 时长、艺术家 - 标题）",
+            variable=self.extended_var,
+            font=("Microsoft YaHei", 10),
+            bg=self.frame_bg
+        ).pack(side=tk.LEFT, padx=(10, 0))
+
         # 控制按钮
         button_frame = tk.Frame(main_frame, bg=self.frame_bg)
         button_frame.pack(pady=30)
@@ -362,6 +608,22 @@ class M3UGeneratorGUI:
         )
         self.generate_button.pack(side=tk.LEFT, padx=10)
 
+        self.batch_button = tk.Button(
+            button_frame,
+            text="批量生成",
+            font=("Microsoft YaHei", 12, "bold"),
+            bg=self.button_color,
+            fg="white",
+            activebackground=self.button_hover,
+            activeforeground="white",
+            relief=tk.FLAT,
+            cursor="hand2",
+            width=15,
+            height=2,
+            command=self.generate_m3u_batch
+        )
+        self.batch_button.pack(side=tk.LEFT, padx=10)
+
         self.open_button = tk.Button(
             button_frame,
             text="打开输出目录",
@@ -448,6 +710,13 @@ my_song_2023"""
             self.dir_entry.delete(0, tk.END)
             self.dir_entry.insert(0, dir_path)
 
+    def browse_list_directory(self):
+        """浏览名称列表文件夹"""
+        dir_path = filedialog.askdirectory(title="选择名称列表(.txt)所在文件夹")
+        if dir_path:
+            self.list_dir_entry.delete(0, tk.END)
+            self.list_dir_entry.insert(0, dir_path)
+
     def browse_output_file(self):
         """浏览输出文件"""
         file_path = filedialog.asksaveasfilename(
@@ -500,10 +769,53 @@ my_song_2023"""
         self.log_text.insert(tk.END, "正在生成M3U文件，请稍候...\n")
         self.root.update()
 
+        fuzzy_threshold = FUZZY_ACCEPT_SCORE if self.fuzzy_var.get() else None
+        extended = self.extended_var.get()
+
         # 在新线程中执行生成操作
         def run_generation():
             try:
-                result, success, output_path = create_m3u_from_list(file_names_list, directory, output_file)
+                result, success, output_path = create_m3u_from_list(file_names_list, directory, output_file,
+                                                                    fuzzy_threshold=fuzzy_threshold,
+                                                                    extended=extended)
+                self.root.after(0, self.on_generation_complete, result, success, output_path)
+            except Exception as e:
+                self.root.after(0, self.on_generation_error, str(e))
+
+        thread = threading.Thread(target=run_generation)
+        thread.daemon = True
+        thread.start()
+
+    def generate_m3u_batch(self):
+        """批量生成：列表文件夹中的每个 .txt 生成一个m3u，音频库只扫描一次"""
+        list_dir = self.list_dir_entry.get().strip()
+        directory = self.dir_entry.get().strip()
+        if not list_dir:
+            messagebox.showwarning("警告", "请指定名称列表文件夹")
+            return
+        if not directory:
+            messagebox.showwarning("警告", "请指定音频目录")
+            return
+
+        # 自定义输出时，输入的路径作为输出文件夹
+        output_dir = None
+        if self.output_var.get() == "custom":
+            output_dir = self.output_entry.get().strip()
+            if not output_dir:
+                messagebox.showwarning("警告", "请选择或输入输出文件夹")
+                return
+
+        self.generate_button.config(state="disabled")
+        self.batch_button.config(state="disabled", text="生成中...")
+        self.log_text.delete(1.0, tk.END)
+        self.log_text.insert(tk.END, "正在批量生成M3U文件，请稍候...\n")
+        fuzzy_threshold = FUZZY_ACCEPT_SCORE if self.fuzzy_var.get() else None
+        extended = self.extended_var.get()
+
+        def run_generation():
+            try:
+                result, success, output_path = create_m3u_batch(list_dir, directory, output_dir, fuzzy_threshold,
+                                                                extended)
                 self.root.after(0, self.on_generation_complete, result, success, output_path)
             except Exception as e:
                 self.root.after(0, self.on_generation_error, str(e))
@@ -515,6 +827,7 @@ my_song_2023"""
     def on_generation_complete(self, result, success, output_path):
         """生成完成后的回调"""
         self.generate_button.config(state="normal", text="生成M3U文件")
+        self.batch_button.config(state="normal", text="批量生成")
         self.log_text.delete(1.0, tk.END)
         self.log_text.insert(tk.END, result)
 
@@ -529,6 +842,7 @@ my_song_2023"""
     def on_generation_error(self, error_msg):
         """生成出错后的回调"""
         self.generate_button.config(state="normal", text="生成M3U文件")
+        self.batch_button.config(state="normal", text="批量生成")
         self.log_text.delete(1.0, tk.END)
         self.log_text.insert(tk.END, f"生成过程中发生错误:\n{error_msg}")
         self.open_button.config(state="disabled")
@@ -545,6 +859,7 @@ my_song_2023"""
         """清空所有输入"""
         self.filenames_text.delete(1.0, tk.END)
         self.dir_entry.delete(0, tk.END)
+        self.list_dir_entry.delete(0, tk.END)
         self.output_entry.delete(0, tk.END)
         self.log_text.delete(1.0, tk.END)
         self.output_var.set("auto")
@@ -560,5 +875,6 @@ def main():
     root.mainloop()
 
 
+# 单独运行：在项目根目录执行 python -m tool002.main
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+名称匹配索引：规范化精确匹配 + 字符n-gram模糊匹配
+
+规范化后比较：全角/半角（NFKC）、大小写、繁简（需要opencc）、标点和空白、
+feat./ft. 合作者说明都不影响匹配。规范化后仍找不到时，用字符三元组倒排索引
+按相似度（Dice系数）给出候选。
+"""
+import heapq
+import re
+import threading
+import unicodedata
+from collections import Counter
+from operator import itemgetter
+
+try:
+    from opencc import OpenCC
+    _t2s = OpenCC('t2s')
+    OPENCC_AVAILABLE = True
+except ImportError:
+    _t2s = None
+    OPENCC_AVAILABLE = False
+
+# n-gram 长度（三元组的倒排列表比二元组短得多，查询更快，候选也更准确）
+NGRAM_SIZE = 3
+
+# 出现在超过该比例名称中的n-gram不参与候选计数（如 "the"、"ove"），保证查询耗时稳定
+STOP_GRAM_RATIO = 0.02
+
+# 每个名称最多返回的候选数
+SUGGESTION_LIMIT = 3
+
+# 只用查询中最少见的若干个n-gram收集候选
+QUERY_GRAMS = 4
+
+# 按共同n-gram数取前若干个候选再计算完整相似度
+CANDIDATE_LIMIT = 100
+
+# 合作者说明：(feat. xxx)、[ft. xxx]、 feat. xxx 到结尾
+FEAT_PATTERN = re.compile(r"[(\[{（【]\s*(?:feat|ft|featuring)\b\.?[^)\]}）】]*[)\]}）】]"
+                          r"|\s(?:feat|ft|featuring)\b\.?\s.*$", re.IGNORECASE)
+
+
+def normalize_name(name):
+    """
+    规范化名称，用于忽略书写差异的精确匹配
+
+    "Song Ａ（feat. B） " 与 "song a" 规范化后相同。
+    """
+    name = unicodedata.normalize('NFKC', name).strip()
+    name = FEAT_PATTERN.sub("", name)
+    if _t2s is not None:
+        name = _t2s.convert(name)
+    # 只保留文字和数字（去掉标点、空白和符号）
+    return "".join(ch for ch in name.casefold() if ch.isalnum())
+
+
+def ngrams(key):
+    """规范化名称的字符n-gram集合，过短的名称整体作为一个gram"""
+    if len(key) <= NGRAM_SIZE:
+        return {key} if key else set()
+    return {key[i:i + NGRAM_SIZE] for i in range(len(key) - NGRAM_SIZE + 1)}
+
+
+class NameIndex:
+    """
+    名称 -> 值 的多级索引
+
+    lookup 依次尝试原名称精确匹配和规范化精确匹配；suggest 用n-gram倒排索引给出模糊候选。
+    规范化索引和n-gram索引在第一次用到时才构建，可以被多个线程共用。
+    """
+
+    def __init__(self, items):
+        """
+        Args:
+            items: {名称: 值}，同一名称保留先出现的值
+        """
+        self.items = items
+        self._normalized = None
+        self._names = None
+        self._keys = None
+        self._sizes = None
+        self._postings = None
+        self._stop_limit = None
+        self._lock = threading.Lock()
+
+    def _build_normalized(self):
+        """构建规范化索引（多个线程共用同一个索引时只构建一次，构建完整后才对外可见）"""
+        with self._lock:
+            if self._normalized is not None:
+                return
+            normalized = {}
+            names = []
+            keys = []
+            for name in self.items:
+                key = normalize_name(name)
+                if key not in normalized:
+                    normalized[key] = name
+                names.append(name)
+                keys.append(key)
+            self._names = names
+            self._keys = keys
+            self._normalized = normalized
+
+    def _build_ngrams(self):
+        """构建n-gram倒排索引，同上"""
+        self._build_normalized()
+        with self._lock:
+            if self._postings is not None:
+                return
+            postings = {}
+            sizes = []
+            for i, key in enumerate(self._keys):
+                grams = ngrams(key)
+                sizes.append(len(grams))
+                for gram in grams:
+                    postings.setdefault(gram, []).append(i)
+            self._sizes = sizes
+            self._stop_limit = max(50, int(len(self._keys) * STOP_GRAM_RATIO))
+            self._postings = postings
+
+    def lookup(self, name):
+        """
+        精确或规范化匹配
+
+        Returns:
+            (匹配到的名称, 值)，未找到时为 (None, None)
+        """
+        if name in self.items:
+            return name, self.items[name]
+        if self._normalized is None:
+            self._build_normalized()
+        key = normalize_name(name)
+        matched = self._normalized.get(key) if key else None
+        if matched is None:
+            return None, None
+        return matched, self.items[matched]
+
+    def suggest(self, name, limit=SUGGESTION_LIMIT, min_score=0.3):
+        """
+        模糊候选
+
+        Returns:
+            [(名称, 值, 相似度0~1), ...]，按相似度从高到低
+        """
+        if self._postings is None:
+            self._build_ngrams()
+        query = ngrams(normalize_name(name))
+        if not query:
+            return []
+
+        # 用最少见的gram收集候选；全部是高频gram时退而使用最少见的两个
+        postings = sorted((self._postings[gram] for gram in query if gram in self._postings), key=len)
+        usable = [posting for posting in postings if len(posting) <= self._stop_limit][:QUERY_GRAMS]
+        counts = Counter()
+        for posting in usable or postings[:2]:
+            counts.update(posting)
+
+        scored = []
+        for i, _ in heapq.nlargest(CANDIDATE_LIMIT, counts.items(), key=itemgetter(1)):
+            # 候选按完整的gram集合计算Dice系数
+            score = 2 * len(query & ngrams(self._keys[i])) / (len(query) + self._sizes[i])
+            if score >= min_score:
+                scored.append((score, i))
+        scored.sort(key=lambda item: (-item[0], self._names[item[1]]))
+        return [(self._names[i], self.items[self._names[i]], round(score, 3)) for score, i in scored[:limit]]
@@ -0,0 +1,5 @@
+NAME = "音频时长统计工具"
+DESCRIPTION = "统计音乐文件时长"
+MODULE = "tool003.main"
+GUI = "FLACDurationExtractor"
+LAUNCHER = True
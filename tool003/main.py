@@ -1,14 +1,183 @@
+import csv
+import json
 import os
 import sys
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext
-from mutagen.flac import FLAC
+
+from common.audio_meta import get_durations_many
+from common.duration_probe import read_duration
+from common.fs_index import list_files
+
+# 统计时长的音频格式
+DURATION_EXTENSIONS = {'.flac', '.mp3', '.m4a', '.ogg', '.opus', '.wav'}
+
+# 报告格式（按输出文件后缀选择）
+REPORT_FORMATS = ('.txt', '.tsv', '.csv', '.json')
+
+# 界面进度刷新的最短间隔（秒）
+UI_UPDATE_INTERVAL = 0.1
+
+
+def get_duration(file_path):
+    """获取音频文件的时长（秒），只读文件头，读取失败时抛出异常"""
+    return read_duration(file_path)
+
+
+def get_durations(file_paths, on_progress=None):
+    """
+    批量获取时长（秒），未变化的文件从元数据缓存读取；其余只读文件头（不构造完整的mutagen对象，
+    不读取内嵌封面），由线程池并行读取后写回缓存
+
+    Returns:
+        {绝对路径: (时长或None, 错误信息或None)}
+    """
+    return get_durations_many(file_paths, on_progress=on_progress)
+
+
+def format_duration(duration):
+    """将秒数格式化为mm:ss"""
+    minutes = int(duration // 60)
+    seconds = int(duration % 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def format_total(duration):
+    """将秒数格式化为hh:mm:ss（用于合计）"""
+    hours, rest = divmod(int(duration), 3600)
+    return f"{hours:02d}:{rest // 60:02d}:{rest % 60:02d}"
+
+
+def scan_durations(folder_path, recursive=True, extensions=DURATION_EXTENSIONS, on_progress=None):
+    """
+    扫描文件夹中音频文件的时长
+
+    文件列表来自持久化的增量索引，时长经元数据缓存读取（未变化的文件不再打开）；
+    缓存中没有的文件只读文件头获取（FLAC/MP3/M4A/WAV，其他格式用mutagen），由线程池并行读取。
+
+    Args:
+        folder_path: 文件夹
+        recursive: 是否包含子文件夹
+        extensions: 音频后缀集合
+        on_progress: 读取进度回调 on_progress(已读取数, 需读取总数)，未变化的文件不计入
+
+    Returns:
+        [{'path', 'dir'(相对文件夹的目录，根目录为"."), 'name', 'duration'(秒或None), 'error'}, ...]，按目录、文件名排序
+    """
+    root = os.path.abspath(folder_path)
+    paths = list_files(root, extensions)
+    if not recursive:
+        paths = [path for path in paths if os.path.dirname(path) == root]
+    durations = get_durations(paths, on_progress)
+    rows = []
+    for path in paths:
+        seconds, error = durations[os.path.abspath(path)]
+        rows.append({
+            'path': path,
+            'dir': os.path.relpath(os.path.dirname(path), root),
+            'name': os.path.basename(path),
+            'duration': seconds,
+            'error': error if seconds is None else None,
+        })
+    # 根目录的文件在前，其余按目录分组
+    rows.sort(key=lambda row: (row['dir'] != os.curdir, row['dir'], row['name']))
+    return rows
+
+
+def directory_totals(rows):
+    """
+    按目录汇总
+
+    Returns:
+        [{'dir', 'files', 'failed', 'duration'(秒)}, ...]，按目录排序，最后一项为全部合计（dir 为 "*"）
+    """
+    totals = {}
+    for row in rows:
+        total = totals.setdefault(row['dir'], {'dir': row['dir'], 'files': 0, 'failed': 0, 'duration': 0.0})
+        total['files'] += 1
+        if row['duration'] is None:
+            total['failed'] += 1
+        else:
+            total['duration'] += row['duration']
+    result = [totals[key] for key in sorted(totals)]
+    result.append({
+        'dir': '*',
+        'files': sum(total['files'] for total in result),
+        'failed': sum(total['failed'] for total in result),
+        'duration': sum(total['duration'] for total in result),
+    })
+    return result
+
+
+def format_result_line(row):
+    """结果行：文件名（不含后缀）\tmm:ss"""
+    name_without_ext = os.path.splitext(row['name'])[0].strip(".")
+    duration = format_duration(row['duration']) if row['duration'] is not None else "00:00"
+    return f"{name_without_ext}\t{duration}"
+
+
+def write_scan_report(rows, output_file):
+    """
+    写入时长报告，格式由输出文件后缀决定
+
+    .txt  每行 文件名\tmm:ss（原有格式）
+    .tsv / .csv  文件明细（目录、文件、秒数、mm:ss、错误），目录合计写入同名的 *_dirs 文件
+    .json  {"files": [...], "directories": [...]}，最后一个目录项为全部合计
+
+    Returns:
+        写入的文件路径列表
+    """
+    ext = os.path.splitext(output_file)[1].lower()
+    totals = directory_totals(rows)
+    if ext == '.json':
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump({'files': rows, 'directories': totals}, f, ensure_ascii=False, indent=2)
+        return [output_file]
+
+    if ext in ('.tsv', '.csv'):
+        delimiter = '\t' if ext == '.tsv' else ','
+        dirs_file = os.path.splitext(output_file)[0] + "_dirs" + ext
+        # CSV 使用 utf-8-sig，Excel 可以直接打开
+        encoding = 'utf-8-sig' if ext == '.csv' else 'utf-8'
+        with open(output_file, 'w', encoding=encoding, newline='') as f:
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(['dir', 'file', 'seconds', 'duration', 'error'])
+            for row in rows:
+                seconds = row['duration']
+                writer.writerow([row['dir'], row['name'], f"{seconds:.3f}" if seconds is not None else "",
+                                 format_duration(seconds) if seconds is not None else "", row['error'] or ""])
+        with open(dirs_file, 'w', encoding=encoding, newline='') as f:
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(['dir', 'files', 'failed', 'seconds', 'duration'])
+            for total in totals:
+                writer.writerow([total['dir'], total['files'], total['failed'], f"{total['duration']:.3f}",
+                                 format_total(total['duration'])])
+        return [output_file, dirs_file]
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(format_result_line(row) + "\n")
+    return [output_file]
+
+
+def write_duration_report(folder_path, output_file, recursive=False, extensions=('.flac',)):
+    """
+    统计文件夹中音频文件的时长并写入报告（默认：顶层FLAC，每行: 文件名\tmm:ss）
+
+    Returns:
+        处理的文件数
+    """
+    rows = scan_durations(folder_path, recursive, set(extensions))
+    write_scan_report(rows, output_file)
+    return len(rows)
 
 
 class FLACDurationExtractor:
     def __init__(self, root):
         self.root = root
-        self.root.title("FLAC文件时长提取器")
+        self.root.title("音频文件时长提取器")
         self.root.geometry("800x600")
 
         # 设置样式
@@ -52,6 +221,12 @@ class FLACDurationExtractor:
         self.output_file_var = tk.StringVar(value="music_duration.txt")
         self.output_entry = ttk.Entry(main_frame, textvariable=self.output_file_var, width=30)
         self.output_entry.grid(row=3, column=0, sticky=tk.W, pady=(0, 15))
+        ttk.Label(main_frame, text="（.txt / .tsv / .csv / .json，表格格式另附各目录合计）",
+                  foreground="gray").grid(row=3, column=1, sticky=tk.W, padx=(10, 0), pady=(0, 15))
+
+        self.recursive_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(main_frame, text="包含子文件夹（FLAC/MP3/M4A/OGG/OPUS/WAV）",
+                        variable=self.recursive_var).grid(row=0, column=1, sticky=tk.E, pady=(0, 5))
 
         # 处理按钮
         self.process_button = ttk.Button(main_frame, text="开始处理", command=self.process_files)
@@ -90,32 +265,18 @@ class FLACDurationExtractor:
 
     def browse_folder(self):
         """打开文件夹选择对话框"""
-        folder_path = filedialog.askdirectory(title="选择包含FLAC文件的文件夹")
+        folder_path = filedialog.askdirectory(title="选择包含音频文件的文件夹")
         if folder_path:
             self.folder_path_var.set(folder_path)
 
-    def get_flac_duration(self, file_path):
-        """获取FLAC文件的时长，返回mm:ss格式"""
-        try:
-            audio = FLAC(file_path)
-            duration = audio.info.length  # 获取时长（秒）
-            minutes = int(duration // 60)
-            seconds = int(duration % 60)
-            return f"{minutes:02d}:{seconds:02d}"
-        except Exception as e:
-            self.log_message(f"错误：无法读取文件 {os.path.basename(file_path)} - {e}")
-            return "00:00"
-
     def log_message(self, message):
         """在输出文本框中记录消息"""
         self.output_text.insert(tk.END, message + "\n")
         self.output_text.see(tk.END)  # 自动滚动到底部
-        self.root.update()  # 更新UI
 
     def process_files(self):
-        """处理FLAC文件"""
+        """在后台线程中扫描音频时长，界面只按固定间隔刷新进度"""
         folder_path = self.folder_path_var.get()
-        output_file = self.output_file_var.get()
 
         if not folder_path:
             self.log_message("错误：请先选择文件夹")
@@ -131,64 +292,67 @@ class FLACDurationExtractor:
         # 禁用处理按钮
         self.process_button.config(state=tk.DISABLED)
         self.save_button.config(state=tk.DISABLED)
-
-        try:
-            # 查找FLAC文件
-            flac_files = [f for f in os.listdir(folder_path) if f.lower().endswith('.flac')]
-
-            if not flac_files:
-                self.log_message("在指定文件夹中未找到FLAC文件")
-                return
-
-            self.log_message(f"找到 {len(flac_files)} 个FLAC文件，开始处理...")
-
-            # 重置进度条
-            self.progress_var.set(0)
-
-            results = []
-            total_files = len(flac_files)
-
-            for i, filename in enumerate(flac_files):
-                file_path = os.path.join(folder_path, filename)
-
-                # 获取文件名（不含后缀）
-                name_without_ext = os.path.splitext(filename)[0].strip(".")
-
-                # 获取音乐时长
-                duration = self.get_flac_duration(file_path)
-
-                # 记录结果
-                result_line = f"{name_without_ext}\t{duration}"
-                results.append(result_line)
-                self.log_message(f"已处理: {filename} -> {duration}")
-
-                # 更新进度条
-                progress = (i + 1) / total_files * 100
-                self.progress_var.set(progress)
-                self.status_label.config(text=f"处理中... ({i + 1}/{total_files})")
-                self.root.update()
-
-            # 在文本框中显示结果
-            self.output_text.delete(1.0, tk.END)
-            for result in results:
-                self.output_text.insert(tk.END, result + "\n")
-
-            self.log_message(f"\n完成！共处理了 {len(flac_files)} 个文件")
+        self.progress_var.set(0)
+        self.status_label.config(text="正在列出文件...")
+
+        recursive = self.recursive_var.get()
+        last_update = [0.0]
+
+        # 读取线程中调用：限制发往界面的进度消息频率
+        def on_progress(done, total):
+            now = time.monotonic()
+            if now - last_update[0] >= UI_UPDATE_INTERVAL or done == total:
+                last_update[0] = now
+                self.root.after(0, self.show_progress, done, total)
+
+        def worker():
+            try:
+                rows = scan_durations(folder_path, recursive, on_progress=on_progress)
+                self.root.after(0, self.on_scan_complete, rows, None)
+            except Exception as e:
+                self.root.after(0, self.on_scan_complete, None, e)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def show_progress(self, done, total):
+        """显示读取进度（在界面线程中调用）"""
+        self.progress_var.set(done / total * 100 if total else 100)
+        self.status_label.config(text=f"读取时长... ({done}/{total})")
+
+    def on_scan_complete(self, rows, error):
+        """扫描结束（在界面线程中调用）：结果一次性写入文本框"""
+        self.process_button.config(state=tk.NORMAL)
+        if error is not None:
+            self.log_message(f"处理过程中发生错误: {error}")
+            self.status_label.config(text="出错")
+            return
+        if not rows:
+            self.log_message("在指定文件夹中未找到音频文件")
             self.status_label.config(text="完成")
+            return
 
-            # 保存结果到变量，供保存文件使用
-            self.results = results
-            self.save_button.config(state=tk.NORMAL)
+        lines = [format_result_line(row) for row in rows]
+        errors = [f"错误：无法读取文件 {os.path.join(row['dir'], row['name'])} - {row['error']}"
+                  for row in rows if row['duration'] is None]
+        totals = directory_totals(rows)
+        summary = ["", "各目录合计:"]
+        summary += [f"  {total['dir']}\t{total['files']} 个文件\t{format_total(total['duration'])}"
+                    + (f"\t失败 {total['failed']}" if total['failed'] else "") for total in totals[:-1]]
+        summary.append(f"\n完成！共处理了 {len(rows)} 个文件，总时长 {format_total(totals[-1]['duration'])}")
 
-        except Exception as e:
-            self.log_message(f"处理过程中发生错误: {e}")
-        finally:
-            # 重新启用处理按钮
-            self.process_button.config(state=tk.NORMAL)
+        self.output_text.delete(1.0, tk.END)
+        self.output_text.insert(tk.END, "\n".join(lines + errors + summary) + "\n")
+        self.progress_var.set(100)
+        self.status_label.config(text="完成")
+
+        # 保存结果到变量，供保存文件使用
+        self.rows = rows
+        self.results = lines
+        self.save_button.config(state=tk.NORMAL)
 
     def save_to_file(self):
-        """将结果保存到文件"""
-        if not hasattr(self, 'results') or not self.results:
+        """将结果保存到文件（.txt/.tsv/.csv/.json）"""
+        if not hasattr(self, 'rows') or not self.rows:
             self.log_message("没有可保存的结果")
             return
 
@@ -199,17 +363,18 @@ class FLACDurationExtractor:
         # 如果输出文件没有扩展名，添加.txt
         if not os.path.splitext(output_file)[1]:
             output_file += ".txt"
+        elif os.path.splitext(output_file)[1].lower() not in REPORT_FORMATS:
+            self.log_message(f"不支持的输出格式，可用: {', '.join(REPORT_FORMATS)}")
+            return
 
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                for result in self.results:
-                    f.write(result + "\n")
-
-            self.log_message(f"结果已保存到: {os.path.abspath(output_file)}")
+            for path in write_scan_report(self.rows, output_file):
+                self.log_message(f"结果已保存到: {os.path.abspath(path)}")
         except Exception as e:
             self.log_message(f"保存文件时出错: {e}")
 
 
+# 单独运行：在项目根目录执行 python -m tool003.main
 if __name__ == "__main__":
     # 检查命令行参数
     folder_path = None
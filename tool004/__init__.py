@@ -0,0 +1,4 @@
+NAME = "按ID分离文件"
+DESCRIPTION = "依靠文件名中的数字ID批量选取并移动文件"
+MODULE = "tool004.main"
+LAUNCHER = False
@@ -0,0 +1,151 @@
+"""
+文件名中的多ID匹配
+
+ID数量很多时逐个 `id in filename` 检查是 文件数×ID数 的开销。这里把全部ID建成
+Aho-Corasick 自动机，每个文件名只扫描一遍；整词匹配（whole_token）时ID两侧不能
+紧邻字母或数字，避免 1234 匹配到 51234。ID全部由字母数字组成时，整词匹配直接
+把文件名切成字母数字片段后查集合。
+"""
+import csv
+import json
+import os
+import re
+
+# 文件名中的字母数字片段（下划线、点号、空格等都是分隔符）
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+def _is_token_char(ch):
+    return TOKEN_PATTERN.fullmatch(ch) is not None
+
+
+class IDMatcher:
+    """
+    在文件名中查找ID
+
+    Args:
+        ids: ID列表（数字或字符串）
+        whole_token: 只匹配两侧不与字母数字相连的ID
+    """
+
+    def __init__(self, ids, whole_token=False):
+        self.whole_token = whole_token
+        self.ids = list(dict.fromkeys(str(i).strip() for i in ids if str(i).strip()))
+        # 整词匹配且ID都是单个字母数字片段时，切分文件名后查集合即可
+        self._token_set = None
+        if whole_token and all(TOKEN_PATTERN.fullmatch(i) for i in self.ids):
+            self._token_set = set(self.ids)
+        else:
+            self._build_automaton()
+
+    def _build_automaton(self):
+        # goto[状态] = {字符: 状态}，output[状态] = 以该状态结尾的最长ID（没有时为None）
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]
+        for id_str in self.ids:
+            state = 0
+            for ch in id_str:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(None)
+                state = nxt
+            self._output[state] = id_str
+
+        # 按层建立失败指针；dict_link 指向失败链上最近的有输出的状态
+        self._dict_link = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                link = self._fail[nxt]
+                self._dict_link[nxt] = link if self._output[link] is not None else self._dict_link[link]
+                queue.append(nxt)
+
+    def _accept(self, filename, end, id_str):
+        """整词匹配时检查ID两侧的字符"""
+        if not self.whole_token:
+            return True
+        start = end - len(id_str) + 1
+        if start > 0 and _is_token_char(filename[start - 1]):
+            return False
+        if end + 1 < len(filename) and _is_token_char(filename[end + 1]):
+            return False
+        return True
+
+    def iter_matches(self, filename):
+        """依次返回文件名中出现的ID（按结束位置，同一ID可能出现多次）"""
+        if self._token_set is not None:
+            for token in TOKEN_PATTERN.findall(filename):
+                if token in self._token_set:
+                    yield token
+            return
+
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        state = 0
+        for end, ch in enumerate(filename):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = state if output[state] is not None else dict_link[state]
+            while hit:
+                if self._accept(filename, end, output[hit]):
+                    yield output[hit]
+                hit = dict_link[hit]
+
+    def find(self, filename):
+        """返回文件名中第一个匹配的ID，没有时为None"""
+        return next(self.iter_matches(filename), None)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def load_ids(file_path, column=None):
+    """
+    从文件读取ID列表
+
+    .json: ID数组，或含 "ids" 数组的对象
+    .csv:  表头中有 id 列（不区分大小写，或用 column 指定列名）时读取该列，否则读取第一列
+    其他:  文本，每行一个或多个ID（逗号/空白分隔），# 开头为注释
+
+    Returns:
+        去重后的ID字符串列表（保持原顺序）
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.json':
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('ids')
+        if not isinstance(data, list):
+            raise ValueError("JSON中应为ID数组，或含 \"ids\" 数组的对象")
+        ids = [str(item) for item in data]
+    elif ext == '.csv':
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = [row for row in csv.reader(f) if row and row[0].strip()]
+        index = 0
+        if rows:
+            header = [cell.strip().lower() for cell in rows[0]]
+            wanted = (column or 'id').lower()
+            if wanted in header:
+                index = header.index(wanted)
+                rows = rows[1:]
+            elif column:
+                raise ValueError(f"CSV中没有列: {column}")
+        ids = [row[index] for row in rows if index < len(row)]
+    else:
+        ids = []
+        with open(file_path, 'r', encoding='utf-8-sig') as f:
+            for line in f:
+                line = line.split('#', 1)[0]
+                ids.extend(re.split(r"[,\s]+", line))
+    return list(dict.fromkeys(i.strip() for i in ids if i.strip()))
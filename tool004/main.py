@@ -1,107 +1,78 @@
 import os
-import shutil
 
+from common.file_mover import COPY_WORKERS, execute_moves, plan_moves
+from tool004.id_matcher import IDMatcher, load_ids
 
-def separate_files_by_ids(source_folder, target_folder, id_list):
+
+def separate_files_by_ids(source_folder, target_folder, id_list, whole_token=False, matcher=None,
+                          conflict="overwrite", dry_run=False, max_workers=COPY_WORKERS):
     """
     将源文件夹中含有特定数字ID的文件分离到目标文件夹
 
+    每个文件名只扫描一遍（多ID自动机），与ID数量无关。先规划全部移动再执行：
+    同盘直接改名，跨盘由复制线程池并行复制。
+
     Args:
         source_folder (str): 源文件夹路径
         target_folder (str): 目标文件夹路径
         id_list (list): 数字ID列表
+        whole_token (bool): 整词匹配，ID两侧不能紧邻字母或数字（1234 不匹配 51234）
+        matcher (IDMatcher): 已建好的匹配器（批量处理多个文件夹时共用），提供时忽略 id_list 和 whole_token
+        conflict (str): 目标已存在时的策略 skip/overwrite/rename（整批相同）
+        dry_run (bool): 只输出计划，不移动
+        max_workers (int): 跨盘复制的线程数
+
+    Returns:
+        (处理文件数, 移动文件数)
     """
-    # 确保目标文件夹存在
-    if not os.path.exists(target_folder):
-        os.makedirs(target_folder)
-
-    # 将数字ID转换为字符串，便于查找
-    id_strings = [str(id_num) for id_num in id_list]
-
-    # 统计变量
-    moved_count = 0
-    total_files = 0
-
-    # 遍历源文件夹中的所有文件
-    for filename in os.listdir(source_folder):
-        file_path = os.path.join(source_folder, filename)
-
-        # 只处理文件，不处理文件夹
-        if os.path.isfile(file_path):
-            total_files += 1
-
-            # 检查文件名是否包含任一数字ID
-            for id_str in id_strings:
-                if id_str in filename:
-                    # 构建目标文件路径
-                    target_path = os.path.join(target_folder, filename)
-
-                    # 移动文件
-                    shutil.move(file_path, target_path)
-                    moved_count += 1
-                    print(f"已移动: {filename}")
-                    break  # 找到匹配后跳出内层循环
-
+    if matcher is None:
+        matcher = IDMatcher(id_list, whole_token)
+
+    # 遍历源文件夹中的所有文件（只处理文件，不处理文件夹）
+    with os.scandir(source_folder) as entries:
+        files = [entry.name for entry in entries if entry.is_file()]
+    total_files = len(files)
+
+    # 检查文件名是否包含任一数字ID
+    pairs = [(os.path.join(source_folder, filename), os.path.join(target_folder, filename))
+             for filename in files if matcher.find(filename) is not None]
+    plan = plan_moves(pairs, conflict)
+
+    if dry_run:
+        for line in plan.describe():
+            print(line)
+        print(f"\n预览完成（未移动文件），总共处理文件数: {total_files}")
+        return total_files, 0
+
+    os.makedirs(target_folder, exist_ok=True)
+    result = execute_moves(plan, max_workers)
+    for src, _ in result['moved']:
+        print(f"已移动: {os.path.basename(src)}")
+    for src, _, error in result['failed']:
+        print(f"移动失败: {os.path.basename(src)} - {error}")
+    for src, _, reason in plan.skipped:
+        print(f"已跳过: {os.path.basename(src)}（{reason}）")
+    for src, error in plan.errors:
+        print(f"错误: {os.path.basename(src)} - {error}")
+
+    moved_count = len(result['moved'])
     print(f"\n分离完成！")
     print(f"总共处理文件数: {total_files}")
     print(f"成功移动文件数: {moved_count}")
+    return total_files, moved_count
 
 
-# 要查找的数字ID列表
-target_ids = [
-    10117227,
-    57045797,
-    69411733,
-    83734452,
-    118599416,
-    123534417,
-    154693135,
-    175679783,
-    176359323,
-    188095415,
-    197464413,
-    225284797,
-    225487733,
-    304165978,
-    312025219,
-    344670814,
-    351114616,
-    376189799,
-    398504901,
-    406299063,
-    422006722,
-    451824903,
-    457021451,
-    533887731,
-    568141208,
-    582953320,
-    630087737,
-    651599959,
-    665608075,
-    673548794,
-    745765777,
-    783140677,
-    788089835,
-    791091089,
-    795747288,
-    816342641,
-    880876879,
-    931970440,
-    936295416,
-    948258271,
-    1033945089,
-    1034508063,
-    1042605695,
-
-]
-
 # 使用示例
+# 单独运行：在项目根目录执行 python -m tool004.main
 if __name__ == "__main__":
     # 设置源文件夹路径（请修改为实际路径）
-    source_directory = "E:\Kin-Audio\星塔旅人\wem"
+    source_directory = r"E:\Kin-Audio\星塔旅人\wem"
 
     # 设置目标文件夹路径（请修改为实际路径）
-    target_directory = "E:\Kin-Audio\星塔旅人\System"
+    target_directory = r"E:\Kin-Audio\星塔旅人\System"
+
+    # 要查找的数字ID列表文件（.txt 每行一个 / .csv 的 id 列 / .json 数组）
+    ids_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "target_ids.txt")
 
     # 执行文件分离
-    separate_files_by_ids(source_directory, target_directory, target_ids)
\ No newline at end of file
+    separate_files_by_ids(source_directory, target_directory, load_ids(ids_file), whole_token=False)
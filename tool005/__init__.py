@@ -0,0 +1,4 @@
+NAME = "Spine导出渲染"
+DESCRIPTION = "使用spine将json文件转化为spine文件并渲染导出"
+MODULE = "tool005.main"
+LAUNCHER = False
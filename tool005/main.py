@@ -1,64 +1,196 @@
 import subprocess
 import os
 import json
+import shutil
+import tempfile
 
+from common.fs_index import list_files
+from common.scheduler import JobScheduler
 
-def exportSpineJson(input_json_path, out_path=None):
-    SPINE_EXE = r"D:\Program Files (Green)\spinepro_3.8.75\Spine.exe"
-    _INPUT_JSON = input_json_path
-    nowdir = os.getcwd()
-    Export_JSON = rf"{nowdir}\template.export.json"
-    OUTPUT_SPINE = rf"{nowdir}\cache.spine"
-
-    cmd = [
-        SPINE_EXE,
-        "-i", _INPUT_JSON,
-        "-o", OUTPUT_SPINE,
-        "-r", "cache"
-    ]
+# 配置文件（可选）：{"spine_exe": "...", "export_template": "...", "workers": 4}
+# spine_exe 也可以是命令列表（如 ["python", "stub_spine.py"]），便于用替身程序测试
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+
+# 指定Spine可执行文件的环境变量（优先于配置文件）
+SPINE_EXE_ENV = "SPINE_EXE"
+
+# 默认的导出设置模板（只读取，不再改写）
+DEFAULT_TEMPLATE = "template.export.json"
+
+# 每个任务的临时项目目录所在位置
+WORK_ROOT = "./cache/spine_export"
+
+# 报错时保留的输出行数
+OUTPUT_TAIL_LINES = 20
+
+
+class SpineExportError(Exception):
+    """Spine命令行导入或导出失败"""
+
+
+def load_config(config_path=CONFIG_PATH):
+    """读取配置文件，不存在时返回空字典"""
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def spine_command(spine_exe=None, config=None):
+    """
+    确定Spine命令（列表形式）
+
+    依次使用：参数、环境变量 SPINE_EXE、配置文件的 spine_exe、PATH 中的 Spine
+
+    Raises:
+        FileNotFoundError: 找不到Spine
+    """
+    if config is None:
+        config = load_config()
+    spine_exe = spine_exe or os.environ.get(SPINE_EXE_ENV) or config.get("spine_exe") or shutil.which("Spine")
+    if not spine_exe:
+        raise FileNotFoundError(f"未配置Spine：设置环境变量 {SPINE_EXE_ENV}，或在 {CONFIG_PATH} 中填写 spine_exe")
+    return list(spine_exe) if isinstance(spine_exe, (list, tuple)) else [spine_exe]
+
+
+def _run(cmd, timeout=None):
+    """运行Spine命令，失败时抛出带输出末尾的 SpineExportError"""
     try:
-        print(f"正在导入 {_INPUT_JSON} 到 Spine 项目...")
-        subprocess.run(cmd, check=True)
-        print(f"成功创建 Spine 项目: {OUTPUT_SPINE}")
-    except subprocess.CalledProcessError as e:
-        print(f"导入失败: {e}")
-    except Exception as e:
-        print(f"发生错误: {e}")
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, errors='replace', timeout=timeout)
+    except (OSError, subprocess.SubprocessError) as e:
+        raise SpineExportError(f"无法运行Spine: {e}") from e
+    if result.returncode != 0:
+        tail = "\n".join(result.stdout.strip().splitlines()[-OUTPUT_TAIL_LINES:])
+        raise SpineExportError(f"Spine退出码 {result.returncode}\n{tail}")
+
+
+def export_output_path(input_json_path, animation_count, out_path=None):
+    """只有一个动画时输出为同名 .mov，否则输出到目录（每个动画一个文件）"""
+    if animation_count == 1:
+        if out_path:
+            _path = os.path.join(out_path, os.path.split(input_json_path)[1])
+        else:
+            _path = input_json_path
+        return os.path.splitext(_path)[0] + ".mov"
+    return out_path or os.path.split(input_json_path)[0]
+
+
+def export_spine_json(input_json_path, out_path=None, spine_exe=None, template_path=None,
+                      work_root=WORK_ROOT, timeout=None, keep_workspace=False):
+    """
+    导入Spine JSON并渲染导出
+
+    每个任务使用独立的临时目录存放项目文件和导出设置，多个导出可以同时运行。
+
+    Args:
+        input_json_path: Spine JSON 文件
+        out_path: 输出目录，默认与输入相同
+        spine_exe: Spine可执行文件（或命令列表），默认按 spine_command 查找
+        template_path: 导出设置模板，默认为配置中的 export_template 或当前目录的 template.export.json
+        timeout: 每个Spine命令的超时（秒）
+        keep_workspace: 保留临时目录（排查问题用）
+
+    Returns:
+        输出路径
+
+    Raises:
+        SpineExportError: 导入或导出失败
+    """
+    config = load_config()
+    command = spine_command(spine_exe, config)
+    template_path = template_path or config.get("export_template") or DEFAULT_TEMPLATE
 
     # 读取JSON文件
-    with open(_INPUT_JSON, 'r', encoding='utf-8') as file:
+    with open(input_json_path, 'r', encoding='utf-8') as file:
         ijdata = json.load(file)
-    with open(Export_JSON, 'r', encoding='utf-8') as file:
+    with open(template_path, 'r', encoding='utf-8') as file:
         ejdata = json.load(file)
-    if len(ijdata["animations"]) == 1:
-        if out_path:
-            _path = os.path.join(out_path, os.path.split(_INPUT_JSON)[1])
-        else:
-            _path = _INPUT_JSON
-        ejdata["output"] = _path.replace(".json", ".mov")
-    else:
-        if out_path:
-            ejdata["output"] = out_path
-        else:
-            ejdata["output"] = os.path.split(_INPUT_JSON)[0]
-    ejdata["project"] = OUTPUT_SPINE
-    with open(Export_JSON, 'w', encoding='utf-8') as file:
-        json.dump(ejdata, file, ensure_ascii=False, indent=4)
-    cmd = [
-        SPINE_EXE,
-        "-e", Export_JSON
-    ]
+
+    name = os.path.splitext(os.path.basename(input_json_path))[0]
+    # 工作目录使用绝对路径：export.json 中的相对 project 会被Spine按它自己的工作目录解析
+    work_root = os.path.abspath(work_root)
+    os.makedirs(work_root, exist_ok=True)
+    workspace = tempfile.mkdtemp(prefix=f"{name}_", dir=work_root)
+    try:
+        project = os.path.join(workspace, "project.spine")
+        export_json = os.path.join(workspace, "export.json")
+
+        # 骨架名使用文件名：多个动画导出到同一目录时文件名不会冲突
+        _run(command + ["-i", os.path.abspath(input_json_path), "-o", project, "-r", name], timeout)
+
+        output = export_output_path(os.path.abspath(input_json_path), len(ijdata.get("animations", {})), out_path)
+        ejdata["output"] = os.path.abspath(output)
+        ejdata["project"] = project
+        with open(export_json, 'w', encoding='utf-8') as file:
+            json.dump(ejdata, file, ensure_ascii=False, indent=4)
+        _run(command + ["-e", export_json], timeout)
+        return output
+    finally:
+        if not keep_workspace:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+def exportSpineJson(input_json_path, out_path=None):
+    """导入并渲染导出单个Spine JSON（打印结果，不抛出异常）"""
     try:
-        print(f"正在渲染导出 {_INPUT_JSON} ...")
-        subprocess.run(cmd, check=True)
-        print(f"成功导出: {_INPUT_JSON}")
-    except subprocess.CalledProcessError as e:
-        print(f"导入失败: {e}")
+        print(f"正在导出 {input_json_path} ...")
+        output = export_spine_json(input_json_path, out_path)
+        print(f"成功导出: {output}")
     except Exception as e:
-        print(f"发生错误: {e}")
+        print(f"导出失败: {e}")
+
+
+def is_skeleton_json(file_path):
+    """根据开头内容判断是否为Spine骨架JSON（排除导出设置等其他JSON）"""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+            head = file.read(4096)
+    except OSError:
+        return False
+    return '"skeleton"' in head and '"bones"' in head
+
+
+def find_skeleton_jsons(inputs):
+    """展开输入：JSON文件直接使用，目录递归查找骨架JSON"""
+    paths = []
+    for item in inputs:
+        if os.path.isfile(item):
+            paths.append(item)
+        else:
+            paths.extend(path for path in list_files(item, {".json"}) if is_skeleton_json(path))
+    return paths
+
+
+def export_spine_batch(inputs, out_path=None, max_workers=None, spine_exe=None, template_path=None, on_done=None):
+    """
+    并行导出多个Spine JSON
+
+    Args:
+        inputs: JSON文件或目录列表
+        max_workers: 同时运行的Spine进程数，默认为配置中的 workers 或CPU核心数
+        on_done: 每个任务结束时的回调 on_done(job, finished_count, total_count)
+
+    Returns:
+        任务列表（job.result 为输出路径，job.error 为错误信息）
+    """
+    config = load_config()
+    # 提前确定命令和模板，找不到时直接报错而不是每个任务都失败
+    command = spine_command(spine_exe, config)
+    template_path = os.path.abspath(template_path or config.get("export_template") or DEFAULT_TEMPLATE)
+    scheduler = JobScheduler(max_workers=max_workers or config.get("workers"))
+    for path in find_skeleton_jsons(inputs):
+        scheduler.submit(path, export_spine_json, path, out_path, command, template_path)
+    return scheduler.run(on_done)
 
 
 # 使用示例
+# 单独运行：在项目根目录执行 python -m tool005.main
 if __name__ == "__main__":
-    INPUT_JSON = r"E:\Unpack\尘白禁区\登录界面spine\sp_login_bg019\sp_login_bg019.json"
-    exportSpineJson(INPUT_JSON)
+    INPUT_DIR = r"E:\Unpack\尘白禁区\登录界面spine"
+
+    def report(job, finished, total):
+        status = f"成功导出: {job.result}" if job.ok else f"导出失败: {job.error}"
+        print(f"[{finished}/{total}] {job.name} - {status}")
+
+    export_spine_batch([INPUT_DIR], on_done=report)
@@ -0,0 +1,4 @@
+NAME = "内嵌歌词提取脚本"
+DESCRIPTION = "提取音乐文件内嵌的歌词"
+MODULE = "tool006.main"
+LAUNCHER = False
@@ -1,56 +1,41 @@
 import os
-from mutagen.id3 import ID3
-from mutagen.flac import FLAC
-from mutagen.mp4 import MP4
+
+from common.lyrics import NO_LYRICS, OUTCOME_LABELS, extract_lyrics_file, extract_lyrics_tree
 
 
 def extract_lyrics_from_audio(audio_file_path):
+    """提取单个音频文件的内嵌歌词到同名txt，返回txt路径（没有歌词时返回None）"""
     if not os.path.exists(audio_file_path):
         print(f"文件不存在: {audio_file_path}")
         return
 
-    lyrics = None
-
-    # 根据文件类型处理
-    if audio_file_path.lower().endswith(".mp3"):
-        try:
-            audio = ID3(audio_file_path)
-            if "USLT::'eng'" in audio:  # 英文歌词标签
-                lyrics = audio["USLT::'eng'"].text
-        except Exception as e:
-            print(f"解析MP3失败: {e}")
-
-    elif audio_file_path.lower().endswith(".flac"):
-        try:
-            audio = FLAC(audio_file_path)
-            if "lyrics" in audio:
-                lyrics = "\n".join(audio["lyrics"])
-        except Exception as e:
-            print(f"解析FLAC失败: {e}")
-
-    elif audio_file_path.lower().endswith(".m4a"):
-        try:
-            audio = MP4(audio_file_path)
-            if "\xa9lyr" in audio:  # iTunes歌词标签
-                lyrics = audio["\xa9lyr"][0]
-        except Exception as e:
-            print(f"解析M4A失败: {e}")
-
-    else:
-        print("不支持的文件格式")
+    try:
+        outcome, txt_file_path = extract_lyrics_file(audio_file_path, suffix=".txt")
+    except Exception as e:
+        print(f"解析失败: {audio_file_path} - {e}")
         return
 
-    # 如果有歌词，写入txt文件
-    if lyrics:
-        txt_file_path = os.path.splitext(audio_file_path)[0] + ".txt"
-        with open(txt_file_path, "w", encoding="utf-8") as f:
-            f.write(lyrics)
-        print(f"歌词已提取到: {txt_file_path}")
-        return txt_file_path
-    else:
+    if outcome == NO_LYRICS:
         print(f"未找到歌词: {audio_file_path}")
         return
+    print(f"歌词已提取到: {txt_file_path}（{OUTCOME_LABELS[outcome]}）")
+    return txt_file_path
+
+
+def extract_lyrics_from_folder(folder_path, max_workers=None):
+    """递归提取文件夹中全部音频的内嵌歌词到同名txt（只写入有歌词且内容变化的文件）"""
+    def report(job, finished, total):
+        if not job.ok:
+            print(f"解析失败: {job.name} - {job.error}")
+        elif job.result[0] != NO_LYRICS:
+            print(f"[{finished}/{total}] {job.result[1]}（{OUTCOME_LABELS[job.result[0]]}）")
+
+    total, jobs = extract_lyrics_tree([folder_path], ".txt", max_workers, report)
+    print(f"完成: 共 {total} 个音频文件，含歌词 {sum(1 for job in jobs if job.ok and job.result[0] != NO_LYRICS)} 个")
+    return jobs
 
 
 # 示例调用
-extract_lyrics_from_audio(r"E:\Kin-Audio\新建文件夹 (3)\夏霞 - あたらよ.mp3")  # 支持MP3/FLAC/M4A等
+# 单独运行：在项目根目录执行 python -m tool006.main
+if __name__ == "__main__":
+    extract_lyrics_from_audio(r"E:\Kin-Audio\新建文件夹 (3)\夏霞 - あたらよ.mp3")  # 支持MP3/FLAC/M4A/OPUS/OGG/WAV
@@ -0,0 +1,4 @@
+NAME = "LRC转SRT（拆分重复时间戳）"
+DESCRIPTION = "lrc转srt文件，并对复数相同时间戳进行拆分到多个srt文件"
+MODULE = "tool007.main"
+LAUNCHER = False
@@ -0,0 +1,4 @@
+NAME = "LRC转SRT"
+DESCRIPTION = "lrc转srt文件"
+MODULE = "tool008.main"
+LAUNCHER = False
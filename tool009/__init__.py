@@ -0,0 +1,4 @@
+NAME = "LRC拆分"
+DESCRIPTION = "LRC文件拆分为多段"
+MODULE = "tool009.main"
+LAUNCHER = False
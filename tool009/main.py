@@ -16,4 +16,5 @@ def split_lrc_file_simple(input_file, lines_per_file=300):
 
 
 # 使用
-split_lrc_file_simple(r"D:\Kin-project\PythonProjects\JAConverter\test1\test1-o2.TXT", 300)
\ No newline at end of file
+if __name__ == "__main__":
+    split_lrc_file_simple(r"D:\Kin-project\PythonProjects\JAConverter\test1\test1-o2.TXT", 300)
\ No newline at end of file
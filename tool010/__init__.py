@@ -0,0 +1,5 @@
+NAME = "繁简字转换工具"
+DESCRIPTION = "批量转换文本文件中的繁简字，支持多种转换模式"
+MODULE = "tool010.main"
+GUI = "BatchChineseConverter"
+LAUNCHER = True
@@ -2,12 +2,53 @@ from opencc import OpenCC
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
+import shutil
 import threading
 
+from common.manifest import Manifest
+
+# 每个进程按需创建的转换器缓存
+_converter_cache = {}
+
+
+def get_converter(conversion_type):
+    """获取（并缓存）指定类型的OpenCC转换器"""
+    if conversion_type not in _converter_cache:
+        _converter_cache[conversion_type] = OpenCC(conversion_type)
+    return _converter_cache[conversion_type]
+
+
+def convert_text_file(file_path, cc, create_backup=True):
+    """
+    转换单个文本文件的繁简字并写回原文件
+
+    Args:
+        file_path: 文本文件路径
+        cc: OpenCC转换器实例或转换类型（如 's2t'）
+        create_backup: 是否创建 .bak 备份
+    """
+    if isinstance(cc, str):
+        cc = get_converter(cc)
+
+    # 创建备份
+    if create_backup:
+        shutil.copy2(file_path, file_path + '.bak')
+
+    # 读取和转换文件
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    converted_content = cc.convert(content)
+
+    # 写回原文件
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(converted_content)
+
 
 class BatchChineseConverter:
-    def __init__(self):
-        self.root = tk.Tk()
+    def __init__(self, root=None):
+        # 可嵌入到启动器的Toplevel中，单独运行时自建主窗口
+        self.root = root if root is not None else tk.Tk()
         self.root.title("中文繁简转换工具")
         self.root.geometry("600x500")
 
@@ -70,6 +111,11 @@ class BatchChineseConverter:
         ttk.Checkbutton(settings_frame, text="创建备份文件 (.bak)",
                         variable=self.backup_var).grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=(10, 0))
 
+        # 跳过已转换的文件
+        self.skip_unchanged_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(settings_frame, text="跳过已按相同类型转换且未变化的文件",
+                        variable=self.skip_unchanged_var).grid(row=2, column=0, columnspan=2, sticky=tk.W)
+
         # 进度显示
         progress_frame = ttk.Frame(main_frame)
         progress_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
@@ -87,7 +133,7 @@ class BatchChineseConverter:
         ttk.Button(button_frame, text="开始转换",
                    command=self.start_conversion).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="退出",
-                   command=self.root.quit).pack(side=tk.LEFT)
+                   command=self.root.destroy).pack(side=tk.LEFT)
 
         # 配置网格权重
         main_frame.columnconfigure(0, weight=1)
@@ -162,30 +208,24 @@ class BatchChineseConverter:
 
         total_files = len(self.selected_files)
         success_count = 0
+        manifest = Manifest("tool010", {"mode": conversion_type})
+        skip_unchanged = self.skip_unchanged_var.get()
 
         self.progress['maximum'] = total_files
         self.progress['value'] = 0
 
         for i, file_path in enumerate(self.selected_files):
             try:
+                # 已转换过且之后未修改的文件（原地转换，记录的是转换后的状态）
+                if skip_unchanged and manifest.is_current(file_path):
+                    success_count += 1
+                    continue
+
                 # 更新进度
                 self.update_status(f"正在转换: {os.path.basename(file_path)} ({i + 1}/{total_files})")
 
-                # 创建备份
-                if create_backup:
-                    backup_path = file_path + '.bak'
-                    import shutil
-                    shutil.copy2(file_path, backup_path)
-
-                # 读取和转换文件
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                converted_content = cc.convert(content)
-
-                # 写回原文件
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(converted_content)
+                convert_text_file(file_path, cc, create_backup)
+                manifest.record(file_path)
 
                 success_count += 1
 
@@ -271,6 +311,7 @@ class SimpleBatchConverter:
 
 
 # 使用示例
+# 单独运行：在项目根目录执行 python -m tool010.main
 if __name__ == "__main__":
     # 使用GUI版本
     app = BatchChineseConverter()
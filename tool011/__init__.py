@@ -0,0 +1,5 @@
+NAME = "SRT转LRC"
+DESCRIPTION = "srt文件转化为lrc文件"
+MODULE = "tool011.main"
+GUI = "SRTtoLRCConverterGUI"
+LAUNCHER = False
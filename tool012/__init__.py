@@ -0,0 +1,4 @@
+NAME = "LRC合并"
+DESCRIPTION = "多段LRC文件合一"
+MODULE = "tool012.main"
+LAUNCHER = False
@@ -0,0 +1,5 @@
+NAME = "音频音量标准化工具"
+DESCRIPTION = "将音频文件音量标准化到指定LUFS值，支持多种音频格式"
+MODULE = "tool013.main"
+GUI = "AudioNormalizerGUI"
+LAUNCHER = True
@@ -3,6 +3,75 @@ import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import threading
+import time
+
+from common import trace
+from common.ffmpeg_pool import FFmpegCancelled, FFmpegPool, probe_duration, run_ffmpeg
+from common.manifest import Manifest
+
+# 支持的音频文件后缀
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.wav', '.m4a', '.aac', '.ogg')
+
+# 界面进度刷新的最短间隔（秒）
+UI_UPDATE_INTERVAL = 0.1
+
+
+def normalize_audio(input_path, output_path, loudnorm="-16", threads=1, cancel_event=None, on_progress=None):
+    """
+    使用ffmpeg的loudnorm滤镜标准化单个音频文件
+
+    Args:
+        input_path: 输入音频路径
+        output_path: 输出音频路径（与输入相同时覆盖原文件）
+        loudnorm: 目标LUFS值
+        threads: ffmpeg线程数（并行处理多个文件时保持为1）
+        cancel_event: 设置后终止ffmpeg
+        on_progress: 进度回调 on_progress(已处理秒数, 比例或None)
+
+    Returns:
+        (是否成功, 错误信息)
+    """
+    with trace.span("file", input_path) as file_span:
+        success, error = _normalize_audio(input_path, output_path, loudnorm, threads, cancel_event, on_progress)
+        file_span.ok = success
+        return success, error
+
+
+def _normalize_audio(input_path, output_path, loudnorm, threads, cancel_event, on_progress):
+    in_place = os.path.abspath(input_path) == os.path.abspath(output_path)
+    if in_place:
+        # 在原文件夹处理，先写到临时文件再替换
+        name, ext = os.path.splitext(output_path)
+        temp_path = f"{name}_temp{ext}"
+    else:
+        temp_path = output_path
+
+    cmd = ['ffmpeg', '-i', input_path, '-threads', str(threads), '-af', f'loudnorm=i={loudnorm}', temp_path, '-y']
+    duration = None
+    if on_progress:
+        with trace.span("probe", input_path):
+            duration = probe_duration(input_path)
+    try:
+        with trace.span("ffmpeg", input_path) as s:
+            returncode, stderr = run_ffmpeg(cmd, duration, on_progress, cancel_event)
+            s.bytes_read = trace.file_size(input_path)
+            s.bytes_written = trace.file_size(temp_path) if returncode == 0 else 0
+    except FFmpegCancelled:
+        # 删除未写完的输出
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if returncode != 0:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False, stderr[-200:]
+
+    if in_place:
+        # 用临时文件替换原文件
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        os.rename(temp_path, output_path)
+    return True, ""
 
 
 class AudioNormalizerGUI:
@@ -16,6 +85,7 @@ class AudioNormalizerGUI:
         self.audio_folder_var = tk.StringVar(value="")
         self.output_folder_var = tk.StringVar(value="")
         self.same_folder_var = tk.BooleanVar(value=False)
+        self.skip_unchanged_var = tk.BooleanVar(value=True)
 
         # 进度跟踪变量（需要在create_widgets之前初始化）
         self.progress_var = tk.DoubleVar(value=0)
@@ -26,6 +96,7 @@ class AudioNormalizerGUI:
         self.total_files = 0
         self.processed_files = 0
         self.processing = False
+        self.pool = None
 
         # 创建UI
         self.create_widgets()
@@ -52,6 +123,8 @@ class AudioNormalizerGUI:
 
         tk.Checkbutton(output_frame, text="在原文件夹处理(覆盖原文件)",
                        variable=self.same_folder_var, command=self.toggle_output_folder).pack(anchor="w")
+        tk.Checkbutton(output_frame, text="跳过已按相同LUFS处理且未变化的文件",
+                       variable=self.skip_unchanged_var).pack(anchor="w")
 
         output_path_frame = tk.Frame(output_frame)
         output_path_frame.pack(fill=tk.X, pady=5)
@@ -137,9 +210,12 @@ class AudioNormalizerGUI:
             self.output_folder_var.set(folder)
 
     def log_message(self, message):
+        """记录日志（可在工作线程中调用，由界面线程写入）"""
+        self.root.after(0, self._append_log, message)
+
+    def _append_log(self, message):
         self.log_text.insert(tk.END, message + "\n")
         self.log_text.see(tk.END)
-        self.root.update()
 
     def clear_log(self):
         self.log_text.delete(1.0, tk.END)
@@ -156,7 +232,7 @@ class AudioNormalizerGUI:
 
         # 检查输入文件夹
         if not _input or not os.path.exists(_input):
-            messagebox.showerror("错误", "请输入有效的输入文件夹路径！")
+            self.root.after(0, messagebox.showerror, "错误", "请输入有效的输入文件夹路径！")
             self.processing = False
             return
 
@@ -166,7 +242,7 @@ class AudioNormalizerGUI:
         else:
             _output = self.output_folder_var.get()
             if not _output:
-                messagebox.showerror("错误", "请输入输出文件夹路径或选择'在原文件夹处理'！")
+                self.root.after(0, messagebox.showerror, "错误", "请输入输出文件夹路径或选择'在原文件夹处理'！")
                 self.processing = False
                 return
 
@@ -177,14 +253,14 @@ class AudioNormalizerGUI:
         # 获取音频文件列表
         audio_files = []
         for filename in os.listdir(_input):
-            if filename.lower().endswith(('.mp3', '.flac', '.wav', '.m4a', '.aac', '.ogg')):
+            if filename.lower().endswith(AUDIO_EXTENSIONS):
                 audio_files.append(filename)
 
         self.total_files = len(audio_files)
         self.processed_files = 0
 
         if self.total_files == 0:
-            messagebox.showwarning("警告", "输入文件夹中没有找到支持的音频文件！")
+            self.root.after(0, messagebox.showwarning, "警告", "输入文件夹中没有找到支持的音频文件！")
             self.processing = False
             return
 
@@ -195,53 +271,55 @@ class AudioNormalizerGUI:
         else:
             self.log_message(f"输出到: {_output}")
 
-        # 处理每个文件
-        for i, filename in enumerate(audio_files):
-            if not self.processing:
-                break
+        manifest = Manifest("tool013", {"lufs": loudnorm})
+        skip_unchanged = self.skip_unchanged_var.get()
 
+        # 多个ffmpeg并行处理，并行数按CPU核心数确定
+        self.pool = FFmpegPool()
+        skipped = 0
+        for filename in audio_files:
             _input_path = os.path.join(_input, filename)
-
-            # 如果在原文件夹处理，需要创建一个临时文件名
-            if self.same_folder_var.get():
-                name, ext = os.path.splitext(filename)
-                temp_filename = f"{name}_temp{ext}"
-                _output_path = os.path.join(_output, temp_filename)
-                final_output_path = os.path.join(_output, filename)
+            _output_path = os.path.join(_output, filename)
+
+            if skip_unchanged and manifest.is_current(_input_path, [_output_path]):
+                self.log_message(f"- 跳过未变化: {filename}")
+                self.processed_files += 1
+                skipped += 1
+                continue
+
+            self.pool.submit(filename, normalize_audio, _input_path, _output_path, loudnorm)
+        self.root.after(0, self.update_progress)
+        self.log_message(f"并行处理数: {min(self.pool.max_workers, max(len(self.pool.jobs), 1))}")
+
+        last_update = [0.0]
+
+        # 多个ffmpeg工作线程同时调用：限制发往界面的进度消息频率
+        def on_progress(job, seconds, fraction):
+            now = time.monotonic()
+            if fraction is not None and now - last_update[0] >= UI_UPDATE_INTERVAL:
+                last_update[0] = now
+                self.root.after(0, self.current_file_var.set, f"正在处理: {job.name} {fraction:.0%}")
+
+        def on_done(job, finished, total):
+            filename = job.name
+            if not job.ok:
+                self.log_message(f"✗ 异常: {filename} - {job.error}")
+            elif job.result[0]:
+                manifest.record(job.args[0], [job.args[1]])
+                self.log_message(f"✓ 完成: {filename} ({job.elapsed:.1f}s)")
             else:
-                _output_path = os.path.join(_output, filename)
-                final_output_path = _output_path
-
-            self.current_file_var.set(f"正在处理: {filename}")
-            self.log_message(f"处理: {filename}")
-
-            try:
-                # 构建ffmpeg命令
-                cmd = f'ffmpeg -i "{_input_path}" -threads 8 -af loudnorm=i={loudnorm} "{_output_path}" -y'
-
-                # 执行命令
-                process = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='utf-8')
-
-                if process.returncode == 0:
-                    # 如果是在原文件夹处理，需要替换原文件
-                    if self.same_folder_var.get():
-                        # 删除原文件
-                        if os.path.exists(final_output_path):
-                            os.remove(final_output_path)
-                        # 重命名临时文件
-                        os.rename(_output_path, final_output_path)
-
-                    self.log_message(f"✓ 完成: {filename}")
-                else:
-                    self.log_message(f"✗ 错误: {filename} - {process.stderr[:100]}")
-
-            except Exception as e:
-                self.log_message(f"✗ 异常: {filename} - {str(e)}")
-
+                self.log_message(f"✗ 错误: {filename} - {job.result[1]}")
             self.processed_files += 1
-            self.update_progress()
+            self.root.after(0, self.update_progress)
+
+        with trace.run("tool013", log=self.log_message):
+            trace.count("跳过未变化", skipped)
+            self.pool.run(on_done, on_progress)
+        self.pool = None
+        self.root.after(0, self.on_processing_done)
 
-        # 处理完成
+    def on_processing_done(self):
+        """处理结束（在界面线程中调用）"""
         if self.processing:
             self.status_var.set(f"处理完成: {self.processed_files}/{self.total_files} 个文件")
             self.current_file_var.set("")
@@ -287,6 +365,9 @@ class AudioNormalizerGUI:
         self.processing = False
         self.status_var.set("正在停止...")
         self.log_message("用户请求停止处理...")
+        if self.pool is not None:
+            # 终止正在运行的ffmpeg，未开始的文件不再处理
+            self.pool.cancel()
 
 
 def main():
@@ -295,5 +376,6 @@ def main():
     root.mainloop()
 
 
+# 单独运行：在项目根目录执行 python -m tool013.main
 if __name__ == "__main__":
     main()
\ No newline at end of file
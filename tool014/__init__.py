@@ -0,0 +1,4 @@
+NAME = "图片音频批量制作视频"
+DESCRIPTION = "使用音乐文件和单张图片，批量制作视频"
+MODULE = "tool014.main"
+LAUNCHER = False
@@ -1,22 +1,42 @@
-import subprocess
 import os
 
+from common.ffmpeg_pool import FFmpegPool, probe_duration, run_ffmpeg
 
-def mkmp4(_audio_folder, pic_path, _out_dir):
+# 视频编码每个ffmpeg使用的线程数，并行数 = 核心数 / 该值
+VIDEO_THREADS = 4
+
+
+def make_video(_audio_path, pic_path, out, threads=VIDEO_THREADS, cancel_event=None, on_progress=None):
+    """使用单张图片和一个音频文件制作视频"""
+    cmd = ["ffmpeg", "-loop", "1", "-y", "-i", pic_path, "-i", _audio_path, "-shortest", "-threads", str(threads),
+           "-r", "24", "-b:v", "2400k", "-b:a", "320k", "-c:v", "h264_amf", out]
+    duration = probe_duration(_audio_path) if on_progress else None
+    returncode, _ = run_ffmpeg(cmd, duration, on_progress, cancel_event)
+    return returncode == 0
+
+
+def mkmp4(_audio_folder, pic_path, _out_dir, max_workers=None):
     if not os.path.exists(_out_dir):
         os.makedirs(_out_dir)
+    pool = FFmpegPool(max_workers, threads_per_job=VIDEO_THREADS)
     for filename in os.listdir(_audio_folder):
         if filename.lower().endswith(('.mp3', '.flac', '.wav')):
             # 构建输入和输出路径
             _audio_path = os.path.join(_audio_folder, filename)
             out = os.path.join(_out_dir, os.path.splitext(filename.lower())[0]+".mp4")
-            cmd = f"ffmpeg -loop 1 -y -i {pic_path} -i {_audio_path} -shortest -threads 8 -r 24 -b:v 2400k -b:a 320k  -c:v h264_amf {out}"
-            ffmpeger = subprocess.Popen(cmd, shell=True, stdin=subprocess.PIPE)
-            ffmpeger.communicate()
+            pool.submit(filename, make_video, _audio_path, pic_path, out)
+
+    def on_done(job, finished, total):
+        status = "✓" if job.ok and job.result else "✗"
+        print(f"[{finished}/{total}] {status} {job.name} ({job.elapsed:.1f}s)")
+
+    pool.run(on_done)
 
 
-out_folder = r"E:\Kin-Audio\千年之旅\新建文件夹"
-pic_path = r"E:\Unpack\新建文件夹2\CG1-1-1.png"
-out_dir = r"E:\Kin-Audio\千年之旅\out\主线剧情"
 # 使用音乐文件和单张图片，批量制作视频
-mkmp4(out_folder, pic_path, out_dir)
+# 单独运行：在项目根目录执行 python -m tool014.main
+if __name__ == "__main__":
+    out_folder = r"E:\Kin-Audio\千年之旅\新建文件夹"
+    pic_path = r"E:\Unpack\新建文件夹2\CG1-1-1.png"
+    out_dir = r"E:\Kin-Audio\千年之旅\out\主线剧情"
+    mkmp4(out_folder, pic_path, out_dir)
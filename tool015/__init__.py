@@ -0,0 +1,4 @@
+NAME = "skel转json"
+DESCRIPTION = "将目录中skel文件转化为json"
+MODULE = "tool015.main"
+LAUNCHER = False
@@ -1,33 +1,59 @@
 from tkinter import filedialog
+import json
 import os
 
+from common.fs_index import list_files
+from common.scheduler import JobScheduler
+from tool015.skel_binary import read_skeleton_file
 
-def convert(_input_path):
-    spine_path = r"D:\Kin-project\Krename\uexp_to_Spine\sptem.spine"
-    spine_config_tem = r"D:\Kin-project\Krename\uexp_to_Spine\spine-config.json"
-    for root, dirs, files in os.walk(_input_path):
-        # print(f"当前目录: {root, dirs, files}")
-        for file in files:
-            ba, suf = os.path.splitext(file)
-            if suf == ".skel":
-                skel_path = os.path.join(root, file)
-                sk_name = os.path.splitext(file)[0]
-                if os.path.exists(spine_path):
-                    os.remove(spine_path)
-                cmd1 = f'Spine -i {skel_path} -o {spine_path} -r {sk_name}'
-                os.system(cmd1)
-                cmd2 = f'Spine -i {spine_path} -o {root} -e {spine_config_tem}'
-                os.system(cmd2)
-                json_path = os.path.splitext(skel_path)[0]+".json"
-                print(f'Convert: {skel_path} -> {json_path}')
-            else:
-                continue
+
+def skel_json_path(skel_path):
+    """skel文件对应的json路径（同目录同名）"""
+    return os.path.splitext(skel_path)[0] + ".json"
+
+
+def skel_to_json(skel_path, json_path=None):
+    """
+    直接解析Spine 3.8二进制骨架并写出JSON（不需要Spine）
+
+    Returns:
+        json路径
+
+    Raises:
+        SkelFormatError: 不是Spine 3.8导出的skel
+    """
+    json_path = json_path or skel_json_path(skel_path)
+    skeleton = read_skeleton_file(skel_path)
+    # json.dumps 使用C编码器，比 json.dump 逐段写入快得多
+    text = json.dumps(skeleton, ensure_ascii=False, separators=(',', ':'))
+    with open(json_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return json_path
+
+
+def convert(_input_path, max_workers=None):
+    """
+    将目录中的skel文件转化为json（进程池并行解析）
+
+    Returns:
+        任务列表（job.result 为json路径，job.error 为错误信息）
+    """
+    scheduler = JobScheduler(max_workers=max_workers, use_processes=True)
+    for skel_path in list_files(_input_path, {".skel"}):
+        scheduler.submit(skel_path, skel_to_json, skel_path)
+
+    def report(job, finished, total):
+        if job.ok:
+            print(f'Convert: {job.name} -> {job.result}')
+        else:
+            print(f'Failed: {job.name} - {job.error}')
+
+    return scheduler.run(report)
 
 
 # 将目录中skel文件转化为json
+# 单独运行：在项目根目录执行 python -m tool015.main
 if __name__ == '__main__':
-    # spine安装路径
-    new_directory = r"D:\Program Files (Green)\spinepro_3.8.75"
-    os.chdir(new_directory)
     input_path = filedialog.askdirectory(title="选择需要批量转化的目录")
-    convert(input_path)
+    if input_path:
+        convert(input_path)
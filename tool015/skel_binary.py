@@ -0,0 +1,636 @@
+"""
+Spine 3.8 二进制骨架（.skel）解析，输出与Spine导出相同结构的JSON
+
+按 spine-runtimes 3.8 SkeletonBinary 的读取顺序顺序解析一遍：
+    头部（hash、版本、尺寸、非必要数据）、字符串表、骨骼、插槽、IK/变换/路径约束、
+    默认皮肤和其他皮肤（region/boundingbox/mesh/linkedmesh/path/point/clipping 附件）、
+    事件、动画（插槽/骨骼/约束/形变/绘制顺序/事件时间线）
+JSON中与默认值相同的字段省略（与Spine导出一致），float32 数值输出为能还原同一 float32 的最短小数。
+不需要安装Spine。
+"""
+import struct
+from functools import lru_cache
+
+# 附件类型
+ATTACHMENT_TYPES = ("region", "boundingbox", "mesh", "linkedmesh", "path", "point", "clipping")
+
+TRANSFORM_MODES = ("normal", "onlyTranslation", "noRotationOrReflection", "noScale", "noScaleOrReflection")
+BLEND_MODES = ("normal", "additive", "multiply", "screen")
+POSITION_MODES = ("fixed", "percent")
+SPACING_MODES = ("length", "fixed", "percent")
+ROTATE_MODES = ("tangent", "chain", "chainScale")
+
+# 时间线类型
+SLOT_TIMELINES = ("attachment", "color", "twoColor")
+BONE_TIMELINES = ("rotate", "translate", "scale", "shear")
+PATH_TIMELINES = ("position", "spacing", "mix")
+
+CURVE_STEPPED = 1
+CURVE_BEZIER = 2
+
+_FLOAT = struct.Struct('>f')
+_INT = struct.Struct('>i')
+_BEZIER = struct.Struct('>4f')
+
+
+class SkelFormatError(ValueError):
+    """不是有效的Spine 3.8二进制骨架"""
+
+
+@lru_cache(maxsize=1 << 16)
+def clean_float(value):
+    """float32 转为最短的等值小数（整数值输出为int），与Spine导出的JSON数值一致"""
+    if value.is_integer():
+        return int(value)
+    packed = _FLOAT.pack(value)
+    for digits in (6, 7, 8):
+        candidate = float(f"{value:.{digits}g}")
+        if _FLOAT.pack(candidate) == packed:
+            return candidate
+    return value
+
+
+class SkeletonInput:
+    """SkeletonBinary 的基本数据读取：大端定长数值、变长整数、字符串和字符串引用"""
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self.strings = []
+
+    def byte(self):
+        value = self.data[self.pos]
+        self.pos += 1
+        return value - 256 if value > 127 else value
+
+    def boolean(self):
+        value = self.data[self.pos]
+        self.pos += 1
+        return value != 0
+
+    def int32(self):
+        value = _INT.unpack_from(self.data, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def varint(self, optimize_positive=True):
+        data = self.data
+        b = data[self.pos]
+        self.pos += 1
+        result = b & 0x7F
+        shift = 7
+        while b & 0x80 and shift <= 28:
+            b = data[self.pos]
+            self.pos += 1
+            result |= (b & 0x7F) << shift
+            shift += 7
+        result &= 0xFFFFFFFF
+        if not optimize_positive:
+            return (result >> 1) ^ -(result & 1)
+        return result - 0x100000000 if result & 0x80000000 else result
+
+    def float(self):
+        value = _FLOAT.unpack_from(self.data, self.pos)[0]
+        self.pos += 4
+        return clean_float(value)
+
+    def floats(self, count):
+        values = struct.unpack_from(f'>{count}f', self.data, self.pos)
+        self.pos += 4 * count
+        return [clean_float(value) for value in values]
+
+    def shorts(self):
+        count = self.varint()
+        values = struct.unpack_from(f'>{count}H', self.data, self.pos)
+        self.pos += 2 * count
+        return list(values)
+
+    def string(self):
+        length = self.varint()
+        if length == 0:
+            return None
+        if length == 1:
+            return ""
+        end = self.pos + length - 1
+        if end > len(self.data):
+            raise IndexError("字符串超出文件末尾")
+        value = self.data[self.pos:end].decode('utf-8', errors='replace')
+        self.pos = end
+        return value
+
+    def string_ref(self):
+        index = self.varint()
+        return None if index == 0 else self.strings[index - 1]
+
+    def rgba(self):
+        return f"{self.int32() & 0xFFFFFFFF:08x}"
+
+
+def _put(target, key, value, default=None):
+    """值与默认值不同时写入"""
+    if value != default:
+        target[key] = value
+
+
+class SkeletonBinaryReader:
+    """解析一个 .skel 文件的内容"""
+
+    def __init__(self, data):
+        self.input = SkeletonInput(data)
+        self.nonessential = False
+        self.bones = []
+        self.slots = []
+        self.ik = []
+        self.transform = []
+        self.path = []
+        self.skin_names = []
+        self.events = {}
+        self.event_names = []
+
+    def read(self):
+        """
+        Returns:
+            与Spine导出JSON结构相同的字典
+
+        Raises:
+            SkelFormatError: 版本不是3.8或数据损坏
+        """
+        try:
+            skeleton = self._read()
+        except (IndexError, struct.error, UnicodeError) as e:
+            raise SkelFormatError(f"数据不完整或格式错误（位置 {self.input.pos}）: {e}") from e
+        remaining = len(self.input.data) - self.input.pos
+        if remaining:
+            raise SkelFormatError(f"解析结束后还剩 {remaining} 字节，可能不是Spine 3.8导出的文件")
+        return skeleton
+
+    def _read(self):
+        inp = self.input
+        header = {}
+        _put(header, "hash", inp.string() or None)
+        version = inp.string()
+        if not version or not version.startswith("3.8"):
+            raise SkelFormatError(f"不支持的Spine版本: {version!r}（只支持3.8）")
+        header["spine"] = version
+        header["x"], header["y"], header["width"], header["height"] = inp.floats(4)
+        self.nonessential = inp.boolean()
+        if self.nonessential:
+            header["fps"] = inp.float()
+            _put(header, "images", inp.string())
+            _put(header, "audio", inp.string())
+
+        inp.strings = [inp.string() for _ in range(inp.varint())]
+
+        skeleton = {"skeleton": header}
+        # 父骨骼在前，逐个加入以便按索引查找
+        for i in range(inp.varint()):
+            self.bones.append(self._read_bone(i))
+        skeleton["bones"] = self.bones
+        self.slots = [self._read_slot() for _ in range(inp.varint())]
+        skeleton["slots"] = self.slots
+        self.ik = [self._read_ik() for _ in range(inp.varint())]
+        self.transform = [self._read_transform() for _ in range(inp.varint())]
+        self.path = [self._read_path() for _ in range(inp.varint())]
+        for key in ("ik", "transform", "path"):
+            if getattr(self, key):
+                skeleton[key] = getattr(self, key)
+
+        skins = []
+        default_skin = self._read_skin(True)
+        if default_skin is not None:
+            skins.append(default_skin)
+        skins.extend(self._read_skin(False) for _ in range(inp.varint()))
+        self.skin_names = [skin["name"] for skin in skins]
+        skeleton["skins"] = skins
+
+        for _ in range(inp.varint()):
+            self._read_event_data()
+        if self.events:
+            skeleton["events"] = self.events
+
+        animations = {}
+        for _ in range(inp.varint()):
+            name = inp.string()
+            animations[name] = self._read_animation()
+        skeleton["animations"] = animations
+        return skeleton
+
+    # ------------------------------------------------------------------
+    # 骨骼、插槽、约束
+    # ------------------------------------------------------------------
+
+    def _read_bone(self, index):
+        inp = self.input
+        bone = {"name": inp.string()}
+        if index > 0:
+            bone["parent"] = self.bones[inp.varint()]["name"]
+        rotation, x, y, scale_x, scale_y, shear_x, shear_y, length = inp.floats(8)
+        _put(bone, "length", length, 0)
+        _put(bone, "rotation", rotation, 0)
+        _put(bone, "x", x, 0)
+        _put(bone, "y", y, 0)
+        _put(bone, "scaleX", scale_x, 1)
+        _put(bone, "scaleY", scale_y, 1)
+        _put(bone, "shearX", shear_x, 0)
+        _put(bone, "shearY", shear_y, 0)
+        _put(bone, "transform", TRANSFORM_MODES[inp.varint()], "normal")
+        _put(bone, "skin", inp.boolean(), False)
+        if self.nonessential:
+            _put(bone, "color", inp.rgba(), "9b9b9bff")
+        return bone
+
+    def _read_slot(self):
+        inp = self.input
+        slot = {"name": inp.string(), "bone": self.bones[inp.varint()]["name"]}
+        _put(slot, "color", inp.rgba(), "ffffffff")
+        dark = inp.int32()
+        if dark != -1:
+            slot["dark"] = f"{dark & 0xFFFFFF:06x}"
+        _put(slot, "attachment", inp.string_ref())
+        _put(slot, "blend", BLEND_MODES[inp.varint()], "normal")
+        return slot
+
+    def _read_constraint_head(self):
+        inp = self.input
+        constraint = {"name": inp.string()}
+        _put(constraint, "order", inp.varint(), 0)
+        _put(constraint, "skin", inp.boolean(), False)
+        constraint["bones"] = [self.bones[inp.varint()]["name"] for _ in range(inp.varint())]
+        return constraint
+
+    def _read_ik(self):
+        inp = self.input
+        ik = self._read_constraint_head()
+        ik["target"] = self.bones[inp.varint()]["name"]
+        _put(ik, "mix", inp.float(), 1)
+        _put(ik, "softness", inp.float(), 0)
+        _put(ik, "bendPositive", inp.byte() != -1, True)
+        _put(ik, "compress", inp.boolean(), False)
+        _put(ik, "stretch", inp.boolean(), False)
+        _put(ik, "uniform", inp.boolean(), False)
+        return ik
+
+    def _read_transform(self):
+        inp = self.input
+        transform = self._read_constraint_head()
+        transform["target"] = self.bones[inp.varint()]["name"]
+        _put(transform, "local", inp.boolean(), False)
+        _put(transform, "relative", inp.boolean(), False)
+        values = inp.floats(10)
+        for key, value, default in zip(("rotation", "x", "y", "scaleX", "scaleY", "shearY",
+                                        "rotateMix", "translateMix", "scaleMix", "shearMix"),
+                                       values, (0, 0, 0, 0, 0, 0, 1, 1, 1, 1)):
+            _put(transform, key, value, default)
+        return transform
+
+    def _read_path(self):
+        inp = self.input
+        path = self._read_constraint_head()
+        path["target"] = self.slots[inp.varint()]["name"]
+        _put(path, "positionMode", POSITION_MODES[inp.varint()], "percent")
+        _put(path, "spacingMode", SPACING_MODES[inp.varint()], "length")
+        _put(path, "rotateMode", ROTATE_MODES[inp.varint()], "tangent")
+        rotation, position, spacing, rotate_mix, translate_mix = inp.floats(5)
+        _put(path, "rotation", rotation, 0)
+        _put(path, "position", position, 0)
+        _put(path, "spacing", spacing, 0)
+        _put(path, "rotateMix", rotate_mix, 1)
+        _put(path, "translateMix", translate_mix, 1)
+        return path
+
+    # ------------------------------------------------------------------
+    # 皮肤和附件
+    # ------------------------------------------------------------------
+
+    def _read_skin(self, default_skin):
+        inp = self.input
+        if default_skin:
+            slot_count = inp.varint()
+            if slot_count == 0:
+                return None
+            skin = {"name": "default"}
+        else:
+            skin = {"name": inp.string_ref()}
+            bones = [self.bones[inp.varint()]["name"] for _ in range(inp.varint())]
+            ik = [self.ik[inp.varint()]["name"] for _ in range(inp.varint())]
+            transform = [self.transform[inp.varint()]["name"] for _ in range(inp.varint())]
+            path = [self.path[inp.varint()]["name"] for _ in range(inp.varint())]
+            for key, names in (("bones", bones), ("ik", ik), ("transform", transform), ("path", path)):
+                if names:
+                    skin[key] = names
+            slot_count = inp.varint()
+
+        attachments = {}
+        for _ in range(slot_count):
+            slot = self.slots[inp.varint()]["name"]
+            entries = attachments.setdefault(slot, {})
+            for _ in range(inp.varint()):
+                key = inp.string_ref()
+                entries[key] = self._read_attachment(key)
+        skin["attachments"] = attachments
+        return skin
+
+    def _read_vertices(self, vertex_count):
+        """顶点：无权重时为 x,y 序列；有权重时每个顶点为 骨骼数, (骨骼, x, y, 权重)..."""
+        inp = self.input
+        if not inp.boolean():
+            return inp.floats(vertex_count * 2)
+        vertices = []
+        for _ in range(vertex_count):
+            bone_count = inp.varint()
+            vertices.append(bone_count)
+            for _ in range(bone_count):
+                vertices.append(inp.varint())
+                vertices.extend(inp.floats(3))
+        return vertices
+
+    def _read_color(self, attachment):
+        if self.nonessential:
+            attachment["color"] = self.input.rgba()
+
+    def _read_attachment(self, key):
+        inp = self.input
+        name = inp.string_ref() or key
+        kind = inp.byte()
+        if not 0 <= kind < len(ATTACHMENT_TYPES):
+            raise SkelFormatError(f"未知的附件类型: {kind}")
+        kind = ATTACHMENT_TYPES[kind]
+
+        attachment = {}
+        _put(attachment, "name", name, key)
+        if kind != "region":
+            attachment["type"] = kind
+
+        if kind == "region":
+            path = inp.string_ref()
+            rotation, x, y, scale_x, scale_y, width, height = inp.floats(7)
+            color = inp.rgba()
+            if path is not None:
+                _put(attachment, "path", path, name)
+            _put(attachment, "x", x, 0)
+            _put(attachment, "y", y, 0)
+            _put(attachment, "scaleX", scale_x, 1)
+            _put(attachment, "scaleY", scale_y, 1)
+            _put(attachment, "rotation", rotation, 0)
+            attachment["width"] = width
+            attachment["height"] = height
+            _put(attachment, "color", color, "ffffffff")
+        elif kind == "boundingbox":
+            vertex_count = inp.varint()
+            attachment["vertexCount"] = vertex_count
+            attachment["vertices"] = self._read_vertices(vertex_count)
+            self._read_color(attachment)
+        elif kind == "mesh":
+            path = inp.string_ref()
+            color = inp.rgba()
+            vertex_count = inp.varint()
+            if path is not None:
+                _put(attachment, "path", path, name)
+            _put(attachment, "color", color, "ffffffff")
+            attachment["uvs"] = inp.floats(vertex_count * 2)
+            attachment["triangles"] = inp.shorts()
+            attachment["vertices"] = self._read_vertices(vertex_count)
+            attachment["hull"] = inp.varint()
+            if self.nonessential:
+                attachment["edges"] = inp.shorts()
+                attachment["width"], attachment["height"] = inp.floats(2)
+        elif kind == "linkedmesh":
+            path = inp.string_ref()
+            color = inp.rgba()
+            skin = inp.string_ref()
+            parent = inp.string_ref()
+            deform = inp.boolean()
+            if path is not None:
+                _put(attachment, "path", path, name)
+            _put(attachment, "color", color, "ffffffff")
+            _put(attachment, "skin", skin)
+            attachment["parent"] = parent
+            _put(attachment, "deform", deform, True)
+            if self.nonessential:
+                attachment["width"], attachment["height"] = inp.floats(2)
+        elif kind == "path":
+            _put(attachment, "closed", inp.boolean(), False)
+            _put(attachment, "constantSpeed", inp.boolean(), True)
+            vertex_count = inp.varint()
+            attachment["vertexCount"] = vertex_count
+            attachment["vertices"] = self._read_vertices(vertex_count)
+            attachment["lengths"] = inp.floats(vertex_count // 3)
+            self._read_color(attachment)
+        elif kind == "point":
+            rotation, x, y = inp.floats(3)
+            _put(attachment, "x", x, 0)
+            _put(attachment, "y", y, 0)
+            _put(attachment, "rotation", rotation, 0)
+            self._read_color(attachment)
+        else:
+            attachment["end"] = self.slots[inp.varint()]["name"]
+            vertex_count = inp.varint()
+            attachment["vertexCount"] = vertex_count
+            attachment["vertices"] = self._read_vertices(vertex_count)
+            self._read_color(attachment)
+        return attachment
+
+    # ------------------------------------------------------------------
+    # 事件和动画
+    # ------------------------------------------------------------------
+
+    def _read_event_data(self):
+        inp = self.input
+        name = inp.string_ref()
+        event = {}
+        _put(event, "int", inp.varint(False), 0)
+        _put(event, "float", inp.float(), 0)
+        _put(event, "string", inp.string())
+        audio = inp.string()
+        if audio is not None:
+            event["audio"] = audio
+            event["volume"], event["balance"] = inp.floats(2)
+        self.events[name] = event
+        self.event_names.append(name)
+
+    def _read_curve(self, frame):
+        kind = self.input.byte()
+        if kind == CURVE_STEPPED:
+            frame["curve"] = "stepped"
+        elif kind == CURVE_BEZIER:
+            frame["curve"], frame["c2"], frame["c3"], frame["c4"] = self.input.floats(4)
+
+    def _read_frames(self, count, read_values, curve=True):
+        """读取一条时间线的关键帧：时间 + read_values(帧) + 曲线（最后一帧没有曲线）"""
+        frames = []
+        for index in range(count):
+            frame = {"time": self.input.float()}
+            read_values(frame)
+            if curve and index < count - 1:
+                self._read_curve(frame)
+            frames.append(frame)
+        return frames
+
+    def _read_float_frames(self, count, keys):
+        """
+        读取只含float值的关键帧（骨骼、变换约束、路径约束时间线）
+
+        占动画数据的绝大部分，每帧用一次 struct 读出时间和全部值，曲线也直接从字节读取。
+        """
+        inp = self.input
+        data = inp.data
+        pos = inp.pos
+        frame_struct = struct.Struct(f'>{len(keys) + 1}f')
+        size = frame_struct.size
+        unpack_frame = frame_struct.unpack_from
+        unpack_bezier = _BEZIER.unpack_from
+        clean = clean_float
+        last = count - 1
+        frames = []
+        for index in range(count):
+            time, *values = unpack_frame(data, pos)
+            pos += size
+            frame = {"time": clean(time)}
+            for key, value in zip(keys, values):
+                frame[key] = clean(value)
+            if index < last:
+                kind = data[pos]
+                pos += 1
+                if kind == CURVE_STEPPED:
+                    frame["curve"] = "stepped"
+                elif kind == CURVE_BEZIER:
+                    c1, c2, c3, c4 = unpack_bezier(data, pos)
+                    pos += 16
+                    frame["curve"], frame["c2"], frame["c3"], frame["c4"] = clean(c1), clean(c2), clean(c3), clean(c4)
+            frames.append(frame)
+        inp.pos = pos
+        return frames
+
+    def _read_animation(self):
+        inp = self.input
+        animation = {}
+
+        slots = {}
+        for _ in range(inp.varint()):
+            timelines = slots.setdefault(self.slots[inp.varint()]["name"], {})
+            for _ in range(inp.varint()):
+                kind = inp.byte()
+                count = inp.varint()
+                if kind == 0:
+                    frames = self._read_frames(count, lambda f: f.__setitem__("name", inp.string_ref()), False)
+                elif kind == 1:
+                    frames = self._read_frames(count, lambda f: f.__setitem__("color", inp.rgba()))
+                elif kind == 2:
+                    def two_color(frame):
+                        frame["light"] = inp.rgba()
+                        frame["dark"] = f"{inp.int32() & 0xFFFFFF:06x}"
+                    frames = self._read_frames(count, two_color)
+                else:
+                    raise SkelFormatError(f"未知的插槽时间线类型: {kind}")
+                timelines[SLOT_TIMELINES[kind]] = frames
+        if slots:
+            animation["slots"] = slots
+
+        bones = {}
+        for _ in range(inp.varint()):
+            timelines = bones.setdefault(self.bones[inp.varint()]["name"], {})
+            for _ in range(inp.varint()):
+                kind = inp.byte()
+                count = inp.varint()
+                if kind == 0:
+                    frames = self._read_float_frames(count, ("angle",))
+                elif 0 < kind < len(BONE_TIMELINES):
+                    frames = self._read_float_frames(count, ("x", "y"))
+                else:
+                    raise SkelFormatError(f"未知的骨骼时间线类型: {kind}")
+                timelines[BONE_TIMELINES[kind]] = frames
+        if bones:
+            animation["bones"] = bones
+
+        ik = {}
+        for _ in range(inp.varint()):
+            name = self.ik[inp.varint()]["name"]
+
+            def ik_frame(frame):
+                frame["mix"], frame["softness"] = inp.floats(2)
+                frame["bendPositive"] = inp.byte() != -1
+                frame["compress"] = inp.boolean()
+                frame["stretch"] = inp.boolean()
+            ik[name] = self._read_frames(inp.varint(), ik_frame)
+        if ik:
+            animation["ik"] = ik
+
+        transform = {}
+        for _ in range(inp.varint()):
+            name = self.transform[inp.varint()]["name"]
+            transform[name] = self._read_float_frames(
+                inp.varint(), ("rotateMix", "translateMix", "scaleMix", "shearMix"))
+        if transform:
+            animation["transform"] = transform
+
+        paths = {}
+        for _ in range(inp.varint()):
+            timelines = paths.setdefault(self.path[inp.varint()]["name"], {})
+            for _ in range(inp.varint()):
+                kind = inp.byte()
+                count = inp.varint()
+                if kind in (0, 1):
+                    frames = self._read_float_frames(count, (PATH_TIMELINES[kind],))
+                elif kind == 2:
+                    frames = self._read_float_frames(count, ("rotateMix", "translateMix"))
+                else:
+                    raise SkelFormatError(f"未知的路径时间线类型: {kind}")
+                timelines[PATH_TIMELINES[kind]] = frames
+        if paths:
+            animation["path"] = paths
+
+        deform = {}
+        for _ in range(inp.varint()):
+            skin = deform.setdefault(self.skin_names[inp.varint()], {})
+            for _ in range(inp.varint()):
+                slot = skin.setdefault(self.slots[inp.varint()]["name"], {})
+                for _ in range(inp.varint()):
+                    name = inp.string_ref()
+
+                    def deform_frame(frame):
+                        end = inp.varint()
+                        if end:
+                            _put(frame, "offset", inp.varint(), 0)
+                            frame["vertices"] = inp.floats(end)
+                    slot[name] = self._read_frames(inp.varint(), deform_frame)
+        if deform:
+            animation["deform"] = deform
+
+        draw_order = []
+        for _ in range(inp.varint()):
+            frame = {"time": inp.float()}
+            offsets = []
+            for _ in range(inp.varint()):
+                slot = self.slots[inp.varint()]["name"]
+                offsets.append({"slot": slot, "offset": inp.varint()})
+            if offsets:
+                frame["offsets"] = offsets
+            draw_order.append(frame)
+        if draw_order:
+            animation["drawOrder"] = draw_order
+
+        events = []
+        for _ in range(inp.varint()):
+            frame = {"time": inp.float()}
+            name = self.event_names[inp.varint()]
+            frame["name"] = name
+            frame["int"] = inp.varint(False)
+            frame["float"] = inp.float()
+            if inp.boolean():
+                frame["string"] = inp.string()
+            if "audio" in self.events[name]:
+                frame["volume"], frame["balance"] = inp.floats(2)
+            events.append(frame)
+        if events:
+            animation["events"] = events
+        return animation
+
+
+def read_skeleton(data):
+    """解析 .skel 文件内容，返回JSON结构（字典）"""
+    return SkeletonBinaryReader(data).read()
+
+
+def read_skeleton_file(skel_path):
+    with open(skel_path, 'rb') as f:
+        return read_skeleton(f.read())
@@ -0,0 +1,4 @@
+NAME = "游戏包体解密"
+DESCRIPTION = "灵魂潮汐, 深空之眼, 环行旅舍 包体解密"
+MODULE = "tool016.main"
+LAUNCHER = False
@@ -1,99 +1,74 @@
-import os
 from tkinter import filedialog
 
+from common.fs_index import list_files
+
+
+def strip_iqigam_header(_filepath):
+    """去除灵魂潮汐 .ab 文件开头的 iqigam 标记，返回是否修改了文件"""
+    with open(_filepath, 'rb') as f:  # 以二进制模式打开文件
+        file_content = f.read()  # 读取整个文件内容
+    if file_content[:6] == b'iqigam':  #
+        modified_content = file_content[6:]
+    else:
+        return False
+    # 将修改后的内容写入新文件
+    with open(_filepath, 'wb') as output_file:  # 以二进制模式写入新文件
+        output_file.write(modified_content)
+    return True
+
+
+def strip_to_unityfs(_filepath):
+    """去除 UnityFS 标记之前的混淆字节（深空之眼/环行旅舍），返回是否修改了文件"""
+    with open(_filepath, 'rb') as f:  # 以二进制模式打开文件
+        file_content = f.read()  # 读取整个文件内容
+    seg = file_content[:50]
+    if b"UnityFS" in seg:
+        _num = seg.find(b"UnityFS")
+        if not _num:
+            return False
+        modified_content = file_content[_num:]
+    else:
+        return False
+    # 将修改后的内容写入新文件
+    with open(_filepath, 'wb') as output_file:  # 以二进制模式写入新文件
+        output_file.write(modified_content)
+    return True
+
+
+# 各游戏对应的包体后缀与解密方法
+DECODERS = {
+    "soul_tide": (".ab", strip_iqigam_header),
+    "skzy": (".ys", strip_to_unityfs),
+    "hxls": (".ab", strip_to_unityfs),
+}
+
+
+def _decode_directory(_directory, game):
+    suffix, decoder = DECODERS[game]
+    # 一次索引查询即可得到总数，不再为统计进度重复遍历目录
+    _files = list_files(_directory, {suffix})
+    fn = len(_files)
+    for fnum, _filepath in enumerate(_files, 1):
+        if decoder(_filepath):
+            print(f"进度 {fnum}/{fn} : " + _filepath)
+
 
 # 灵魂潮汐包体解密
 def soul_tide_decode(_directory):
-    _list = os.walk(directory)
-    tn = len(list(_list))
-    _list = os.walk(directory)
-    tnum = 0
-    for root, dirs, files in _list:
-        tnum += 1
-        fn = len(files)
-        fnum = 0
-        _str = f"进度 {tnum}/{tn} | "
-        for file in files:
-            fnum += 1
-            ba, suf = os.path.splitext(file)
-            if suf == ".ab":  # ".ab"
-                _filepath = os.path.join(root, file)
-                with open(_filepath, 'rb') as f:  # 以二进制模式打开文件
-                    file_content = f.read()  # 读取整个文件内容
-                if file_content[:6] == b'iqigam':  #
-                    modified_content = file_content[6:]
-                else:
-                    continue
-                # 将修改后的内容写入新文件
-                with open(_filepath, 'wb') as output_file:  # 以二进制模式写入新文件
-                    output_file.write(modified_content)
-                print(_str + f"{fnum}/{fn} : " + _filepath)
+    _decode_directory(_directory, "soul_tide")
 
 
 # 深空之眼解密
 def skzy_decode(_directory):
-    _list = os.walk(directory)
-    tn = len(list(_list))
-    _list = os.walk(directory)
-    tnum = 0
-    for root, dirs, files in _list:
-        tnum += 1
-        fn = len(files)
-        fnum = 0
-        _str = f"进度 {tnum}/{tn} | "
-        for file in files:
-            fnum += 1
-            ba, suf = os.path.splitext(file)
-            if suf == ".ys":  # ".ab"
-                _filepath = os.path.join(root, file)
-                with open(_filepath, 'rb') as f:  # 以二进制模式打开文件
-                    file_content = f.read()  # 读取整个文件内容
-                seg = file_content[:50]
-                if b"UnityFS" in seg:
-                    _num = seg.find(b"UnityFS")
-                    if not _num:
-                        continue
-                    modified_content = file_content[_num:]
-                else:
-                    continue
-                # 将修改后的内容写入新文件
-                with open(_filepath, 'wb') as output_file:  # 以二进制模式写入新文件
-                    output_file.write(modified_content)
-                print(_str + f"{fnum}/{fn} : " + _filepath)
+    _decode_directory(_directory, "skzy")
 
 
 # 环行旅舍解密
 def hxls_decode(_directory):
-    _list = os.walk(directory)
-    tn = len(list(_list))
-    _list = os.walk(directory)
-    tnum = 0
-    for root, dirs, files in _list:
-        tnum += 1
-        fn = len(files)
-        fnum = 0
-        _str = f"进度 {tnum}/{tn} | "
-        for file in files:
-            fnum += 1
-            ba, suf = os.path.splitext(file)
-            if suf == ".ab":  # ".ab"
-                _filepath = os.path.join(root, file)
-                with open(_filepath, 'rb') as f:  # 以二进制模式打开文件
-                    file_content = f.read()  # 读取整个文件内容
-                seg = file_content[:50]
-                if b"UnityFS" in seg:
-                    _num = seg.find(b"UnityFS")
-                    if not _num:
-                        continue
-                    modified_content = file_content[_num:]
-                else:
-                    continue
-                # 将修改后的内容写入新文件
-                with open(_filepath, 'wb') as output_file:  # 以二进制模式写入新文件
-                    output_file.write(modified_content)
-                print(_str + f"{fnum}/{fn} : " + _filepath)
+    _decode_directory(_directory, "hxls")
 
 
+# 单独运行：在项目根目录执行 python -m tool016.main
 if __name__ == '__main__':
     directory = filedialog.askdirectory(title="选择需要批量解密的目录")
     # 灵魂潮汐包体解密
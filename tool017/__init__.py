@@ -0,0 +1,4 @@
+NAME = "Spine图集路径修改"
+DESCRIPTION = "json文件修改图集识别位置"
+MODULE = "tool017.main"
+LAUNCHER = False
@@ -0,0 +1,262 @@
+"""
+按 JSON Pointer（RFC 6901）修改JSON文件中的值，只替换值所在的文本
+
+不重新序列化整个文件：定位到目标值在原文中的位置后直接替换，其余内容（缩进、键顺序、
+数值写法、换行符、BOM）保持原样。值已经相同的文件不写入；写入时先写同目录的临时文件再替换。
+"""
+import codecs
+import json
+import os
+import re
+from json.decoder import scanstring
+
+# 先读取文件开头这么多字节判断是否需要修改（Spine JSON 的 skeleton 在最前面）
+HEAD_BYTES = 64 * 1024
+
+# 写入时的临时文件后缀
+PART_SUFFIX = ".part"
+
+# 每个文件的处理结果
+PATCHED = "patched"
+UNCHANGED = "unchanged"
+MISSING = "missing"
+OUTCOME_LABELS = {
+    PATCHED: "已修改",
+    UNCHANGED: "无需修改",
+    MISSING: "缺少路径",
+}
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+
+class JsonPatchError(ValueError):
+    """JSON Pointer 格式错误或文件不是有效的JSON"""
+
+
+class PointerNotFound(LookupError):
+    """路径的上级不存在（或不是对象/数组）"""
+
+    def __init__(self, pointer):
+        super().__init__(pointer)
+        self.pointer = pointer
+
+
+def parse_pointer(pointer):
+    """'/skeleton/images' -> ['skeleton', 'images']（~1 为 /，~0 为 ~）"""
+    if not pointer.startswith('/'):
+        raise JsonPatchError(f"JSON Pointer 必须以 / 开头: {pointer!r}")
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/')]
+
+
+def format_pointer(tokens):
+    return ''.join('/' + token.replace('~', '~0').replace('/', '~1') for token in tokens)
+
+
+def load_edits(edits_path):
+    """读取修改列表文件：{"/skeleton/images": "images", ...}"""
+    with open(edits_path, 'r', encoding='utf-8') as f:
+        edits = json.load(f)
+    if not isinstance(edits, dict) or not edits:
+        raise JsonPatchError(f"修改列表应为非空的对象（JSON Pointer -> 值）: {edits_path}")
+    return edits
+
+
+def _skip(text, pos):
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _skip_back(text, pos):
+    """pos 之前连续空白的开始位置"""
+    while pos > 0 and text[pos - 1] in ' \t\n\r':
+        pos -= 1
+    return pos
+
+
+def _expect(text, pos, char):
+    if text[pos] != char:
+        raise JsonPatchError(f"位置 {pos} 应为 {char!r}")
+    return pos + 1
+
+
+def locate(text, tokens):
+    """
+    找到路径对应的值在文本中的位置，途经的其他值只跳过不保留
+
+    Returns:
+        ("value", 开始, 结束)：值存在
+        ("insert", 插入位置, 值前文本, 值后文本)：上级对象存在但没有最后一个键，
+        作为第一个键插入，冒号和逗号后的空白参照同级原有的键
+
+    Raises:
+        PointerNotFound: 上级不存在
+        JsonPatchError / ValueError / IndexError: 文本不完整或不是有效的JSON
+    """
+    pos = _skip(text, 0)
+    for depth, token in enumerate(tokens):
+        last = depth == len(tokens) - 1
+        char = text[pos]
+        if char == '{':
+            pos = _skip(text, pos + 1)
+            key_text = json.dumps(token, ensure_ascii=False)
+            if text[pos] == '}':
+                if last:
+                    return ("insert", pos, key_text + ": ", "")
+                raise PointerNotFound(format_pointer(tokens[:depth + 1]))
+            first_key = pos
+            indent = text[_skip_back(text, first_key):first_key]
+            after_colon = after_comma = None
+            while True:
+                key, pos = scanstring(text, _expect(text, pos, '"'))
+                colon = _skip(text, pos)
+                pos = _skip(text, _expect(text, colon, ':'))
+                if after_colon is None:
+                    after_colon = text[colon + 1:pos]
+                if key == token:
+                    break
+                _, pos = _DECODER.raw_decode(text, pos)
+                pos = _skip(text, pos)
+                if text[pos] == ',':
+                    comma = pos
+                    pos = _skip(text, comma + 1)
+                    if after_comma is None:
+                        after_comma = text[comma + 1:pos]
+                    continue
+                _expect(text, pos, '}')
+                if last:
+                    if after_comma is None:
+                        after_comma = indent or (" " if after_colon else "")
+                    return ("insert", first_key, key_text + ":" + after_colon, "," + after_comma)
+                raise PointerNotFound(format_pointer(tokens[:depth + 1]))
+        elif char == '[':
+            if not token.isdigit():
+                raise PointerNotFound(format_pointer(tokens[:depth + 1]))
+            pos = _skip(text, pos + 1)
+            for _ in range(int(token)):
+                if text[pos] == ']':
+                    raise PointerNotFound(format_pointer(tokens[:depth + 1]))
+                _, pos = _DECODER.raw_decode(text, pos)
+                pos = _skip(text, pos)
+                if text[pos] == ',':
+                    pos = _skip(text, pos + 1)
+            if text[pos] == ']':
+                raise PointerNotFound(format_pointer(tokens[:depth + 1]))
+        else:
+            raise PointerNotFound(format_pointer(tokens[:depth]))
+    _, end = _DECODER.raw_decode(text, pos)
+    return ("value", pos, end)
+
+
+def _same(current, value):
+    """JSON值相等（区分 1 与 true、1 与 1.0）"""
+    return json.dumps(current, sort_keys=True) == json.dumps(value, sort_keys=True)
+
+
+def compile_edits(edits):
+    """{JSON Pointer: 值} -> [(pointer, tokens, 值, 值的JSON文本)]"""
+    return [(pointer, parse_pointer(pointer), value, json.dumps(value, ensure_ascii=False))
+            for pointer, value in edits.items()]
+
+
+def is_unchanged(text, compiled):
+    """所有路径都已存在且值相同（文本可以不完整，不完整时抛出 ValueError/IndexError）"""
+    for _, tokens, value, _ in compiled:
+        location = locate(text, tokens)
+        if location[0] != "value":
+            return False
+        _, start, end = location
+        if not _same(json.loads(text[start:end]), value):
+            return False
+    return True
+
+
+def patch_text(text, compiled):
+    """
+    依次应用修改，只替换目标值的文本
+
+    Returns:
+        (新文本, 修改了的路径列表)
+
+    Raises:
+        PointerNotFound: 某个路径的上级不存在
+    """
+    changed = []
+    for pointer, tokens, value, encoded in compiled:
+        location = locate(text, tokens)
+        if location[0] == "value":
+            _, start, end = location
+            if _same(json.loads(text[start:end]), value):
+                continue
+            text = text[:start] + encoded + text[end:]
+        else:
+            _, pos, before, after = location
+            text = text[:pos] + before + encoded + after + text[pos:]
+        changed.append(pointer)
+    return text, changed
+
+
+def _decode_head(head):
+    """解码文件开头，去掉被截断的最后一个多字节字符"""
+    try:
+        return head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        if e.start < len(head) - 3:
+            raise
+        return head[:e.start].decode('utf-8')
+
+
+def write_atomic(file_path, data):
+    """写入同目录的临时文件后替换原文件（保留权限），中途失败不会留下半个文件"""
+    part = file_path + PART_SUFFIX
+    try:
+        with open(part, 'wb') as f:
+            f.write(data)
+        if os.path.exists(file_path):
+            os.chmod(part, os.stat(file_path).st_mode & 0o7777)
+        os.replace(part, file_path)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+
+
+def patch_file(file_path, compiled, dry_run=False):
+    """
+    修改单个JSON文件
+
+    先只读开头 HEAD_BYTES 判断，值都已相同时不再读取文件其余部分。
+
+    Args:
+        compiled: compile_edits 的结果
+        dry_run: 只判断，不写入
+
+    Returns:
+        (结果, 说明)：结果为 PATCHED / UNCHANGED / MISSING，说明为修改的路径或缺少的路径
+
+    Raises:
+        JsonPatchError / ValueError: 不是有效的JSON
+        OSError: 读写失败
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read(HEAD_BYTES)
+        if len(raw) == HEAD_BYTES:
+            try:
+                if is_unchanged(_decode_head(raw.removeprefix(codecs.BOM_UTF8)), compiled):
+                    return UNCHANGED, ""
+            except (ValueError, IndexError, PointerNotFound):
+                # 开头不够判断（值或上级在更后面），读取全文
+                pass
+            raw += f.read()
+
+    bom = codecs.BOM_UTF8 if raw.startswith(codecs.BOM_UTF8) else b""
+    text = raw[len(bom):].decode('utf-8')
+    try:
+        new_text, changed = patch_text(text, compiled)
+    except PointerNotFound as e:
+        return MISSING, e.pointer
+    except IndexError:
+        raise JsonPatchError("JSON不完整") from None
+    if not changed:
+        return UNCHANGED, ""
+    if not dry_run:
+        write_atomic(file_path, bom + new_text.encode('utf-8'))
+    return PATCHED, ", ".join(changed)
@@ -1,24 +1,53 @@
-import json
-import os
-
-
-def write_json(directory):
-    for root, dirs, files in os.walk(directory):
-        # print(f"当前目录: {root, dirs, files}")
-        for file in files:
-            ba, suf = os.path.splitext(file)
-            if suf == ".json":
-                filepath = os.path.join(root, file)
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    _dir = json.load(f)
-                    _dir["skeleton"]["images"] = 'images'
-                    # print(_dir)
-                    # return 0
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(_dir, f)
-                print(f"Complete：{filepath}")
+from common.batch import iter_input_files
+from common.scheduler import JobScheduler
+from tool017.json_patch import OUTCOME_LABELS, compile_edits, patch_file
+
+# 默认修改：图集图片目录
+DEFAULT_EDITS = {"/skeleton/images": "images"}
+
+
+def patch_json_tree(inputs, edits=None, max_workers=None, dry_run=False, on_done=None):
+    """
+    并行修改目录（递归）或文件中的全部JSON
+
+    只替换目标值所在的文本，值已经相同的文件不写入；缺少路径的文件（不是Spine骨架）跳过。
+
+    Args:
+        inputs: 目录或JSON文件列表
+        edits: {JSON Pointer: 值}，默认 DEFAULT_EDITS
+        dry_run: 只判断，不写入
+        on_done: 每个文件结束时的回调 on_done(job, finished_count, total_count)，
+                 job.result 为 (结果, 说明)
+
+    Returns:
+        任务列表
+    """
+    compiled = compile_edits(edits or DEFAULT_EDITS)
+    scheduler = JobScheduler(max_workers=max_workers)
+    for file_path in iter_input_files(inputs, {".json"}):
+        scheduler.submit(file_path, patch_file, file_path, compiled, dry_run)
+    return scheduler.run(on_done)
+
+
+def write_json(directory, edits=None, max_workers=None, dry_run=False):
+    """修改目录中JSON的图集路径，打印每个文件的结果和汇总"""
+    def report(job, finished, total):
+        if job.ok:
+            outcome, detail = job.result
+            print(f"{OUTCOME_LABELS[outcome]}：{job.name}" + (f"（{detail}）" if detail else ""))
+        else:
+            print(f"Failed：{job.name} - {job.error}")
+
+    jobs = patch_json_tree([directory], edits, max_workers, dry_run, report)
+    counts = {}
+    for job in jobs:
+        key = OUTCOME_LABELS[job.result[0]] if job.ok else "失败"
+        counts[key] = counts.get(key, 0) + 1
+    print("完成：" + "，".join(f"{key} {count}" for key, count in counts.items()))
+    return jobs
 
 
 # json文件修改图集识别位置
+# 单独运行：在项目根目录执行 python -m tool017.main
 if __name__ == '__main__':
     write_json(r'E:\Unpack\assets\23_spine\dressspine')
@@ -0,0 +1,4 @@
+NAME = "UE批量图片解包"
+DESCRIPTION = "UE批量图片解包"
+MODULE = "tool018.main"
+LAUNCHER = False
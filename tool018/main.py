@@ -1,9 +1,11 @@
 import subprocess
 import os
-game_content = r"E:\Unpack\尘白禁区\2.7\Game\Content\Plot\CgPlot\Login_Plots\PoltAsset\Bg"
 
 from PIL import Image
 
+UMODEL_PATH = r"D:\Program Files (Green)\umodel_win32\umodel_64.exe"
+
+
 def convert_to_png(input_path, output_path):
     try:
         img = Image.open(input_path)
@@ -12,21 +14,27 @@ def convert_to_png(input_path, output_path):
     except Exception as e:
         print(f"转换失败: {e}")
 
+
+def export_uexp_texture(game_content, file, umodel_path=UMODEL_PATH, game="ue4.26"):
+    """使用umodel导出单个 .uexp 贴图为 .tga，再转为 .png"""
+    file_name = os.path.splitext(file)[0]
+    print(file_name)
+    subprocess.run([
+        umodel_path,
+        f"-path={game_content}",
+        f"-game={game}",
+        "-export",
+        f"-out={game_content}",
+        file_name
+    ])
+    tga_path = os.path.join(game_content, file.replace(".uexp", ".tga"))
+    convert_to_png(tga_path, os.path.join(game_content, file.replace(".uexp", ".png")))
+    os.remove(tga_path)
+
+
 # 批量图片解包
-for file in os.listdir(game_content):
-    if file.endswith(".uexp"):
-        file_name = os.path.splitext(file)[0]
-        print(file_name)
-        subprocess.run([
-            r"D:\Program Files (Green)\umodel_win32\umodel_64.exe",
-            f"-path={game_content}",
-            "-game=ue4.26",
-            "-export",
-            f"-out={game_content}",
-            file_name
-        ])
-        convert_to_png(
-            os.path.join(game_content, file.replace(".uexp", ".tga")),
-            os.path.join(game_content, file.replace(".uexp", ".png"))
-        )
-        os.remove(os.path.join(game_content, file.replace(".uexp", ".tga")))
+if __name__ == "__main__":
+    game_content = r"E:\Unpack\尘白禁区\2.7\Game\Content\Plot\CgPlot\Login_Plots\PoltAsset\Bg"
+    for file in os.listdir(game_content):
+        if file.endswith(".uexp"):
+            export_uexp_texture(game_content, file)
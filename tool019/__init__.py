@@ -0,0 +1,5 @@
+NAME = "音频片段拼接工具"
+DESCRIPTION = "拼接多个音频片段文件为一个音频文件"
+MODULE = "tool019.main"
+GUI = "AudioConcatenatorGUI"
+LAUNCHER = True
@@ -1,13 +1,16 @@
-import subprocess
 import os
+
+from common.ffmpeg_pool import FFmpegCancelled, run_ffmpeg
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 
 
-def concat_audio_files_filter(input_files, output_file):
+def concat_audio_files_filter(input_files, output_file, threads=None, cancel_event=None, on_progress=None):
     """
     使用FFmpeg的filter_complex拼接音频文件
     适用于不同格式的音频，会自动进行格式转换
+
+    threads 为None时由ffmpeg自行决定线程数（单独拼接一个文件时）
     """
     try:
         # 检查输入文件是否存在
@@ -32,17 +35,20 @@ def concat_audio_files_filter(input_files, output_file):
             *input_params,
             '-filter_complex', filter_complex,
             '-map', '[out]',
+            *(['-threads', str(threads)] if threads else []),
             output_file
         ]
 
         # 执行命令
-        subprocess.run(cmd, check=True, capture_output=True)
+        returncode, stderr = run_ffmpeg(cmd, on_progress=on_progress, cancel_event=cancel_event)
+        if returncode != 0:
+            return False, f"拼接失败: {stderr}"
         return True, f"音频拼接完成: {output_file}"
 
     except FileNotFoundError as e:
         return False, str(e)
-    except subprocess.CalledProcessError as e:
-        return False, f"拼接失败: {e.stderr.decode()}"
+    except FFmpegCancelled:
+        return False, "拼接已取消"
     except Exception as e:
         return False, f"未知错误: {e}"
 
@@ -105,7 +111,7 @@ class AudioConcatenatorGUI:
                   bg="lightblue", font=("Arial", 10, "bold")).pack(side="left", padx=5)
 
         # 退出按钮
-        tk.Button(action_frame, text="退出", command=self.root.quit).pack(side="right", padx=5)
+        tk.Button(action_frame, text="退出", command=self.root.destroy).pack(side="right", padx=5)
 
         # 状态标签
         self.status_label = tk.Label(self.root, text="准备就绪", anchor="w", relief="sunken", bd=1)
@@ -197,5 +203,6 @@ def main():
     root.mainloop()
 
 
+# 单独运行：在项目根目录执行 python -m tool019.main
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,4 @@
+NAME = "UE解包拆分atlas与json"
+DESCRIPTION = "UE解包拆分为.atlas与.json文件"
+MODULE = "tool020.unatlas"
+LAUNCHER = False
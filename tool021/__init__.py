@@ -0,0 +1,4 @@
+NAME = "atlas图集解包"
+DESCRIPTION = "atlas图理文件对png文件解包"
+MODULE = "tool021.atlas_unpack3"
+LAUNCHER = False
@@ -3,6 +3,9 @@ import os
 from PIL import Image
 from loguru import logger
 
+from common.fs_index import list_files
+from common.manifest import Manifest
+
 
 def premultiply_alpha(image):
     '''
@@ -131,24 +134,48 @@ def split_atlas(fileName, output_path: str = None, atlas_path: str = None): # ty
                         logger.info(f"保存图像: {output_path + '/' + name}")
 
 
+def atlas_pages(atlas_path):
+    """返回.atlas引用的图集PNG路径（查找规则与 split_atlas 相同，只返回存在的文件）"""
+    atlas_dir = os.path.split(atlas_path)[0]
+    pages = []
+    with open(atlas_path, 'r', encoding='utf-8-sig') as atlas:
+        for _line in atlas:
+            if ".png" not in _line:
+                continue
+            png_name = _line.strip("\n")
+            for png_path in (os.path.join(atlas_dir, png_name), os.path.join(atlas_dir, "Textures", png_name)):
+                if os.path.exists(png_path):
+                    pages.append(png_path)
+                    break
+    return pages
+
+
+def split_atlas_directory(input_path, skip_unchanged=True):
+    """批量解包目录下的所有.atlas文件，输出到各自同目录的images；跳过图集和图片都未变化的文件"""
+    manifest = Manifest("tool021")
+    for atlas_path in list_files(input_path, {".atlas"}):
+        unitName = os.path.basename(atlas_path)
+        outputPath = os.path.join(os.path.dirname(atlas_path), 'images')  # sub
+        inputs = [atlas_path] + atlas_pages(atlas_path)
+        if skip_unchanged and manifest.is_current(inputs, [outputPath]):
+            logger.debug(f"未变化，跳过: {atlas_path}")
+            continue
+
+        if not os.path.exists(outputPath):
+            os.makedirs(outputPath)
+            logger.info(f"创建输出目录: {outputPath}")
+
+        try:
+            split_atlas(unitName, output_path=outputPath, atlas_path=atlas_path)
+            manifest.record(inputs, [outputPath])
+        except Exception as e:
+            logger.error(f"解包失败: {e}，跳过: {atlas_path}")
+
+
 # atlas图理文件解包
 if __name__ == '__main__':
     # input_path = filedialog.askdirectory(title="选择需要批量解包的目录")
     # logger.info(f"选择的目录: {input_path}")
 
-    # for root, dirs, files in os.walk(input_path):
-    #     for filename in files:
-    #         if filename.endswith(".atlas"):
-    #             atlas_path = os.path.join(root, filename)
-    #             unitName = os.path.split(filename)[1]
-    #             outputPath = os.path.join(root, 'images')  # sub
-
-    #             if not os.path.exists(outputPath):
-    #                 os.makedirs(outputPath)
-    #                 logger.info(f"创建输出目录: {outputPath}")
-
-    #             try:
-    #                 split_atlas(unitName, output_path=outputPath, atlas_path=atlas_path)
-    #             except Exception as e:
-    #                 logger.error(f"解包失败: {e}，跳过: {atlas_path}")
+    # split_atlas_directory(input_path)
     logger.debug("程序已退出")
\ No newline at end of file
@@ -0,0 +1,4 @@
+NAME = "去除重名mp3"
+DESCRIPTION = "去除已有同名flac的mp3"
+MODULE = "tool022.main"
+LAUNCHER = False
@@ -2,6 +2,8 @@
 import os
 import shutil
 
+from common.fs_index import list_files
+
 
 def get_all_files(directory):
     """
@@ -9,12 +11,7 @@ def get_all_files(directory):
     :param directory: Ŀ¼·
     :return: ļ·б
     """
-    file_paths = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            file_path = os.path.join(root, file)
-            file_paths.append(file_path)
-    return file_paths
+    return list_files(directory)
 
 
 def dele_repeat_file(_files):
@@ -32,6 +29,7 @@ def dele_repeat_file(_files):
 
 
 # ȥmp3
+# УĿĿ¼ִ python -m tool022.main
 if __name__ == "__main__":
     _path = r"F:\Ǻ-Ƶ\ֿ"
     _list = get_all_files(_path)
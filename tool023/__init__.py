@@ -0,0 +1,5 @@
+NAME = "移动文件到同名文件夹"
+DESCRIPTION = "移动文件到自身文件名的文件夹内"
+MODULE = "tool023.main"
+GUI = "WavFileMover"
+LAUNCHER = False
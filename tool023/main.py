@@ -1,18 +1,39 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import os
-import shutil
+import threading
+import time
+
+from common.file_mover import CONFLICT_LABELS, execute_moves, plan_moves
+
+# 界面进度刷新的最短间隔（秒）
+UI_UPDATE_INTERVAL = 0.1
+
+
+def target_path_for(file_path):
+    """文件的目标路径：同目录下以文件名（不含扩展名）命名的子文件夹"""
+    file_dir = os.path.dirname(file_path)
+    file_name = os.path.basename(file_path)
+    return os.path.join(file_dir, os.path.splitext(file_name)[0], file_name)
+
+
+def plan_folder_moves(file_paths, conflict="skip"):
+    """规划把每个文件移动到同名子文件夹（冲突策略整批相同）"""
+    return plan_moves([(file_path, target_path_for(file_path)) for file_path in file_paths], conflict)
 
 
 class WavFileMover:
     def __init__(self, root):
         self.root = root
         self.root.title("WAV文件整理工具")
-        self.root.geometry("500x200")
+        self.root.geometry("500x300")
 
         # 存储选择的文件路径
         self.selected_files = []
 
+        # 目标已存在时的处理方式（整批相同，不逐个询问）
+        self.conflict_var = tk.StringVar(value="skip")
+
         # 创建GUI元素
         self.create_widgets()
 
@@ -37,9 +58,30 @@ class WavFileMover:
         self.file_list_text.pack(pady=5)
         self.file_list_text.config(state=tk.DISABLED)
 
+        # 冲突策略
+        conflict_frame = tk.Frame(self.root)
+        conflict_frame.pack()
+        tk.Label(conflict_frame, text="目标已存在时:").pack(side=tk.LEFT)
+        for value, label in CONFLICT_LABELS.items():
+            tk.Radiobutton(conflict_frame, text=label, variable=self.conflict_var, value=value).pack(side=tk.LEFT)
+
+        button_frame = tk.Frame(self.root)
+        button_frame.pack(pady=10)
+
+        # 预览按钮（只列出计划，不移动）
+        self.preview_button = tk.Button(
+            button_frame,
+            text="预览",
+            command=self.preview_moves,
+            font=("Arial", 12),
+            height=2,
+            width=8
+        )
+        self.preview_button.pack(side=tk.LEFT, padx=5)
+
         # 开始移动按钮
         self.move_button = tk.Button(
-            self.root,
+            button_frame,
             text="开始移动文件",
             command=self.move_files,
             font=("Arial", 12),
@@ -48,7 +90,7 @@ class WavFileMover:
             height=2,
             width=20
         )
-        self.move_button.pack(pady=10)
+        self.move_button.pack(side=tk.LEFT, padx=5)
 
     def select_wav_files(self):
         # 弹窗选择多个WAV文件
@@ -60,81 +102,84 @@ class WavFileMover:
         if files:
             self.selected_files = list(files)
             self.file_count_label.config(text=f"已选择 {len(self.selected_files)} 个WAV文件")
+            self.show_lines(self.selected_files)
 
-            # 更新文件列表显示
-            self.file_list_text.config(state=tk.NORMAL)
-            self.file_list_text.delete(1.0, tk.END)
-            for file_path in self.selected_files:
-                self.file_list_text.insert(tk.END, f"{file_path}\n")
-            self.file_list_text.config(state=tk.DISABLED)
+    def show_lines(self, lines):
+        """在文件列表文本框中显示若干行"""
+        self.file_list_text.config(state=tk.NORMAL)
+        self.file_list_text.delete(1.0, tk.END)
+        self.file_list_text.insert(tk.END, "\n".join(lines) + ("\n" if lines else ""))
+        self.file_list_text.config(state=tk.DISABLED)
 
-    def move_files(self):
+    def preview_moves(self):
         if not self.selected_files:
             messagebox.showwarning("警告", "请先选择WAV文件！")
             return
+        plan = plan_folder_moves(self.selected_files, self.conflict_var.get())
+        self.show_lines(plan.describe())
 
-        try:
-            moved_count = 0
-            skipped_count = 0
+    def set_running(self, running):
+        state = tk.DISABLED if running else tk.NORMAL
+        for button in (self.select_button, self.preview_button, self.move_button):
+            button.config(state=state)
 
-            for file_path in self.selected_files:
-                success = self.move_single_file(file_path)
-                if success:
-                    moved_count += 1
-                else:
-                    skipped_count += 1
+    def move_files(self):
+        if not self.selected_files:
+            messagebox.showwarning("警告", "请先选择WAV文件！")
+            return
 
-            result_message = f"文件移动完成！\n成功移动: {moved_count} 个文件"
-            if skipped_count > 0:
-                result_message += f"\n跳过: {skipped_count} 个文件（可能已存在或出错）"
+        try:
+            plan = plan_folder_moves(self.selected_files, self.conflict_var.get())
+        except Exception as e:
+            messagebox.showerror("错误", f"移动文件时出现错误：{str(e)}")
+            return
 
-            messagebox.showinfo("完成", result_message)
+        self.set_running(True)
+        self.file_count_label.config(text=plan.summary())
+
+        last_update = [0.0]
+
+        # 工作线程中调用：限制发往界面的进度消息频率
+        def on_progress(done, total, done_bytes, total_bytes):
+            now = time.monotonic()
+            if now - last_update[0] >= UI_UPDATE_INTERVAL or done == total:
+                last_update[0] = now
+                text = f"正在移动... {done}/{total}（{done_bytes / (1024 * 1024):.1f} MB）"
+                self.root.after(0, lambda: self.file_count_label.config(text=text))
+
+        def worker():
+            try:
+                result = execute_moves(plan, on_progress=on_progress)
+                self.root.after(0, self.on_moves_done, plan, result, None)
+            except Exception as e:
+                self.root.after(0, self.on_moves_done, plan, None, e)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def on_moves_done(self, plan, result, error):
+        """移动结束（在界面线程中调用）"""
+        self.set_running(False)
+        if error is not None:
+            messagebox.showerror("错误", f"移动文件时出现错误：{str(error)}")
+            return
 
-            # 清空选择列表
-            self.selected_files = []
-            self.file_count_label.config(text="未选择文件")
-            self.file_list_text.config(state=tk.NORMAL)
-            self.file_list_text.delete(1.0, tk.END)
-            self.file_list_text.config(state=tk.DISABLED)
+        for src, dst in result['moved']:
+            print(f"已移动: {src} -> {dst}")
+        for src, _, message in result['failed']:
+            print(f"移动文件失败 {src}: {message}")
 
-        except Exception as e:
-            messagebox.showerror("错误", f"移动文件时出现错误：{str(e)}")
+        moved_count = len(result['moved'])
+        skipped_count = len(plan.skipped) + len(plan.errors) + len(result['failed'])
+        result_message = f"文件移动完成！\n成功移动: {moved_count} 个文件"
+        if skipped_count > 0:
+            result_message += f"\n跳过: {skipped_count} 个文件（可能已存在或出错）"
 
-    def move_single_file(self, file_path):
-        """移动单个WAV文件到对应的子文件夹"""
-        try:
-            # 获取文件所在目录和文件名（不含扩展名）
-            file_dir = os.path.dirname(file_path)
-            file_name = os.path.basename(file_path)
-            file_name_without_ext = os.path.splitext(file_name)[0]
-
-            # 创建目标文件夹（以文件名命名）
-            target_dir = os.path.join(file_dir, file_name_without_ext)
-
-            # 如果目标文件夹不存在，则创建
-            if not os.path.exists(target_dir):
-                os.makedirs(target_dir)
-
-            # 目标文件路径
-            target_path = os.path.join(target_dir, file_name)
-
-            # 如果目标文件已存在，询问是否覆盖
-            if os.path.exists(target_path):
-                response = messagebox.askyesno(
-                    "文件已存在",
-                    f"文件 {file_name} 在目标文件夹中已存在。是否覆盖？"
-                )
-                if not response:
-                    return False
-
-            # 移动文件
-            shutil.move(file_path, target_path)
-            print(f"已移动: {file_path} -> {target_path}")
-            return True
+        messagebox.showinfo("完成", result_message)
 
-        except Exception as e:
-            print(f"移动文件失败 {file_path}: {str(e)}")
-            return False
+        # 清空选择列表
+        self.selected_files = []
+        self.file_count_label.config(text="未选择文件")
+        self.show_lines([])
 
 
 def main():
@@ -143,5 +188,6 @@ def main():
     root.mainloop()
 
 
+# 单独运行：在项目根目录执行 python -m tool023.main
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
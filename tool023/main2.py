@@ -8,6 +8,8 @@ from matplotlib.colors import LinearSegmentedColormap
 import subprocess
 from concurrent.futures import ThreadPoolExecutor
 
+from common.ffmpeg_pool import run_ffmpeg
+
 DEFAULT_CONFIG = {
     "fft_size": 2048,
     "sample_rate": 44100,
@@ -26,14 +28,34 @@ DEFAULT_CONFIG = {
 }
 
 
-def generate_spectrum_video(flac_path, output_path, config=None):
+def _run_checked(cmd, duration=None, on_progress=None, cancel_event=None):
+    """运行ffmpeg，失败时抛出 CalledProcessError"""
+    returncode, stderr = run_ffmpeg(cmd, duration, on_progress, cancel_event)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+
+
+def generate_spectrum_video(flac_path, output_path, config=None, threads=None, cancel_event=None, on_progress=None):
+    """
+    threads: 视频编码线程数，默认使用 config["workers"]
+    cancel_event / on_progress: 见 common.ffmpeg_pool.run_ffmpeg（进度对应最终视频编码）
+    """
     config = {**DEFAULT_CONFIG, **(config or {})}
+    threads = threads or config["workers"]
 
     # 加载音频文件
     print("加载音频文件...")
     y, sr = librosa.load(flac_path, sr=config["sample_rate"])
 
-    with tempfile.TemporaryDirectory() as temp_dir:
+    with tempfile.TemporaryDirectory() as temp_dir, ThreadPoolExecutor(max_workers=1) as audio_executor:
+        # 音频编码与帧渲染互不依赖，在后台先行执行
+        audio_temp = os.path.join(temp_dir, "audio.aac")
+        audio_future = audio_executor.submit(_run_checked, [
+            "ffmpeg", "-y", "-i", flac_path,
+            "-c:a", "aac", "-b:a", "192k", "-loglevel", "error",
+            audio_temp
+        ], cancel_event=cancel_event)
+
         print("生成频谱帧...")
 
         # 配置matplotlib
@@ -141,23 +163,17 @@ def generate_spectrum_video(flac_path, output_path, config=None):
 
         # 合并音频和视频
         print("合并音频和视频...")
-        audio_temp = os.path.join(temp_dir, "audio.aac")
-
-        subprocess.run([
-            "ffmpeg", "-y", "-i", flac_path,
-            "-c:a", "aac", "-b:a", "192k", "-loglevel", "error",
-            audio_temp
-        ], check=True)
+        audio_future.result()
 
-        subprocess.run([
+        _run_checked([
             "ffmpeg", "-y", "-framerate", str(effective_fps),
             "-i", os.path.join(temp_dir, "frame_%05d.png"),
             "-i", audio_temp,
-            "-c:v", "libx264", "-preset", "veryfast", "-crf", 23,
-            "-threads", str(config["workers"]),
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+            "-threads", str(threads),
             "-c:a", "copy", "-shortest", "-loglevel", "error",
             output_path
-        ], check=True)
+        ], len(y) / sr, on_progress, cancel_event)
 
     print(f"视频已保存至: {output_path}")
 
@@ -0,0 +1,4 @@
+NAME = "Astrofox批量渲染"
+DESCRIPTION = "Astrofox批量渲染自动化操作"
+MODULE = "tool024.main"
+LAUNCHER = False
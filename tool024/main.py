@@ -18,6 +18,7 @@ def get_files_os(directory):
 
 
 # Astrofox批量渲染
+# 单独运行：在项目根目录执行 python -m tool024.main
 if __name__ == "__main__":
     dire = r"D:\Temp"
     for name in get_files_os(dire):
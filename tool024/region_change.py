@@ -1,4 +1,3 @@
-import pyautogui
 import time
 
 
@@ -12,6 +11,9 @@ def detect_region_change(x1, y1, x2, y2, interval=1, threshold=0.9):
     - interval: 检测间隔(秒)
     - threshold: 相似度阈值，低于此值认为发生变化
     """
+    # 截图依赖图形界面，只在需要时导入（compare_images 可在无界面环境使用）
+    import pyautogui
+
     # 获取初始截图
     previous_screenshot = pyautogui.screenshot(region=(x1, y1, x2 - x1, y2 - y1))
 
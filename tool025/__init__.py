@@ -0,0 +1,5 @@
+NAME = "AE渲染前置图片裁剪"
+DESCRIPTION = "AE批量渲染前置批量图片裁剪"
+MODULE = "tool025.main"
+GUI = "ImageProcessorApp"
+LAUNCHER = False
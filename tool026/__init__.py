@@ -0,0 +1,5 @@
+NAME = "音频文件歌词提取工具"
+DESCRIPTION = "分离音频文件歌词文本到同目录文件名的lrc文件中"
+MODULE = "tool026.main"
+GUI = "LyricsExtractorGUI"
+LAUNCHER = True
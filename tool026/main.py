@@ -1,18 +1,19 @@
 import os
+import threading
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from pathlib import Path
-from mutagen import File
-from mutagen.id3 import ID3, USLT
-from mutagen.flac import FLAC
-from mutagen.oggopus import OggOpus
-from mutagen.wave import WAVE
-import chardet
+
+from common.lyrics import LYRICS_EXTENSIONS, NO_LYRICS, OUTCOME_LABELS, UNCHANGED, WRITTEN, extract_lyrics_tree
+
+# 界面进度刷新的最短间隔（秒）
+UI_UPDATE_INTERVAL = 0.1
 
 
 class LyricsExtractorGUI:
-    def __init__(self):
-        self.root = tk.Tk()
+    def __init__(self, root=None):
+        # 可嵌入到启动器的Toplevel中，单独运行时自建主窗口
+        self.root = root if root is not None else tk.Tk()
         self.root.title("音频文件歌词提取工具")
         self.root.geometry("600x600")
 
@@ -26,25 +27,36 @@ class LyricsExtractorGUI:
         title_label.pack(pady=10)
 
         # 说明文本
-        desc_text = "支持格式: MP3, FLAC, Opus, WAV\n\n" \
-                    "功能: 从音频文件中提取内嵌歌词并保存为同名的LRC文件"
+        desc_text = "支持格式: MP3, FLAC, M4A, Opus, OGG, WAV\n\n" \
+                    "功能: 从音频文件中提取内嵌歌词并保存为同名的LRC文件\n" \
+                    "文件夹会递归查找；没有歌词或内容未变化的文件不会写入"
         desc_label = tk.Label(self.root, text=desc_text, justify=tk.LEFT)
         desc_label.pack(pady=10)
 
-        # 选择文件按钮
-        select_btn = tk.Button(self.root, text="选择音频文件",
-                               command=self.select_files,
-                               font=("Arial", 12),
-                               bg="#4CAF50", fg="white",
-                               width=20, height=2)
-        select_btn.pack(pady=20)
+        # 选择按钮
+        select_frame = tk.Frame(self.root)
+        select_frame.pack(pady=20)
+
+        self.select_btn = tk.Button(select_frame, text="选择音频文件",
+                                    command=self.select_files,
+                                    font=("Arial", 12),
+                                    bg="#4CAF50", fg="white",
+                                    width=15, height=2)
+        self.select_btn.pack(side=tk.LEFT, padx=5)
+
+        self.folder_btn = tk.Button(select_frame, text="选择文件夹",
+                                    command=self.select_folder,
+                                    font=("Arial", 12),
+                                    bg="#4CAF50", fg="white",
+                                    width=15, height=2)
+        self.folder_btn.pack(side=tk.LEFT, padx=5)
 
         # 文件列表框架
         list_frame = tk.Frame(self.root)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
 
         # 文件列表标签
-        list_label = tk.Label(list_frame, text="已选文件:", anchor="w")
+        list_label = tk.Label(list_frame, text="已选文件/文件夹:", anchor="w")
         list_label.pack(fill=tk.X)
 
         # 文件列表框和滚动条
@@ -61,41 +73,51 @@ class LyricsExtractorGUI:
         btn_frame.pack(pady=10)
 
         # 提取按钮
-        extract_btn = tk.Button(btn_frame, text="提取歌词",
-                                command=self.extract_lyrics,
-                                font=("Arial", 10),
-                                bg="#2196F3", fg="white",
-                                width=15, height=1)
-        extract_btn.pack(side=tk.LEFT, padx=5)
+        self.extract_btn = tk.Button(btn_frame, text="提取歌词",
+                                     command=self.extract_lyrics,
+                                     font=("Arial", 10),
+                                     bg="#2196F3", fg="white",
+                                     width=15, height=1)
+        self.extract_btn.pack(side=tk.LEFT, padx=5)
 
         # 清空列表按钮
-        clear_btn = tk.Button(btn_frame, text="清空列表",
-                              command=self.clear_list,
-                              font=("Arial", 10),
-                              bg="#FF9800", fg="white",
-                              width=15, height=1)
-        clear_btn.pack(side=tk.LEFT, padx=5)
+        self.clear_btn = tk.Button(btn_frame, text="清空列表",
+                                   command=self.clear_list,
+                                   font=("Arial", 10),
+                                   bg="#FF9800", fg="white",
+                                   width=15, height=1)
+        self.clear_btn.pack(side=tk.LEFT, padx=5)
 
         # 退出按钮
         exit_btn = tk.Button(btn_frame, text="退出",
-                             command=self.root.quit,
+                             command=self.root.destroy,
                              font=("Arial", 10),
                              bg="#F44336", fg="white",
                              width=15, height=1)
         exit_btn.pack(side=tk.LEFT, padx=5)
 
         # 状态标签
-        self.status_label = tk.Label(self.root, text="请选择音频文件",
+        self.status_label = tk.Label(self.root, text="请选择音频文件或文件夹",
                                      relief=tk.SUNKEN, anchor=tk.W)
         self.status_label.pack(fill=tk.X, side=tk.BOTTOM)
 
+    def add_paths(self, paths):
+        existing = set(self.file_listbox.get(0, tk.END))
+        for path in paths:
+            if path not in existing:
+                self.file_listbox.insert(tk.END, path)
+                existing.add(path)
+
     def select_files(self):
         """打开文件选择对话框"""
+        patterns = " ".join(f"*{ext}" for ext in sorted(LYRICS_EXTENSIONS))
         file_types = [
-            ("音频文件", "*.mp3 *.flac *.opus *.wav"),
+            ("音频文件", patterns),
             ("MP3文件", "*.mp3"),
             ("FLAC文件", "*.flac"),
+            ("M4A文件", "*.m4a"),
             ("Opus文件", "*.opus"),
+            ("OGG文件", "*.ogg"),
             ("WAV文件", "*.wav"),
             ("所有文件", "*.*")
         ]
@@ -106,12 +128,16 @@ class LyricsExtractorGUI:
         )
 
         if files:
-            for file_path in files:
-                if file_path not in self.file_listbox.get(0, tk.END):
-                    self.file_listbox.insert(tk.END, file_path)
-
+            self.add_paths(files)
             self.update_status(f"已选择 {len(files)} 个文件")
 
+    def select_folder(self):
+        """选择文件夹（递归查找其中的音频文件）"""
+        folder = filedialog.askdirectory(title="选择音频文件夹")
+        if folder:
+            self.add_paths([folder])
+            self.update_status(f"已添加文件夹: {folder}")
+
     def clear_list(self):
         """清空文件列表"""
         self.file_listbox.delete(0, tk.END)
@@ -120,154 +146,69 @@ class LyricsExtractorGUI:
     def update_status(self, message):
         """更新状态标签"""
         self.status_label.config(text=message)
-        self.root.update_idletasks()
-
-    def detect_encoding(self, text_bytes):
-        """检测文本编码"""
-        result = chardet.detect(text_bytes)
-        return result.get('encoding', 'utf-8')
-
-    def extract_lyrics_from_audio(self, file_path):
-        """
-        从音频文件中提取内嵌歌词
-        返回歌词文本和编码信息
-        """
-        file_path = Path(file_path)
-        lyrics_text = None
-        encoding = 'utf-8'
-
-        try:
-            if file_path.suffix.lower() == '.mp3':
-                audio = ID3(file_path)
-                # 查找USLT帧（非同步歌词文本）
-                for key in audio.keys():
-                    if key.startswith('USLT'):
-                        uslt_frame = audio[key]
-                        lyrics_bytes = uslt_frame.text
-                        if isinstance(lyrics_bytes, bytes):
-                            encoding = self.detect_encoding(lyrics_bytes)
-                            lyrics_text = lyrics_bytes.decode(encoding, errors='ignore')
-                        else:
-                            lyrics_text = str(lyrics_bytes)
-                        break
-
-            elif file_path.suffix.lower() == '.flac':
-                audio = FLAC(file_path)
-                if 'lyrics' in audio:
-                    lyrics_bytes = audio['lyrics'][0]
-                    if isinstance(lyrics_bytes, bytes):
-                        encoding = self.detect_encoding(lyrics_bytes)
-                        lyrics_text = lyrics_bytes.decode(encoding, errors='ignore')
-                    else:
-                        lyrics_text = str(lyrics_bytes)
-
-            elif file_path.suffix.lower() == '.opus':
-                audio = OggOpus(file_path)
-                if 'lyrics' in audio:
-                    lyrics_bytes = audio['lyrics'][0]
-                    if isinstance(lyrics_bytes, bytes):
-                        encoding = self.detect_encoding(lyrics_bytes)
-                        lyrics_text = lyrics_bytes.decode(encoding, errors='ignore')
-                    else:
-                        lyrics_text = str(lyrics_bytes)
-
-            elif file_path.suffix.lower() == '.wav':
-                audio = WAVE(file_path)
-                # WAV文件通常不包含标准歌词标签，尝试常见标签
-                tags = audio.tags if audio.tags else []
-                for tag in tags:
-                    if tag[0].lower() in ['lyrics', 'lyric', 'unsyncedlyrics']:
-                        lyrics_bytes = tag[1]
-                        if isinstance(lyrics_bytes, bytes):
-                            encoding = self.detect_encoding(lyrics_bytes)
-                            lyrics_text = lyrics_bytes.decode(encoding, errors='ignore')
-                        else:
-                            lyrics_text = str(lyrics_bytes)
-                        break
-
-        except Exception as e:
-            print(f"处理文件 {file_path} 时出错: {e}")
-            return None, None
-
-        return lyrics_text, encoding
-
-    def save_lyrics_to_lrc(self, audio_file_path, lyrics_text, encoding='utf-8'):
-        """
-        将歌词文本保存为LRC文件
-        """
-        audio_path = Path(audio_file_path)
-        lrc_path = audio_path.with_suffix('.lrc')
-
-        try:
-            with open(lrc_path, 'w', encoding='utf-8') as f:
-                # 如果没有时间标签，添加默认的标题信息
-                if lyrics_text and not any(line.strip().startswith('[') for line in lyrics_text.split('\n')):
-                    f.write(f"[ti:{audio_path.stem}]\n")
-                    f.write("[ar:Unknown]\n")
-                    f.write("[al:Unknown]\n")
-                    f.write("[by:Extracted Lyrics]\n")
-                    f.write("\n")
-
-                if lyrics_text:
-                    f.write(lyrics_text)
-                else:
-                    f.write("[00:00.00]暂无歌词信息\n")
-
-            return lrc_path
-
-        except Exception as e:
-            print(f"保存LRC文件 {lrc_path} 时出错: {e}")
-            return None
+
+    def set_running(self, running):
+        state = tk.DISABLED if running else tk.NORMAL
+        for button in (self.select_btn, self.folder_btn, self.extract_btn, self.clear_btn):
+            button.config(state=state)
 
     def extract_lyrics(self):
-        """提取选中文件的歌词"""
-        file_paths = self.file_listbox.get(0, tk.END)
+        """在工作线程中提取列表中全部文件/文件夹的歌词"""
+        inputs = [path for path in self.file_listbox.get(0, tk.END) if os.path.exists(path)]
+        if not inputs:
+            messagebox.showwarning("警告", "请先选择音频文件或文件夹")
+            return
 
-        if not file_paths:
-            messagebox.showwarning("警告", "请先选择音频文件")
+        self.set_running(True)
+        self.update_status("正在查找音频文件...")
+        last_update = [0.0]
+
+        # 工作线程中调用：限制发往界面的进度消息频率
+        def on_done(job, finished, total):
+            if not job.ok:
+                print(f"  处理失败: {job.name} - {job.error}")
+            elif job.result[0] == WRITTEN:
+                print(f"  已保存: {job.result[1]}")
+            now = time.monotonic()
+            if now - last_update[0] >= UI_UPDATE_INTERVAL or finished == total:
+                last_update[0] = now
+                text = f"正在处理 ({finished}/{total}): {os.path.basename(job.name)}"
+                self.root.after(0, self.update_status, text)
+
+        def worker():
+            try:
+                total, jobs = extract_lyrics_tree(inputs, on_done=on_done)
+                self.root.after(0, self.on_extract_done, total, jobs, None)
+            except Exception as e:
+                self.root.after(0, self.on_extract_done, 0, [], e)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def on_extract_done(self, total, jobs, error):
+        """提取结束（在界面线程中调用）"""
+        self.set_running(False)
+        if error is not None:
+            self.update_status("处理失败")
+            messagebox.showerror("错误", f"提取歌词时出现错误：{error}")
             return
 
-        success_count = 0
-        total_count = len(file_paths)
-
-        for i, file_path in enumerate(file_paths):
-            self.update_status(f"正在处理 ({i + 1}/{total_count}): {os.path.basename(file_path)}")
-
-            # 检查文件是否存在
-            if not os.path.exists(file_path):
-                print(f"文件不存在: {file_path}")
-                continue
-
-            # 检查文件格式
-            valid_extensions = {'.mp3', '.flac', '.opus', '.wav'}
-            file_ext = Path(file_path).suffix.lower()
-            if file_ext not in valid_extensions:
-                print(f"不支持的文件格式: {file_path}")
-                continue
-
-            # 提取歌词
-            lyrics_text, encoding = self.extract_lyrics_from_audio(file_path)
-
-            if lyrics_text:
-                print(f"  找到歌词，编码: {encoding}")
-                # 保存为LRC文件
-                lrc_path = self.save_lyrics_to_lrc(file_path, lyrics_text, encoding)
-                if lrc_path:
-                    print(f"  已保存: {lrc_path}")
-                    success_count += 1
-                else:
-                    print(f"  保存失败: {file_path}")
-            else:
-                print(f"  未找到内嵌歌词: {file_path}")
-                # 即使没有歌词也创建空的LRC文件
-                lrc_path = self.save_lyrics_to_lrc(file_path, None)
-                if lrc_path:
-                    print(f"  创建空LRC文件: {lrc_path}")
-                    success_count += 1
-
-        # 显示结果
-        self.update_status(f"处理完成! 成功处理 {success_count}/{total_count} 个文件")
-        messagebox.showinfo("完成", f"处理完成!\n成功处理 {success_count}/{total_count} 个文件")
+        counts = dict.fromkeys((WRITTEN, UNCHANGED), 0)
+        failed = 0
+        for job in jobs:
+            if not job.ok:
+                failed += 1
+            elif job.result[0] != NO_LYRICS:
+                counts[job.result[0]] += 1
+        no_lyrics = total - counts[WRITTEN] - counts[UNCHANGED] - failed
+
+        message = (f"共 {total} 个音频文件\n"
+                   f"{OUTCOME_LABELS[WRITTEN]}: {counts[WRITTEN]}\n"
+                   f"{OUTCOME_LABELS[UNCHANGED]}: {counts[UNCHANGED]}\n"
+                   f"{OUTCOME_LABELS[NO_LYRICS]}: {no_lyrics}")
+        if failed:
+            message += f"\n处理失败: {failed}（详见控制台）"
+        self.update_status(f"处理完成! 写入 {counts[WRITTEN]} 个LRC文件")
+        messagebox.showinfo("完成", f"处理完成!\n{message}")
 
     def run(self):
         """运行应用程序"""
@@ -280,5 +221,6 @@ def main():
     app.run()
 
 
+# 单独运行：在项目根目录执行 python -m tool026.main
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
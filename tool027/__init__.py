@@ -0,0 +1,5 @@
+NAME = "文件管理工具"
+DESCRIPTION = "管理文件和文件夹，可生成包含文件信息的Excel表格，支持音频文件元数据提取"
+MODULE = "tool027.main"
+GUI = "FileManagerApp"
+LAUNCHER = True
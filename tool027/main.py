@@ -9,6 +9,11 @@ import subprocess
 from datetime import datetime
 import threading
 
+from common import trace
+from common.audio_meta import get_metadata, get_metadata_many
+from common.ffmpeg_pool import run_ffmpeg
+from common.fs_index import list_files
+
 # 音频文件处理相关
 try:
     from mutagen import File
@@ -21,6 +26,355 @@ except ImportError:
     MUTAGEN_AVAILABLE = False
     print("警告: mutagen库未安装，音乐文件元数据功能将不可用")
 
+# 音频文件后缀
+AUDIO_EXTENSIONS = {'.wav', '.mp3', '.flac', '.opus'}
+
+# 表格列
+TABLE_COLUMNS = [
+    '所在目录', '操作类型', '文件名(无后缀)', '文件后缀',
+    '标题', '艺术家', '专辑', '原路径',
+    '备份标题', '备份艺术家', '备份专辑'
+]
+
+
+def print_log(message, level='info'):
+    """无界面时的日志输出"""
+    print(f"{level.upper()}: {message}")
+
+
+def get_audio_metadata(file_path, log=print_log, cached=None):
+    """
+    获取音频文件的元数据（经过元数据缓存，未变化的文件不再解析）
+
+    Args:
+        cached: 已批量获取的缓存记录，为None时单独查询
+    """
+    if not MUTAGEN_AVAILABLE:
+        return {"title": "", "artist": "", "album": ""}
+
+    meta = cached if cached is not None else get_metadata(file_path)
+    if meta is None:
+        return {"title": "", "artist": "", "album": ""}
+    if meta["error"]:
+        log(f"读取元数据失败 {file_path}: {meta['error']}", 'warning')
+        return {"title": "", "artist": "", "album": ""}
+
+    return {
+        "title": meta["title"] or "",
+        "artist": meta["artist"] or "",
+        "album": meta["album"] or ""
+    }
+
+
+def process_file_path(file_path, data, log=print_log, cached=None):
+    """处理单个文件路径"""
+    with trace.span("file", file_path) as file_span:
+        file_span.ok = _process_file_path(file_path, data, log, cached)
+
+
+def _process_file_path(file_path, data, log, cached=None):
+    try:
+        path_obj = Path(file_path)
+        directory = str(path_obj.parent)
+        stem = path_obj.stem
+        suffix = path_obj.suffix.lower()
+
+        is_audio = suffix in AUDIO_EXTENSIONS
+        metadata = {"title": "", "artist": "", "album": ""}
+        if is_audio:
+            with trace.span("tags", file_path):
+                metadata = get_audio_metadata(file_path, log, cached)
+
+        row = [
+            directory,  # 所在目录
+            '移动',  # 操作类型
+            stem,  # 文件名(无后缀)
+            suffix,  # 文件后缀
+            metadata.get('title', ''),  # 标题
+            metadata.get('artist', ''),  # 艺术家
+            metadata.get('album', ''),  # 专辑
+            file_path,  # 原路径
+            metadata.get('title', ''),  # 备份标题
+            metadata.get('artist', ''),  # 备份艺术家
+            metadata.get('album', '')  # 备份专辑
+        ]
+
+        data.append(row)
+        log(f"处理文件: {file_path}")
+        return True
+
+    except Exception as e:
+        log(f"处理文件失败 {file_path}: {str(e)}", 'error')
+        return False
+
+
+
+def process_directory(dir_path, data, log=print_log):
+    """处理目录中的所有文件"""
+    try:
+        with trace.span("walk", dir_path):
+            file_paths = list_files(dir_path)
+        metadata = prefetch_metadata(file_paths)
+        for file_path in file_paths:
+            process_file_path(file_path, data, log, metadata.get(os.path.abspath(file_path)))
+
+        log(f"处理目录: {dir_path}")
+
+    except Exception as e:
+        log(f"处理目录失败 {dir_path}: {str(e)}", 'error')
+
+
+
+def prefetch_metadata(file_paths):
+    """批量获取音频文件的缓存元数据 {绝对路径: 记录}，未缓存的文件并行解析"""
+    audio_paths = [path for path in file_paths if Path(path).suffix.lower() in AUDIO_EXTENSIONS]
+    if not audio_paths or not MUTAGEN_AVAILABLE:
+        return {}
+    with trace.span("prefetch", None, count=len(audio_paths)):
+        return get_metadata_many(audio_paths)
+
+
+def process_row(row, log=print_log):
+    """处理单行数据"""
+    original_path = row['原路径']
+    operation = row['操作类型']
+    new_directory = row['所在目录']
+    new_stem = str(row['文件名(无后缀)'])
+    new_suffix = row['文件后缀']
+
+    # 检查文件是否存在
+    if not os.path.exists(original_path):
+        log(f"文件不存在: {original_path}", 'error')
+        return False
+
+    current_path = original_path
+
+    # 1. 删除操作
+    if operation == '删除':
+        try:
+            with trace.span("delete", current_path):
+                if os.path.isfile(current_path):
+                    os.remove(current_path)
+                    log(f"删除文件: {current_path}")
+                elif os.path.isdir(current_path):
+                    shutil.rmtree(current_path)
+                    log(f"删除文件夹: {current_path}")
+            return True
+        except Exception as e:
+            log(f"删除失败 {current_path}: {str(e)}", 'error')
+            return False
+
+    # 2. 移动/复制操作
+    original_dir = str(Path(original_path).parent)
+    if new_directory != original_dir:
+        new_path_in_dir = os.path.join(new_directory, Path(current_path).name)
+
+        try:
+            if operation == '移动':
+                os.makedirs(new_directory, exist_ok=True)
+                with trace.span("move", current_path):
+                    shutil.move(current_path, new_path_in_dir)
+                current_path = new_path_in_dir
+                log(f"移动文件: {original_path} -> {current_path}")
+            elif operation == '复制':
+                os.makedirs(new_directory, exist_ok=True)
+                with trace.span("copy", current_path) as s:
+                    if os.path.isfile(current_path):
+                        shutil.copy2(current_path, new_path_in_dir)
+                        s.bytes_read = s.bytes_written = trace.file_size(new_path_in_dir)
+                    else:
+                        shutil.copytree(current_path, new_path_in_dir)
+                current_path = new_path_in_dir
+                log(f"复制文件: {original_path} -> {current_path}")
+        except Exception as e:
+            log(f"{operation}操作失败 {original_path} -> {new_path_in_dir}: {str(e)}", 'error')
+            return False
+
+    # 3. 重命名操作
+    current_path_obj = Path(current_path)
+    if current_path_obj.stem != new_stem or current_path_obj.suffix != new_suffix:
+        new_path = os.path.join(current_path_obj.parent, new_stem + new_suffix)
+
+        try:
+            with trace.span("rename", current_path):
+                os.rename(current_path, new_path)
+            current_path = new_path
+            log(f"重命名: {current_path_obj.name} -> {Path(new_path).name}")
+        except Exception as e:
+            log(f"重命名失败 {current_path} -> {new_path}: {str(e)}", 'error')
+            return False
+
+    # 4. 元数据修改（仅对音频文件）
+    if Path(current_path).suffix.lower() in AUDIO_EXTENSIONS:
+        with trace.span("tags", current_path):
+            updated = update_audio_metadata(current_path, row, log)
+        if not updated:
+            return False
+
+    # 5. 转码操作
+    original_suffix = Path(original_path).suffix.lower()
+    if (original_suffix in AUDIO_EXTENSIONS and
+            Path(current_path).suffix.lower() in AUDIO_EXTENSIONS and
+            original_suffix != Path(current_path).suffix.lower()):
+
+        with trace.span("transcode", current_path) as s:
+            s.bytes_read = trace.file_size(current_path)
+            transcoded = transcode_audio(current_path, log)
+            s.bytes_written = trace.file_size(current_path) if transcoded else 0
+        if not transcoded:
+            return False
+
+    return True
+
+
+
+def update_audio_metadata(file_path, row, log=print_log):
+    """更新音频文件元数据"""
+    if not MUTAGEN_AVAILABLE:
+        log("mutagen库不可用，跳过元数据更新", 'warning')
+        return True
+
+    try:
+        audio = File(file_path)
+        if audio is None:
+            log(f"无法读取音频文件: {file_path}", 'warning')
+            return True
+
+        # 检查元数据是否有变化
+        backup_title = str(row['备份标题'])
+        backup_artist = str(row['备份艺术家'])
+        backup_album = str(row['备份专辑'])
+
+        new_title = str(row['标题'])
+        new_artist = str(row['艺术家'])
+        new_album = str(row['专辑'])
+
+        changes_made = False
+
+        if pd.notna(new_title) and str(new_title) != str(backup_title):
+            audio['title'] = str(new_title)
+            changes_made = True
+            log(f"更新标题: {file_path}")
+
+        if pd.notna(new_artist) and str(new_artist) != str(backup_artist):
+            audio['artist'] = str(new_artist)
+            changes_made = True
+            log(f"更新艺术家: {file_path}")
+
+        if pd.notna(new_album) and str(new_album) != str(backup_album):
+            audio['album'] = str(new_album)
+            changes_made = True
+            log(f"更新专辑: {file_path}")
+
+        if changes_made:
+            audio.save()
+            log(f"保存元数据: {file_path}")
+
+        return True
+
+    except Exception as e:
+        log(f"更新元数据失败 {file_path}: {str(e)}", 'error')
+        return False
+
+
+
+def transcode_audio(file_path, log=print_log, threads=None, cancel_event=None, on_progress=None):
+    """转码音频文件"""
+    # 临时文件保留原后缀，ffmpeg据此选择输出格式
+    name, ext = os.path.splitext(file_path)
+    temp_path = f"{name}.temp{ext}"
+    try:
+        # 构建ffmpeg命令
+        cmd = [
+            'ffmpeg', '-i', file_path,
+            *(['-threads', str(threads)] if threads else []),
+            '-y',  # 覆盖输出文件
+            temp_path
+        ]
+
+        log(f"开始转码: {file_path}")
+
+        # 执行转码
+        returncode, stderr = run_ffmpeg(cmd, on_progress=on_progress, cancel_event=cancel_event, timeout=300)
+
+        if returncode == 0:
+            # 删除原文件，重命名临时文件
+            os.remove(file_path)
+            os.rename(temp_path, file_path)
+            log(f"转码完成: {file_path}")
+            return True
+        else:
+            log(f"转码失败 {file_path}: {stderr}", 'error')
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+    except subprocess.TimeoutExpired:
+        log(f"转码超时: {file_path}", 'error')
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+    except Exception as e:
+        log(f"转码异常 {file_path}: {str(e)}", 'error')
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+
+def collect_table_rows(paths, log=print_log):
+    """收集文件/文件夹列表中所有文件的表格行"""
+    data = []
+    file_metadata = prefetch_metadata([path for path in paths if os.path.isfile(path)])
+    for path in paths:
+        if os.path.isfile(path):
+            process_file_path(path, data, log, file_metadata.get(os.path.abspath(path)))
+        elif os.path.isdir(path):
+            process_directory(path, data, log)
+    return data
+
+
+def write_table(data, excel_path):
+    """将文件信息行写入Excel表格，并隐藏备份列"""
+    df = pd.DataFrame(data, columns=TABLE_COLUMNS)
+
+    # 保存Excel文件
+    with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='文件管理')
+
+        # 获取工作表并隐藏列
+        worksheet = writer.sheets['文件管理']
+        worksheet.column_dimensions['H'].hidden = True  # 原路径
+        worksheet.column_dimensions['I'].hidden = True  # 备份标题
+        worksheet.column_dimensions['J'].hidden = True  # 备份艺术家
+        worksheet.column_dimensions['K'].hidden = True  # 备份专辑
+
+
+def apply_table(excel_path, log=print_log):
+    """
+    按Excel表格逐行执行删除/移动/复制/重命名/元数据修改/转码
+
+    Returns:
+        (成功数, 失败数)
+    """
+    df = pd.read_excel(excel_path)
+    success_count = 0
+    error_count = 0
+
+    for index, row in df.iterrows():
+        with trace.span("file", row['原路径']) as file_span:
+            try:
+                file_span.ok = process_row(row, log)
+            except Exception as e:
+                log(f"处理第{index + 2}行失败: {str(e)}", 'error')
+                file_span.ok = False
+        if file_span.ok:
+            success_count += 1
+        else:
+            error_count += 1
+
+    return success_count, error_count
+
+
 
 class FileManagerApp:
     def __init__(self, root):
@@ -41,7 +395,7 @@ class FileManagerApp:
         self.file_paths = []
 
         # 音频文件后缀
-        self.audio_extensions = {'.wav', '.mp3', '.flac', '.opus'}
+        self.audio_extensions = AUDIO_EXTENSIONS
 
         # 创建GUI
         self.create_gui()
@@ -151,29 +505,7 @@ class FileManagerApp:
 
     def get_audio_metadata(self, file_path):
         """获取音频文件的元数据"""
-        if not MUTAGEN_AVAILABLE:
-            return {"title": "", "artist": "", "album": ""}
-
-        try:
-            audio = File(file_path)
-            if audio is None:
-                return {"title": "", "artist": "", "album": ""}
-
-            metadata = {
-                "title": audio.get("title", [""])[0] if audio.get("title") else "",
-                "artist": audio.get("artist", [""])[0] if audio.get("artist") else "",
-                "album": audio.get("album", [""])[0] if audio.get("album") else ""
-            }
-
-            # 确保返回字符串
-            for key in metadata:
-                if not isinstance(metadata[key], str):
-                    metadata[key] = str(metadata[key])
-
-            return metadata
-        except Exception as e:
-            self.log(f"读取元数据失败 {file_path}: {str(e)}", 'warning')
-            return {"title": "", "artist": "", "album": ""}
+        return get_audio_metadata(file_path, self.log)
 
     def generate_table(self):
         """生成Excel表格"""
@@ -192,33 +524,9 @@ class FileManagerApp:
     def _generate_table_thread(self):
         """在后台线程中生成表格"""
         try:
-            data = []
-
-            for path in self.file_paths:
-                if os.path.isfile(path):
-                    self.process_file_path(path, data)
-                elif os.path.isdir(path):
-                    self.process_directory(path, data)
-
-            # 创建DataFrame
-            columns = [
-                '所在目录', '操作类型', '文件名(无后缀)', '文件后缀',
-                '标题', '艺术家', '专辑', '原路径',
-                '备份标题', '备份艺术家', '备份专辑'
-            ]
-
-            df = pd.DataFrame(data, columns=columns)
-
-            # 保存Excel文件
-            with pd.ExcelWriter(self.excel_path, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='文件管理')
-
-                # 获取工作表并隐藏列
-                worksheet = writer.sheets['文件管理']
-                worksheet.column_dimensions['H'].hidden = True  # 原路径
-                worksheet.column_dimensions['I'].hidden = True  # 备份标题
-                worksheet.column_dimensions['J'].hidden = True  # 备份艺术家
-                worksheet.column_dimensions['K'].hidden = True  # 备份专辑
+            with trace.run("tool027", log=self.log):
+                data = collect_table_rows(self.file_paths, self.log)
+            write_table(data, self.excel_path)
 
             self.root.after(0, self._on_table_generated)
 
@@ -228,47 +536,11 @@ class FileManagerApp:
 
     def process_file_path(self, file_path, data):
         """处理单个文件路径"""
-        try:
-            path_obj = Path(file_path)
-            directory = str(path_obj.parent)
-            stem = path_obj.stem
-            suffix = path_obj.suffix.lower()
-
-            is_audio = suffix in self.audio_extensions
-            metadata = self.get_audio_metadata(file_path) if is_audio else {"title": "", "artist": "", "album": ""}
-
-            row = [
-                directory,  # 所在目录
-                '移动',  # 操作类型
-                stem,  # 文件名(无后缀)
-                suffix,  # 文件后缀
-                metadata.get('title', ''),  # 标题
-                metadata.get('artist', ''),  # 艺术家
-                metadata.get('album', ''),  # 专辑
-                file_path,  # 原路径
-                metadata.get('title', ''),  # 备份标题
-                metadata.get('artist', ''),  # 备份艺术家
-                metadata.get('album', '')  # 备份专辑
-            ]
-
-            data.append(row)
-            self.log(f"处理文件: {file_path}")
-
-        except Exception as e:
-            self.log(f"处理文件失败 {file_path}: {str(e)}", 'error')
+        process_file_path(file_path, data, self.log)
 
     def process_directory(self, dir_path, data):
         """处理目录中的所有文件"""
-        try:
-            for root, dirs, files in os.walk(dir_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    self.process_file_path(file_path, data)
-
-            self.log(f"处理目录: {dir_path}")
-
-        except Exception as e:
-            self.log(f"处理目录失败 {dir_path}: {str(e)}", 'error')
+        process_directory(dir_path, data, self.log)
 
     def _on_table_generated(self):
         """表格生成完成后的回调"""
@@ -306,21 +578,8 @@ class FileManagerApp:
     def _apply_changes_thread(self):
         """在后台线程中应用更改"""
         try:
-            # 读取Excel文件
-            df = pd.read_excel(self.excel_path)
-            success_count = 0
-            error_count = 0
-
-            for index, row in df.iterrows():
-                try:
-                    if self.process_row(row):
-                        success_count += 1
-                    else:
-                        error_count += 1
-
-                except Exception as e:
-                    self.log(f"处理第{index + 2}行失败: {str(e)}", 'error')
-                    error_count += 1
+            with trace.run("tool027", log=self.log):
+                success_count, error_count = apply_table(self.excel_path, self.log)
 
             self.root.after(0, lambda: self._on_changes_applied(success_count, error_count))
 
@@ -330,172 +589,15 @@ class FileManagerApp:
 
     def process_row(self, row):
         """处理单行数据"""
-        original_path = row['原路径']
-        operation = row['操作类型']
-        new_directory = row['所在目录']
-        new_stem = str(row['文件名(无后缀)'])
-        new_suffix = row['文件后缀']
-
-        # 检查文件是否存在
-        if not os.path.exists(original_path):
-            self.log(f"文件不存在: {original_path}", 'error')
-            return False
-
-        current_path = original_path
-
-        # 1. 删除操作
-        if operation == '删除':
-            try:
-                if os.path.isfile(current_path):
-                    os.remove(current_path)
-                    self.log(f"删除文件: {current_path}")
-                elif os.path.isdir(current_path):
-                    shutil.rmtree(current_path)
-                    self.log(f"删除文件夹: {current_path}")
-                return True
-            except Exception as e:
-                self.log(f"删除失败 {current_path}: {str(e)}", 'error')
-                return False
-
-        # 2. 移动/复制操作
-        original_dir = str(Path(original_path).parent)
-        if new_directory != original_dir:
-            new_path_in_dir = os.path.join(new_directory, Path(current_path).name)
-
-            try:
-                if operation == '移动':
-                    os.makedirs(new_directory, exist_ok=True)
-                    shutil.move(current_path, new_path_in_dir)
-                    current_path = new_path_in_dir
-                    self.log(f"移动文件: {original_path} -> {current_path}")
-                elif operation == '复制':
-                    os.makedirs(new_directory, exist_ok=True)
-                    if os.path.isfile(current_path):
-                        shutil.copy2(current_path, new_path_in_dir)
-                    else:
-                        shutil.copytree(current_path, new_path_in_dir)
-                    current_path = new_path_in_dir
-                    self.log(f"复制文件: {original_path} -> {current_path}")
-            except Exception as e:
-                self.log(f"{operation}操作失败 {original_path} -> {new_path_in_dir}: {str(e)}", 'error')
-                return False
-
-        # 3. 重命名操作
-        current_path_obj = Path(current_path)
-        if current_path_obj.stem != new_stem or current_path_obj.suffix != new_suffix:
-            new_path = os.path.join(current_path_obj.parent, new_stem + new_suffix)
-
-            try:
-                os.rename(current_path, new_path)
-                current_path = new_path
-                self.log(f"重命名: {current_path_obj.name} -> {Path(new_path).name}")
-            except Exception as e:
-                self.log(f"重命名失败 {current_path} -> {new_path}: {str(e)}", 'error')
-                return False
-
-        # 4. 元数据修改（仅对音频文件）
-        if Path(current_path).suffix.lower() in self.audio_extensions:
-            if not self.update_audio_metadata(current_path, row):
-                return False
-
-        # 5. 转码操作
-        original_suffix = Path(original_path).suffix.lower()
-        if (original_suffix in self.audio_extensions and
-                Path(current_path).suffix.lower() in self.audio_extensions and
-                original_suffix != Path(current_path).suffix.lower()):
-
-            if not self.transcode_audio(current_path):
-                return False
-
-        return True
+        return process_row(row, self.log)
 
     def update_audio_metadata(self, file_path, row):
         """更新音频文件元数据"""
-        if not MUTAGEN_AVAILABLE:
-            self.log("mutagen库不可用，跳过元数据更新", 'warning')
-            return True
-
-        try:
-            audio = File(file_path)
-            if audio is None:
-                self.log(f"无法读取音频文件: {file_path}", 'warning')
-                return True
-
-            # 检查元数据是否有变化
-            backup_title = str(row['备份标题'])
-            backup_artist = str(row['备份艺术家'])
-            backup_album = str(row['备份专辑'])
-
-            new_title = str(row['标题'])
-            new_artist = str(row['艺术家'])
-            new_album = str(row['专辑'])
-
-            changes_made = False
-
-            if pd.notna(new_title) and str(new_title) != str(backup_title):
-                audio['title'] = str(new_title)
-                changes_made = True
-                self.log(f"更新标题: {file_path}")
-
-            if pd.notna(new_artist) and str(new_artist) != str(backup_artist):
-                audio['artist'] = str(new_artist)
-                changes_made = True
-                self.log(f"更新艺术家: {file_path}")
-
-            if pd.notna(new_album) and str(new_album) != str(backup_album):
-                audio['album'] = str(new_album)
-                changes_made = True
-                self.log(f"更新专辑: {file_path}")
-
-            if changes_made:
-                audio.save()
-                self.log(f"保存元数据: {file_path}")
-
-            return True
-
-        except Exception as e:
-            self.log(f"更新元数据失败 {file_path}: {str(e)}", 'error')
-            return False
+        return update_audio_metadata(file_path, row, self.log)
 
     def transcode_audio(self, file_path):
         """转码音频文件"""
-        try:
-            temp_path = file_path + '.temp'
-
-            # 构建ffmpeg命令
-            cmd = [
-                'ffmpeg', '-i', file_path,
-                '-y',  # 覆盖输出文件
-                temp_path
-            ]
-
-            self.log(f"开始转码: {file_path}")
-
-            # 执行转码
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-
-            if result.returncode == 0:
-                # 删除原文件，重命名临时文件
-                os.remove(file_path)
-                os.rename(temp_path, file_path)
-                self.log(f"转码完成: {file_path}")
-                return True
-            else:
-                self.log(f"转码失败 {file_path}: {result.stderr}", 'error')
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                return False
-
-        except subprocess.TimeoutExpired:
-            self.log(f"转码超时: {file_path}", 'error')
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            return False
-        except Exception as e:
-            self.log(f"转码异常 {file_path}: {str(e)}", 'error')
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            return False
+        return transcode_audio(file_path, self.log)
 
     def _on_changes_applied(self, success_count, error_count):
         """更改应用完成后的回调"""
@@ -518,5 +620,6 @@ def main():
     root.mainloop()
 
 
+# 单独运行：在项目根目录执行 python -m tool027.main
 if __name__ == "__main__":
     main()
\ No newline at end of file
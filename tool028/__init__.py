@@ -0,0 +1,5 @@
+NAME = "WEM音频文件转换器"
+DESCRIPTION = "将WEM格式音频文件转换为FLAC或WAV格式"
+MODULE = "tool028.main"
+GUI = "WEMConverterGUI"
+LAUNCHER = True
@@ -5,10 +5,100 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 
+from common import trace
+from common.ffmpeg_pool import FFmpegPool, run_ffmpeg
+from common.manifest import Manifest
+
 vgm_path = r"D:\Kin-project\PythonProjects\GamesUnpack\vgmstream-win64\vgmstream-cli.exe"
 ffmpeg_path = r"D:\Program Files\ffmpeg\ffmpeg.exe"
 
 
+def wem_output_path(file_path, output_dir, output_format="FLAC"):
+    """WEM文件转换后的输出路径"""
+    file_base = path.splitext(path.basename(file_path))[0]
+    return path.join(output_dir, f"{file_base}.{output_format.lower()}")
+
+
+def _check_call(cmd, cancel_event=None, on_progress=None):
+    """运行外部命令，失败时抛出 CalledProcessError"""
+    returncode, stderr = run_ffmpeg(cmd, on_progress=on_progress, cancel_event=cancel_event)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+
+
+def convert_wem(file_path, output_dir, output_format="FLAC", keep_original=True,
+                threads=1, cancel_event=None, on_progress=None):
+    """
+    转换单个WEM文件为FLAC或WAV
+
+    Args:
+        file_path: WEM文件路径
+        output_dir: 输出目录
+        output_format: "FLAC" 或 "WAV"
+        keep_original: 是否保留原WEM文件
+        threads: ffmpeg线程数（并行转换多个文件时保持为1）
+        cancel_event: 设置后终止正在运行的vgmstream/ffmpeg
+        on_progress: FLAC编码进度回调 on_progress(已处理秒数, 比例或None)
+
+    Returns:
+        是否转换成功
+    """
+    with trace.span("file", file_path) as file_span:
+        file_span.ok = _convert_wem(file_path, output_dir, output_format, keep_original,
+                                    threads, cancel_event, on_progress)
+        return file_span.ok
+
+
+def _convert_wem(file_path, output_dir, output_format, keep_original, threads, cancel_event, on_progress):
+    try:
+        filename = path.basename(file_path)
+        file_base = path.splitext(filename)[0]
+
+        # 1. 用 vgmstream 解码为 WAV
+        wav_path = path.join(output_dir, f"{file_base}.wav")
+        with trace.span("vgmstream", file_path) as s:
+            _check_call([
+                vgm_path,
+                "-o", wav_path,
+                file_path
+            ], cancel_event)
+            s.bytes_read = trace.file_size(file_path)
+            s.bytes_written = trace.file_size(wav_path)
+
+        # 根据选择的格式处理
+        if output_format == "FLAC":
+            # 2. 用 FFmpeg 转 WAV 为 FLAC
+            output_path = path.join(output_dir, f"{file_base}.flac")
+            with trace.span("ffmpeg", wav_path) as s:
+                _check_call([
+                    ffmpeg_path,
+                    "-i", wav_path,
+                    "-threads", str(threads),
+                    "-c:a", "flac",
+                    output_path
+                ], cancel_event, on_progress)
+                s.bytes_read = trace.file_size(wav_path)
+                s.bytes_written = trace.file_size(output_path)
+
+            # 清理临时文件
+            if path.exists(wav_path):
+                remove(wav_path)
+        # 如果是WAV格式，直接保留解码后的WAV文件
+
+        # 如果不保留原文件，删除WEM文件
+        if not keep_original and path.exists(file_path):
+            remove(file_path)
+
+        return True
+
+    except subprocess.CalledProcessError as e:
+        print(f"转换失败: {e}")
+        return False
+    except Exception as e:
+        print(f"发生错误: {e}")
+        return False
+
+
 class WEMConverterGUI:
     def __init__(self, root):
         self.root = root
@@ -19,6 +109,7 @@ class WEMConverterGUI:
         # 变量
         self.format_var = tk.StringVar(value="FLAC")
         self.keep_original_var = tk.BooleanVar(value=True)
+        self.skip_unchanged_var = tk.BooleanVar(value=True)
         self.progress_var = tk.DoubleVar()
         self.status_var = tk.StringVar(value="准备就绪")
 
@@ -54,6 +145,10 @@ class WEMConverterGUI:
                                      variable=self.keep_original_var)
         keep_check.grid(row=0, column=0, sticky=tk.W)
 
+        skip_check = ttk.Checkbutton(file_option_frame, text="跳过已转换且未变化的文件",
+                                     variable=self.skip_unchanged_var)
+        skip_check.grid(row=1, column=0, sticky=tk.W)
+
         # 选择按钮
         select_button = ttk.Button(main_frame, text="选择文件或文件夹并开始",
                                    command=self.select_and_convert)
@@ -126,75 +221,44 @@ class WEMConverterGUI:
         """转换文件列表"""
         total_files = len(file_paths)
         converted_count = 0
-
-        for i, file_path in enumerate(file_paths):
-            try:
-                # 更新状态
-                filename = path.basename(file_path)
-                self.status_var.set(f"正在转换: {filename} ({i + 1}/{total_files})")
-
-                # 转换单个文件
-                if self.convert_single_file(file_path, output_dir):
-                    converted_count += 1
-
-                # 更新进度
-                self.progress_var.set((i + 1) / total_files * 100)
-                self.root.update_idletasks()
-
-            except Exception as e:
-                self.show_error(f"转换文件 {filename} 时出错: {str(e)}")
+        skipped_count = 0
+        output_format = self.format_var.get()
+        keep_original = self.keep_original_var.get()
+        manifest = Manifest("tool028", {"format": output_format})
+
+        # vgmstream/ffmpeg 按核心数并行转换
+        pool = FFmpegPool()
+        for file_path in file_paths:
+            output_path = wem_output_path(file_path, output_dir, output_format)
+            if self.skip_unchanged_var.get() and manifest.is_current(file_path, [output_path]):
+                skipped_count += 1
                 continue
+            pool.submit(path.basename(file_path), convert_wem, file_path, output_dir, output_format, keep_original)
+
+        def on_done(job, finished, total):
+            nonlocal converted_count
+            if job.ok and job.result:
+                manifest.record(job.args[0], [wem_output_path(job.args[0], output_dir, output_format)])
+                converted_count += 1
+            elif not job.ok:
+                print(f"转换文件 {job.name} 时出错: {job.error}")
+            done = finished + skipped_count
+            self.status_var.set(f"已完成: {job.name} ({done}/{total_files})")
+            self.progress_var.set(done / total_files * 100)
+
+        with trace.run("tool028"):
+            trace.count("跳过未变化", skipped_count)
+            pool.run(on_done)
 
         # 完成提示
-        self.status_var.set(f"转换完成！成功转换 {converted_count}/{total_files} 个文件")
-        messagebox.showinfo("完成", f"转换完成！\n成功转换 {converted_count}/{total_files} 个文件")
+        skipped = f"，跳过未变化 {skipped_count} 个" if skipped_count else ""
+        self.status_var.set(f"转换完成！成功转换 {converted_count}/{total_files} 个文件{skipped}")
+        messagebox.showinfo("完成", f"转换完成！\n成功转换 {converted_count}/{total_files} 个文件{skipped}")
         self.progress_var.set(0)
 
     def convert_single_file(self, file_path, output_dir):
         """转换单个WEM文件"""
-        try:
-            filename = path.basename(file_path)
-            file_base = path.splitext(filename)[0]
-
-            # 1. 用 vgmstream 解码为 WAV
-            wav_path = path.join(output_dir, f"{file_base}.wav")
-            subprocess.run([
-                vgm_path,
-                "-o", wav_path,
-                file_path
-            ], check=True, capture_output=True)
-
-            # 根据选择的格式处理
-            if self.format_var.get() == "FLAC":
-                # 2. 用 FFmpeg 转 WAV 为 FLAC
-                output_path = path.join(output_dir, f"{file_base}.flac")
-                subprocess.run([
-                    ffmpeg_path,
-                    "-i", wav_path,
-                    "-c:a", "flac",
-                    output_path
-                ], check=True, capture_output=True)
-            else:
-                # 如果是WAV格式，直接保留解码后的WAV文件
-                output_path = wav_path
-                # 不需要额外处理，文件已经在正确位置
-
-            # 清理临时文件
-            if path.exists(wav_path) and self.format_var.get() == "FLAC":
-                remove(wav_path)
-
-            # 如果不保留原文件，删除WEM文件
-            if not self.keep_original_var.get() and path.exists(file_path):
-                remove(file_path)
-
-            return True
-
-        except subprocess.CalledProcessError as e:
-            print(f"转换失败: {e}")
-            return False
-        except Exception as e:
-            print(f"发生错误: {e}")
-            return False
+        return convert_wem(file_path, output_dir, self.format_var.get(), self.keep_original_var.get())
 
     def show_error(self, message):
         """显示错误信息"""
@@ -228,6 +292,7 @@ def convert_audio_single(oldn, newn, path_out):
             remove(wem_path)
 
 
+# 单独运行：在项目根目录执行 python -m tool028.main
 if __name__ == "__main__":
     # 检查必要的工具是否存在
     if not path.exists(vgm_path):